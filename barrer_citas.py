@@ -0,0 +1,49 @@
+"""
+Cierra las citas vencidas: confirmadas de días pasados -> 'no_asistio' y
+pendientes vencidas -> 'cancelada' (ver services/barrido_citas_service.py).
+
+Pensado para un cron diario (p.ej. Railway cron a primera hora). Trabaja
+por lotes con pausas, por lo que también puede correr en horario de atención.
+
+Uso:
+    python barrer_citas.py                          # Ejecutar el barrido
+    python barrer_citas.py --simular                # Solo contar las citas afectadas
+    python barrer_citas.py --lote 200 --pausa 1     # Lotes más pequeños y espaciados
+    python barrer_citas.py --fecha 2025-12-01       # Tomar esa fecha como "hoy"
+"""
+
+import argparse
+from datetime import date
+
+from app import app
+from services.barrido_citas_service import BarridoCitasService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de citas vencidas")
+    parser.add_argument("--simular", action="store_true", help="Solo contar, sin modificar")
+    parser.add_argument("--fecha", type=date.fromisoformat, help="Fecha de referencia (YYYY-MM-DD)")
+    parser.add_argument("--lote", type=int, help="Citas por transacción (BARRIDO_LOTE)")
+    parser.add_argument("--pausa", type=float, help="Segundos entre lotes (BARRIDO_PAUSA)")
+    parser.add_argument("--pendiente-dias", type=int, help="Días de gracia para pendientes (BARRIDO_PENDIENTE_DIAS)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.simular:
+            print("--- Citas que se cerrarían ---")
+            for regla, total in BarridoCitasService.contar(args.fecha, args.pendiente_dias).items():
+                print(f"  {regla}: {total}")
+            return
+
+        print("--- Barrido de citas vencidas ---")
+        resumen = BarridoCitasService.ejecutar(
+            hoy=args.fecha, dias_pendiente=args.pendiente_dias, lote=args.lote, pausa=args.pausa
+        )
+        if resumen.pop("omitido", False):
+            print("⚠️ Otro proceso está ejecutando el barrido; no se hizo nada.")
+        for regla, total in resumen.items():
+            print(f"✓ {regla}: {total} citas")
+
+
+if __name__ == "__main__":
+    main()
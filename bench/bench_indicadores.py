@@ -0,0 +1,240 @@
+"""
+Benchmark de GET /api/indicadores: siete consultas sobre 'citas' (versión
+anterior) vs. una consulta sobre la tabla de hechos 'citas_diarias'
+(IndicadoresService).
+
+Genera un año de horarios y citas en una base SQLite temporal (o en
+TEST_DATABASE_URI si está definida) y compara tiempo y número de consultas.
+
+Uso:
+    python bench/bench_indicadores.py
+    python bench/bench_indicadores.py --citas-por-horario 20 --repeticiones 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+from sqlalchemy import event, func
+
+from factory import create_app
+from extensions.database import db
+from controllers.indicador_controller import IndicadorController
+from models.area_model import Area
+from models.cita_model import Cita
+from models.cita_diaria_model import CitaDiaria
+from models.estado_cita_model import EstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.paciente_model import Paciente
+from models.persona_model import Persona
+from models.rol_model import Rol
+from models.usuario_model import Usuario
+
+ESTADOS = ["pendiente", "confirmada", "atendida", "cancelada", "no_asistio", "referido"]
+PESOS_ESTADOS = [10, 15, 45, 12, 15, 3]
+
+
+def sembrar_anio(app, citas_por_horario, areas=4, medicos_por_area=3, semilla=7):
+    """Inserta un año de horarios (turnos M/T diarios por médico) con sus citas."""
+    rnd = random.Random(semilla)
+    inicio = date.today() - timedelta(days=365)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        estados = {}
+        for nombre in ESTADOS:
+            estados[nombre] = EstadoCita(nombre=nombre, color="blue")
+            db.session.add(estados[nombre])
+        db.session.add(Rol(id=2, nombre="profesional"))
+        db.session.flush()
+
+        persona_paciente = Persona(dni="70000000", nombres="Paciente", apellido_paterno="Bench", apellido_materno=".")
+        db.session.add(persona_paciente)
+        db.session.flush()
+        paciente = Paciente(persona_id=persona_paciente.id, estado_civil="S")
+        db.session.add(paciente)
+
+        medicos = []
+        for a in range(areas):
+            area = Area(nombre=f"Area {a}")
+            db.session.add(area)
+            db.session.flush()
+            for m in range(medicos_por_area):
+                persona = Persona(dni=f"4{a:03d}{m:04d}", nombres="Medico", apellido_paterno=str(m), apellido_materno=".")
+                db.session.add(persona)
+                db.session.flush()
+                medico = Usuario(persona_id=persona.id, password="x", rol_id=2)
+                db.session.add(medico)
+                db.session.flush()
+                medicos.append((medico.id, area.id))
+        db.session.commit()
+
+        horarios = []
+        for d in range(365):
+            fecha = inicio + timedelta(days=d)
+            for medico_id, area_id in medicos:
+                for turno in ("M", "T"):
+                    horarios.append({
+                        "medico_id": medico_id, "area_id": area_id, "fecha": fecha,
+                        "dia_semana": fecha.weekday(), "turno": turno, "cupos": citas_por_horario + 5
+                    })
+        db.session.execute(HorarioMedico.__table__.insert(), horarios)
+
+        filas = db.session.query(HorarioMedico.id, HorarioMedico.medico_id, HorarioMedico.area_id, HorarioMedico.fecha).all()
+        estado_ids = [estados[n].id for n in ESTADOS]
+        citas = []
+        for horario_id, medico_id, area_id, fecha in filas:
+            for _ in range(citas_por_horario):
+                citas.append({
+                    "paciente_id": paciente.id, "horario_id": horario_id, "doctor_id": medico_id,
+                    "area_id": area_id, "fecha": fecha, "sintomas": "Control",
+                    "fecha_registro": datetime.combine(fecha, datetime.min.time()) - timedelta(days=rnd.randint(0, 20)),
+                    "estado_id": rnd.choices(estado_ids, PESOS_ESTADOS)[0]
+                })
+        db.session.execute(Cita.__table__.insert(), citas)
+        CitaDiaria.reconstruir()
+        db.session.commit()
+
+        return inicio, inicio + timedelta(days=364), len(filas), len(citas)
+
+
+def indicadores_siete_consultas(fecha_inicio, fecha_fin, area_id=None):
+    """Reproduce las consultas de la versión anterior de obtener_indicadores."""
+    def citas(*filtros):
+        query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
+            Cita.fecha >= fecha_inicio, Cita.fecha <= fecha_fin, *filtros
+        )
+        if area_id:
+            query = query.filter(Cita.area_id == area_id)
+        return query.scalar() or 0
+
+    cupos_query = db.session.query(func.sum(HorarioMedico.cupos)).filter(
+        HorarioMedico.fecha >= fecha_inicio, HorarioMedico.fecha <= fecha_fin
+    )
+    if area_id:
+        cupos_query = cupos_query.filter(HorarioMedico.area_id == area_id)
+
+    resultado = {
+        "cupos_totales": cupos_query.scalar() or 0,
+        "citas_programadas": citas(EstadoCita.nombre != 'cancelada'),
+        "citas_confirmadas": citas(EstadoCita.nombre.in_(['confirmada', 'atendida', 'no_asistio'])),
+        "no_shows": citas(EstadoCita.nombre == 'no_asistio'),
+    }
+
+    lead_time_query = db.session.query(
+        func.avg(func.cast(Cita.fecha, db.Date) - func.cast(Cita.fecha_registro, db.Date))
+    ).join(EstadoCita).filter(
+        Cita.fecha >= fecha_inicio, Cita.fecha <= fecha_fin,
+        EstadoCita.nombre != 'cancelada', Cita.fecha.isnot(None)
+    )
+    if area_id:
+        lead_time_query = lead_time_query.filter(Cita.area_id == area_id)
+    lead_time = lead_time_query.scalar()
+
+    resultado["lead_time"] = round(float(lead_time), 2) if lead_time else 0
+    resultado["citas_atendidas"] = citas(EstadoCita.nombre == 'atendida')
+    resultado["citas_canceladas"] = citas(EstadoCita.nombre == 'cancelada')
+    return resultado
+
+
+def indicadores_endpoint(app, fecha_inicio, fecha_fin, area_id=None):
+    url = f"/?fecha_inicio={fecha_inicio}&fecha_fin={fecha_fin}"
+    if area_id:
+        url += f"&area_id={area_id}"
+    with app.test_request_context(url):
+        respuesta, status = IndicadorController.obtener_indicadores()
+    assert status == 200, respuesta.get_json()
+    datos = respuesta.get_json()
+    ind = datos["indicadores"]
+    extra = datos["estadisticas_adicionales"]
+    return {
+        "cupos_totales": ind["utilizacion_capacidad"]["componentes"]["cupos_totales"],
+        "citas_programadas": ind["utilizacion_capacidad"]["componentes"]["citas_programadas"],
+        "citas_confirmadas": ind["tasa_inasistencia"]["componentes"]["citas_confirmadas"],
+        "no_shows": ind["tasa_inasistencia"]["componentes"]["no_shows"],
+        "lead_time": ind["lead_time"]["valor"],
+        "citas_atendidas": extra["citas_atendidas"],
+        "citas_canceladas": extra["citas_canceladas"],
+    }
+
+
+def db_dialecto(app):
+    with app.app_context():
+        return db.engine.dialect.name
+
+
+def medir(app, funcion, repeticiones):
+    consultas = [0]
+
+    def contar(*args, **kwargs):
+        consultas[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", contar)
+        try:
+            tiempos = []
+            for _ in range(repeticiones):
+                db.session.remove()
+                inicio = time.perf_counter()
+                resultado = funcion()
+                tiempos.append(time.perf_counter() - inicio)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", contar)
+
+    tiempos.sort()
+    return resultado, tiempos[len(tiempos) // 2] * 1000, consultas[0] // repeticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--citas-por-horario", type=int, default=8)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    print("=" * 60)
+    print("Sembrando un año de datos...")
+    fecha_inicio, fecha_fin, total_horarios, total_citas = sembrar_anio(app, args.citas_por_horario)
+    print(f"✓ {total_horarios} horarios, {total_citas} citas ({fecha_inicio} a {fecha_fin})")
+    with app.app_context():
+        print(f"✓ {CitaDiaria.query.count()} filas en citas_diarias")
+    print("=" * 60)
+
+    for area_id in (None, 1):
+        def antes():
+            return indicadores_siete_consultas(fecha_inicio, fecha_fin, area_id)
+
+        def despues():
+            return indicadores_endpoint(app, fecha_inicio, fecha_fin, area_id)
+
+        res_antes, ms_antes, q_antes = medir(app, antes, args.repeticiones)
+        res_despues, ms_despues, q_despues = medir(app, despues, args.repeticiones)
+
+        etiqueta = f"area_id={area_id}" if area_id else "todas las áreas"
+        print(f"[{etiqueta}]")
+        print(f"  Antes:   {ms_antes:8.1f} ms (mediana) | {q_antes} consultas")
+        print(f"  Después: {ms_despues:8.1f} ms (mediana) | {q_despues} consultas")
+        print(f"  Mejora:  x{ms_antes / ms_despues:.2f}")
+        # En SQLite CAST(fecha AS DATE) no da días (la versión anterior solo era
+        # correcta en PostgreSQL); ahí solo se comparan los conteos.
+        if db_dialecto(app) == 'sqlite':
+            res_antes.pop("lead_time")
+            res_despues.pop("lead_time")
+        assert res_antes == res_despues, f"Resultados distintos:\n{res_antes}\n{res_despues}"
+        print("  ✓ Mismos resultados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Evaluación offline de la recomendación de área por síntomas contra las
+citas históricas de la base configurada (solo lectura).
+
+Divide las citas con área asignada en orden cronológico: las primeras
+entrenan el clasificador local y las últimas (--prueba) se usan para medir:
+- Precisión top-1 / top-3 del clasificador local y cobertura (citas con
+  alguna predicción), comparadas con recomendar siempre el área más frecuente
+- Tasa de aciertos de la caché por síntomas normalizados con el TTL dado,
+  reproduciendo las citas en orden de registro, y con qué frecuencia el área
+  cacheada coincide con la asignada
+
+Uso:
+    python bench/evaluar_recomendador.py
+    python bench/evaluar_recomendador.py --prueba 0.3 --ttl 3600
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from factory import create_app
+from extensions.database import db
+from models.area_model import Area
+from models.cita_model import Cita
+from services.recomendacion_service import ClasificadorSintomas, clave_sintomas, version_catalogo
+
+
+def cargar_citas():
+    return db.session.query(Cita.sintomas, Cita.area_id, Cita.fecha_registro).filter(
+        Cita.area_id.isnot(None)
+    ).order_by(Cita.fecha_registro, Cita.id).all()
+
+
+def evaluar_clasificador(entrenamiento, prueba, areas):
+    clasificador = ClasificadorSintomas().entrenar([(c.sintomas, c.area_id) for c in entrenamiento], areas)
+    mas_frecuente = Counter(c.area_id for c in entrenamiento).most_common(1)[0][0]
+
+    top1 = top3 = cubiertas = base = 0
+    inicio = time.perf_counter()
+    for cita in prueba:
+        prediccion = [area_id for area_id, _ in clasificador.predecir(cita.sintomas, k=3)]
+        cubiertas += bool(prediccion)
+        top1 += bool(prediccion) and prediccion[0] == cita.area_id
+        top3 += cita.area_id in prediccion
+        base += cita.area_id == mas_frecuente
+    ms_por_consulta = (time.perf_counter() - inicio) * 1000 / len(prueba)
+
+    return {
+        "top1": top1 / len(prueba),
+        "top3": top3 / len(prueba),
+        "cobertura": cubiertas / len(prueba),
+        "base": base / len(prueba),
+        "ms": ms_por_consulta
+    }
+
+
+def evaluar_cache(citas, desde, ttl, version):
+    """Reproduce las citas en orden; cuenta aciertos solo desde el índice 'desde'."""
+    vistas = {}  # clave -> (fecha_registro, area_id)
+    consultas = aciertos = coincidencias = 0
+    for i, cita in enumerate(citas):
+        clave = clave_sintomas(cita.sintomas, version)
+        previa = vistas.get(clave)
+        vigente = previa and cita.fecha_registro and previa[0] and \
+            (cita.fecha_registro - previa[0]).total_seconds() <= ttl
+
+        if i >= desde:
+            consultas += 1
+            if vigente:
+                aciertos += 1
+                coincidencias += previa[1] == cita.area_id
+        if not vigente:
+            vistas[clave] = (cita.fecha_registro, cita.area_id)
+
+    return {
+        "tasa": aciertos / consultas if consultas else 0,
+        "coincidencia": coincidencias / aciertos if aciertos else 0,
+        "claves": len(vistas)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prueba", type=float, default=0.2, help="Fracción final de citas usada como prueba")
+    parser.add_argument("--ttl", type=int, default=86400, help="TTL de la caché en segundos")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        areas = [a.to_dict() for a in Area.query.filter_by(activo=True).all()]
+        citas = cargar_citas()
+
+    corte = int(len(citas) * (1 - args.prueba))
+    if not areas or corte == 0 or corte == len(citas):
+        print("✗ No hay suficientes citas con área asignada para evaluar")
+        sys.exit(1)
+
+    entrenamiento, prueba = citas[:corte], citas[corte:]
+    print("=" * 60)
+    print(f"  {len(areas)} áreas activas | {len(entrenamiento)} citas de entrenamiento | {len(prueba)} de prueba")
+    print("=" * 60)
+
+    clasificador = evaluar_clasificador(entrenamiento, prueba, areas)
+    print("Clasificador local (TF-IDF):")
+    print(f"  Precisión top-1:   {clasificador['top1']:.1%}")
+    print(f"  Precisión top-3:   {clasificador['top3']:.1%}")
+    print(f"  Cobertura:         {clasificador['cobertura']:.1%}")
+    print(f"  Área más frecuente: {clasificador['base']:.1%} (referencia)")
+    print(f"  Tiempo:            {clasificador['ms']:.2f} ms por consulta")
+
+    cache = evaluar_cache(citas, corte, args.ttl, version_catalogo(areas))
+    print(f"Caché por síntomas normalizados (TTL {args.ttl} s):")
+    print(f"  Tasa de aciertos:  {cache['tasa']:.1%}")
+    print(f"  Área coincidente:  {cache['coincidencia']:.1%} de los aciertos")
+    print(f"  Claves distintas:  {cache['claves']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=8)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
     
+    # Segundos que se reutilizan los datos del usuario autenticado sin consultar la BD
+    AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 60))
+    
     # IMPORTANTE: Para usar cookies HttpOnly
     JWT_TOKEN_LOCATION = ['cookies'] 
     
@@ -45,7 +48,69 @@ class Config:
     # Custom Configs
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     API_PERU_DEV_TOKEN = os.getenv('API_PERU_DEV_TOKEN')
+    API_PERU_DEV_URL = os.getenv('API_PERU_DEV_URL', 'https://apiperu.dev/api/dni')
     
+    # Consulta de DNI: timeouts (segundos) y vigencia de la caché
+    DNI_API_TIMEOUT_CONEXION = float(os.getenv('DNI_API_TIMEOUT_CONEXION', 3.05))
+    DNI_API_TIMEOUT_LECTURA = float(os.getenv('DNI_API_TIMEOUT_LECTURA', 10))
+    DNI_CACHE_DIAS = int(os.getenv('DNI_CACHE_DIAS', 30))  # DNI encontrados
+    DNI_CACHE_NEGATIVO_HORAS = int(os.getenv('DNI_CACHE_NEGATIVO_HORAS', 24))  # DNI no encontrados
+
+    # Recomendación de área por síntomas: timeouts de Gemini y caché (segundos)
+    GEMINI_TIMEOUT_CONEXION = float(os.getenv('GEMINI_TIMEOUT_CONEXION', 3.05))
+    GEMINI_TIMEOUT_LECTURA = float(os.getenv('GEMINI_TIMEOUT_LECTURA', 8))
+    RECOMENDACION_CACHE_TTL = int(os.getenv('RECOMENDACION_CACHE_TTL', 86400))  # Respuestas de la IA
+    RECOMENDACION_LOCAL_TTL = int(os.getenv('RECOMENDACION_LOCAL_TTL', 300))  # Respuestas del clasificador local
+    RECOMENDACION_MODELO_TTL = int(os.getenv('RECOMENDACION_MODELO_TTL', 21600))  # Reentrenar el clasificador
+
+    # Catálogos en memoria (estados, áreas, roles, especialidades)
+    CATALOGO_VERIFICAR_SEGUNDOS = int(os.getenv('CATALOGO_VERIFICAR_SEGUNDOS', 5))  # Revisar versión en BD
+    CATALOGO_MAX_AGE = int(os.getenv('CATALOGO_MAX_AGE', 60))  # Cache-Control de /api/catalogos
+
+    # Segundos que se reutiliza el resumen del dashboard (se invalida al modificar citas)
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 15))
+
+    # Eventos en vivo (GET /api/events): broker 'auto' | 'local' | 'postgres'
+    EVENTOS_BROKER = os.getenv('EVENTOS_BROKER', 'auto')
+    EVENTOS_MAX_CONEXIONES = int(os.getenv('EVENTOS_MAX_CONEXIONES', 4))  # Por worker (cada una ocupa un hilo)
+    EVENTOS_KEEPALIVE = int(os.getenv('EVENTOS_KEEPALIVE', 15))  # Segundos entre comentarios ': ping'
+    EVENTOS_DURACION_MAX = int(os.getenv('EVENTOS_DURACION_MAX', 300))  # Luego el cliente se reconecta
+    EVENTOS_COLA = int(os.getenv('EVENTOS_COLA', 200))  # Eventos pendientes por conexión
+    EVENTOS_LISTEN_URI = os.getenv('EVENTOS_LISTEN_URI')  # Conexión directa para LISTEN (sin pooler)
+
+    # Máximo de citas por cambio de estado masivo (POST /api/citas/estado/bulk)
+    CITAS_BULK_MAX = int(os.getenv('CITAS_BULK_MAX', 10000))
+
+    # Máximo de horarios generados por POST /api/horarios/bulk
+    HORARIOS_BULK_MAX = int(os.getenv('HORARIOS_BULK_MAX', 20000))
+
+    # Barrido de citas vencidas (barrer_citas.py o programado en el proceso web)
+    BARRIDO_INTERVALO_MINUTOS = int(os.getenv('BARRIDO_INTERVALO_MINUTOS', 0))  # 0 = solo por CLI/cron
+    BARRIDO_PENDIENTE_DIAS = int(os.getenv('BARRIDO_PENDIENTE_DIAS', 0))  # Gracia para pendientes vencidas
+    BARRIDO_LOTE = int(os.getenv('BARRIDO_LOTE', 500))  # Citas por transacción
+    BARRIDO_PAUSA = float(os.getenv('BARRIDO_PAUSA', 0.5))  # Segundos entre lotes
+
+    # Cabecera Idempotency-Key en POST /api/citas y POST /api/pacientes
+    IDEMPOTENCIA_TTL_HORAS = int(os.getenv('IDEMPOTENCIA_TTL_HORAS', 24))  # Vigencia de las respuestas guardadas
+    IDEMPOTENCIA_ESPERA = float(os.getenv('IDEMPOTENCIA_ESPERA', 5))  # Espera de un reintento simultáneo
+
+    # Trabajos en segundo plano (POST /api/jobs): PDFs, reportes y exportaciones
+    JOBS_HILOS_WEB = int(os.getenv('JOBS_HILOS_WEB', 0))  # Hilos por worker de gunicorn (0 = solo procesar_jobs.py)
+    JOBS_INTERVALO = float(os.getenv('JOBS_INTERVALO', 2))  # Segundos entre consultas con la cola vacía
+    JOBS_MAX_INTENTOS = int(os.getenv('JOBS_MAX_INTENTOS', 3))
+    JOBS_REINTENTO_SEGUNDOS = int(os.getenv('JOBS_REINTENTO_SEGUNDOS', 30))  # Espera base (se duplica por intento)
+    JOBS_TIMEOUT = int(os.getenv('JOBS_TIMEOUT', 600))  # Reserva de un intento (se renueva mientras corre); vencida, otro worker lo retoma
+    JOBS_RESULTADO_HORAS = int(os.getenv('JOBS_RESULTADO_HORAS', 24))  # Vigencia de archivos y errores
+
+    # Instrumentación por solicitud (cabecera Server-Timing y log JSON en stdout)
+    INSTRUMENTACION = os.getenv('INSTRUMENTACION', 'true').lower() == 'true'
+    INSTRUMENTACION_TOP = int(os.getenv('INSTRUMENTACION_TOP', 3))  # Sentencias más lentas en el log
+    SQL_LENTA_MS = float(os.getenv('SQL_LENTA_MS', 200))  # Umbral del log de SQL lenta
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'INFO')
+
+    # GET /api/metrics: token Bearer del scraper de Prometheus (vacío = 403, salvo en DEBUG/TESTING)
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+
     # Legacy/Other configs
     MYSQL_CONFIG = {
         'host': os.getenv('MYSQL_HOST'),
@@ -73,8 +138,16 @@ class ProductionConfig(Config):
         'pool_timeout': 30
     }
 
+class TestingConfig(Config):
+    TESTING = True
+    # Base de datos en archivo: las pruebas de concurrencia usan varias conexiones
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URI', 'sqlite:///test.db')
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'WARNING')
+    JOBS_HILOS_WEB = 0  # Las pruebas procesan los trabajos explícitamente
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -1,15 +1,16 @@
 from flask import jsonify
 from extensions.database import db
+from services.catalogo_service import Catalogo
 from models.area_model import Area
-from services.gemini_services import GeminiService
+from services.recomendacion_service import RecomendacionService
 
 class AreaController:
 
     @staticmethod
     def get_all():
         try:
-            areas = Area.query.order_by(Area.id.desc()).all()
-            return jsonify([area.to_dict() for area in areas]), 200
+            # Catálogo en memoria (por id); se invierte para mostrar primero los más recientes
+            return jsonify(list(reversed(Catalogo.lista("areas")))), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -32,6 +33,7 @@ class AreaController:
 
             db.session.add(nueva_area)
             db.session.commit()
+            Catalogo.invalidar("areas")
 
             return jsonify({
                 "message": "Área creada correctamente",
@@ -61,6 +63,7 @@ class AreaController:
                 area.activo = data["activo"]
 
             db.session.commit()
+            Catalogo.invalidar("areas")
 
             return jsonify({
                 "message": "Área actualizada correctamente",
@@ -79,6 +82,7 @@ class AreaController:
 
             db.session.delete(area)
             db.session.commit()
+            Catalogo.invalidar("areas")
 
             return jsonify({"message": "Área eliminada correctamente"}), 200
         except Exception as e:
@@ -92,13 +96,12 @@ class AreaController:
                 return jsonify({"error": "Debe proporcionar los síntomas del paciente"}), 400
             
             # Obtener todas las áreas activas
-            areas = Area.query.filter_by(activo=True).all()
-            if not areas:
+            areas_list = Catalogo.lista("areas", activos=True)
+            if not areas_list:
                 return jsonify({"error": "No hay áreas disponibles para recomendar"}), 404
-                
-            areas_list = [a.to_dict() for a in areas]
             
-            recommendation = GeminiService.recommend_area(sintomas, areas_list)
+            # Caché -> Gemini -> clasificador local entrenado con citas anteriores
+            recommendation = RecomendacionService.recomendar(sintomas, areas_list)
             
             if "error" in recommendation:
                 return jsonify(recommendation), 500 if "status" not in recommendation else recommendation["status"]
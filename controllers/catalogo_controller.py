@@ -1,26 +1,31 @@
-from flask import jsonify
-from models.rol_model import Rol
-from models.especialidad_model import Especialidad
-from models.area_model import Area
+from flask import jsonify, request, current_app
+from services.catalogo_service import Catalogo
 
 class CatalogoController:
+    @staticmethod
+    def _responder(nombre, activos=False):
+        """
+        Respuesta con ETag (huella del catálogo) y Cache-Control: si el
+        cliente envía If-None-Match con la misma huella se responde 304 sin cuerpo.
+        """
+        entrada = Catalogo.obtener(nombre)
+        respuesta = jsonify(Catalogo.lista(nombre, activos=activos))
+        respuesta.set_etag(f"{entrada.etag}-activos" if activos else entrada.etag)
+        respuesta.headers["Cache-Control"] = f"public, max-age={current_app.config['CATALOGO_MAX_AGE']}"
+        return respuesta.make_conditional(request)
+
     @staticmethod
     def get_roles():
-        roles = Rol.query.all()
-        return jsonify([r.to_dict() for r in roles]), 200
+        return CatalogoController._responder("roles")
 
     @staticmethod
     def get_especialidades():
-        especialidades = Especialidad.query.all()
-        return jsonify([e.to_dict() for e in especialidades]), 200
+        return CatalogoController._responder("especialidades")
 
     @staticmethod
     def get_areas():
-        areas = Area.query.all()
-        return jsonify([a.to_dict() for a in areas]), 200
+        return CatalogoController._responder("areas")
 
     @staticmethod
     def get_estados_cita():
-        from models.estado_cita_model import EstadoCita
-        estados = EstadoCita.query.filter_by(activo=True).all()
-        return jsonify([e.to_dict() for e in estados]), 200
+        return CatalogoController._responder("estados", activos=True)
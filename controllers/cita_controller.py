@@ -1,4 +1,5 @@
-from flask import jsonify, request, send_file, Response
+from flask import jsonify, request, send_file, Response, stream_with_context, current_app
+from sqlalchemy.orm import aliased
 from extensions.database import db
 from models.cita_model import Cita
 from models.paciente_model import Paciente
@@ -8,12 +9,107 @@ from models.usuario_model import Usuario
 from models.persona_model import Persona
 from models.estado_cita_model import EstadoCita
 from models.historial_estado_cita_model import HistorialEstadoCita
+from models.horario_ocupacion_model import HorarioOcupacion
+from models.cita_diaria_model import CitaDiaria
 
 from services.pdf_service import PDFService
-from datetime import datetime
+from services.busqueda_service import BusquedaPersonas
+from services.catalogo_service import Catalogo
+from services.cita_serializer import CitaSerializer
+from services.export_service import ExportService, FORMATOS
+from services.eventos_service import Eventos
+from services.cita_estado_service import CitaEstadoService, ACTUALIZADA
+from utils.paginacion import limitar_per_page, paginar_keyset
+from datetime import datetime, date
 
 class CitaController:
 
+    @staticmethod
+    def _aplicar_filtros(query):
+        """
+        Aplica a una query de Cita los filtros de GET /api/citas
+        (fecha, fecha_registro, doctor_id, area, area_id, estado, paciente_dni, turno)
+        y la restricción por rol del usuario autenticado.
+        Compartido por el listado y la exportación.
+        """
+        fecha = request.args.get('fecha')  # Fecha de la cita YYYY-MM-DD
+        fecha_registro = request.args.get('fecha_registro')  # Fecha de registro YYYY-MM-DD
+        doctor_id = request.args.get('doctor_id')
+        area = request.args.get('area')
+        area_id = request.args.get('area_id')
+        estado = request.args.get('estado')
+        paciente_dni = request.args.get('paciente_dni')
+        turno = request.args.get('turno')
+
+        # Si el usuario autenticado es un profesional (rol_id = 2),
+        # forzar el filtro de doctor_id para que solo vea sus propias citas
+        # y restringir los estados visibles
+        is_profesional = False
+        if hasattr(request, 'user') and request.user:
+            user_rol_id = request.user.get('rol_id')
+            user_id = request.user.get('id')
+            
+            # Rol 2 = Profesional: solo puede ver sus propias citas
+            if user_rol_id == 2 and user_id:
+                doctor_id = user_id
+                is_profesional = True
+
+        # Filtro por fecha de la cita
+        if fecha:
+            try:
+                fecha_obj = datetime.strptime(fecha, "%Y-%m-%d").date()
+                query = query.filter(Cita.fecha == fecha_obj)
+            except ValueError:
+                pass
+
+        # Filtro por fecha de registro
+        if fecha_registro:
+            try:
+                fecha_obj = datetime.strptime(fecha_registro, "%Y-%m-%d").date()
+                query = query.filter(db.func.date(Cita.fecha_registro) == fecha_obj)
+            except ValueError:
+                pass
+
+        if doctor_id:
+            query = query.filter_by(doctor_id=doctor_id)
+        
+        # Filtro por área (por ID o por nombre)
+        if area_id:
+            query = query.filter_by(area_id=area_id)
+        elif area:
+            # Buscar por nombre de área (case-insensitive, parcial)
+            query = query.join(Area, Cita.area_id == Area.id).filter(
+                Area.nombre.ilike(f"%{area}%")
+            )
+        # Filtro de estado
+        # Para profesionales: solo pueden ver estados específicos
+        # (confirmada, atendida, no_asistio, referido) - NO ven pendientes ni canceladas
+        if is_profesional:
+            estados_permitidos_nombres = ['confirmada', 'atendida', 'no_asistio', 'referido']
+            if estado and estado in estados_permitidos_nombres:
+                # Filtrar por un estado específico
+                 query = query.filter(Cita.estado_id.in_(Catalogo.ids_de("estados", [estado])))
+            else:
+                # Mostrar todos los permitidos
+                 query = query.filter(Cita.estado_id.in_(Catalogo.ids_de("estados", estados_permitidos_nombres)))
+        elif estado:
+            # Filtrar por estado_id (resuelto desde el catálogo, sin JOIN a estados_cita)
+            query = query.filter(Cita.estado_id.in_(Catalogo.ids_de("estados", [estado])))
+
+        if paciente_dni:
+            # Prefijo de DNI sobre el índice único (o nombre, si no es numérico)
+            query, _ = BusquedaPersonas.filtrar(
+                query.join(Paciente).join(Persona, Paciente.persona_id == Persona.id), paciente_dni
+            )
+
+        # Filtro por turno (si tiene horario asociado)
+        if turno:
+            query = query.join(HorarioMedico, Cita.horario_id == HorarioMedico.id).filter(
+                HorarioMedico.turno == turno
+            )
+
+        return query
+
     @staticmethod
     def listar():
         """
@@ -24,125 +120,50 @@ class CitaController:
         
         Query params:
         - page: Página actual (default: 1)
-        - per_page: Items por página (default: 10)
+        - per_page: Items por página (default: 10, máximo 100)
         - fecha: Filtrar por fecha de cita (YYYY-MM-DD)
         - fecha_registro: Filtrar por fecha de registro (YYYY-MM-DD)
         - doctor_id: Filtrar por ID del doctor
         - area: Filtrar por nombre de área (búsqueda parcial)
         - area_id: Filtrar por ID de área
         - estado: Filtrar por estado (pendiente, confirmada, atendida, cancelada, referido, no_asistio)
-        - paciente_dni: Filtrar por DNI del paciente
+        - paciente_dni: Filtrar por DNI del paciente (prefijo)
         - turno: Filtrar por turno ('M' o 'T')
+        - cursor: Activa la paginación por cursor (vacío para la primera página).
+                  En este modo no se calcula el total; la respuesta incluye
+                  'next_cursor' para pedir la página siguiente.
         """
         try:
+            cursor = request.args.get('cursor')
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
-            fecha = request.args.get('fecha')  # Fecha de la cita YYYY-MM-DD
-            fecha_registro = request.args.get('fecha_registro')  # Fecha de registro YYYY-MM-DD
-            doctor_id = request.args.get('doctor_id')
-            area = request.args.get('area')
-            area_id = request.args.get('area_id')
-            estado = request.args.get('estado')
-            paciente_dni = request.args.get('paciente_dni')
-            turno = request.args.get('turno')
-            
-            # Si el usuario autenticado es un profesional (rol_id = 2),
-            # forzar el filtro de doctor_id para que solo vea sus propias citas
-            # y restringir los estados visibles
-            is_profesional = False
-            if hasattr(request, 'user') and request.user:
-                user_rol_id = request.user.get('rol_id')
-                user_id = request.user.get('id')
-                
-                # Rol 2 = Profesional: solo puede ver sus propias citas
-                if user_rol_id == 2 and user_id:
-                    doctor_id = user_id
-                    is_profesional = True
-
-            query = Cita.query
-
-            # Filtro por fecha de la cita
-            if fecha:
-                try:
-                    fecha_obj = datetime.strptime(fecha, "%Y-%m-%d").date()
-                    query = query.filter(Cita.fecha == fecha_obj)
-                except ValueError:
-                    pass
-
-            # Filtro por fecha de registro
-            if fecha_registro:
-                try:
-                    fecha_obj = datetime.strptime(fecha_registro, "%Y-%m-%d").date()
-                    query = query.filter(db.func.date(Cita.fecha_registro) == fecha_obj)
-                except ValueError:
-                    pass
-
-            if doctor_id:
-                query = query.filter_by(doctor_id=doctor_id)
-            
-            # Filtro por área (por ID o por nombre)
-            if area_id:
-                query = query.filter_by(area_id=area_id)
-            elif area:
-                # Buscar por nombre de área (case-insensitive, parcial)
-                query = query.join(Area, Cita.area_id == Area.id).filter(
-                    Area.nombre.ilike(f"%{area}%")
-                )
-            # Filtro de estado
-            # Para profesionales: solo pueden ver estados específicos
-            # (confirmada, atendida, no_asistio, referido) - NO ven pendientes ni canceladas
-                estados_permitidos_nombres = ['confirmada', 'atendida', 'no_asistio', 'referido']
-                if estado and estado in estados_permitidos_nombres:
-                    # Filtrar por un estado específico
-                     query = query.join(EstadoCita).filter(EstadoCita.nombre == estado)
-                else:
-                    # Mostrar todos los permitidos
-                     query = query.join(EstadoCita).filter(EstadoCita.nombre.in_(estados_permitidos_nombres))
-            elif estado:
-                # Filtrar por nombre de estado normalizado
-                query = query.join(EstadoCita).filter(EstadoCita.nombre == estado)
-
-            if paciente_dni:
-                query = query.join(Paciente).join(Persona, Paciente.persona_id == Persona.id).filter(Persona.dni.ilike(f"%{paciente_dni}%"))
-
-            # Filtro por turno (si tiene horario asociado)
-            if turno:
-                query = query.join(HorarioMedico, Cita.horario_id == HorarioMedico.id).filter(
-                    HorarioMedico.turno == turno
-                )
+            per_page = limitar_per_page(request.args.get('per_page', 10, type=int))
+            
+            # Cargar relaciones en la misma consulta (evita N+1 al serializar)
+            query = CitaController._aplicar_filtros(CitaSerializer.cargar(Cita.query))
 
-            # Ordenar por fecha de cita descendente, luego por fecha_registro
-            query = query.order_by(Cita.fecha.desc().nullslast(), Cita.fecha_registro.desc())
+            # Modo cursor: misma ordenación (fecha, fecha_registro) con id como desempate
+            if cursor is not None:
+                items, next_cursor = paginar_keyset(query, [
+                    (Cita.fecha, date.fromisoformat),
+                    (Cita.fecha_registro, datetime.fromisoformat),
+                    (Cita.id, int)
+                ], cursor=cursor, per_page=per_page)
+            else:
+                # Ordenar por fecha de cita descendente, luego por fecha_registro;
+                # id desempata igual que el cursor (orden estable entre páginas)
+                query = query.order_by(Cita.fecha.desc().nullslast(), Cita.fecha_registro.desc(), Cita.id.desc())
+                pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+                items = pagination.items
 
-            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            data = [CitaSerializer.para_listado(cita) for cita in items]
 
-            data = []
-            for cita in pagination.items:
-                cita_dict = cita.to_dict()
-                
-                # Incluir datos del paciente
-                if cita.paciente:
-                    cita_dict['paciente'] = {
-                        "id": cita.paciente.id,
-                        "nombres": cita.paciente.nombres,
-                        "apellido_paterno": cita.paciente.apellido_paterno,
-                        "apellido_materno": cita.paciente.apellido_materno,
-                        "dni": cita.paciente.dni,
-                        "telefono": cita.paciente.telefono,
-                        "email": cita.paciente.email
-                    }
-                
-                # Incluir información del horario si existe
-                if cita.horario:
-                    cita_dict['horario'] = {
-                        "id": cita.horario.id,
-                        "turno": cita.horario.turno,
-                        "turno_nombre": cita.horario.turno_nombre,
-                        "hora_inicio": str(cita.horario.hora_inicio),
-                        "hora_fin": str(cita.horario.hora_fin)
-                    }
-                
-                data.append(cita_dict)
+            if cursor is not None:
+                return jsonify({
+                    "per_page": per_page,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                    "data": data
+                }), 200
 
             return jsonify({
                 "total": pagination.total,
@@ -152,9 +173,105 @@ class CitaController:
                 "data": data
             }), 200
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @staticmethod
+    def exportar():
+        """
+        Exportar citas a CSV o XLSX (GET /api/citas/export).
+
+        Acepta los mismos filtros que listar() (sin paginación) más:
+        - format: 'csv' (default) o 'xlsx'
+
+        Las filas se leen con yield_per (cursor del lado del servidor en
+        PostgreSQL) y se escriben a medida que llegan, por lo que la memoria
+        no depende del número de citas exportadas.
+        """
+        formato = request.args.get('format', 'csv').lower()
+        if formato not in FORMATOS:
+            return jsonify({"error": "Formato inválido. Use 'csv' o 'xlsx'"}), 400
+
+        PersonaPaciente = aliased(Persona)
+        PersonaDoctor = aliased(Persona)
+        PersonaAcompanante = aliased(Persona)
+        PacienteExport = aliased(Paciente)
+        Doctor = aliased(Usuario)
+        Horario = aliased(HorarioMedico)
+        AreaExport = aliased(Area)
+        Estado = aliased(EstadoCita)
+
+        # Los filtros se aplican sobre Cita; las columnas exportadas usan alias
+        # para no chocar con los joins que agregan los filtros.
+        query = CitaController._aplicar_filtros(Cita.query).with_entities(
+            Cita.id, Cita.fecha, Horario.turno,
+            PersonaPaciente.dni, PersonaPaciente.nombres, PersonaPaciente.apellido_paterno,
+            PersonaPaciente.apellido_materno, PersonaPaciente.telefono,
+            AreaExport.nombre, PersonaDoctor.nombres, PersonaDoctor.apellido_paterno,
+            PersonaDoctor.apellido_materno, Estado.nombre, Cita.sintomas, Cita.fecha_registro,
+            PersonaAcompanante.dni, PersonaAcompanante.nombres, PersonaAcompanante.apellido_paterno
+        ).outerjoin(
+            PacienteExport, PacienteExport.id == Cita.paciente_id
+        ).outerjoin(
+            PersonaPaciente, PersonaPaciente.id == PacienteExport.persona_id
+        ).outerjoin(
+            Horario, Horario.id == Cita.horario_id
+        ).outerjoin(
+            AreaExport, AreaExport.id == Cita.area_id
+        ).outerjoin(
+            Doctor, Doctor.id == Cita.doctor_id
+        ).outerjoin(
+            PersonaDoctor, PersonaDoctor.id == Doctor.persona_id
+        ).outerjoin(
+            Estado, Estado.id == Cita.estado_id
+        ).outerjoin(
+            PersonaAcompanante, PersonaAcompanante.id == Cita.acompanante_persona_id
+        ).order_by(
+            Cita.fecha.desc().nullslast(), Cita.fecha_registro.desc(), Cita.id.desc()
+        ).yield_per(1000)
+
+        encabezados = [
+            "ID", "Fecha", "Turno", "DNI Paciente", "Paciente", "Teléfono", "Área", "Médico",
+            "Estado", "Síntomas", "Fecha Registro", "DNI Acompañante", "Acompañante"
+        ]
+
+        def nombre(*partes):
+            return " ".join(p for p in partes if p)
+
+        def filas():
+            for (cita_id, fecha, turno, dni, nombres, ap_paterno, ap_materno, telefono,
+                 area_nombre, doc_nombres, doc_paterno, doc_materno, estado, sintomas,
+                 fecha_registro, dni_ac, nombres_ac, paterno_ac) in query:
+                yield (
+                    cita_id,
+                    fecha,
+                    {"M": "Mañana", "T": "Tarde"}.get(turno, ""),
+                    dni or "",
+                    nombre(nombres, ap_paterno, ap_materno),
+                    telefono or "",
+                    area_nombre or "",
+                    nombre(doc_nombres, doc_paterno, doc_materno),
+                    estado or "pendiente",
+                    sintomas or "",
+                    fecha_registro.replace(microsecond=0) if fecha_registro else None,
+                    dni_ac or "",
+                    nombre(nombres_ac, paterno_ac)
+                )
+
+        if formato == 'xlsx':
+            contenido = ExportService.generar_xlsx(encabezados, filas(), titulo="Citas")
+        else:
+            contenido = ExportService.generar_csv(encabezados, filas())
+
+        filename = f"citas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        return Response(
+            stream_with_context(contenido),
+            mimetype=FORMATOS[formato],
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
     @staticmethod
     def crear():
         """
@@ -201,28 +318,22 @@ class CitaController:
             if horario.fecha != fecha_cita:
                 return jsonify({"error": "La fecha no coincide con el horario seleccionado"}), 400
             
-            # Contar citas existentes para este horario en esta fecha
-            # Contar citas existentes usando relación de estado
-            citas_existentes = Cita.query.join(EstadoCita).filter(
-                Cita.horario_id == horario.id,
-                Cita.fecha == fecha_cita,
-                EstadoCita.nombre != 'cancelada'
-            ).count()
-            
-            # Validar cupos disponibles
-            if citas_existentes >= horario.cupos:
+            # Reservar el cupo de forma atómica (UPDATE condicional sobre el contador).
+            # Evita que dos registros simultáneos sobre el mismo turno excedan los cupos.
+            if not HorarioOcupacion.reservar(horario.id):
+                db.session.rollback()
                 return jsonify({
                     "error": "No hay cupos disponibles para este horario",
                     "cupos_totales": horario.cupos,
-                    "cupos_ocupados": citas_existentes
+                    "cupos_ocupados": HorarioOcupacion.ocupados(horario.id)
                 }), 400
             
             # Determinar area_id (del payload o del horario)
             area_id = data.get("area_id") or horario.area_id
             
             # Obtener nombre del área
-            area = Area.query.get(area_id)
-            area_nombre = area.nombre if area else "Sin área"
+            area = Catalogo.por_id("areas", area_id)
+            area_nombre = area["nombre"] if area else "Sin área"
             
             # Gestionar Acompañante
             acompanante_persona_id = None
@@ -266,15 +377,24 @@ class CitaController:
             )
             
             # Buscar estado pendiente
-            estado_pendiente = EstadoCita.query.filter_by(nombre="pendiente").first()
-            if estado_pendiente:
-                nueva_cita.estado_id = estado_pendiente.id
+            estado_pendiente_id = Catalogo.id_de("estados", "pendiente")
+            if estado_pendiente_id:
+                nueva_cita.estado_id = estado_pendiente_id
             
             db.session.add(nueva_cita)
-            db.session.commit()
+            db.session.flush()
+            
+            # Sumar la cita a la tabla de hechos diaria (fecha_registro ya asignada)
+            CitaDiaria.registrar_cambio(None, CitaDiaria.aporte(nueva_cita))
+            
+            # Calcular cupos restantes para la respuesta (contador ya incluye esta cita)
+            ocupados = HorarioOcupacion.ocupados(horario.id)
+            cupos_restantes = horario.cupos - ocupados
             
-            # Calcular cupos restantes para la respuesta
-            cupos_restantes = horario.cupos - (citas_existentes + 1)
+            # Eventos en vivo (se publican solo si el commit se completa)
+            Eventos.cita("cita.creada", nueva_cita, "pendiente")
+            Eventos.cupos(horario, ocupados)
+            db.session.commit()
             
             return jsonify({
                 "message": "Cita creada exitosamente",
@@ -293,40 +413,11 @@ class CitaController:
         Incluye información del paciente, horario y doctor.
         """
         try:
-            cita = Cita.query.get(id)
+            cita = CitaSerializer.obtener(id)
             if not cita:
                 return jsonify({"error": "Cita no encontrada"}), 404
             
-            cita_dict = cita.to_dict()
-            
-            # Incluir datos completos del paciente
-            if cita.paciente:
-                cita_dict['paciente'] = {
-                    "id": cita.paciente.id,
-                    "nombres": cita.paciente.nombres,
-                    "apellido_paterno": cita.paciente.apellido_paterno,
-                    "apellido_materno": cita.paciente.apellido_materno,
-                    "dni": cita.paciente.dni,
-                    "telefono": cita.paciente.telefono,
-                    "email": cita.paciente.email,
-                    "fecha_nacimiento": str(cita.paciente.fecha_nacimiento) if cita.paciente.fecha_nacimiento else None,
-                    "sexo": cita.paciente.sexo,
-                    "direccion": cita.paciente.direccion,
-                    "seguro": cita.paciente.seguro
-                }
-            
-            # Incluir información del horario si existe
-            if cita.horario:
-                cita_dict['horario'] = {
-                    "id": cita.horario.id,
-                    "turno": cita.horario.turno,
-                    "turno_nombre": cita.horario.turno_nombre,
-                    "hora_inicio": str(cita.horario.hora_inicio),
-                    "hora_fin": str(cita.horario.hora_fin),
-                    "cupos": cita.horario.cupos
-                }
-            
-            return jsonify(cita_dict), 200
+            return jsonify(CitaSerializer.para_detalle(cita)), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -340,7 +431,10 @@ class CitaController:
 
             # Guardar estado anterior para el historial
             estado_anterior_id = cita.estado_id
+            estado_anterior_nombre = cita.estado_nombre
             estado_nuevo_id = None
+            estado_nuevo_nombre = None
+            aporte_anterior = CitaDiaria.aporte(cita)
 
             if "doctor_id" in data:
                 cita.doctor_id = data["doctor_id"]
@@ -350,10 +444,36 @@ class CitaController:
                 cita.sintomas = data["sintomas"]
             if "estado" in data:
                 # Actualizar relación de estado
-                nuevo_estado_obj = EstadoCita.query.filter_by(nombre=data["estado"]).first()
-                if nuevo_estado_obj:
-                    estado_nuevo_id = nuevo_estado_obj.id
+                estado_nuevo_id = Catalogo.id_de("estados", data["estado"])
+                if estado_nuevo_id:
+
+                    if estado_nuevo_id != estado_anterior_id:
+                        # Actualizar la ocupación del horario (libera el cupo al cancelar,
+                        # lo vuelve a reservar al reactivar una cita cancelada). Va antes
+                        # de tocar la cita: una fila de ocupación creada aquí se calcula
+                        # con el estado que la cita aún tiene en la base.
+                        if cita.horario_id:
+                            aplicado = HorarioOcupacion.registrar_transicion(
+                                cita.horario_id, estado_anterior_nombre, data["estado"]
+                            )
+                            if not aplicado:
+                                db.session.rollback()
+                                return jsonify({"error": "No hay cupos disponibles para reactivar la cita"}), 400
+
+                        # UPDATE condicional sobre el estado leído: si otra solicitud ya cambió
+                        # el estado, se descarta también la transición de ocupación
+                        cambiada = db.session.execute(
+                            db.update(Cita)
+                            .where(Cita.id == cita.id, Cita.estado_id == estado_anterior_id)
+                            .values(estado_id=estado_nuevo_id)
+                            .execution_options(synchronize_session=False)
+                        ).rowcount
+                        if not cambiada:
+                            db.session.rollback()
+                            return jsonify({"error": "La cita cambió de estado mientras se procesaba. Vuelva a cargarla."}), 409
+
                     cita.estado_id = estado_nuevo_id
+                    estado_nuevo_nombre = data["estado"]
             
             if "dni_acompanante" in data:
                 dni_ac = data["dni_acompanante"]
@@ -410,12 +530,91 @@ class CitaController:
                     ip_address=ip_address
                 )
 
+            # Mover la cita en la tabla de hechos (estado, área o doctor pueden cambiar)
+            CitaDiaria.registrar_cambio(aporte_anterior, CitaDiaria.aporte(cita, estado_nuevo_nombre))
+
+            # Eventos en vivo: cambio de estado (y cupos del horario) o edición
+            if estado_nuevo_id and estado_nuevo_id != estado_anterior_id:
+                Eventos.cita("cita.estado", cita, estado_nuevo_nombre, estado_anterior=estado_anterior_nombre)
+                if cita.horario_id:
+                    Eventos.cupos(cita.horario)
+            else:
+                Eventos.cita("cita.actualizada", cita, estado_nuevo_nombre)
+
             db.session.commit()
             return jsonify(cita.to_dict()), 200
         except Exception as e:
             db.session.rollback()
             return jsonify({"error": str(e)}), 500
 
+    @staticmethod
+    def cambiar_estado_masivo():
+        """
+        Cambia el estado de muchas citas en una sola transacción.
+        
+        Payload esperado:
+        {
+            "estado": string (requerido, estado destino),
+            "ids": [int] (o bien "filtro"),
+            "filtro": {
+                "fecha": "YYYY-MM-DD" (requerido si no se envían ids),
+                "area_id": int, "turno": "M" | "T",
+                "estado": string o lista (estado actual)
+            },
+            "comentario_cambio": string (opcional)
+        }
+        """
+        try:
+            data = request.get_json() or {}
+            estado = data.get("estado")
+            if not estado or Catalogo.id_de("estados", estado) is None:
+                return jsonify({"error": "El campo 'estado' es obligatorio y debe ser un estado válido"}), 400
+            
+            maximo = current_app.config["CITAS_BULK_MAX"]
+            ids = data.get("ids")
+            filtro = data.get("filtro") or {}
+            if ids is not None:
+                if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                    return jsonify({"error": "'ids' debe ser una lista de enteros"}), 400
+                if len(ids) > maximo:
+                    return jsonify({"error": f"Máximo {maximo} citas por solicitud"}), 400
+                query = CitaEstadoService.consulta(ids=ids)
+            else:
+                try:
+                    fecha = datetime.strptime(filtro.get("fecha", ""), "%Y-%m-%d").date()
+                except ValueError:
+                    return jsonify({"error": "Envíe 'ids' o un 'filtro' con 'fecha' (YYYY-MM-DD)"}), 400
+                estados = filtro.get("estado")
+                if isinstance(estados, str):
+                    estados = [estados]
+                query = CitaEstadoService.consulta(
+                    fecha=fecha, area_id=filtro.get("area_id"), turno=filtro.get("turno"), estados=estados
+                )
+                if query.count() > maximo:
+                    return jsonify({"error": f"El filtro abarca más de {maximo} citas"}), 400
+            
+            usuario_id = request.user.get('id') if hasattr(request, 'user') and request.user else None
+            resultados = CitaEstadoService.cambiar_estado(
+                query, estado,
+                usuario_id=usuario_id,
+                comentario=data.get("comentario_cambio"),
+                ip_address=request.remote_addr,
+                ids=ids
+            )
+            db.session.commit()
+            
+            resumen = {}
+            for r in resultados:
+                resumen[r["resultado"]] = resumen.get(r["resultado"], 0) + 1
+            return jsonify({
+                "message": f"{resumen.get(ACTUALIZADA, 0)} citas actualizadas a '{estado}'",
+                "resumen": resumen,
+                "resultados": resultados
+            }), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 500
+
     @staticmethod
     def eliminar(id):
         try:
@@ -423,6 +622,14 @@ class CitaController:
             if not cita:
                 return jsonify({"error": "Cita no encontrada"}), 404
             
+            # Descontar la cita de la ocupación del horario (libera el cupo si estaba activa)
+            if cita.horario_id:
+                HorarioOcupacion.liberar(cita.horario_id, cita.estado_nombre)
+            CitaDiaria.registrar_cambio(CitaDiaria.aporte(cita), None)
+            Eventos.cita("cita.eliminada", cita)
+            if cita.horario_id:
+                Eventos.cupos(cita.horario)
+            
             db.session.delete(cita)
             db.session.commit()
             return jsonify({"message": "Cita eliminada correctamente"}), 200
@@ -497,7 +704,7 @@ class CitaController:
                 }), 400
             
             # Verificar que el área existe
-            area = Area.query.get(area_id)
+            area = Catalogo.por_id("areas", area_id)
             if not area:
                 return jsonify({
                     'success': False,
@@ -508,11 +715,12 @@ class CitaController:
             
             # Consultar citas confirmadas ordenadas por fecha de registro (orden de llegada)
             # Usamos JOIN con HorarioMedico para poder filtrar por médico si es necesario
-            query = Cita.query.join(HorarioMedico).join(EstadoCita).filter(
-                Cita.fecha == fecha_obj,
-                Cita.area_id == area_id,
-                EstadoCita.nombre == 'confirmada'
-            )
+            query = CitaSerializer.cargar(Cita.query, incluir_medico_horario=True)\
+                .join(HorarioMedico).filter(
+                    Cita.fecha == fecha_obj,
+                    Cita.area_id == area_id,
+                    Cita.estado_id.in_(Catalogo.ids_de("estados", ["confirmada"]))
+                )
             
             if medico_id:
                 query = query.filter(HorarioMedico.medico_id == medico_id)
@@ -522,40 +730,17 @@ class CitaController:
             ).all()
             
             # Construir respuesta con numeración
-            citas_data = []
-            for numero, cita in enumerate(citas, start=1):
-                cita_info = {
-                    'numero': numero,  # Numeración automática por orden de registro
-                    'id': cita.id,
-                    'paciente': {
-                        'id': cita.paciente.id,
-                        'nombres': cita.paciente.nombres,
-                        'apellido_paterno': cita.paciente.apellido_paterno,
-                        'apellido_materno': cita.paciente.apellido_materno,
-                        'dni': cita.paciente.dni,
-                        'telefono': cita.paciente.telefono
-                    } if cita.paciente else None,
-                    'horario': {
-                        'id': cita.horario.id,
-                        'hora_inicio': str(cita.horario.hora_inicio),
-                        'hora_fin': str(cita.horario.hora_fin),
-                        'turno': cita.horario.turno,
-                        'turno_nombre': cita.horario.turno_nombre
-                    } if cita.horario else None,
-                    'medico': {
-                        'id': cita.horario.medico.id,
-                        'nombre': cita.horario.medico.nombres_completos
-                    } if cita.horario and cita.horario.medico else None,
-                    'fecha_registro': cita.fecha_registro.isoformat() if cita.fecha_registro else None
-                }
-                citas_data.append(cita_info)
+            citas_data = [
+                CitaSerializer.para_impresion(cita, numero)
+                for numero, cita in enumerate(citas, start=1)
+            ]
             
             response = {
                 'success': True,
                 'fecha': fecha,
                 'area': {
-                    'id': area.id,
-                    'nombre': area.nombre
+                    'id': area['id'],
+                    'nombre': area['nombre']
                 },
                 'total': len(citas_data),
                 'citas': citas_data
@@ -618,7 +803,7 @@ class CitaController:
                 }), 400
 
             # Validar existencia del área
-            area = Area.query.get(area_id)
+            area = Catalogo.por_id("areas", area_id)
             if not area:
                 return jsonify({
                     'success': False,
@@ -632,11 +817,12 @@ class CitaController:
                 # Validar que el médico exista es opcional aquí, pero útil
             
             # Construir consulta
-            query = Cita.query.join(HorarioMedico).join(EstadoCita).filter(
-                HorarioMedico.area_id == area_id,
-                HorarioMedico.fecha == fecha_obj,
-                EstadoCita.nombre == 'confirmada'
-            )
+            query = CitaSerializer.cargar(Cita.query, incluir_medico_horario=True)\
+                .join(HorarioMedico).filter(
+                    HorarioMedico.area_id == area_id,
+                    HorarioMedico.fecha == fecha_obj,
+                    Cita.estado_id.in_(Catalogo.ids_de("estados", ["confirmada"]))
+                )
             
             # Filtrar por médico si se proporciona
             if medico_id:
@@ -672,7 +858,7 @@ class CitaController:
                 }
                 citas_data.append(cita_info)
             
-            area_data = {'id': area.id, 'nombre': area.nombre}
+            area_data = {'id': area['id'], 'nombre': area['nombre']}
             medico_data = {'nombre': medico.nombres_completos} if medico else None
             
             # Generar PDF
@@ -686,7 +872,7 @@ class CitaController:
             # Nombre del archivo
             filename = PDFService.generar_nombre_archivo(
                 fecha, 
-                area.nombre, 
+                area['nombre'], 
                 medico.nombres_completos if medico else None
             )
             
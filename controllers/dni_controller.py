@@ -1,5 +1,5 @@
 from flask import jsonify, request
-from services.api_dni_services import ApiPeruDevService
+from services.api_dni_services import DniService
 
 class DniController:
     @staticmethod
@@ -13,7 +13,8 @@ class DniController:
         if not isinstance(dni, str) or len(dni) != 8 or not dni.isdigit():
             return jsonify({"error": "dni debe ser una cadena de 8 dígitos"}), 400
 
-        result = ApiPeruDevService.get_data_by_dni(dni)
+        # Caché en memoria / tabla dni_cache antes de consultar la API externa
+        result = DniService.buscar(dni)
 
         # Si la API respondió mal
         if not result.get("success"):
@@ -1,14 +1,16 @@
 from flask import jsonify
 from extensions.database import db
+from services.catalogo_service import Catalogo
 from models.especialidad_model import Especialidad
+from extensions.jwt_manager import invalidar_usuarios
 
 class EspecialidadController:
 
     @staticmethod
     def get_all():
         try:
-            especialidades = Especialidad.query.order_by(Especialidad.id.desc()).all()
-            return jsonify([e.to_dict() for e in especialidades]), 200
+            # Catálogo en memoria (por id); se invierte para mostrar primero los más recientes
+            return jsonify(list(reversed(Catalogo.lista("especialidades")))), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -31,6 +33,7 @@ class EspecialidadController:
 
             db.session.add(nueva_esp)
             db.session.commit()
+            Catalogo.invalidar("especialidades")
 
             return jsonify({
                 "message": "Especialidad creada correctamente",
@@ -60,6 +63,9 @@ class EspecialidadController:
                 especialidad.activo = data["activo"]
 
             db.session.commit()
+            Catalogo.invalidar("especialidades")
+            # Los datos cacheados de los profesionales incluyen sus especialidades
+            invalidar_usuarios()
 
             return jsonify({
                 "message": "Especialidad actualizada correctamente",
@@ -82,6 +88,8 @@ class EspecialidadController:
 
             db.session.delete(especialidad)
             db.session.commit()
+            Catalogo.invalidar("especialidades")
+            invalidar_usuarios()
 
             return jsonify({"message": "Especialidad eliminada correctamente"}), 200
         except Exception as e:
@@ -0,0 +1,81 @@
+import json
+import queue
+import time
+
+from flask import Response, current_app, jsonify, request
+from services.eventos_service import Eventos
+
+class EventoController:
+
+    @staticmethod
+    def _filtro(tipos=None, area_id=None, fecha=None):
+        """Filtro de eventos según los query params de la conexión."""
+        def acepta(evento):
+            if evento["tipo"] in ("conectado", "sincronizar"):
+                return True
+            if tipos and evento["tipo"] not in tipos:
+                return False
+            if area_id is not None and evento.get("area_id") not in (None, area_id):
+                return False
+            if fecha:
+                if "fecha" in evento:
+                    return evento["fecha"] == fecha
+                if "desde" in evento:
+                    return evento["desde"] <= fecha <= evento["hasta"]
+            return True
+        return acepta
+
+    @staticmethod
+    def _formato(evento):
+        return f"event: {evento['tipo']}\ndata: {json.dumps(evento, default=str)}\n\n"
+
+    @staticmethod
+    def stream():
+        """
+        Stream SSE de eventos de citas y horarios.
+
+        Query params (opcionales):
+        - tipos: lista separada por comas (p.ej. 'cita.creada,horario.cupos')
+        - area_id: solo eventos del área
+        - fecha: YYYY-MM-DD, solo eventos de esa fecha
+
+        Cada conexión ocupa un hilo del worker: se limita a
+        EVENTOS_MAX_CONEXIONES por worker (503 si se excede, el cliente
+        sigue con polling) y se cierra tras EVENTOS_DURACION_MAX segundos
+        para que EventSource se reconecte.
+        """
+        config = current_app.config
+        tipos = {t.strip() for t in request.args.get("tipos", "").split(",") if t.strip()}
+        area_id = request.args.get("area_id", type=int)
+        fecha = request.args.get("fecha")
+
+        broker = Eventos.broker()
+        if broker.conexiones() >= config["EVENTOS_MAX_CONEXIONES"]:
+            respuesta = jsonify({"error": "Demasiadas conexiones de eventos, intente más tarde"})
+            respuesta.headers["Retry-After"] = str(config["EVENTOS_KEEPALIVE"])
+            return respuesta, 503
+
+        suscripcion = broker.suscribir(EventoController._filtro(tipos, area_id, fecha))
+        keepalive = config["EVENTOS_KEEPALIVE"]
+        duracion_max = config["EVENTOS_DURACION_MAX"]
+
+        # Sin stream_with_context: la sesión de BD se libera al devolver la respuesta
+        def generar():
+            try:
+                yield f"retry: {keepalive * 1000}\n\n"
+                yield EventoController._formato({"tipo": "conectado"})
+                fin = time.monotonic() + duracion_max
+                while time.monotonic() < fin and not suscripcion.desbordada:
+                    try:
+                        evento = suscripcion.cola.get(timeout=min(keepalive, max(fin - time.monotonic(), 0.01)))
+                    except queue.Empty:
+                        yield ": ping\n\n"
+                        continue
+                    yield EventoController._formato(evento)
+            finally:
+                broker.cancelar(suscripcion)
+
+        return Response(generar(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
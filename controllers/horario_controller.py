@@ -1,8 +1,11 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from extensions.database import db
 from models.horario_medico_model import HorarioMedico
 from models.usuario_model import Usuario
 from models.area_model import Area
+from models.cita_diaria_model import CitaDiaria
+from services.eventos_service import Eventos
+from services.horario_masivo_service import HorarioMasivoService
 from datetime import datetime, date
 from calendar import monthrange
 
@@ -12,7 +15,7 @@ class HorarioController:
     def create_horarios_mensuales():
         """
         Crea horarios para todo un mes de forma OPTIMIZADA.
-        Reduce las consultas a BD de N a 1.
+        Una consulta de lectura y un UPSERT (ver HorarioMasivoService).
         """
         try:
             data = request.json
@@ -61,76 +64,23 @@ class HorarioController:
             if not fechas_validas:
                 return jsonify({"error": "No hay fechas válidas para procesar", "detalles": errores_fechas}), 400
 
-            # 2. OPTIMIZACIÓN: Traer TODOS los horarios existentes para estas fechas en UNA sola consulta
-            # Esto evita el problema N+1 (hacer una query por cada día)
-            existing_records = HorarioMedico.query.filter(
-                HorarioMedico.medico_id == medico_id,
-                HorarioMedico.fecha.in_(fechas_validas)
-            ).all()
-
-            # 3. Crear mapa de búsqueda rápida: {(fecha, turno): objeto_horario}
-            mapa_existentes = {
-                (h.fecha, h.turno): h for h in existing_records
-            }
-
-            contadores = {"creados": 0, "actualizados": 0}
-            nuevos_objetos = []
-
-            # 4. Procesar en memoria
-            for fecha in fechas_validas:
-                dia_semana = fecha.weekday() # 0=Lun, 6=Dom
-                
-                # Definir qué turnos vamos a procesar
-                turnos_a_procesar = []
-                if turno_manana.get("activo"):
-                    turnos_a_procesar.append(('M', turno_manana.get("cupos", 7)))
-                if turno_tarde.get("activo"):
-                    turnos_a_procesar.append(('T', turno_tarde.get("cupos", 7)))
-                
-                for codigo_turno, cupos in turnos_a_procesar:
-                    clave = (fecha, codigo_turno)
-                    horario = mapa_existentes.get(clave)
-                    
-                    if horario:
-                        # Actualizar existente
-                        cambio = False
-                        if horario.area_id != area_id:
-                            horario.area_id = area_id
-                            cambio = True
-                        if horario.cupos != cupos:
-                            horario.cupos = cupos
-                            cambio = True
-                        
-                        if cambio:
-                            contadores["actualizados"] += 1
-                        # Si no hubo cambios, no contamos pero tampoco hacemos nada (SQLAlchemy lo ignora)
-                    else:
-                        # Crear nuevo
-                        nuevo = HorarioMedico(
-                            medico_id=medico_id,
-                            area_id=area_id,
-                            fecha=fecha,
-                            dia_semana=dia_semana,
-                            turno=codigo_turno,
-                            cupos=cupos
-                        )
-                        nuevos_objetos.append(nuevo)
-                        contadores["creados"] += 1
-
-            # 5. Guardar todo en bloque
-            if nuevos_objetos:
-                db.session.add_all(nuevos_objetos)
-            
+            # 2. Alta o actualización en bloque (INSERT ... ON CONFLICT)
+            resumen = HorarioMasivoService.aplicar(
+                HorarioMasivoService.filas(medico_id, area_id, fechas_validas, turnos)
+            )
             db.session.commit()
             
             response = {
                 "message": "Horarios procesados correctamente",
-                "creados": contadores["creados"],
-                "actualizados": contadores["actualizados"],
+                "creados": resumen["creados"],
+                "actualizados": resumen["actualizados"],
                 # Retornamos solo un resumen numérico para no sobrecargar la respuesta JSON con 60+ objetos
-                "total_procesados": contadores["creados"] + contadores["actualizados"]
+                "total_procesados": resumen["creados"] + resumen["actualizados"]
             }
             
+            if resumen["conflictos"]:
+                # Horarios con más citas activas que los cupos pedidos: no se modificaron
+                response["conflictos"] = resumen["conflictos"]
             if errores_fechas:
                 response["advertencias"] = errores_fechas
             
@@ -141,6 +91,88 @@ class HorarioController:
             print(f"Error al crear horarios: {str(e)}") # Log para debug
             return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
 
+    @staticmethod
+    def create_horarios_masivos():
+        """
+        Crea o actualiza horarios de varios médicos y meses en una sola solicitud
+        (p.ej. toda la clínica para un trimestre).
+        
+        Payload esperado:
+        {
+            "meses": ["YYYY-MM", ...],
+            "dias_semana": [0, 1, 2, 3, 4] (opcional, 0=Lunes; por defecto lunes a viernes),
+            "excluir_fechas": ["YYYY-MM-DD", ...] (opcional, feriados),
+            "turnos": {"manana": {"activo": true, "cupos": 7}, "tarde": {...}},
+            "medicos": [
+                {"medico_id": int, "area_id": int, "turnos": {...}, "dias_semana": [...]}
+            ]   ('turnos' y 'dias_semana' por médico son opcionales)
+        }
+        """
+        try:
+            data = request.get_json() or {}
+            meses = data.get("meses") or []
+            medicos = data.get("medicos") or []
+            if not meses or not medicos:
+                return jsonify({"error": "Se requieren 'meses' y 'medicos'"}), 400
+            
+            try:
+                excluir = {datetime.strptime(f, "%Y-%m-%d").date() for f in data.get("excluir_fechas", [])}
+            except (TypeError, ValueError):
+                return jsonify({"error": "Formato inválido en 'excluir_fechas'. Use YYYY-MM-DD"}), 400
+            
+            filas = []
+            fechas_por_dias = {}
+            for medico in medicos:
+                medico_id, area_id = medico.get("medico_id"), medico.get("area_id")
+                if not medico_id or not area_id:
+                    return jsonify({"error": "Cada médico requiere 'medico_id' y 'area_id'"}), 400
+                turnos = medico.get("turnos") or data.get("turnos") or {}
+                if not any(turnos.get(t, {}).get("activo") for t in ("manana", "tarde")):
+                    return jsonify({"error": f"Debe activar al menos un turno (médico {medico_id})"}), 400
+                
+                dias_semana = tuple(sorted(medico.get("dias_semana") or data.get("dias_semana") or range(5)))
+                if dias_semana not in fechas_por_dias:
+                    try:
+                        fechas_por_dias[dias_semana] = [
+                            f for mes in meses
+                            for f in HorarioMasivoService.fechas_mes(mes, set(dias_semana), excluir)
+                        ]
+                    except (AttributeError, ValueError):
+                        return jsonify({"error": "Formato de mes inválido. Use YYYY-MM"}), 400
+                filas.extend(HorarioMasivoService.filas(medico_id, area_id, fechas_por_dias[dias_semana], turnos))
+            
+            maximo = current_app.config["HORARIOS_BULK_MAX"]
+            if len(filas) > maximo:
+                return jsonify({"error": f"La solicitud genera {len(filas)} horarios (máximo {maximo})"}), 400
+            
+            medico_ids = {f["medico_id"] for f in filas}
+            area_ids = {f["area_id"] for f in filas}
+            encontrados = db.session.execute(db.select(
+                db.select(db.func.count(Usuario.id)).where(Usuario.id.in_(medico_ids)).scalar_subquery(),
+                db.select(db.func.count(Area.id)).where(Area.id.in_(area_ids)).scalar_subquery()
+            )).one()
+            if tuple(encontrados) != (len(medico_ids), len(area_ids)):
+                return jsonify({"error": "Algún médico o área no existe"}), 400
+            
+            resumen = HorarioMasivoService.aplicar(filas)
+            db.session.commit()
+            
+            return jsonify({
+                "message": "Horarios procesados correctamente",
+                "resumen": {
+                    "creados": resumen["creados"],
+                    "actualizados": resumen["actualizados"],
+                    "sin_cambio": resumen["sin_cambio"],
+                    "conflictos": len(resumen["conflictos"])
+                },
+                "conflictos": resumen["conflictos"]
+            }), 200
+        
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al crear horarios masivos: {str(e)}")
+            return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
+
     @staticmethod
     def _crear_o_actualizar_horario(medico_id, area_id, fecha, dia_semana, turno, cupos):
         """
@@ -188,6 +220,9 @@ class HorarioController:
                     res = HorarioController._process_single_horario(item)
                     results.append(res)
                 
+                HorarioController._recalcular_cupos(results)
+                for medico_id, (desde, hasta) in HorarioController._rangos(results).items():
+                    Eventos.horarios(medico_id, desde, hasta)
                 db.session.commit()
                 return jsonify({
                     "message": f"{len(results)} horarios procesados correctamente", 
@@ -196,6 +231,8 @@ class HorarioController:
             else:
                 # Procesamiento individual
                 res = HorarioController._process_single_horario(data)
+                HorarioController._recalcular_cupos([res])
+                Eventos.cupos(res)
                 db.session.commit()
                 return jsonify({
                     "message": "Horario procesado correctamente", 
@@ -206,6 +243,22 @@ class HorarioController:
             db.session.rollback()
             return jsonify({"error": str(e)}), 500
 
+    @staticmethod
+    def _rangos(horarios):
+        """Rango de fechas por médico: {medico_id: (desde, hasta)}."""
+        rangos = {}
+        for h in horarios:
+            desde, hasta = rangos.get(h.medico_id, (h.fecha, h.fecha))
+            rangos[h.medico_id] = (min(desde, h.fecha), max(hasta, h.fecha))
+        return rangos
+
+    @staticmethod
+    def _recalcular_cupos(horarios):
+        """Actualiza los cupos de la tabla de hechos diaria para los horarios dados."""
+        db.session.flush()
+        for medico_id, (desde, hasta) in HorarioController._rangos(horarios).items():
+            CitaDiaria.recalcular_cupos(medico_id, desde, hasta)
+
     @staticmethod
     def _process_single_horario(data):
         """Procesa un horario individual con el nuevo formato"""
@@ -260,7 +313,8 @@ class HorarioController:
         """
         Obtiene horarios con filtros opcionales.
         Incluye cupos_disponibles calculado en base a citas activas.
-        OPTIMIZADO: Una sola consulta con LEFT JOIN para calcular cupos.
+        OPTIMIZADO: LEFT JOIN por clave primaria a 'horario_ocupacion',
+        sin recorrer la tabla de citas.
         
         Query params:
         - medico_id: Filtrar por médico
@@ -270,8 +324,8 @@ class HorarioController:
         - turno: Filtrar por turno ('M' o 'T')
         """
         try:
-            from models.cita_model import Cita
-            from sqlalchemy import func, case
+            from models.horario_ocupacion_model import HorarioOcupacion
+            from sqlalchemy import func
             
             medico_id = request.args.get('medico_id')
             area_id = request.args.get('area_id')
@@ -279,23 +333,14 @@ class HorarioController:
             fecha = request.args.get('fecha')  # Formato YYYY-MM-DD
             turno = request.args.get('turno')  # 'M' o 'T'
             
-            # Subconsulta para contar citas activas por horario_id
-            # Cuenta solo citas no canceladas usando EstadoCita
-            from models.estado_cita_model import EstadoCita
-            citas_count_subq = db.session.query(
-                Cita.horario_id,
-                func.count(Cita.id).label('citas_activas')
-            ).join(EstadoCita).filter(
-                EstadoCita.nombre != 'cancelada'
-            ).group_by(Cita.horario_id).subquery()
-            
-            # Query principal con LEFT JOIN a la subconsulta
+            # Query principal con LEFT JOIN a la ocupación materializada
+            # (citas activas = no canceladas, mantenidas por CitaController)
             query = db.session.query(
                 HorarioMedico,
-                func.coalesce(citas_count_subq.c.citas_activas, 0).label('citas_activas')
+                func.coalesce(HorarioOcupacion.activos, 0).label('citas_activas')
             ).outerjoin(
-                citas_count_subq,
-                HorarioMedico.id == citas_count_subq.c.horario_id
+                HorarioOcupacion,
+                HorarioMedico.id == HorarioOcupacion.horario_id
             )
             
             # Aplicar filtros
@@ -414,6 +459,11 @@ class HorarioController:
                 return jsonify({"error": "Horario no encontrado"}), 404
             
             db.session.delete(horario)
+            HorarioController._recalcular_cupos([horario])
+            Eventos.emitir(
+                "horario.eliminado", horario_id=horario.id, fecha=str(horario.fecha),
+                area_id=horario.area_id, medico_id=horario.medico_id, turno=horario.turno
+            )
             db.session.commit()
             return jsonify({"message": "Horario eliminado correctamente"}), 200
         except Exception as e:
@@ -446,6 +496,8 @@ class HorarioController:
             if 'area_id' in data:
                 horario.area_id = data['area_id']
             
+            HorarioController._recalcular_cupos([horario])
+            Eventos.cupos(horario)
             db.session.commit()
             
             return jsonify({
@@ -493,6 +545,8 @@ class HorarioController:
                 query = query.filter_by(turno=turno)
             
             deleted_count = query.delete()
+            CitaDiaria.recalcular_cupos(int(medico_id), fecha_inicio, fecha_fin)
+            Eventos.horarios(int(medico_id), fecha_inicio, fecha_fin)
             db.session.commit()
             
             return jsonify({
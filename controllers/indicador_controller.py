@@ -7,13 +7,10 @@ Implementa las 3 dimensiones para la tesis:
 """
 
 from flask import jsonify, request
-from extensions.database import db
-from models.cita_model import Cita
-from models.estado_cita_model import EstadoCita
-from models.horario_medico_model import HorarioMedico
+from models.cita_diaria_model import CitaDiaria
 from models.area_model import Area
-from sqlalchemy import func, case, extract
-from datetime import datetime, timedelta
+from services.indicadores_service import IndicadoresService, porcentaje, promedio
+from datetime import datetime
 
 
 class IndicadorController:
@@ -58,105 +55,31 @@ class IndicadorController:
                     'error': 'La fecha de inicio debe ser anterior o igual a la fecha fin'
                 }), 400
             
+            # Una sola consulta sobre la tabla de hechos diaria (conteos, cupos y lead time)
+            citas = IndicadoresService.consulta(fecha_inicio, fecha_fin, area_id).one()
+            cupos_totales = citas.cupos_totales
+            
             # ==================== INDICADOR 1: UTILIZACIÓN DE CAPACIDAD ====================
             # Fórmula: (Citas No Canceladas / Cupos Totales) * 100
-            
-            # Query para cupos totales
-            cupos_query = db.session.query(func.sum(HorarioMedico.cupos)).filter(
-                HorarioMedico.fecha >= fecha_inicio,
-                HorarioMedico.fecha <= fecha_fin
-            )
-            if area_id:
-                cupos_query = cupos_query.filter(HorarioMedico.area_id == area_id)
-            
-            cupos_totales = cupos_query.scalar() or 0
-            
-            # Query para citas no canceladas
-            citas_query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre != 'cancelada'
-            )
-            if area_id:
-                citas_query = citas_query.filter(Cita.area_id == area_id)
-            
-            citas_programadas = citas_query.scalar() or 0
-            
-            utilizacion = round((citas_programadas / cupos_totales * 100), 2) if cupos_totales > 0 else 0
+            citas_programadas = citas.citas_no_canceladas
+            utilizacion = porcentaje(citas_programadas, cupos_totales)
             
             # ==================== INDICADOR 2: TASA DE INASISTENCIA ====================
             # Fórmula: (Citas No Asistió / Citas Confirmadas Totales) * 100
-            
-            # Citas con estado final (confirmadas que llegaron a resolución)
-            citas_confirmadas_query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre.in_(['confirmada', 'atendida', 'no_asistio'])
-            )
-            if area_id:
-                citas_confirmadas_query = citas_confirmadas_query.filter(Cita.area_id == area_id)
-            
-            citas_confirmadas_total = citas_confirmadas_query.scalar() or 0
-            
-            # No shows
-            no_shows_query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre == 'no_asistio'
-            )
-            if area_id:
-                no_shows_query = no_shows_query.filter(Cita.area_id == area_id)
-            
-            no_shows = no_shows_query.scalar() or 0
-            
-            tasa_inasistencia = round((no_shows / cupos_totales * 100), 2) if cupos_totales > 0 else 0
+            citas_confirmadas_total = citas.confirmadas_total
+            no_shows = citas.no_shows
+            tasa_inasistencia = porcentaje(no_shows, cupos_totales)
 
             # ==================== INDICADOR 3: LEAD TIME (TIEMPO DE ANTICIPACIÓN) ====================
-            # Fórmula: Promedio de (Fecha Cita - Fecha Registro)
-            # En PostgreSQL: la resta de dos fechas devuelve INTEGER (días)
-            
-            lead_time_query = db.session.query(
-                func.avg(
-                    func.cast(Cita.fecha, db.Date) - func.cast(Cita.fecha_registro, db.Date)
-                )
-            ).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre != 'cancelada',
-                Cita.fecha.isnot(None)
-            )
-            if area_id:
-                lead_time_query = lead_time_query.filter(Cita.area_id == area_id)
-            
-            lead_time_promedio = lead_time_query.scalar()
-            lead_time_promedio = round(float(lead_time_promedio), 2) if lead_time_promedio else 0
+            # Fórmula: Promedio de (Fecha Cita - Fecha Registro), sin citas canceladas
+            lead_time_promedio = promedio(citas.lead_time_no_canceladas)
             
             # ==================== ESTADÍSTICAS ADICIONALES ====================
-            
-            # Citas atendidas
-            citas_atendidas_query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre == 'atendida'
-            )
-            if area_id:
-                citas_atendidas_query = citas_atendidas_query.filter(Cita.area_id == area_id)
-            
-            citas_atendidas = citas_atendidas_query.scalar() or 0
-            
-            # Citas canceladas
-            citas_canceladas_query = db.session.query(func.count(Cita.id)).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin,
-                EstadoCita.nombre == 'cancelada'
-            )
-            if area_id:
-                citas_canceladas_query = citas_canceladas_query.filter(Cita.area_id == area_id)
-            
-            citas_canceladas = citas_canceladas_query.scalar() or 0
+            citas_atendidas = citas.atendidas
+            citas_canceladas = citas.canceladas
             
             # Tasa de atención efectiva
-            tasa_atencion = round((citas_atendidas / citas_confirmadas_total * 100), 2) if citas_confirmadas_total > 0 else 0
+            tasa_atencion = porcentaje(citas_atendidas, citas_confirmadas_total)
             
             return jsonify({
                 'success': True,
@@ -244,78 +167,22 @@ class IndicadorController:
                     'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
                 }), 400
             
-            # Determinar la función de agrupación
-            if agrupacion == 'dia':
-                group_func = Cita.fecha
-                group_func_horario = HorarioMedico.fecha
-            elif agrupacion == 'semana':
-                group_func = func.date_trunc('week', Cita.fecha)
-                group_func_horario = func.date_trunc('week', HorarioMedico.fecha)
-            else:  # mes por defecto
-                group_func = func.date_trunc('month', Cita.fecha)
-                group_func_horario = func.date_trunc('month', HorarioMedico.fecha)
-            
-            # Obtener datos de citas agrupados
-            citas_query = db.session.query(
-                group_func.label('periodo'),
-                func.count(Cita.id).label('total_citas'),
-                # Usar EstadoCita para filtros
-                func.count(case((EstadoCita.nombre != 'cancelada', 1))).label('citas_no_canceladas'),
-                func.count(case((EstadoCita.nombre == 'no_asistio', 1))).label('no_shows'),
-                func.count(case((EstadoCita.nombre == 'atendida', 1))).label('atendidas'),
-                func.count(case((EstadoCita.nombre.in_(['confirmada', 'atendida', 'no_asistio']), 1))).label('confirmadas_total'),
-                func.avg(
-                    func.cast(Cita.fecha, db.Date) - func.cast(Cita.fecha_registro, db.Date)
-                ).label('lead_time_promedio')
-            ).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin
-            )
-            
-            if area_id:
-                citas_query = citas_query.filter(Cita.area_id == area_id)
-            
-            citas_data = citas_query.group_by(group_func).order_by(group_func).all()
-            
-            # Obtener cupos por período
-            cupos_query = db.session.query(
-                group_func_horario.label('periodo'),
-                func.sum(HorarioMedico.cupos).label('cupos_totales')
-            ).filter(
-                HorarioMedico.fecha >= fecha_inicio,
-                HorarioMedico.fecha <= fecha_fin
-            )
-            
-            if area_id:
-                cupos_query = cupos_query.filter(HorarioMedico.area_id == area_id)
+            # Inicio del día, semana o mes (por defecto) según el motor de BD
+            group_func = IndicadoresService.periodo(agrupacion)
             
-            cupos_data = {
-                str(row.periodo.date() if hasattr(row.periodo, 'date') else row.periodo): row.cupos_totales 
-                for row in cupos_query.group_by(group_func_horario).all()
-            }
+            # Citas y cupos agrupados por período
+            citas_data = IndicadoresService.consulta(
+                fecha_inicio, fecha_fin, area_id, grupo=[group_func.label('periodo')]
+            ).order_by(group_func).all()
             
             # Construir resultado
             resultado = []
             for row in citas_data:
                 periodo_str = str(row.periodo.date() if hasattr(row.periodo, 'date') else row.periodo)
-                cupos = cupos_data.get(periodo_str, 0) or 0
                 
-                utilizacion = round((row.citas_no_canceladas / cupos * 100), 2) if cupos > 0 else 0
-                tasa_inasistencia = round((row.no_shows / cupos * 100), 2) if cupos > 0 else 0
-                lead_time = round(float(row.lead_time_promedio), 2) if row.lead_time_promedio else 0
-
                 resultado.append({
                     'periodo': periodo_str,
-                    'utilizacion_capacidad': utilizacion,
-                    'tasa_inasistencia': tasa_inasistencia,
-                    'lead_time': lead_time,
-                    'detalles': {
-                        'total_citas': row.total_citas,
-                        'citas_no_canceladas': row.citas_no_canceladas,
-                        'no_shows': row.no_shows,
-                        'atendidas': row.atendidas,
-                        'cupos_totales': cupos
-                    }
+                    **IndicadoresService.resumen(row)
                 })
             
             return jsonify({
@@ -363,56 +230,18 @@ class IndicadorController:
                     'error': 'Formato de fecha inválido. Use YYYY-MM-DD'
                 }), 400
             
-            # Query principal agrupado por área
-            citas_por_area = db.session.query(
-                Area.id.label('area_id'),
-                Area.nombre.label('area_nombre'),
-                func.count(Cita.id).label('total_citas'),
-                func.count(case((EstadoCita.nombre != 'cancelada', 1))).label('citas_no_canceladas'),
-                func.count(case((EstadoCita.nombre == 'no_asistio', 1))).label('no_shows'),
-                func.count(case((EstadoCita.nombre == 'atendida', 1))).label('atendidas'),
-                func.count(case((EstadoCita.nombre.in_(['confirmada', 'atendida', 'no_asistio']), 1))).label('confirmadas_total'),
-                func.avg(
-                    func.cast(Cita.fecha, db.Date) - func.cast(Cita.fecha_registro, db.Date)
-                ).label('lead_time_promedio')
-            ).join(Area, Cita.area_id == Area.id).join(EstadoCita).filter(
-                Cita.fecha >= fecha_inicio,
-                Cita.fecha <= fecha_fin
-            ).group_by(Area.id, Area.nombre).all()
-            
-            # Cupos por área
-            cupos_por_area = db.session.query(
-                HorarioMedico.area_id,
-                func.sum(HorarioMedico.cupos).label('cupos_totales')
-            ).filter(
-                HorarioMedico.fecha >= fecha_inicio,
-                HorarioMedico.fecha <= fecha_fin
-            ).group_by(HorarioMedico.area_id).all()
-            
-            cupos_dict = {row.area_id: row.cupos_totales or 0 for row in cupos_por_area}
+            # Citas y cupos agrupados por área
+            citas_por_area = IndicadoresService.consulta(
+                fecha_inicio, fecha_fin, grupo=[Area.id.label('area_id'), Area.nombre.label('area_nombre')]
+            ).join(Area, CitaDiaria.area_id == Area.id).all()
             
             # Construir resultado
             resultado = []
             for row in citas_por_area:
-                cupos = cupos_dict.get(row.area_id, 0)
-                
-                utilizacion = round((row.citas_no_canceladas / cupos * 100), 2) if cupos > 0 else 0
-                tasa_inasistencia = round((row.no_shows / cupos * 100), 2) if cupos > 0 else 0
-                lead_time = round(float(row.lead_time_promedio), 2) if row.lead_time_promedio else 0
-
                 resultado.append({
                     'area_id': row.area_id,
                     'area_nombre': row.area_nombre,
-                    'utilizacion_capacidad': utilizacion,
-                    'tasa_inasistencia': tasa_inasistencia,
-                    'lead_time': lead_time,
-                    'detalles': {
-                        'total_citas': row.total_citas,
-                        'citas_no_canceladas': row.citas_no_canceladas,
-                        'no_shows': row.no_shows,
-                        'atendidas': row.atendidas,
-                        'cupos_totales': cupos
-                    }
+                    **IndicadoresService.resumen(row)
                 })
             
             return jsonify({
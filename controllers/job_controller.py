@@ -0,0 +1,73 @@
+from io import BytesIO
+
+from flask import current_app, jsonify, request, send_file
+
+from extensions.database import db
+from models.job_model import Job, COMPLETADO, FALLIDO
+from services.job_service import JobService
+
+class JobController:
+
+    @staticmethod
+    def _obtener_propio(id):
+        """El trabajo si existe y es del usuario autenticado (o es administrador)."""
+        job = db.session.get(Job, id)
+        if job is None:
+            return None
+        usuario = request.user or {}
+        if usuario.get("rol_id") != 1 and job.usuario_id != usuario.get("id"):
+            return None
+        return job
+
+    @staticmethod
+    def crear():
+        """
+        Encolar un trabajo (POST /api/jobs).
+
+        Payload:
+        {
+            "tipo": "citas_confirmadas_pdf" | "reporte_pdf" | "citas_export",
+            "parametros": {...}  # Los query params del endpoint síncrono equivalente
+        }
+
+        Responde 202 con el trabajo; consultar GET /api/jobs/<id> hasta que
+        su estado sea 'completado' y descargar archivo.descarga.
+        """
+        data = request.get_json(silent=True) or {}
+        try:
+            job = JobService.encolar(data.get("tipo"), data.get("parametros"), request.user.get("id"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        JobService.asegurar_hilos(current_app._get_current_object())
+        respuesta = jsonify(job.to_dict())
+        respuesta.headers["Location"] = f"/api/jobs/{job.id}"
+        return respuesta, 202
+
+    @staticmethod
+    def obtener(id):
+        job = JobController._obtener_propio(id)
+        if job is None:
+            return jsonify({"error": "Trabajo no encontrado o vencido"}), 404
+
+        # Tras reiniciar el worker, los hilos vuelven a arrancar con el siguiente sondeo
+        JobService.asegurar_hilos(current_app._get_current_object())
+        return jsonify(job.to_dict())
+
+    @staticmethod
+    def descargar(id):
+        job = JobController._obtener_propio(id)
+        if job is None:
+            return jsonify({"error": "Trabajo no encontrado o vencido"}), 404
+        if job.estado != COMPLETADO:
+            respuesta = jsonify({"error": f"El trabajo está {job.estado}", "estado": job.estado})
+            if job.estado != FALLIDO:
+                respuesta.headers["Retry-After"] = str(max(1, int(current_app.config["JOBS_INTERVALO"])))
+            return respuesta, 409
+
+        return send_file(
+            BytesIO(job.resultado),
+            mimetype=job.mimetype,
+            as_attachment=True,
+            download_name=job.archivo_nombre
+        )
@@ -0,0 +1,28 @@
+import hmac
+
+from flask import Response, current_app, jsonify, request
+
+from utils import metricas
+
+class MetricaController:
+
+    @staticmethod
+    def index():
+        """
+        Métricas en formato de texto de Prometheus.
+
+        Exige 'Authorization: Bearer <METRICAS_TOKEN>' (el scraper no maneja
+        las cookies JWT). Sin METRICAS_TOKEN solo responde en DEBUG o TESTING:
+        en producción las métricas no quedan públicas por omisión.
+        """
+        token = current_app.config["METRICAS_TOKEN"]
+        if not token:
+            if not (current_app.debug or current_app.testing):
+                return jsonify({"error": "Métricas deshabilitadas: defina METRICAS_TOKEN"}), 403
+        else:
+            recibido = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(recibido, f"Bearer {token}"):
+                return jsonify({"error": "No autorizado"}), 401
+
+        cuerpo, content_type = metricas.exportar()
+        return Response(cuerpo, content_type=content_type)
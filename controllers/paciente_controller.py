@@ -3,7 +3,10 @@ from extensions.database import db
 from models.paciente_model import Paciente
 from models.cita_model import Cita
 from models.persona_model import Persona
-from datetime import datetime
+from services.busqueda_service import BusquedaPersonas
+from services.cita_serializer import CitaSerializer
+from utils.paginacion import limitar_per_page, paginar_keyset
+from datetime import datetime, date
 
 class PacienteController:
 
@@ -24,9 +27,9 @@ class PacienteController:
                 data["tipo_existencia"] = "persona"
                 return jsonify(data), 200
             
-            # 3. Si no existe localmente, buscar en API externa
-            from services.api_dni_services import ApiPeruDevService
-            api_response = ApiPeruDevService.get_data_by_dni(dni)
+            # 3. Si no existe localmente, buscar en API externa (con caché)
+            from services.api_dni_services import DniService
+            api_response = DniService.buscar(dni)
             
             if api_response.get("success"):
                 data = api_response.get("data", {})
@@ -45,26 +48,45 @@ class PacienteController:
 
     @staticmethod
     def listar():
+        """
+        Listar pacientes con búsqueda y paginación.
+        
+        Query params:
+        - page, per_page: Paginación clásica (default: 1, 10; per_page máximo 100)
+        - search: Búsqueda por DNI (prefijo si es numérico), nombres o apellidos
+                  (todas las palabras, sin distinguir tildes). En la paginación
+                  clásica los resultados se ordenan por relevancia.
+        - cursor: Activa la paginación por cursor (vacío para la primera página)
+        """
         try:
             from flask import request
+            cursor = request.args.get('cursor')
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = limitar_per_page(request.args.get('per_page', 10, type=int))
             search = request.args.get('search', '', type=str)
 
             query = Paciente.query
+            relevancia = []
 
             if search:
-                search_term = f"%{search}%"
                 # Unimos con Persona para buscar en los datos centralizados
-                query = query.join(Persona).filter(
-                    (Persona.dni.ilike(search_term)) |
-                    (Persona.nombres.ilike(search_term)) |
-                    (Persona.apellido_paterno.ilike(search_term)) |
-                    (Persona.apellido_materno.ilike(search_term))
-                )
+                query, relevancia = BusquedaPersonas.filtrar(query.join(Persona), search)
+
+            if cursor is not None:
+                items, next_cursor = paginar_keyset(query, [
+                    (Paciente.fecha_registro, datetime.fromisoformat),
+                    (Paciente.id, int)
+                ], cursor=cursor, per_page=per_page)
+
+                return jsonify({
+                    "per_page": per_page,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                    "data": [p.to_dict() for p in items]
+                }), 200
 
-            # Ordenar por fecha de registro descendente (más recientes primero)
-            query = query.order_by(Paciente.fecha_registro.desc())
+            # Ordenar por relevancia de la búsqueda y luego por fecha de registro (más recientes primero)
+            query = query.order_by(*relevancia, Paciente.fecha_registro.desc())
 
             pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
@@ -76,6 +98,8 @@ class PacienteController:
                 "data": [p.to_dict() for p in pagination.items]
             }), 200
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -274,13 +298,15 @@ class PacienteController:
         
         Query params:
         - page: Página actual (default: 1)
-        - per_page: Items por página (default: 10)
+        - per_page: Items por página (default: 10, máximo 100)
         - estado: Filtrar por estado (pendiente, confirmada, atendida, cancelada, referido)
+        - cursor: Activa la paginación por cursor (vacío para la primera página)
         
         Retorna lista de citas ordenadas por fecha descendente.
         """
         try:
             from flask import request
+            cursor = request.args.get('cursor')
             
             # Verificar que el paciente existe
             paciente = Paciente.query.get(paciente_id)
@@ -289,44 +315,48 @@ class PacienteController:
 
             # Parámetros de paginación
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = limitar_per_page(request.args.get('per_page', 10, type=int))
             estado = request.args.get('estado', '', type=str)
 
             # Construir query
-            query = Cita.query.filter_by(paciente_id=paciente_id)
+            query = CitaSerializer.cargar(Cita.query).filter_by(paciente_id=paciente_id)
 
             # Filtro por estado
             if estado:
                 query = query.filter(Cita.estado == estado)
 
-            # Ordenar por fecha de cita descendente (más recientes primero)
-            query = query.order_by(Cita.fecha.desc(), Cita.fecha_registro.desc())
-
-            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            if cursor is not None:
+                items, next_cursor = paginar_keyset(query, [
+                    (Cita.fecha, date.fromisoformat),
+                    (Cita.fecha_registro, datetime.fromisoformat),
+                    (Cita.id, int)
+                ], cursor=cursor, per_page=per_page)
+            else:
+                # Ordenar por fecha de cita descendente (más recientes primero)
+                query = query.order_by(Cita.fecha.desc(), Cita.fecha_registro.desc())
+                pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+                items = pagination.items
 
             # Construir respuesta con datos enriquecidos
-            citas_data = []
-            for cita in pagination.items:
-                cita_dict = cita.to_dict()
-                
-                # Agregar información del horario si existe
-                if cita.horario:
-                    cita_dict["horario"] = {
-                        "id": cita.horario.id,
-                        "turno": cita.horario.turno,
-                        "turno_nombre": cita.horario.turno_nombre,
-                        "hora_inicio": str(cita.horario.hora_inicio),
-                        "hora_fin": str(cita.horario.hora_fin)
-                    }
-                
-                citas_data.append(cita_dict)
+            citas_data = [CitaSerializer.para_historial_paciente(cita) for cita in items]
+
+            paciente_info = {
+                "id": paciente.id,
+                "dni": paciente.dni,
+                "nombre_completo": f"{paciente.apellido_paterno} {paciente.apellido_materno}, {paciente.nombres}"
+            }
+
+            if cursor is not None:
+                return jsonify({
+                    "paciente": paciente_info,
+                    "per_page": per_page,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                    "data": citas_data
+                }), 200
 
             return jsonify({
-                "paciente": {
-                    "id": paciente.id,
-                    "dni": paciente.dni,
-                    "nombre_completo": f"{paciente.apellido_paterno} {paciente.apellido_materno}, {paciente.nombres}"
-                },
+                "paciente": paciente_info,
                 "total": pagination.total,
                 "pages": pagination.pages,
                 "current_page": pagination.page,
@@ -334,6 +364,8 @@ class PacienteController:
                 "data": citas_data
             }), 200
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
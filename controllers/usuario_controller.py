@@ -6,6 +6,7 @@ from models.persona_model import Persona
 from models.horario_medico_model import HorarioMedico
 from models.especialidad_model import Especialidad
 from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from extensions.jwt_manager import invalidar_usuario
 from flask import make_response
 
 
@@ -135,8 +136,7 @@ class UsuarioController:
         """
         try:
             from models.area_model import Area
-            from models.cita_model import Cita
-            from models.estado_cita_model import EstadoCita
+            from models.horario_ocupacion_model import HorarioOcupacion
             from sqlalchemy import func, desc
             from datetime import date
             
@@ -186,17 +186,14 @@ class UsuarioController:
             
             capacity_subquery = capacity_query.group_by(HorarioMedico.medico_id).subquery()
 
-            # B. Citas ocupadas (Citas en horarios futuros activos)
+            # B. Citas ocupadas (ocupación materializada de horarios futuros)
             occupied_query = db.session.query(
                 HorarioMedico.medico_id,
-                func.count(Cita.id).label('occupied_count')
+                func.sum(HorarioOcupacion.activos).label('occupied_count')
             ).join(
-                Cita, Cita.horario_id == HorarioMedico.id
-            ).join(
-                EstadoCita, Cita.estado_id == EstadoCita.id
+                HorarioOcupacion, HorarioOcupacion.horario_id == HorarioMedico.id
             ).filter(
-                HorarioMedico.fecha >= today,
-                EstadoCita.nombre != 'cancelada'
+                HorarioMedico.fecha >= today
             )
 
             if area_id_filter:
@@ -441,6 +438,7 @@ class UsuarioController:
                 usuario.activo = data['activo']
 
             db.session.commit()
+            invalidar_usuario(usuario_id)
 
             role_mapping_reverse = {
                 1: 'admin',
@@ -486,6 +484,7 @@ class UsuarioController:
 
             db.session.delete(usuario)
             db.session.commit()
+            invalidar_usuario(usuario_id)
 
             return jsonify({
                 "message": "Usuario eliminado correctamente"
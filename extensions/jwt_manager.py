@@ -1,8 +1,40 @@
+from flask import current_app
 from flask_jwt_extended import JWTManager
+from sqlalchemy.orm import joinedload
 from models.usuario_model import Usuario
+from services.catalogo_service import Catalogo
+from utils.cache import TTLCache
 
 jwt = JWTManager()
 
+# Datos del usuario autenticado (payload de Usuario.to_dict()) por id y versión.
+# Evita consultar usuarios/personas/roles/especialidades en cada petición protegida.
+# La versión es el contador 'usuarios' de catalogo_version: al modificar un usuario
+# se incrementa y cada worker deja de usar sus entradas anteriores en cuanto la lee
+# (como máximo CATALOGO_VERIFICAR_SEGUNDOS después).
+usuarios_cache = TTLCache(maxsize=2048, ttl=60, nombre="usuarios")
+
+
+def _clave(identity):
+    return f"{identity}:{Catalogo.version('usuarios')}"
+
+
+def invalidar_usuarios():
+    """
+    Descarta los datos cacheados de todos los usuarios, en todos los workers
+    (llamar después del commit).
+    """
+    Catalogo.invalidar("usuarios")
+    usuarios_cache.clear()
+
+
+def invalidar_usuario(usuario_id):
+    """Descarta los datos cacheados de un usuario (llamar tras modificarlo o eliminarlo)."""
+    # Sin la tabla catalogo_version la versión no cambia: se borra también la entrada local
+    usuarios_cache.delete(_clave(usuario_id))
+    Catalogo.invalidar("usuarios")
+
+
 @jwt.user_identity_loader
 def user_identity_lookup(user):
     # If it's a dict (legacy support), return the id as string
@@ -16,6 +48,24 @@ def user_identity_lookup(user):
 
 @jwt.user_lookup_loader
 def user_lookup_callback(_jwt_header, jwt_data):
-    identity = jwt_data["sub"]
-    return Usuario.query.filter_by(id=identity).first()
+    """
+    Retorna el payload del usuario (dict) para 'current_user'.
+    Con la caché caliente no se realiza ninguna consulta a la BD.
+    """
+    identity = str(jwt_data["sub"])
+    clave = _clave(identity)
+
+    payload = usuarios_cache.get(clave)
+    if payload is not None:
+        return payload
+
+    usuario = Usuario.query.options(
+        joinedload(Usuario.persona),
+        joinedload(Usuario.rol)
+    ).filter_by(id=identity).first()
+    if not usuario:
+        return None
 
+    payload = usuario.to_dict()
+    usuarios_cache.set(clave, payload, ttl=current_app.config.get('AUTH_CACHE_TTL'))
+    return payload
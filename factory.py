@@ -23,6 +23,11 @@ from routes.catalogo_routes import catalogo_bp
 from routes.especialidad_routes import especialidad_bp
 from routes.manual_routes import manual_bp
 from routes.reporte_routes import reporte_bp
+from routes.evento_routes import evento_bp
+from routes.metrica_routes import metrica_bp
+from routes.job_routes import job_bp
+from services.barrido_citas_service import BarridoCitasService
+from utils import instrumentacion, metricas
 
 load_dotenv()
 
@@ -39,6 +44,11 @@ def create_app(config_name=None):
     # Initialize Extensions
     db.init_app(app)
     jwt.init_app(app)
+
+    # Consultas SQL, tiempo en BD y Server-Timing por solicitud; log de SQL lenta
+    instrumentacion.instalar(app)
+    # Latencia por endpoint, pool de conexiones y cachés (GET /api/metrics)
+    metricas.instalar(app, db)
     
     # CORS Configuration
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -58,7 +68,7 @@ def create_app(config_name=None):
     CORS(app,
          origins=allowed_origins,
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization", "X-CSRF-TOKEN"],
+         allow_headers=["Content-Type", "Authorization", "X-CSRF-TOKEN", "Idempotency-Key"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
     )
     
@@ -76,6 +86,9 @@ def create_app(config_name=None):
     app.register_blueprint(especialidad_bp, url_prefix="/api/especialidades")
     app.register_blueprint(manual_bp, url_prefix="/api/manuales")
     app.register_blueprint(reporte_bp, url_prefix="/api/reportes")
+    app.register_blueprint(evento_bp, url_prefix="/api/events")
+    app.register_blueprint(metrica_bp, url_prefix="/api/metrics")
+    app.register_blueprint(job_bp, url_prefix="/api/jobs")
     
     # Global Health Check
     @app.route('/api/health', methods=['GET'])
@@ -93,4 +106,7 @@ def create_app(config_name=None):
             "docs": "/api/health"
         }), 200
 
+    # Barrido periódico de citas vencidas (BARRIDO_INTERVALO_MINUTOS)
+    BarridoCitasService.iniciar_programado(app)
+
     return app
@@ -0,0 +1,25 @@
+"""
+Configuración de gunicorn que se carga sola desde el directorio de trabajo
+(el comando de Procfile/railway.json define bind, workers y threads).
+
+Las métricas de /api/metrics se agregan entre workers: cada worker escribe
+en PROMETHEUS_MULTIPROC_DIR, que se vacía al arrancar y del que se quitan
+los datos de 'gauges' de los workers que terminan.
+"""
+
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/citas_metricas")
+
+from prometheus_client import multiprocess  # noqa: E402 (después de definir el directorio)
+
+
+def on_starting(server):
+    directorio = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -8,10 +8,11 @@ def token_required(f):
         try:
             verify_jwt_in_request()
             # current_user is populated by user_lookup_loader in extensions/jwt_manager.py
+            # (payload dict de Usuario.to_dict(), servido desde caché)
             if not current_user:
                 return jsonify({"error": "Usuario no encontrado"}), 401
             
-            request.user = current_user.to_dict()
+            request.user = dict(current_user)
         except Exception as e:
             return jsonify({"error": "Token inválido o expirado", "details": str(e)}), 401
 
@@ -0,0 +1,57 @@
+import hashlib
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+
+from services.idempotencia_service import IdempotenciaService
+
+CABECERA = "Idempotency-Key"
+LONGITUD_MAXIMA = 255
+
+
+def idempotente(alcance):
+    """
+    Decorador de rutas POST: aplica la cabecera Idempotency-Key si viene.
+    Las solicitudes sin cabecera se procesan como siempre.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            clave = request.headers.get(CABECERA)
+            if not clave:
+                return f(*args, **kwargs)
+            if len(clave) > LONGITUD_MAXIMA:
+                return jsonify({"error": f"{CABECERA} admite como máximo {LONGITUD_MAXIMA} caracteres"}), 400
+
+            hash_solicitud = hashlib.sha256(request.get_data()).hexdigest()
+            limite = time.monotonic() + current_app.config["IDEMPOTENCIA_ESPERA"]
+            while True:
+                existente = IdempotenciaService.reservar(clave, alcance, hash_solicitud)
+                if existente is None:
+                    break
+                if existente.hash_solicitud != hash_solicitud:
+                    return jsonify({"error": f"{CABECERA} ya usada con otra solicitud"}), 422
+                if not existente.en_proceso:
+                    respuesta = make_response(jsonify(existente.respuesta), existente.status_code)
+                    respuesta.headers["Idempotent-Replayed"] = "true"
+                    return respuesta
+                if time.monotonic() >= limite:
+                    respuesta = make_response(jsonify({"error": "La solicitud original aún está en proceso"}), 409)
+                    respuesta.headers["Retry-After"] = "1"
+                    return respuesta
+                time.sleep(0.1)
+
+            try:
+                respuesta = make_response(f(*args, **kwargs))
+            except Exception:
+                IdempotenciaService.liberar(clave, alcance)
+                raise
+
+            if respuesta.status_code >= 500 or not respuesta.is_json:
+                IdempotenciaService.liberar(clave, alcance)
+            else:
+                IdempotenciaService.guardar(clave, alcance, respuesta.status_code, respuesta.get_json())
+            return respuesta
+        return wrapper
+    return decorator
@@ -0,0 +1,85 @@
+"""
+Script de migración para la búsqueda de pacientes por DNI y nombre.
+
+Pasos:
+1. Agregar la columna 'personas.busqueda' (DNI, nombres y apellidos en
+   minúsculas y sin tildes).
+2. Completarla para las personas existentes.
+3. Crear el índice de búsqueda: GIN pg_trgm en PostgreSQL (CONCURRENTLY,
+   requiere permiso para CREATE EXTENSION) o tabla FTS5 con triggers en
+   SQLite.
+
+El índice pacientes(persona_id), usado al pasar de la persona encontrada
+al paciente, se crea con 'python migrate_indices.py'.
+
+Es idempotente; puede ejecutarse de nuevo sin efectos.
+
+Ejecutar:
+    python migrate_busqueda.py
+"""
+
+from sqlalchemy import bindparam, inspect
+
+from app import app
+from extensions.database import db
+from models.persona_model import Persona
+from services.busqueda_service import BusquedaPersonas
+
+TAMANO_LOTE = 1000
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Búsqueda de pacientes (personas.busqueda)")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            # 1. Columna
+            print("\n[1/3] Agregando columna 'busqueda'...")
+            columnas = {c["name"] for c in inspect(db.engine).get_columns("personas")}
+            if "busqueda" in columnas:
+                print("  - busqueda ya existe")
+            else:
+                db.session.execute(db.text("ALTER TABLE personas ADD COLUMN busqueda TEXT"))
+                db.session.commit()
+                print("  ✓ Columna agregada")
+
+            # 2. Datos existentes
+            print("\n[2/3] Completando texto de búsqueda...")
+            tabla = Persona.__table__
+            actualizar = tabla.update().where(tabla.c.id == bindparam("b_id")).values(busqueda=bindparam("b_texto"))
+            total = 0
+            while True:
+                filas = db.session.query(
+                    Persona.id, Persona.dni, Persona.nombres, Persona.apellido_paterno, Persona.apellido_materno
+                ).filter(Persona.busqueda.is_(None)).limit(TAMANO_LOTE).all()
+                if not filas:
+                    break
+                db.session.execute(actualizar, [
+                    {"b_id": f.id, "b_texto": Persona.texto_busqueda(f.dni, f.nombres, f.apellido_paterno, f.apellido_materno)}
+                    for f in filas
+                ])
+                db.session.commit()
+                total += len(filas)
+            print(f"  ✓ {total} personas actualizadas")
+
+            # 3. Índice
+            print("\n[3/3] Creando índice de búsqueda...")
+            if BusquedaPersonas.instalar():
+                print(f"  ✓ Índice listo ({db.engine.dialect.name})")
+            else:
+                print(f"  - Motor {db.engine.dialect.name} sin índice de búsqueda; se usará LIKE")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,57 @@
+"""
+Script de migración para crear la tabla 'catalogo_version'.
+
+Guarda la versión de cada catálogo cacheado en memoria (estados, areas,
+roles, especialidades). AreaController y EspecialidadController la
+incrementan al modificar su catálogo y cada worker la revisa cada
+CATALOGO_VERIFICAR_SEGUNDOS para descartar su copia.
+
+Si se modifica un catálogo con SQL directo o con scripts, ejecutar con
+--invalidar para que los workers lo recarguen.
+
+Ejecutar:
+    python migrate_catalogo_version.py
+    python migrate_catalogo_version.py --invalidar
+"""
+
+import sys
+
+from app import app
+from extensions.database import db
+from models.catalogo_version_model import CatalogoVersion
+from services.catalogo_service import CATALOGOS, Catalogo
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear tabla 'catalogo_version'")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            CatalogoVersion.__table__.create(db.engine, checkfirst=True)
+            print("  ✓ Tabla lista")
+
+            for nombre in CATALOGOS:
+                if not db.session.get(CatalogoVersion, nombre):
+                    db.session.add(CatalogoVersion(nombre=nombre, version=0))
+            db.session.commit()
+            print(f"  ✓ Catálogos registrados: {', '.join(CATALOGOS)}")
+
+            if "--invalidar" in sys.argv:
+                for nombre in CATALOGOS:
+                    Catalogo.invalidar(nombre)
+                print("  ✓ Versiones incrementadas")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
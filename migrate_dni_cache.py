@@ -0,0 +1,46 @@
+"""
+Script de migración para crear la tabla 'dni_cache'.
+
+La tabla guarda las consultas de DNI a apiperu.dev (encontrados y no
+encontrados) con fecha de expiración, para que las búsquedas repetidas de
+acompañantes o pacientes nuevos no vuelvan a consultar la API externa.
+
+Ejecutar:
+    python migrate_dni_cache.py           # Crear la tabla
+    python migrate_dni_cache.py --purgar  # Además, borrar entradas vencidas
+"""
+
+import sys
+
+from app import app
+from extensions.database import db
+from models.dni_cache_model import DniCache
+from services.api_dni_services import DniService
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear tabla 'dni_cache'")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            DniCache.__table__.create(db.engine, checkfirst=True)
+            print("  ✓ Tabla lista")
+
+            if "--purgar" in sys.argv:
+                eliminadas = DniService.purgar_expirados()
+                print(f"  ✓ {eliminadas} entradas vencidas eliminadas")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
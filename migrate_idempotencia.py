@@ -0,0 +1,46 @@
+"""
+Script de migración para crear la tabla 'idempotencia_claves'.
+
+La tabla guarda las claves Idempotency-Key de POST /api/citas y
+POST /api/pacientes con la respuesta enviada, para que los reintentos del
+frontend (Wi-Fi inestable) no creen citas ni pacientes duplicados.
+
+Ejecutar:
+    python migrate_idempotencia.py           # Crear la tabla
+    python migrate_idempotencia.py --purgar  # Además, borrar claves vencidas (cron diario)
+"""
+
+import sys
+
+from app import app
+from extensions.database import db
+from models.idempotencia_model import ClaveIdempotencia
+from services.idempotencia_service import IdempotenciaService
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear tabla 'idempotencia_claves'")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            ClaveIdempotencia.__table__.create(db.engine, checkfirst=True)
+            print("  ✓ Tabla lista")
+
+            if "--purgar" in sys.argv:
+                eliminadas = IdempotenciaService.purgar_expirados()
+                print(f"  ✓ {eliminadas} claves vencidas eliminadas")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
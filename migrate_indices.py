@@ -0,0 +1,95 @@
+"""
+Script de migración para crear los índices declarados en los modelos
+(citas, horarios_medicos, historial_estado_citas, pacientes).
+
+Es idempotente: omite los índices que ya existen. En PostgreSQL usa
+CREATE INDEX CONCURRENTLY (fuera de transacción) para no bloquear las
+escrituras en 'citas' mientras se construye el índice; si una ejecución
+anterior se interrumpió y dejó un índice inválido, lo elimina y lo recrea.
+
+Ejecutar:
+    python migrate_indices.py
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from app import app
+from extensions.database import db
+from models.cita_model import Cita
+from models.historial_estado_cita_model import HistorialEstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.paciente_model import Paciente
+
+MODELOS = [Cita, HorarioMedico, HistorialEstadoCita, Paciente]
+
+
+def indices_declarados():
+    return [indice for modelo in MODELOS
+            for indice in sorted(modelo.__table__.indexes, key=lambda i: i.name)]
+
+
+def indice_invalido(conexion, nombre):
+    """En PostgreSQL, True si el índice existe pero quedó marcado como inválido."""
+    return bool(conexion.execute(db.text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :nombre AND NOT i.indisvalid"
+    ), {"nombre": nombre}).scalar())
+
+
+def crear_postgres(indice):
+    """Crea el índice con CONCURRENTLY; requiere una conexión en autocommit."""
+    sql = str(CreateIndex(indice, if_not_exists=True).compile(dialect=db.engine.dialect))
+    sql = sql.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+        if indice_invalido(conexion, indice.name):
+            print(f"  - {indice.name} inválido (ejecución interrumpida), recreando...")
+            conexion.execute(db.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{indice.name}"'))
+        conexion.execute(db.text(sql))
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear índices de consultas frecuentes")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            es_postgres = db.engine.dialect.name == "postgresql"
+            inspector = inspect(db.engine)
+            creados = 0
+
+            for indice in indices_declarados():
+                tabla = indice.table.name
+                existentes = {i["name"] for i in inspector.get_indexes(tabla)}
+                columnas = ", ".join(c.name for c in indice.columns)
+
+                if indice.name in existentes and not es_postgres:
+                    print(f"  - {indice.name} ya existe")
+                    continue
+
+                if es_postgres:
+                    # IF NOT EXISTS no detecta índices inválidos: se revisan en crear_postgres
+                    crear_postgres(indice)
+                else:
+                    indice.create(db.engine, checkfirst=True)
+
+                if indice.name in existentes:
+                    print(f"  - {indice.name} ya existe")
+                else:
+                    creados += 1
+                    print(f"  ✓ {indice.name} ON {tabla} ({columnas})")
+
+            print("\n" + "=" * 60)
+            print(f"  ✓ MIGRACIÓN COMPLETADA: {creados} índices creados")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
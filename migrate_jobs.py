@@ -0,0 +1,46 @@
+"""
+Script de migración para crear la tabla 'jobs'.
+
+La tabla es la cola de trabajos en segundo plano (POST /api/jobs): PDFs de
+citas confirmadas, reporte de estadísticas y exportaciones, con el archivo
+generado hasta que vence.
+
+Ejecutar:
+    python migrate_jobs.py           # Crear la tabla
+    python migrate_jobs.py --purgar  # Además, borrar trabajos vencidos y sus archivos
+"""
+
+import sys
+
+from app import app
+from extensions.database import db
+from models.job_model import Job
+from services.job_service import JobService
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear tabla 'jobs'")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            Job.__table__.create(db.engine, checkfirst=True)
+            print("  ✓ Tabla lista")
+
+            if "--purgar" in sys.argv:
+                eliminados = JobService.purgar_expirados()
+                print(f"  ✓ {eliminados} trabajos vencidos eliminados")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
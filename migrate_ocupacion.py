@@ -0,0 +1,66 @@
+"""
+Script de migración para crear la tabla 'horario_ocupacion'.
+
+La tabla guarda, por cada horario médico, el número de citas activas
+(no canceladas) y los conteos de canceladas, atendidas y no_asistio.
+CitaController la mantiene en cada transacción y la usa para reservar
+cupos con un UPDATE condicional; los listados de disponibilidad la leen
+por clave primaria en lugar de agrupar toda la tabla 'citas'.
+
+Pasos:
+1. Crear la tabla si no existe.
+2. Agregar las columnas por estado (instalaciones con la versión inicial).
+3. Recalcular la ocupación a partir de la tabla 'citas'.
+
+Ejecutar:
+    python migrate_ocupacion.py
+"""
+
+from app import app
+from extensions.database import db
+from models.horario_ocupacion_model import HorarioOcupacion
+
+
+def run_migration():
+    print("=" * 60)
+    print("  MIGRACIÓN: Crear tabla 'horario_ocupacion'")
+    print("=" * 60)
+
+    with app.app_context():
+        try:
+            # 1. Crear tabla
+            print("\n[1/3] Creando tabla 'horario_ocupacion'...")
+            HorarioOcupacion.__table__.create(db.engine, checkfirst=True)
+            print("  ✓ Tabla lista")
+
+            # 2. Columnas por estado
+            print("\n[2/3] Agregando columnas por estado...")
+            for columna in ["cancelados", "atendidos", "no_asistio"]:
+                stmt = f"ALTER TABLE horario_ocupacion ADD COLUMN {columna} INTEGER NOT NULL DEFAULT 0"
+                try:
+                    db.session.execute(db.text(stmt))
+                    db.session.commit()
+                    print(f"  ✓ {columna}")
+                except Exception:
+                    # La columna ya existe
+                    db.session.rollback()
+                    print(f"  - {columna} ya existe")
+
+            # 3. Recalcular ocupación desde citas
+            print("\n[3/3] Recalculando ocupación por horario...")
+            total = HorarioOcupacion.reconstruir()
+            db.session.commit()
+            print(f"  ✓ {total} horarios con ocupación inicializada")
+
+            print("\n" + "=" * 60)
+            print("  ✓ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+            print("=" * 60)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n✗ Error en migración: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    run_migration()
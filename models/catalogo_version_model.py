@@ -0,0 +1,17 @@
+from extensions.database import db
+from datetime import datetime
+
+
+class CatalogoVersion(db.Model):
+    """
+    Versión de cada catálogo cacheado en memoria (estados, areas, roles,
+    especialidades). Quien modifica un catálogo incrementa su versión; cada
+    worker de gunicorn la consulta periódicamente y descarta su copia si
+    cambió (ver services/catalogo_service.py). El contador 'usuarios' versiona
+    la caché de usuarios autenticados (extensions/jwt_manager.py).
+    """
+    __tablename__ = "catalogo_version"
+
+    nombre = db.Column(db.String(30), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
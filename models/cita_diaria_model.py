@@ -0,0 +1,354 @@
+from extensions.database import db
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+class CitaDiaria(db.Model):
+    """
+    Tabla de hechos diaria para indicadores y reportes.
+
+    Una fila por (fecha, area_id, doctor_id, turno) con los conteos de citas
+    por estado, los cupos ofertados y la suma de días de anticipación
+    (lead time). Un rango de 12 meses son unos cientos de filas en lugar de
+    decenas de miles de citas.
+
+    Las claves no admiten NULL (una restricción de unicidad con NULL no
+    detecta duplicados): área o doctor desconocido se guarda como 0 y la
+    cita sin horario con turno ''. Por eso no hay llaves foráneas; la tabla
+    es derivada y puede reconstruirse en cualquier momento con
+    rebuild_citas_diarias.py.
+
+    Mantenimiento incremental:
+    - Citas: tomar CitaDiaria.aporte(cita) antes de modificarla y llamar a
+      CitaDiaria.registrar_cambio(antes, CitaDiaria.aporte(cita, estado_nuevo))
+      en la misma transacción.
+    - Horarios: llamar a CitaDiaria.recalcular_cupos(medico_id, desde, hasta)
+      después de crear, modificar o eliminar horarios (con flush previo).
+    """
+    __tablename__ = "citas_diarias"
+
+    fecha = db.Column(db.Date, primary_key=True)
+    area_id = db.Column(db.Integer, primary_key=True, default=0)
+    doctor_id = db.Column(db.Integer, primary_key=True, default=0)
+    turno = db.Column(db.String(1), primary_key=True, default='')
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+    pendientes = db.Column(db.Integer, nullable=False, default=0)
+    confirmadas = db.Column(db.Integer, nullable=False, default=0)
+    atendidas = db.Column(db.Integer, nullable=False, default=0)
+    canceladas = db.Column(db.Integer, nullable=False, default=0)
+    no_asistio = db.Column(db.Integer, nullable=False, default=0)
+    referidos = db.Column(db.Integer, nullable=False, default=0)
+    cupos = db.Column(db.Integer, nullable=False, default=0)
+
+    # Lead time (días entre el registro y la fecha de la cita)
+    lead_time_dias = db.Column(db.Integer, nullable=False, default=0)
+    lead_time_citas = db.Column(db.Integer, nullable=False, default=0)
+    lead_time_dias_canceladas = db.Column(db.Integer, nullable=False, default=0)
+    lead_time_citas_canceladas = db.Column(db.Integer, nullable=False, default=0)
+
+    CLAVES = ['fecha', 'area_id', 'doctor_id', 'turno']
+
+    # Clave en session.info que indica cambios de citas o cupos sin confirmar
+    # (tras el commit se invalidan las cachés derivadas, p.ej. el dashboard)
+    MARCA_SESION = 'citas_diarias_modificadas'
+    METRICAS = [
+        'total', 'pendientes', 'confirmadas', 'atendidas', 'canceladas', 'no_asistio', 'referidos',
+        'cupos', 'lead_time_dias', 'lead_time_citas', 'lead_time_dias_canceladas', 'lead_time_citas_canceladas'
+    ]
+
+    # Columna que se incrementa según el nombre del estado
+    COLUMNAS_ESTADO = {
+        'pendiente': 'pendientes',
+        'confirmada': 'confirmadas',
+        'atendida': 'atendidas',
+        'cancelada': 'canceladas',
+        'no_asistio': 'no_asistio',
+        'referido': 'referidos'
+    }
+
+    def to_dict(self):
+        datos = {clave: getattr(self, clave) for clave in self.CLAVES + self.METRICAS}
+        datos["fecha"] = str(self.fecha)
+        return datos
+
+    # ==================== MANTENIMIENTO INCREMENTAL ====================
+
+    @staticmethod
+    def aporte(cita, estado=None):
+        """
+        Contribución de una cita a la tabla de hechos.
+
+        Args:
+            cita: Instancia de Cita
+            estado: Nombre del estado a usar (por defecto cita.estado_nombre).
+                    Necesario cuando estado_id acaba de cambiar y estado_rel
+                    aún no se ha recargado.
+
+        Returns:
+            (clave, deltas) o None si la cita no tiene fecha.
+        """
+        if cita is None or cita.fecha is None:
+            return None
+
+        estado = estado or cita.estado_nombre
+        clave = (
+            cita.fecha,
+            cita.area_id or 0,
+            cita.doctor_id or 0,
+            cita.horario.turno if cita.horario_id and cita.horario else ''
+        )
+
+        deltas = {'total': 1}
+        columna = CitaDiaria.COLUMNAS_ESTADO.get(estado)
+        if columna:
+            deltas[columna] = 1
+
+        if cita.fecha_registro:
+            sufijo = '_canceladas' if estado == 'cancelada' else ''
+            deltas['lead_time_dias' + sufijo] = (cita.fecha - cita.fecha_registro.date()).days
+            deltas['lead_time_citas' + sufijo] = 1
+
+        return clave, deltas
+
+    @staticmethod
+    def registrar_cambio(antes, despues):
+        """
+        Aplica la diferencia entre dos aportes de la misma cita.
+        Use None como 'antes' al crear la cita y como 'despues' al eliminarla.
+        """
+        CitaDiaria.registrar_cambios([(antes, despues)])
+
+    @staticmethod
+    def registrar_cambios(pares):
+        """Como registrar_cambio para varias citas (lista de (antes, despues)) en una sola sentencia."""
+        cambios = {}
+        for antes, despues in pares:
+            for aporte, signo in ((antes, -1), (despues, 1)):
+                if aporte is None:
+                    continue
+                clave, deltas = aporte
+                fila = cambios.setdefault(clave, {})
+                for columna, valor in deltas.items():
+                    fila[columna] = fila.get(columna, 0) + signo * valor
+
+        filas = []
+        for clave, deltas in cambios.items():
+            deltas = {columna: valor for columna, valor in deltas.items() if valor}
+            if deltas:
+                filas.append(dict(zip(CitaDiaria.CLAVES, clave), **deltas))
+
+        CitaDiaria._acumular(filas)
+
+    @staticmethod
+    def recalcular_cupos(medico_id, fecha_inicio, fecha_fin):
+        """
+        Recalcula los cupos de un médico (o una lista de médicos) en un rango
+        de fechas a partir de horarios_medicos. Cubre altas, cambios de cupos
+        o de área y bajas.
+        """
+        from models.horario_medico_model import HorarioMedico
+
+        medico_ids = list(medico_id) if isinstance(medico_id, (list, tuple, set)) else [medico_id]
+        db.session.execute(
+            db.update(CitaDiaria).where(
+                CitaDiaria.doctor_id.in_(medico_ids),
+                CitaDiaria.fecha >= fecha_inicio,
+                CitaDiaria.fecha <= fecha_fin
+            ).values(cupos=0).execution_options(synchronize_session=False)
+        )
+
+        filas = db.session.execute(
+            CitaDiaria.select_cupos(fecha_inicio, fecha_fin).where(HorarioMedico.medico_id.in_(medico_ids))
+        ).all()
+        CitaDiaria._acumular([dict(fila._mapping) for fila in filas])
+
+    @staticmethod
+    def _acumular(filas):
+        """
+        Suma las métricas de cada fila a la clave correspondiente
+        (INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col).
+        """
+        if not filas:
+            return
+
+        db.session.info[CitaDiaria.MARCA_SESION] = True
+
+        # Todas las filas de una misma sentencia deben tener las mismas columnas
+        columnas = sorted({col for fila in filas for col in fila if col in CitaDiaria.METRICAS})
+        valores = [
+            {**{clave: fila[clave] for clave in CitaDiaria.CLAVES}, **{col: fila.get(col, 0) for col in columnas}}
+            for fila in filas
+        ]
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            # executemany: la sentencia se compila una vez para cualquier número de filas
+            # (psycopg2 las agrupa en INSERT ... VALUES de hasta 1000 filas)
+            tabla = CitaDiaria.__table__
+            stmt = insert(tabla)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=CitaDiaria.CLAVES,
+                set_={col: tabla.c[col] + stmt.excluded[col] for col in columnas}
+            )
+            db.session.execute(stmt, valores)
+            return
+
+        for fila in valores:
+            condiciones = [getattr(CitaDiaria, clave) == fila[clave] for clave in CitaDiaria.CLAVES]
+            result = db.session.execute(
+                db.update(CitaDiaria).where(*condiciones).values(
+                    **{col: getattr(CitaDiaria, col) + fila[col] for col in columnas}
+                ).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.session.execute(db.insert(CitaDiaria).values(**fila))
+
+    # ==================== RECONSTRUCCIÓN ====================
+
+    @staticmethod
+    def _dias_anticipacion():
+        """Expresión SQL: días entre fecha_registro y la fecha de la cita."""
+        from models.cita_model import Cita
+
+        if db.session.get_bind().dialect.name == 'sqlite':
+            return db.cast(
+                db.func.julianday(Cita.fecha) - db.func.julianday(db.func.date(Cita.fecha_registro)),
+                db.Integer
+            )
+        return Cita.fecha - db.cast(Cita.fecha_registro, db.Date)
+
+    @staticmethod
+    def select_citas(fecha_inicio=None, fecha_fin=None):
+        """SELECT que recalcula las métricas de citas desde 'citas', agrupado por clave."""
+        from models.cita_model import Cita
+        from models.estado_cita_model import EstadoCita
+        from models.horario_medico_model import HorarioMedico
+
+        def contar(condicion):
+            return db.func.coalesce(db.func.sum(db.case((condicion, 1), else_=0)), 0)
+
+        def sumar(condicion, valor):
+            return db.func.coalesce(db.func.sum(db.case((condicion, valor), else_=0)), 0)
+
+        # Una cita sin estado se considera pendiente (ver Cita.estado_nombre)
+        estado = db.func.coalesce(EstadoCita.nombre, 'pendiente')
+        cancelada = estado == 'cancelada'
+        con_registro = Cita.fecha_registro.isnot(None)
+        dias = CitaDiaria._dias_anticipacion()
+
+        columnas = [
+            Cita.fecha.label('fecha'),
+            db.func.coalesce(Cita.area_id, 0).label('area_id'),
+            db.func.coalesce(Cita.doctor_id, 0).label('doctor_id'),
+            db.func.coalesce(HorarioMedico.turno, '').label('turno'),
+            db.func.count(Cita.id).label('total'),
+        ]
+        for nombre, columna in CitaDiaria.COLUMNAS_ESTADO.items():
+            columnas.append(contar(estado == nombre).label(columna))
+        columnas += [
+            sumar(con_registro & ~cancelada, dias).label('lead_time_dias'),
+            contar(con_registro & ~cancelada).label('lead_time_citas'),
+            sumar(con_registro & cancelada, dias).label('lead_time_dias_canceladas'),
+            contar(con_registro & cancelada).label('lead_time_citas_canceladas'),
+        ]
+
+        stmt = db.select(*columnas).select_from(Cita).outerjoin(
+            EstadoCita, EstadoCita.id == Cita.estado_id
+        ).outerjoin(
+            HorarioMedico, HorarioMedico.id == Cita.horario_id
+        ).where(Cita.fecha.isnot(None))
+
+        if fecha_inicio:
+            stmt = stmt.where(Cita.fecha >= fecha_inicio)
+        if fecha_fin:
+            stmt = stmt.where(Cita.fecha <= fecha_fin)
+
+        return stmt.group_by(*columnas[:4])
+
+    @staticmethod
+    def select_cupos(fecha_inicio=None, fecha_fin=None):
+        """SELECT con la suma de cupos de horarios_medicos, agrupado por clave."""
+        from models.horario_medico_model import HorarioMedico
+
+        columnas = [
+            HorarioMedico.fecha.label('fecha'),
+            HorarioMedico.area_id.label('area_id'),
+            HorarioMedico.medico_id.label('doctor_id'),
+            HorarioMedico.turno.label('turno'),
+        ]
+        stmt = db.select(*columnas, db.func.sum(HorarioMedico.cupos).label('cupos'))
+
+        if fecha_inicio:
+            stmt = stmt.where(HorarioMedico.fecha >= fecha_inicio)
+        if fecha_fin:
+            stmt = stmt.where(HorarioMedico.fecha <= fecha_fin)
+
+        return stmt.group_by(*columnas)
+
+    @staticmethod
+    def calcular(fecha_inicio=None, fecha_fin=None):
+        """Recalcula las filas de la tabla de hechos: {clave: {metricas}}."""
+        filas = {}
+        for select in (CitaDiaria.select_citas, CitaDiaria.select_cupos):
+            for row in db.session.execute(select(fecha_inicio, fecha_fin)):
+                datos = dict(row._mapping)
+                clave = tuple(datos.pop(c) for c in CitaDiaria.CLAVES)
+                fila = filas.setdefault(clave, dict.fromkeys(CitaDiaria.METRICAS, 0))
+                fila.update({col: int(valor or 0) for col, valor in datos.items()})
+        return filas
+
+    @staticmethod
+    def reconstruir(fecha_inicio=None, fecha_fin=None):
+        """
+        Reconstruye la tabla de hechos (todo o solo un rango de fechas).
+        No hace commit.
+
+        Returns:
+            Número de filas insertadas.
+        """
+        borrar = db.delete(CitaDiaria)
+        if fecha_inicio:
+            borrar = borrar.where(CitaDiaria.fecha >= fecha_inicio)
+        if fecha_fin:
+            borrar = borrar.where(CitaDiaria.fecha <= fecha_fin)
+        db.session.execute(borrar)
+
+        filas = [
+            dict(zip(CitaDiaria.CLAVES, clave), **metricas)
+            for clave, metricas in CitaDiaria.calcular(fecha_inicio, fecha_fin).items()
+        ]
+        if filas:
+            db.session.execute(db.insert(CitaDiaria), filas)
+        return len(filas)
+
+    @staticmethod
+    def verificar(fecha_inicio=None, fecha_fin=None):
+        """
+        Compara la tabla de hechos con el recálculo desde citas y horarios.
+
+        Returns:
+            Lista de diferencias: {clave, esperado, actual}
+        """
+        esperado = CitaDiaria.calcular(fecha_inicio, fecha_fin)
+
+        query = CitaDiaria.query
+        if fecha_inicio:
+            query = query.filter(CitaDiaria.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(CitaDiaria.fecha <= fecha_fin)
+        actual = {
+            tuple(getattr(f, c) for c in CitaDiaria.CLAVES): {m: getattr(f, m) for m in CitaDiaria.METRICAS}
+            for f in query.all()
+        }
+
+        diferencias = []
+        for clave in sorted(set(esperado) | set(actual), key=str):
+            e = esperado.get(clave)
+            a = actual.get(clave)
+            # Una fila en cero equivale a que no exista
+            if e is None and a and not any(a.values()):
+                continue
+            if e != a:
+                diferencias.append({"clave": clave, "esperado": e, "actual": a})
+        return diferencias
@@ -22,6 +22,16 @@ class Cita(db.Model):
 
     # Normalización: Acompañante
     acompanante_persona_id = db.Column(db.Integer, db.ForeignKey('personas.id'), nullable=True)
+
+    # Índices para los filtros más usados (listados, reportes, ocupación, historial del paciente).
+    # En producción se crean con 'python migrate_indices.py' (CONCURRENTLY en PostgreSQL).
+    __table_args__ = (
+        db.Index('ix_citas_fecha_area_estado', 'fecha', 'area_id', 'estado_id'),
+        db.Index('ix_citas_horario_estado', 'horario_id', 'estado_id'),
+        db.Index('ix_citas_paciente_fecha', 'paciente_id', 'fecha'),
+        db.Index('ix_citas_doctor_fecha', 'doctor_id', 'fecha'),
+        db.Index('ix_citas_fecha_registro', 'fecha_registro'),
+    )
     acompanante = db.relationship('Persona', foreign_keys=[acompanante_persona_id], backref=db.backref('acompanando', lazy=True))
 
     # Relaciones
@@ -0,0 +1,33 @@
+from extensions.database import db
+from datetime import datetime
+
+
+class DniCache(db.Model):
+    """
+    Caché persistente de consultas de DNI a la API externa (apiperu.dev).
+
+    Guarda tanto los DNI encontrados como los no encontrados (caché negativa)
+    con su fecha de expiración, para no volver a pagar la latencia ni la
+    cuota de la API en consultas repetidas (acompañantes, pacientes sin cita).
+    Los errores transitorios (timeouts, 5xx) no se guardan.
+    """
+    __tablename__ = "dni_cache"
+
+    dni = db.Column(db.String(8), primary_key=True)
+    encontrado = db.Column(db.Boolean, nullable=False, default=True)
+    datos = db.Column(db.JSON, nullable=True)  # Campo 'data' de la respuesta de la API
+    consultado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expira_en = db.Column(db.DateTime, nullable=False, index=True)
+
+    @property
+    def vigente(self):
+        return self.expira_en > datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            "dni": self.dni,
+            "encontrado": self.encontrado,
+            "datos": self.datos,
+            "consultado_en": self.consultado_en.isoformat() if self.consultado_en else None,
+            "expira_en": self.expira_en.isoformat() if self.expira_en else None
+        }
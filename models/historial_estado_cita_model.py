@@ -24,6 +24,10 @@ class HistorialEstadoCita(db.Model):
     comentario = db.Column(db.Text, nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_historial_cita_fecha', 'cita_id', 'fecha_cambio'),
+    )
+
     # Relaciones
     cita = db.relationship('Cita', backref=db.backref('historial_estados', lazy='dynamic', order_by='HistorialEstadoCita.fecha_cambio.desc()'))
     usuario = db.relationship('Usuario', backref=db.backref('cambios_estado_citas', lazy=True))
@@ -61,3 +65,27 @@ class HistorialEstadoCita(db.Model):
         )
         db.session.add(historial)
         return historial
+
+    @staticmethod
+    def registrar_cambios(cambios, usuario_id=None, comentario=None, ip_address=None):
+        """
+        Registra varios cambios de estado en un solo INSERT (ejecutado por lotes).
+
+        Args:
+            cambios: Lista de (cita_id, estado_anterior_id, estado_nuevo_id)
+        """
+        if not cambios:
+            return
+        ahora = datetime.utcnow()
+        db.session.execute(db.insert(HistorialEstadoCita), [
+            {
+                "cita_id": cita_id,
+                "estado_anterior_id": estado_anterior_id,
+                "estado_nuevo_id": estado_nuevo_id,
+                "usuario_id": usuario_id,
+                "fecha_cambio": ahora,
+                "comentario": comentario,
+                "ip_address": ip_address
+            }
+            for cita_id, estado_anterior_id, estado_nuevo_id in cambios
+        ])
@@ -21,8 +21,10 @@ class HorarioMedico(db.Model):
     cupos = db.Column(db.Integer, nullable=False, default=0)
     
     # Constraint único: un médico solo puede tener un horario por fecha y turno
+    # (su índice también sirve las búsquedas por medico_id y fecha)
     __table_args__ = (
         db.UniqueConstraint('medico_id', 'fecha', 'turno', name='unique_medico_fecha_turno'),
+        db.Index('ix_horarios_fecha_area', 'fecha', 'area_id'),
     )
 
     medico = db.relationship('Usuario', backref=db.backref('horarios', lazy=True))
@@ -0,0 +1,309 @@
+from extensions.database import db
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+class HorarioOcupacion(db.Model):
+    """
+    Ocupación materializada por horario.
+
+    Cada fila resume las citas de un HorarioMedico:
+    - activos: citas no canceladas (son las que consumen cupo)
+    - cancelados, atendidos, no_asistio: conteos por estado
+
+    Se actualiza en la misma transacción que crea, cambia de estado o elimina
+    la cita. La reserva de un cupo se hace con un UPDATE condicional
+    (activos < cupos) en una sola sentencia, de modo que dos reservas
+    simultáneas sobre el mismo turno no pueden sobrepasar los cupos.
+
+    IMPORTANTE: los métodos de este modelo deben llamarse ANTES de modificar
+    la cita en la sesión, para que una fila creada de forma diferida refleje
+    el estado previo al cambio.
+    """
+    __tablename__ = "horario_ocupacion"
+
+    horario_id = db.Column(db.Integer, db.ForeignKey('horarios_medicos.id', ondelete='CASCADE'), primary_key=True)
+    activos = db.Column(db.Integer, nullable=False, default=0)
+    cancelados = db.Column(db.Integer, nullable=False, default=0)
+    atendidos = db.Column(db.Integer, nullable=False, default=0)
+    no_asistio = db.Column(db.Integer, nullable=False, default=0)
+
+    horario = db.relationship('HorarioMedico', backref=db.backref('ocupacion', uselist=False, passive_deletes=True))
+
+    # Columna adicional que se incrementa según el nombre del estado
+    COLUMNAS_ESTADO = {
+        'cancelada': 'cancelados',
+        'atendida': 'atendidos',
+        'no_asistio': 'no_asistio'
+    }
+
+    def to_dict(self):
+        return {
+            "horario_id": self.horario_id,
+            "activos": self.activos,
+            "cancelados": self.cancelados,
+            "atendidos": self.atendidos,
+            "no_asistio": self.no_asistio
+        }
+
+    @staticmethod
+    def select_conteos(horario_ids=None):
+        """
+        SELECT que recalcula la ocupación desde 'citas'.
+        Columnas: horario_id, activos, cancelados, atendidos, no_asistio.
+        """
+        from models.horario_medico_model import HorarioMedico
+        from models.cita_model import Cita
+        from models.estado_cita_model import EstadoCita
+
+        def contar(condicion):
+            return db.func.coalesce(db.func.sum(db.case((condicion, 1), else_=0)), 0)
+
+        # Una cita sin estado se considera pendiente (ver Cita.estado_nombre)
+        existe = Cita.id.isnot(None)
+        cancelada = EstadoCita.nombre == 'cancelada'
+
+        stmt = db.select(
+            HorarioMedico.id.label('horario_id'),
+            contar(existe & db.or_(EstadoCita.nombre.is_(None), EstadoCita.nombre != 'cancelada')).label('activos'),
+            contar(existe & cancelada).label('cancelados'),
+            contar(existe & (EstadoCita.nombre == 'atendida')).label('atendidos'),
+            contar(existe & (EstadoCita.nombre == 'no_asistio')).label('no_asistio')
+        ).select_from(HorarioMedico).outerjoin(
+            Cita, Cita.horario_id == HorarioMedico.id
+        ).outerjoin(
+            EstadoCita, EstadoCita.id == Cita.estado_id
+        )
+
+        if horario_ids is not None:
+            stmt = stmt.where(HorarioMedico.id.in_(horario_ids))
+        else:
+            stmt = stmt.where(db.true())
+
+        return stmt.group_by(HorarioMedico.id)
+
+    @staticmethod
+    def _asegurar_fila(horario_id):
+        """
+        Crea la fila de ocupación si aún no existe (horarios creados antes de la
+        migración o por scripts de carga). Los valores iniciales se toman de 'citas'.
+        INSERT ... ON CONFLICT DO NOTHING evita colisiones entre reservas concurrentes.
+        """
+        HorarioOcupacion._asegurar_filas([horario_id])
+
+    @staticmethod
+    def _asegurar_filas(horario_ids):
+        """Como _asegurar_fila para varios horarios en una sola sentencia."""
+        columnas = ['horario_id', 'activos', 'cancelados', 'atendidos', 'no_asistio']
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect == 'postgresql':
+            origen = HorarioOcupacion.select_conteos(horario_ids)
+            stmt = postgresql.insert(HorarioOcupacion).from_select(columnas, origen).on_conflict_do_nothing()
+        elif dialect == 'sqlite':
+            origen = HorarioOcupacion.select_conteos(horario_ids)
+            stmt = sqlite.insert(HorarioOcupacion).from_select(columnas, origen).on_conflict_do_nothing()
+        else:
+            existentes = set(db.session.execute(
+                db.select(HorarioOcupacion.horario_id).where(HorarioOcupacion.horario_id.in_(horario_ids))
+            ).scalars())
+            faltantes = [h for h in horario_ids if h not in existentes]
+            if not faltantes:
+                return
+            stmt = db.insert(HorarioOcupacion).from_select(columnas, HorarioOcupacion.select_conteos(faltantes))
+
+        db.session.execute(stmt)
+
+    @staticmethod
+    def _deltas(estado, signo):
+        """Incrementos que aporta una cita en el estado dado (None = sin cita)."""
+        if estado is None:
+            return {}
+        if estado == 'cancelada':
+            return {'cancelados': signo}
+
+        deltas = {'activos': signo}
+        columna = HorarioOcupacion.COLUMNAS_ESTADO.get(estado)
+        if columna:
+            deltas[columna] = signo
+        return deltas
+
+    @staticmethod
+    def registrar_transicion(horario_id, estado_anterior, estado_nuevo):
+        """
+        Aplica a la ocupación el paso de una cita de un estado a otro.
+        Use None como estado_anterior al crear la cita y como estado_nuevo al eliminarla.
+
+        Si la transición ocupa un cupo (creación o reactivación de una cita
+        cancelada) el UPDATE solo se aplica cuando activos < cupos.
+
+        Returns:
+            True si se aplicó, False si el horario no tiene cupos disponibles.
+        """
+        from models.horario_medico_model import HorarioMedico
+
+        deltas = HorarioOcupacion._deltas(estado_nuevo, 1)
+        for columna, valor in HorarioOcupacion._deltas(estado_anterior, -1).items():
+            deltas[columna] = deltas.get(columna, 0) + valor
+        deltas = {columna: valor for columna, valor in deltas.items() if valor}
+
+        if not deltas:
+            return True
+
+        condiciones = [HorarioOcupacion.horario_id == horario_id]
+        if deltas.get('activos', 0) > 0:
+            cupos_subq = db.select(HorarioMedico.cupos).where(
+                HorarioMedico.id == horario_id
+            ).scalar_subquery()
+            condiciones.append(HorarioOcupacion.activos < cupos_subq)
+
+        valores = {
+            columna: getattr(HorarioOcupacion, columna) + valor
+            for columna, valor in deltas.items()
+        }
+        stmt = db.update(HorarioOcupacion).where(*condiciones).values(**valores)\
+            .execution_options(synchronize_session=False)
+
+        result = db.session.execute(stmt)
+        if result.rowcount == 1:
+            return True
+
+        # Sin fila para el horario: crearla y reintentar una sola vez
+        existe = db.session.execute(
+            db.select(HorarioOcupacion.horario_id).where(HorarioOcupacion.horario_id == horario_id)
+        ).first()
+        if existe is None:
+            HorarioOcupacion._asegurar_fila(horario_id)
+            result = db.session.execute(stmt)
+            return result.rowcount == 1
+
+        return False
+
+    @staticmethod
+    def registrar_transiciones(transiciones):
+        """
+        Versión por lotes de registrar_transicion para cambios masivos de estado.
+
+        Args:
+            transiciones: Lista de (horario_id, estado_anterior, estado_nuevo)
+
+        Las transiciones se suman por horario. Los horarios que ganan citas
+        activas (reactivación de canceladas) se actualizan uno a uno con la
+        condición activos + n <= cupos (todo o nada por horario); el resto en
+        un solo UPDATE ejecutado por lotes.
+
+        Returns:
+            Conjunto de horario_id rechazados por falta de cupos.
+        """
+        from models.horario_medico_model import HorarioMedico
+
+        columnas = ['activos', 'cancelados', 'atendidos', 'no_asistio']
+        por_horario = {}
+        for horario_id, estado_anterior, estado_nuevo in transiciones:
+            deltas = por_horario.setdefault(horario_id, dict.fromkeys(columnas, 0))
+            for estado, signo in ((estado_nuevo, 1), (estado_anterior, -1)):
+                for columna, valor in HorarioOcupacion._deltas(estado, signo).items():
+                    deltas[columna] += valor
+
+        por_horario = {h: d for h, d in por_horario.items() if any(d.values())}
+        if not por_horario:
+            return set()
+
+        # Orden fijo de horarios para no bloquearse con otros lotes
+        HorarioOcupacion._asegurar_filas(sorted(por_horario))
+
+        rechazados = set()
+        sin_limite = []
+        for horario_id in sorted(por_horario):
+            deltas = por_horario[horario_id]
+            if deltas['activos'] <= 0:
+                sin_limite.append({'b_horario_id': horario_id, **{f'b_{c}': v for c, v in deltas.items()}})
+                continue
+
+            cupos_subq = db.select(HorarioMedico.cupos).where(HorarioMedico.id == horario_id).scalar_subquery()
+            stmt = db.update(HorarioOcupacion).where(
+                HorarioOcupacion.horario_id == horario_id,
+                HorarioOcupacion.activos + deltas['activos'] <= cupos_subq
+            ).values(**{c: getattr(HorarioOcupacion, c) + v for c, v in deltas.items()})\
+                .execution_options(synchronize_session=False)
+            if db.session.execute(stmt).rowcount != 1:
+                rechazados.add(horario_id)
+
+        if sin_limite:
+            tabla = HorarioOcupacion.__table__
+            stmt = tabla.update().where(tabla.c.horario_id == db.bindparam('b_horario_id')).values(
+                **{c: tabla.c[c] + db.bindparam(f'b_{c}') for c in columnas}
+            )
+            db.session.execute(stmt, sin_limite)
+
+        return rechazados
+
+    @staticmethod
+    def reservar(horario_id, estado='pendiente'):
+        """
+        Ocupa un cupo del horario de forma atómica para una cita nueva.
+
+        Returns:
+            True si se reservó el cupo, False si el horario está lleno.
+        """
+        return HorarioOcupacion.registrar_transicion(horario_id, None, estado)
+
+    @staticmethod
+    def liberar(horario_id, estado='pendiente'):
+        """Descuenta una cita eliminada de la ocupación del horario."""
+        HorarioOcupacion.registrar_transicion(horario_id, estado, None)
+
+    @staticmethod
+    def ocupados(horario_id):
+        """Retorna el número de cupos ocupados según el contador."""
+        valor = db.session.execute(
+            db.select(HorarioOcupacion.activos).where(HorarioOcupacion.horario_id == horario_id)
+        ).scalar()
+        return valor or 0
+
+    @staticmethod
+    def reconstruir(horario_ids=None):
+        """
+        Recalcula la ocupación desde 'citas' (todos los horarios o solo los indicados).
+        No hace commit.
+
+        Returns:
+            Número de filas reconstruidas.
+        """
+        columnas = ['horario_id', 'activos', 'cancelados', 'atendidos', 'no_asistio']
+
+        borrar = db.delete(HorarioOcupacion)
+        if horario_ids is not None:
+            borrar = borrar.where(HorarioOcupacion.horario_id.in_(horario_ids))
+        db.session.execute(borrar)
+
+        origen = HorarioOcupacion.select_conteos(horario_ids)
+        result = db.session.execute(db.insert(HorarioOcupacion).from_select(columnas, origen))
+        return result.rowcount
+
+    @staticmethod
+    def verificar():
+        """
+        Compara la tabla materializada con el recálculo desde 'citas'.
+
+        Returns:
+            Lista de diferencias: {horario_id, esperado, actual}
+        """
+        esperado = {
+            row.horario_id: dict(row._mapping)
+            for row in db.session.execute(HorarioOcupacion.select_conteos())
+        }
+        actual = {
+            o.horario_id: o.to_dict()
+            for o in HorarioOcupacion.query.all()
+        }
+
+        diferencias = []
+        for horario_id in sorted(set(esperado) | set(actual)):
+            e = esperado.get(horario_id)
+            a = actual.get(horario_id)
+            # Un horario sin fila y sin citas es equivalente a una fila en cero
+            if a is None and e and not any(v for k, v in e.items() if k != 'horario_id'):
+                continue
+            if e != a:
+                diferencias.append({"horario_id": horario_id, "esperado": e, "actual": a})
+        return diferencias
@@ -0,0 +1,31 @@
+from extensions.database import db
+from datetime import datetime
+
+
+class ClaveIdempotencia(db.Model):
+    """
+    Solicitudes POST recibidas con cabecera Idempotency-Key.
+
+    La fila se inserta (y confirma) antes de procesar la solicitud: la clave
+    primaria hace que solo una de varias solicitudes simultáneas con la misma
+    clave se ejecute. status_code nulo indica que la solicitud aún está en
+    proceso; al terminar se guarda la respuesta para devolverla en los
+    reintentos sin volver a ejecutar nada.
+    """
+    __tablename__ = "idempotencia_claves"
+
+    clave = db.Column(db.String(255), primary_key=True)
+    alcance = db.Column(db.String(50), primary_key=True)  # Endpoint, p.ej. 'citas.crear'
+    hash_solicitud = db.Column(db.String(64), nullable=False)  # SHA-256 del cuerpo
+    status_code = db.Column(db.Integer, nullable=True)
+    respuesta = db.Column(db.JSON, nullable=True)
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expira_en = db.Column(db.DateTime, nullable=False, index=True)
+
+    @property
+    def vigente(self):
+        return self.expira_en > datetime.utcnow()
+
+    @property
+    def en_proceso(self):
+        return self.status_code is None
@@ -0,0 +1,69 @@
+from extensions.database import db
+from datetime import datetime
+
+# Estados de un trabajo en segundo plano
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+COMPLETADO = "completado"
+FALLIDO = "fallido"
+
+
+class Job(db.Model):
+    """
+    Trabajo en segundo plano (PDF, reporte o exportación) encolado con
+    POST /api/jobs y ejecutado por services/job_service.py.
+
+    La tabla es la cola: un worker toma una fila 'pendiente' cuya
+    disponible_en ya pasó cambiándola a 'en_proceso' con un UPDATE
+    condicional, y la reserva hasta bloqueado_hasta (si el proceso muere,
+    otro la retoma al vencer). El archivo generado se guarda en 'resultado'
+    (carga diferida: los listados y el estado no lo leen) hasta expira_en.
+    """
+    __tablename__ = "jobs"
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID: forma parte de la URL de descarga
+    tipo = db.Column(db.String(50), nullable=False)
+    parametros = db.Column(db.JSON, nullable=False, default=dict)
+    estado = db.Column(db.String(20), nullable=False, default=PENDIENTE)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True)
+
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    max_intentos = db.Column(db.Integer, nullable=False, default=3)
+    error = db.Column(db.Text, nullable=True)  # Último error (también si luego se reintentó)
+
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    disponible_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Próximo intento
+    iniciado_en = db.Column(db.DateTime, nullable=True)
+    bloqueado_hasta = db.Column(db.DateTime, nullable=True)
+    terminado_en = db.Column(db.DateTime, nullable=True)
+    expira_en = db.Column(db.DateTime, nullable=True, index=True)  # Se purga el trabajo y su archivo
+
+    archivo_nombre = db.Column(db.String(255), nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    tamano = db.Column(db.Integer, nullable=True)  # Bytes del archivo
+    resultado = db.deferred(db.Column(db.LargeBinary, nullable=True))
+
+    __table_args__ = (
+        db.Index('ix_jobs_estado_disponible', 'estado', 'disponible_en'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "parametros": self.parametros,
+            "estado": self.estado,
+            "intentos": self.intentos,
+            "max_intentos": self.max_intentos,
+            "error": self.error,
+            "creado_en": self.creado_en.isoformat() if self.creado_en else None,
+            "iniciado_en": self.iniciado_en.isoformat() if self.iniciado_en else None,
+            "terminado_en": self.terminado_en.isoformat() if self.terminado_en else None,
+            "expira_en": self.expira_en.isoformat() if self.expira_en else None,
+            "archivo": {
+                "nombre": self.archivo_nombre,
+                "mimetype": self.mimetype,
+                "tamano": self.tamano,
+                "descarga": f"/api/jobs/{self.id}/descarga"
+            } if self.estado == COMPLETADO else None
+        }
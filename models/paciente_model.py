@@ -10,6 +10,11 @@ class Paciente(db.Model):
     # Normalización: Relación con tabla personas
     persona_id = db.Column(db.Integer, db.ForeignKey('personas.id'), nullable=True)
     persona = db.relationship('Persona', backref=db.backref('paciente', uselist=False))
+
+    # Búsqueda de pacientes: de la persona encontrada al paciente (ver services/busqueda_service.py)
+    __table_args__ = (
+        db.Index('ix_pacientes_persona_id', 'persona_id'),
+    )
     
     @property
     def dni(self):
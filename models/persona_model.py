@@ -1,5 +1,7 @@
 from extensions.database import db
 from datetime import datetime
+from sqlalchemy import event
+from utils.texto import normalizar
 
 class Persona(db.Model):
     __tablename__ = "personas"
@@ -16,6 +18,14 @@ class Persona(db.Model):
     direccion = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # DNI, nombres y apellidos en minúsculas y sin tildes (ver services/busqueda_service.py).
+    # Se mantiene automáticamente al insertar o actualizar una persona.
+    busqueda = db.Column(db.Text, nullable=True)
+
+    @staticmethod
+    def texto_busqueda(dni, nombres, apellido_paterno, apellido_materno):
+        return normalizar(" ".join(filter(None, [dni, nombres, apellido_paterno, apellido_materno])))
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -30,3 +40,11 @@ class Persona(db.Model):
             "email": self.email,
             "direccion": self.direccion
         }
+
+
+@event.listens_for(Persona, "before_insert")
+@event.listens_for(Persona, "before_update")
+def _actualizar_busqueda(mapper, connection, persona):
+    persona.busqueda = Persona.texto_busqueda(
+        persona.dni, persona.nombres, persona.apellido_paterno, persona.apellido_materno
+    )
@@ -0,0 +1,107 @@
+"""
+Worker de trabajos en segundo plano (POST /api/jobs; ver services/job_service.py).
+
+Es la forma de ejecutar los trabajos: un servicio aparte en Railway (mismo
+repositorio, comando `python procesar_jobs.py`), para que ningún PDF ni
+exportación compita con el tráfico interactivo. El servicio web no los
+ejecuta salvo que JOBS_HILOS_WEB > 0.
+
+Con --procesos N arranca N procesos de --hilos hilos cada uno: los PDF
+usan CPU y el GIL limita a los hilos de un mismo proceso.
+
+Con --puerto-metricas P (o JOBS_METRICAS_PUERTO) sirve las métricas
+Prometheus del worker (citas_jobs_total, citas_jobs_duracion_segundos, ...)
+en http://<host>:P/. Con varios procesos cada uno escribe en
+PROMETHEUS_MULTIPROC_DIR y el proceso principal sirve la suma.
+
+Termina con SIGTERM/Ctrl+C después de los trabajos en curso.
+
+Uso:
+    python procesar_jobs.py                      # 2 hilos
+    python procesar_jobs.py --procesos 2 --hilos 2
+    python procesar_jobs.py --una-vez            # Vaciar la cola y salir (cron)
+    python procesar_jobs.py --puerto-metricas 9100
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import threading
+
+# app y prometheus_client se importan después de leer los argumentos:
+# prometheus_client decide al importarse si escribe en PROMETHEUS_MULTIPROC_DIR
+DIRECTORIO_METRICAS = "/tmp/citas_jobs_metricas"
+
+
+def _detener_con_senales():
+    detener = threading.Event()
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(senal, lambda *args: detener.set())
+    return detener
+
+
+def _exponer_metricas(puerto, procesos):
+    """Servidor HTTP de Prometheus en 'puerto' (hilo daemon del proceso principal)."""
+    if procesos > 1:
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", DIRECTORIO_METRICAS)
+    directorio = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+    from prometheus_client import start_http_server
+    from utils import metricas
+
+    start_http_server(puerto, registry=metricas.registro())
+    print(f"--- Métricas en el puerto {puerto} ---")
+
+
+def _proceso(hilos, una_vez):
+    from app import app
+    from services.job_service import JobService
+
+    JobService.trabajar(app, hilos=hilos, detener=_detener_con_senales(), una_vez=una_vez)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de trabajos en segundo plano")
+    parser.add_argument("--hilos", type=int, default=2, help="Hilos por proceso")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos (cada uno con --hilos hilos)")
+    parser.add_argument("--una-vez", action="store_true", help="Salir cuando la cola quede vacía")
+    parser.add_argument("--puerto-metricas", type=int, default=int(os.getenv("JOBS_METRICAS_PUERTO", 0)),
+                        help="Puerto del servidor de métricas Prometheus (0: desactivado)")
+    args = parser.parse_args()
+
+    print(f"--- Worker de trabajos: {args.procesos} proceso(s) x {args.hilos} hilo(s) ---")
+    if args.puerto_metricas:
+        _exponer_metricas(args.puerto_metricas, args.procesos)
+    if args.procesos <= 1:
+        _proceso(args.hilos, args.una_vez)
+        return
+
+    # 'spawn': cada proceso crea su propio pool de conexiones (no se heredan del padre)
+    contexto = multiprocessing.get_context("spawn")
+    procesos = [
+        contexto.Process(target=_proceso, args=(args.hilos, args.una_vez), name=f"jobs-{i}")
+        for i in range(args.procesos)
+    ]
+    for proceso in procesos:
+        proceso.start()
+
+    detener = _detener_con_senales()
+    while any(p.is_alive() for p in procesos) and not detener.wait(1):
+        pass
+    for proceso in procesos:
+        if proceso.is_alive():
+            proceso.terminate()  # SIGTERM: el proceso termina su trabajo en curso
+    for proceso in procesos:
+        proceso.join()
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(proceso.pid)
+
+
+if __name__ == "__main__":
+    main()
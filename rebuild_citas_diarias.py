@@ -0,0 +1,67 @@
+"""
+Crea, verifica o reconstruye la tabla de hechos 'citas_diarias'.
+
+La tabla resume citas y cupos por (fecha, área, médico, turno) y es la que
+leen los indicadores, reportes y el dashboard. La API la mantiene de forma
+incremental; este script sirve para la carga inicial y para backfills
+después de cargas masivas hechas fuera de la API (scripts seed_*, migraciones).
+
+Uso:
+    python rebuild_citas_diarias.py                      # Verificar y reconstruir si hay diferencias
+    python rebuild_citas_diarias.py --verificar          # Solo reportar diferencias
+    python rebuild_citas_diarias.py --forzar             # Reconstruir todo sin verificar
+    python rebuild_citas_diarias.py --desde 2025-01-01 --hasta 2025-12-31
+"""
+
+import argparse
+import sys
+from datetime import date
+
+from app import app
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabla de hechos 'citas_diarias'")
+    parser.add_argument("--verificar", action="store_true", help="Solo reportar diferencias")
+    parser.add_argument("--forzar", action="store_true", help="Reconstruir sin verificar")
+    parser.add_argument("--desde", type=date.fromisoformat, help="Fecha inicial (YYYY-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Fecha final (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        CitaDiaria.__table__.create(db.engine, checkfirst=True)
+
+        if args.forzar:
+            total = CitaDiaria.reconstruir(args.desde, args.hasta)
+            db.session.commit()
+            print(f"✓ Tabla de hechos reconstruida: {total} filas")
+            return
+
+        print("--- Verificando citas_diarias ---")
+        diferencias = CitaDiaria.verificar(args.desde, args.hasta)
+
+        if not diferencias:
+            print("✅ La tabla de hechos coincide con citas y horarios.")
+            return
+
+        print(f"⚠️ {len(diferencias)} filas con diferencias:")
+        for d in diferencias[:20]:
+            fecha, area_id, doctor_id, turno = d["clave"]
+            print(f"  {fecha} área={area_id} doctor={doctor_id} turno={turno or '-'}")
+            print(f"    esperado={d['esperado']}")
+            print(f"    actual=  {d['actual']}")
+        if len(diferencias) > 20:
+            print(f"  ... y {len(diferencias) - 20} más")
+
+        if args.verificar:
+            sys.exit(1)
+
+        total = CitaDiaria.reconstruir(args.desde, args.hasta)
+        db.session.commit()
+        print(f"✓ Tabla de hechos reconstruida: {total} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Verifica o reconstruye la tabla 'horario_ocupacion' a partir de 'citas'.
+
+Útil después de cargas masivas hechas fuera de la API (scripts seed_*,
+normalizaciones) o si se sospecha que algún contador quedó desfasado.
+
+Uso:
+    python rebuild_ocupacion.py              # Verificar y reconstruir si hay diferencias
+    python rebuild_ocupacion.py --verificar  # Solo reportar diferencias
+    python rebuild_ocupacion.py --forzar     # Reconstruir todo sin verificar
+"""
+
+import sys
+
+from app import app
+from extensions.database import db
+from models.horario_ocupacion_model import HorarioOcupacion
+
+
+def main():
+    solo_verificar = "--verificar" in sys.argv
+    forzar = "--forzar" in sys.argv
+
+    with app.app_context():
+        if forzar:
+            total = HorarioOcupacion.reconstruir()
+            db.session.commit()
+            print(f"✓ Ocupación reconstruida para {total} horarios")
+            return
+
+        print("--- Verificando ocupación de horarios ---")
+        diferencias = HorarioOcupacion.verificar()
+
+        if not diferencias:
+            print("✅ La ocupación coincide con las citas registradas.")
+            return
+
+        print(f"⚠️ {len(diferencias)} horarios con diferencias:")
+        for d in diferencias[:20]:
+            print(f"  Horario {d['horario_id']}: esperado={d['esperado']} actual={d['actual']}")
+        if len(diferencias) > 20:
+            print(f"  ... y {len(diferencias) - 20} más")
+
+        if solo_verificar:
+            sys.exit(1)
+
+        horario_ids = [d["horario_id"] for d in diferencias]
+        total = HorarioOcupacion.reconstruir(horario_ids)
+        db.session.commit()
+        print(f"✓ Ocupación reconstruida para {total} horarios")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 from flask import Blueprint
 from controllers.cita_controller import CitaController
 from middleware.auth_middleware import token_required
+from middleware.idempotencia_middleware import idempotente
 
 cita_bp = Blueprint("cita_bp", __name__)
 
 @cita_bp.post("/")
+@idempotente("citas.crear")
 def crear_cita():
     return CitaController.crear()
 
@@ -13,6 +15,29 @@ def crear_cita():
 def listar_citas():
     return CitaController.listar()
 
+@cita_bp.get("/export")
+@token_required
+def exportar_citas():
+    """
+    Exportar citas a CSV o XLSX con los mismos filtros del listado.
+    
+    Query params:
+    - format: 'csv' | 'xlsx' (default: csv)
+    - fecha, fecha_registro, doctor_id, area, area_id, estado, paciente_dni, turno
+    """
+    return CitaController.exportar()
+
+@cita_bp.post("/estado/bulk")
+@token_required
+def cambiar_estado_masivo():
+    """
+    Cambiar el estado de varias citas en una sola transacción.
+    
+    Body: {"estado": "confirmada", "ids": [...]} o
+          {"estado": "no_asistio", "filtro": {"fecha": "YYYY-MM-DD", "area_id": 1, "turno": "M", "estado": "confirmada"}}
+    """
+    return CitaController.cambiar_estado_masivo()
+
 @cita_bp.get("/<int:id>")
 @token_required
 def obtener_cita(id):
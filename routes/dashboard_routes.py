@@ -2,7 +2,8 @@ from flask import Blueprint, jsonify, request
 from controllers.dashboard_controller import (
     get_dashboard_stats,
     get_upcoming_appointments,
-    get_appointments_by_specialty_today
+    get_appointments_by_specialty_today,
+    get_dashboard_summary
 )
 from middleware.auth_middleware import token_required
 
@@ -37,3 +38,15 @@ def appointments_by_specialty():
         return jsonify(data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/summary', methods=['GET'])
+@token_required
+def summary():
+    try:
+        user_rol_id = request.user.get('rol_id') if hasattr(request, 'user') else None
+        user_id = request.user.get('id') if hasattr(request, 'user') else None
+
+        data = get_dashboard_summary(user_rol_id, user_id)
+        return jsonify(data), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,17 @@
+from flask import Blueprint
+from controllers.evento_controller import EventoController
+from middleware.auth_middleware import token_required
+
+evento_bp = Blueprint("evento_bp", __name__)
+
+@evento_bp.get("")
+@token_required
+def stream_eventos():
+    """
+    Stream Server-Sent Events con los cambios de citas y cupos.
+
+    Query params:
+    - tipos: 'cita.creada,cita.estado,cita.actualizada,cita.eliminada,horario.cupos,horario.eliminado,horarios.actualizados'
+    - area_id, fecha: filtros opcionales
+    """
+    return EventoController.stream()
@@ -7,6 +7,9 @@ horario_bp = Blueprint('horario_bp', __name__)
 # Crear horarios mensuales (nuevo endpoint principal)
 horario_bp.route('/mensual', methods=['POST'])(token_required(HorarioController.create_horarios_mensuales))
 
+# Crear horarios de varios médicos y meses (UPSERT por lotes)
+horario_bp.route('/bulk', methods=['POST'])(token_required(HorarioController.create_horarios_masivos))
+
 # Obtener resumen de horarios por mes (para calendario)
 horario_bp.route('/resumen', methods=['GET'])(token_required(HorarioController.get_horarios_resumen_mes))
 
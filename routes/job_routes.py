@@ -0,0 +1,27 @@
+from flask import Blueprint
+from controllers.job_controller import JobController
+from middleware.auth_middleware import token_required
+
+job_bp = Blueprint("job_bp", __name__)
+
+@job_bp.post("")
+@token_required
+def crear_job():
+    """
+    Encolar un PDF, reporte o exportación para generarlo en segundo plano.
+
+    Body: {"tipo": "citas_confirmadas_pdf", "parametros": {"fecha": "YYYY-MM-DD", "area_id": 1}}
+    """
+    return JobController.crear()
+
+@job_bp.get("/<id>")
+@token_required
+def obtener_job(id):
+    """Estado del trabajo; al completarse incluye la URL de descarga."""
+    return JobController.obtener(id)
+
+@job_bp.get("/<id>/descarga")
+@token_required
+def descargar_job(id):
+    """Archivo generado (409 mientras no esté completado)."""
+    return JobController.descargar(id)
@@ -0,0 +1,9 @@
+from flask import Blueprint
+from controllers.metrica_controller import MetricaController
+
+metrica_bp = Blueprint("metrica_bp", __name__)
+
+@metrica_bp.get("")
+def get_metricas():
+    """Métricas Prometheus (solicitudes, pool de BD, cachés y servicios externos)."""
+    return MetricaController.index()
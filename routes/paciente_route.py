@@ -1,9 +1,11 @@
 from flask import Blueprint, request
 from controllers.paciente_controller import PacienteController
+from middleware.idempotencia_middleware import idempotente
 
 paciente_bp = Blueprint("paciente_bp", __name__)
 
 @paciente_bp.post("/")
+@idempotente("pacientes.registrar")
 def registrar_paciente():
     data = request.get_json()
     return PacienteController.registrar(data)
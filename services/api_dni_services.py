@@ -1,13 +1,46 @@
+from datetime import datetime, timedelta
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from config import Config
+from extensions.database import db
+from models.dni_cache_model import DniCache
+from utils.cache import TTLCache
+from utils.instrumentacion import medir_externo
 
 API_PERU_DEV_TOKEN = Config.API_PERU_DEV_TOKEN
 
+
+def _crear_sesion():
+    """
+    Sesión HTTP compartida: reutiliza conexiones TLS con la API (pool) y
+    reintenta solo errores de conexión (el POST no se repite si ya se envió).
+    """
+    sesion = requests.Session()
+    reintentos = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2)
+    adaptador = HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=reintentos)
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    return sesion
+
+
 class ApiPeruDevService:
-    BASE_URL = "https://apiperu.dev/api/dni"
+    BASE_URL = Config.API_PERU_DEV_URL
+    TIMEOUT = (Config.DNI_API_TIMEOUT_CONEXION, Config.DNI_API_TIMEOUT_LECTURA)
+
+    _sesion = _crear_sesion()
 
     @staticmethod
     def get_data_by_dni(dni: str):
+        """
+        Consulta la API externa sin caché.
+
+        Returns:
+            dict con la respuesta JSON de la API. Ante errores de red o
+            respuestas inválidas: {"success": False, "error": ..., "transitorio": True}
+        """
         headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -17,13 +50,106 @@ class ApiPeruDevService:
             "dni": dni
         }
 
-        response = requests.post(ApiPeruDevService.BASE_URL, json=payload, headers=headers)
+        try:
+            with medir_externo("dni"):
+                response = ApiPeruDevService._sesion.post(
+                    ApiPeruDevService.BASE_URL, json=payload, headers=headers,
+                    timeout=ApiPeruDevService.TIMEOUT
+                )
+        except requests.RequestException as e:
+            print(f"Error consultando DNI en apiperu.dev: {e}")
+            return {
+                "success": False,
+                "error": "No se pudo conectar con la API de DNI",
+                "detalle": str(e),
+                "transitorio": True
+            }
 
         try:
-            return response.json()
+            result = response.json()
         except Exception:
             return {
                 "error": "La API no devolvió JSON",
                 "status": response.status_code,
-                "raw": response.text
+                "raw": response.text,
+                "transitorio": True
             }
+
+        # Autenticación, cuota o error del servidor: no es un "no encontrado"
+        if response.status_code in (401, 403, 429) or response.status_code >= 500:
+            if isinstance(result, dict):
+                result.setdefault("success", False)
+                result["status"] = response.status_code
+                result["transitorio"] = True
+        return result
+
+
+class DniService:
+    """
+    Consulta de DNI con caché en dos niveles delante de ApiPeruDevService:
+    1. LRU en memoria del proceso (minutos)
+    2. Tabla 'dni_cache' compartida entre workers (días; horas si no se encontró)
+
+    Devuelve el mismo formato que la API ({"success": ..., "data": {...}}).
+    """
+
+    _memoria = TTLCache(maxsize=2048, ttl=600, nombre="dni")
+
+    @staticmethod
+    def _respuesta(encontrado, datos, origen):
+        if encontrado:
+            return {"success": True, "data": datos or {}, "origen": origen}
+        return {"success": False, "message": "No se encontraron datos para el DNI", "origen": origen}
+
+    @staticmethod
+    def buscar(dni: str):
+        en_memoria = DniService._memoria.get(dni)
+        if en_memoria is not None:
+            encontrado, datos = en_memoria
+            return DniService._respuesta(encontrado, datos, "cache")
+
+        # Sin autoflush: la consulta no escribe los cambios pendientes de quien llama
+        with db.session.no_autoflush:
+            registro = db.session.get(DniCache, dni, populate_existing=True)
+        if registro and registro.vigente:
+            DniService._memoria.set(dni, (registro.encontrado, registro.datos))
+            return DniService._respuesta(registro.encontrado, registro.datos, "cache")
+
+        result = ApiPeruDevService.get_data_by_dni(dni)
+        if not isinstance(result, dict) or result.get("transitorio"):
+            return result
+
+        encontrado = bool(result.get("success"))
+        datos = result.get("data") if encontrado else None
+        DniService._guardar(dni, encontrado, datos)
+        return DniService._respuesta(encontrado, datos, "api")
+
+    @staticmethod
+    def _guardar(dni, encontrado, datos):
+        ahora = datetime.utcnow()
+        vigencia = timedelta(days=Config.DNI_CACHE_DIAS) if encontrado \
+            else timedelta(hours=Config.DNI_CACHE_NEGATIVO_HORAS)
+
+        DniService._memoria.set(dni, (encontrado, datos))
+        valores = dict(encontrado=encontrado, datos=datos, consultado_en=ahora, expira_en=ahora + vigencia)
+        try:
+            # Conexión y transacción propias: guardar en caché no confirma ni
+            # descarta el trabajo pendiente en la sesión de quien llama
+            with db.engine.begin() as conexion:
+                actualizado = conexion.execute(
+                    db.update(DniCache).where(DniCache.dni == dni).values(**valores)
+                ).rowcount
+                if not actualizado:
+                    conexion.execute(db.insert(DniCache).values(dni=dni, **valores))
+        except Exception as e:
+            # Otra petición guardó el mismo DNI a la vez; la caché es opcional
+            print(f"No se pudo guardar el DNI {dni} en caché: {e}")
+
+    @staticmethod
+    def purgar_expirados():
+        """Elimina de 'dni_cache' las entradas vencidas. Retorna cuántas se borraron."""
+        result = db.session.execute(
+            db.delete(DniCache).where(DniCache.expira_en < datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount
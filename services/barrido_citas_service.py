@@ -0,0 +1,193 @@
+"""
+Cierre automático de citas vencidas.
+
+Las citas que quedan 'confirmada' después de su fecha nunca pasan a
+'no_asistio' si nadie las edita, lo que distorsiona los indicadores de
+inasistencia y las próximas citas del dashboard. El barrido:
+- confirmadas con fecha anterior a hoy -> 'no_asistio'
+- pendientes con fecha anterior a hoy - BARRIDO_PENDIENTE_DIAS -> 'cancelada'
+
+Se procesa por lotes (BARRIDO_LOTE citas, un commit por lote y una pausa
+de BARRIDO_PAUSA segundos entre lotes) con CitaEstadoService, que
+actualiza ocupación, tabla de hechos e historial (usuario_id nulo: se
+muestra como "Sistema"). Así cada transacción bloquea pocas citas y el
+barrido puede correr en horario de atención.
+
+Ejecución:
+- python barrer_citas.py (cron / Railway cron)
+- o en el proceso web cada BARRIDO_INTERVALO_MINUTOS (0 = desactivado).
+  En PostgreSQL un advisory lock de sesión, tomado durante toda la
+  ejecución en una conexión propia, evita que dos workers barran a la vez.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from extensions.database import db
+from models.cita_model import Cita
+from services.catalogo_service import Catalogo
+from services.cita_estado_service import CitaEstadoService, ACTUALIZADA
+
+COMENTARIO = "Cierre automático de citas vencidas"
+
+# Clave del advisory lock de PostgreSQL para el barrido
+_CLAVE_BLOQUEO = 7301
+
+
+class BarridoCitasService:
+    """Barrido por lotes de citas vencidas."""
+
+    _hilo = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def reglas(hoy=None, dias_pendiente=None):
+        """Lista de (estado actual, estado destino, fecha límite exclusiva)."""
+        hoy = hoy or date.today()
+        if dias_pendiente is None:
+            dias_pendiente = current_app.config["BARRIDO_PENDIENTE_DIAS"]
+        return [
+            ("confirmada", "no_asistio", hoy),
+            ("pendiente", "cancelada", hoy - timedelta(days=dias_pendiente)),
+        ]
+
+    @staticmethod
+    def _filtro(estado, limite):
+        condicion = Cita.estado_id.in_(Catalogo.ids_de("estados", [estado]))
+        # Una cita sin estado se considera pendiente (ver Cita.estado_nombre)
+        if estado == "pendiente":
+            condicion = db.or_(condicion, Cita.estado_id.is_(None))
+        return db.and_(Cita.fecha < limite, condicion)
+
+    @staticmethod
+    def contar(hoy=None, dias_pendiente=None):
+        """Citas que cambiaría el barrido, por regla (sin modificar nada)."""
+        return {
+            f"{origen}->{destino}": db.session.scalar(
+                db.select(func.count(Cita.id)).where(BarridoCitasService._filtro(origen, limite))
+            )
+            for origen, destino, limite in BarridoCitasService.reglas(hoy, dias_pendiente)
+        }
+
+    @staticmethod
+    @contextmanager
+    def _bloqueo():
+        """
+        Advisory lock de sesión durante el bloque (True si se obtuvo, False si
+        otro proceso está barriendo). Se toma en una conexión aparte, en
+        autocommit: la de db.session vuelve al pool en cada commit de lote.
+        """
+        engine = db.session.get_bind()
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+            obtenido = conexion.scalar(db.select(func.pg_try_advisory_lock(_CLAVE_BLOQUEO)))
+            try:
+                yield obtenido
+            finally:
+                if obtenido:
+                    conexion.scalar(db.select(func.pg_advisory_unlock(_CLAVE_BLOQUEO)))
+
+    @staticmethod
+    def ejecutar(hoy=None, dias_pendiente=None, lote=None, pausa=None, max_lotes=None):
+        """
+        Aplica las reglas por lotes, con un commit por lote.
+
+        Args:
+            hoy: Fecha de referencia (por defecto hoy)
+            lote: Citas por transacción (BARRIDO_LOTE)
+            pausa: Segundos de espera entre lotes (BARRIDO_PAUSA)
+            max_lotes: Límite de lotes por ejecución (None = hasta terminar)
+
+        Returns:
+            {"origen->destino": citas actualizadas}, o {"omitido": True} si
+            otro proceso estaba barriendo.
+        """
+        with BarridoCitasService._bloqueo() as obtenido:
+            if not obtenido:
+                return {"omitido": True}
+            return BarridoCitasService._ejecutar(hoy, dias_pendiente, lote, pausa, max_lotes)
+
+    @staticmethod
+    def _ejecutar(hoy, dias_pendiente, lote, pausa, max_lotes):
+        config = current_app.config
+        lote = lote or config["BARRIDO_LOTE"]
+        pausa = config["BARRIDO_PAUSA"] if pausa is None else pausa
+
+        resumen = {}
+        lotes = 0
+        for origen, destino, limite in BarridoCitasService.reglas(hoy, dias_pendiente):
+            if max_lotes is not None and lotes >= max_lotes:
+                break
+            clave = f"{origen}->{destino}"
+            resumen[clave] = 0
+            ultimo_id = 0
+            while True:
+                try:
+                    # Avanza por id: las citas sin cambio (sin cupo, etc.) no se releen
+                    ids = db.session.scalars(
+                        db.select(Cita.id)
+                        .where(BarridoCitasService._filtro(origen, limite), Cita.id > ultimo_id)
+                        .order_by(Cita.id)
+                        .limit(lote)
+                    ).all()
+                    if not ids:
+                        db.session.commit()
+                        break
+
+                    # El estado se vuelve a comprobar al bloquear las citas
+                    resultados = CitaEstadoService.cambiar_estado(
+                        CitaEstadoService.consulta(ids=ids, estados=[origen]),
+                        destino,
+                        comentario=COMENTARIO
+                    )
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+
+                resumen[clave] += sum(1 for r in resultados if r["resultado"] == ACTUALIZADA)
+                ultimo_id = ids[-1]
+                lotes += 1
+                if len(ids) < lote or (max_lotes is not None and lotes >= max_lotes):
+                    break
+                if pausa:
+                    time.sleep(pausa)
+        return resumen
+
+    @staticmethod
+    def iniciar_programado(app):
+        """
+        Hilo que ejecuta el barrido cada BARRIDO_INTERVALO_MINUTOS en este
+        proceso. Con gunicorn se llama al crear la app en cada worker.
+        """
+        intervalo = app.config["BARRIDO_INTERVALO_MINUTOS"]
+        if intervalo <= 0:
+            return None
+        with BarridoCitasService._lock:
+            if BarridoCitasService._hilo is None or not BarridoCitasService._hilo.is_alive():
+                BarridoCitasService._hilo = threading.Thread(
+                    target=BarridoCitasService._programado, args=(app, intervalo * 60),
+                    name="barrido-citas", daemon=True
+                )
+                BarridoCitasService._hilo.start()
+        return BarridoCitasService._hilo
+
+    @staticmethod
+    def _programado(app, segundos):
+        while True:
+            time.sleep(segundos)
+            try:
+                with app.app_context():
+                    resumen = BarridoCitasService.ejecutar()
+                    db.session.remove()
+                if any(v for k, v in resumen.items() if k != "omitido"):
+                    print(f"Barrido de citas vencidas: {resumen}")
+            except Exception as e:
+                print(f"Error en el barrido de citas vencidas: {e}")
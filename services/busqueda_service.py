@@ -0,0 +1,138 @@
+"""
+Búsqueda de personas (pacientes) por DNI, nombres o apellidos.
+
+- Entrada numérica: prefijo de DNI como rango sobre el índice único de
+  'dni' (dni >= '4512' AND dni < '4513'), sin recorrer la tabla.
+- Texto: cada palabra debe aparecer en 'personas.busqueda' (minúsculas,
+  sin tildes). En PostgreSQL un índice GIN pg_trgm atiende los
+  LIKE '%palabra%' y se ordena por similarity(); en SQLite (desarrollo) se
+  usa una tabla FTS5 con tokenizador trigram ordenada por bm25.
+
+Si el índice de búsqueda no está instalado (ver migrate_busqueda.py) se
+filtra con LIKE sobre 'busqueda', sin ranking.
+"""
+
+from sqlalchemy import func
+
+from extensions.database import db
+from models.persona_model import Persona
+from utils.texto import normalizar
+
+LARGO_MINIMO_TRIGRAMA = 3
+
+SQL_SQLITE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS personas_fts USING fts5(
+        busqueda, content='personas', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS personas_fts_ai AFTER INSERT ON personas BEGIN
+        INSERT INTO personas_fts(rowid, busqueda) VALUES (new.id, new.busqueda);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS personas_fts_ad AFTER DELETE ON personas BEGIN
+        INSERT INTO personas_fts(personas_fts, rowid, busqueda) VALUES ('delete', old.id, old.busqueda);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS personas_fts_au AFTER UPDATE OF busqueda ON personas BEGIN
+        INSERT INTO personas_fts(personas_fts, rowid, busqueda) VALUES ('delete', old.id, old.busqueda);
+        INSERT INTO personas_fts(rowid, busqueda) VALUES (new.id, new.busqueda);
+    END""",
+    "INSERT INTO personas_fts(personas_fts) VALUES ('rebuild')",
+]
+
+SQL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_personas_busqueda_trgm ON personas USING gin (busqueda gin_trgm_ops)",
+]
+
+
+def _siguiente_prefijo(prefijo):
+    """Menor cadena mayor que todas las que empiezan con 'prefijo' ('129' -> '12:')."""
+    return prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class BusquedaPersonas:
+    """Filtro y orden de relevancia para consultas que incluyen Persona."""
+
+    _instalado = {}  # url del engine -> índice de búsqueda disponible
+
+    @staticmethod
+    def instalar():
+        """
+        Crea el índice de búsqueda del motor actual (idempotente). En
+        PostgreSQL requiere permiso para CREATE EXTENSION y se ejecuta fuera
+        de transacción (CREATE INDEX CONCURRENTLY).
+        """
+        dialecto = db.engine.dialect.name
+        if dialecto == "postgresql":
+            with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+                for sql in SQL_POSTGRES:
+                    conexion.execute(db.text(sql))
+        elif dialecto == "sqlite":
+            for sql in SQL_SQLITE:
+                db.session.execute(db.text(sql))
+            db.session.commit()
+        else:
+            return False
+
+        BusquedaPersonas._instalado.pop(str(db.engine.url), None)
+        return True
+
+    @staticmethod
+    def indice_disponible():
+        """True si el índice de búsqueda del motor actual está instalado (se consulta una vez)."""
+        clave = str(db.engine.url)
+        if clave not in BusquedaPersonas._instalado:
+            dialecto = db.engine.dialect.name
+            if dialecto == "postgresql":
+                sql = "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            elif dialecto == "sqlite":
+                sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'personas_fts'"
+            else:
+                sql = None
+            BusquedaPersonas._instalado[clave] = bool(sql and db.session.execute(db.text(sql)).scalar())
+        return BusquedaPersonas._instalado[clave]
+
+    @staticmethod
+    def filtrar(query, termino):
+        """
+        Aplica la búsqueda a una consulta que ya incluye la tabla 'personas'.
+
+        Returns:
+            (query, orden): la consulta filtrada y la lista de expresiones
+            ORDER BY por relevancia (vacía si no hay ranking).
+        """
+        termino = normalizar(termino)
+        if not termino:
+            return query, []
+
+        if termino.isdigit():
+            query = query.filter(Persona.dni >= termino, Persona.dni < _siguiente_prefijo(termino))
+            return query, [(Persona.dni == termino).desc(), Persona.dni]
+
+        palabras = termino.split()
+        dialecto = db.engine.dialect.name
+        indice = BusquedaPersonas.indice_disponible()
+
+        if dialecto == "sqlite" and indice:
+            # FTS5 trigram solo indexa palabras de 3+ letras; el resto va por LIKE
+            largas = [p for p in palabras if len(p) >= LARGO_MINIMO_TRIGRAMA]
+            palabras = [p for p in palabras if len(p) < LARGO_MINIMO_TRIGRAMA]
+            orden = []
+            if largas:
+                consulta_fts = " AND ".join('"{}"'.format(p.replace('"', '""')) for p in largas)
+                fts = db.text(
+                    "SELECT rowid AS id, rank FROM personas_fts WHERE personas_fts MATCH :consulta"
+                ).bindparams(consulta=consulta_fts).columns(id=db.Integer, rank=db.Float).subquery("fts")
+                query = query.join(fts, fts.c.id == Persona.id)
+                orden = [fts.c.rank]
+        elif dialecto == "postgresql" and indice:
+            orden = [func.similarity(Persona.busqueda, termino).desc()]
+        else:
+            orden = []
+
+        query = query.filter(*[
+            Persona.busqueda.like(f"%{_escapar_like(p)}%", escape="\\") for p in palabras
+        ])
+        return query, orden
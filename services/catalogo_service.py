@@ -0,0 +1,159 @@
+"""
+Caché en memoria de los catálogos: estados de cita, áreas, roles y
+especialidades.
+
+Cada worker carga un catálogo completo la primera vez que se usa y lo
+reutiliza (listas, búsqueda por id y por nombre, ETag). La coherencia entre
+workers se mantiene con la tabla 'catalogo_version':
+- quien modifica un catálogo llama a Catalogo.invalidar(nombre) después del
+  commit, que incrementa la versión y descarta la copia local
+- cada worker lee las versiones como máximo cada CATALOGO_VERIFICAR_SEGUNDOS
+  y descarta las copias con versión distinta
+
+La misma tabla guarda contadores sin catálogo asociado (p. ej. 'usuarios',
+ver extensions/jwt_manager.py): Catalogo.version(nombre) da su valor vigente
+en este worker y Catalogo.invalidar(nombre) lo incrementa.
+
+Los dicts devueltos son compartidos: no deben modificarse.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import inspect
+
+from config import Config
+from extensions.database import db
+from models.area_model import Area
+from models.catalogo_version_model import CatalogoVersion
+from models.especialidad_model import Especialidad
+from models.estado_cita_model import EstadoCita
+from models.rol_model import Rol
+
+CATALOGOS = {
+    "estados": EstadoCita,
+    "areas": Area,
+    "roles": Rol,
+    "especialidades": Especialidad,
+}
+
+
+class _Entrada:
+    """Copia cargada de un catálogo."""
+
+    def __init__(self, version, filas):
+        self.version = version
+        self.lista = filas
+        self.por_id = {f["id"]: f for f in filas}
+        self.por_nombre = {f["nombre"]: f for f in filas}
+        contenido = json.dumps(filas, sort_keys=True, default=str).encode("utf-8")
+        self.etag = hashlib.sha1(contenido).hexdigest()[:16]
+
+
+class Catalogo:
+    """Acceso a los catálogos cacheados."""
+
+    _datos = {}       # (url del engine, catálogo) -> _Entrada
+    _versiones = {}   # url del engine -> {catálogo: versión}
+    _verificado = {}  # url del engine -> time.monotonic() de la última lectura
+    _tabla_versiones = {}  # url del engine -> existe la tabla 'catalogo_version'
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _leer_versiones(url):
+        """
+        Versiones en BD, leídas con la conexión de la sesión (una segunda
+        conexión por petición podría agotar el pool con muchos hilos).
+        """
+        if url not in Catalogo._tabla_versiones:
+            Catalogo._tabla_versiones[url] = inspect(db.session.connection()).has_table(CatalogoVersion.__tablename__)
+        if not Catalogo._tabla_versiones[url]:
+            # Tabla sin crear (ver migrate_catalogo_version.py): solo invalidación local
+            return {}
+
+        filas = db.session.execute(db.select(CatalogoVersion.nombre, CatalogoVersion.version)).all()
+        return {nombre: version for nombre, version in filas}
+
+    @staticmethod
+    def _revisar_versiones(url):
+        ahora = time.monotonic()
+        if ahora - Catalogo._verificado.get(url, float("-inf")) < Config.CATALOGO_VERIFICAR_SEGUNDOS:
+            return
+
+        versiones = Catalogo._leer_versiones(url)
+        with Catalogo._lock:
+            for nombre in CATALOGOS:
+                entrada = Catalogo._datos.get((url, nombre))
+                if entrada and entrada.version != versiones.get(nombre, 0):
+                    del Catalogo._datos[(url, nombre)]
+            Catalogo._versiones[url] = versiones
+            Catalogo._verificado[url] = ahora
+
+    @staticmethod
+    def obtener(nombre):
+        """Entrada vigente del catálogo (lista, por_id, por_nombre, etag)."""
+        url = str(db.engine.url)
+        Catalogo._revisar_versiones(url)
+
+        entrada = Catalogo._datos.get((url, nombre))
+        if entrada is None:
+            modelo = CATALOGOS[nombre]
+            version = Catalogo._versiones.get(url, {}).get(nombre, 0)
+            filas = [fila.to_dict() for fila in modelo.query.order_by(modelo.id).all()]
+            entrada = _Entrada(version, filas)
+            with Catalogo._lock:
+                Catalogo._datos[(url, nombre)] = entrada
+        return entrada
+
+    @staticmethod
+    def version(nombre):
+        """Versión vigente de 'nombre' en catalogo_version (0 si nunca cambió)."""
+        url = str(db.engine.url)
+        Catalogo._revisar_versiones(url)
+        return Catalogo._versiones.get(url, {}).get(nombre, 0)
+
+    @staticmethod
+    def lista(nombre, activos=False):
+        filas = Catalogo.obtener(nombre).lista
+        return [f for f in filas if f.get("activo", True)] if activos else filas
+
+    @staticmethod
+    def por_id(nombre, id):
+        return Catalogo.obtener(nombre).por_id.get(id)
+
+    @staticmethod
+    def id_de(nombre, valor):
+        """Id del elemento con ese nombre (p.ej. Catalogo.id_de('estados', 'pendiente')), o None."""
+        fila = Catalogo.obtener(nombre).por_nombre.get(valor)
+        return fila["id"] if fila else None
+
+    @staticmethod
+    def ids_de(nombre, valores):
+        """Ids de los nombres que existen; lista vacía si ninguno existe."""
+        por_nombre = Catalogo.obtener(nombre).por_nombre
+        return [por_nombre[v]["id"] for v in valores if v in por_nombre]
+
+    @staticmethod
+    def invalidar(nombre):
+        """
+        Registra que el catálogo cambió (llamar después del commit): incrementa
+        su versión en BD para los demás workers y descarta la copia local.
+        """
+        try:
+            actualizado = db.session.execute(
+                db.update(CatalogoVersion).where(CatalogoVersion.nombre == nombre)
+                .values(version=CatalogoVersion.version + 1)
+            ).rowcount
+            if not actualizado:
+                db.session.execute(db.insert(CatalogoVersion).values(nombre=nombre, version=1))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"No se pudo actualizar la versión del catálogo '{nombre}': {e}")
+
+        url = str(db.engine.url)
+        with Catalogo._lock:
+            Catalogo._datos.pop((url, nombre), None)
+            Catalogo._verificado.pop(url, None)
@@ -0,0 +1,143 @@
+"""
+Cambio de estado de muchas citas en una sola transacción.
+
+Usado por POST /api/citas/estado/bulk (confirmar las citas del día, marcar
+inasistencias al cierre del turno). En lugar de una petición, un commit y
+un registro de historial por cita:
+- una consulta carga las citas (bloqueadas con FOR UPDATE en PostgreSQL)
+- la ocupación de los horarios y la tabla de hechos diaria se actualizan
+  con los deltas sumados (antes de modificar las citas)
+- un UPDATE cambia el estado de todas las citas aplicables
+- un INSERT por lotes registra el historial
+"""
+
+from sqlalchemy.orm import joinedload
+
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.historial_estado_cita_model import HistorialEstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+from services.catalogo_service import Catalogo
+from services.eventos_service import Eventos
+
+# Resultado por cita
+ACTUALIZADA = "actualizada"
+SIN_CAMBIO = "sin_cambio"
+SIN_CUPO = "sin_cupo"
+NO_ENCONTRADA = "no_encontrada"
+
+
+class CitaEstadoService:
+    """Transiciones de estado por lotes."""
+
+    @staticmethod
+    def consulta(ids=None, fecha=None, area_id=None, turno=None, estados=None):
+        """
+        Citas a cambiar: por ids o por filtro (fecha, área, turno y estados actuales).
+        Se cargan con su horario (turno para la tabla de hechos).
+        """
+        query = Cita.query.options(joinedload(Cita.horario))
+        if ids is not None:
+            query = query.filter(Cita.id.in_(ids))
+        if fecha:
+            query = query.filter(Cita.fecha == fecha)
+        if area_id:
+            query = query.filter(Cita.area_id == area_id)
+        if turno:
+            query = query.filter(Cita.horario_id.in_(
+                db.select(HorarioMedico.id).where(HorarioMedico.turno == turno)
+            ))
+        if estados:
+            condicion = Cita.estado_id.in_(Catalogo.ids_de("estados", estados))
+            # Una cita sin estado se considera pendiente (ver Cita.estado_nombre)
+            if "pendiente" in estados:
+                condicion = db.or_(condicion, Cita.estado_id.is_(None))
+            query = query.filter(condicion)
+        return query
+
+    @staticmethod
+    def cambiar_estado(query, estado, usuario_id=None, comentario=None, ip_address=None, ids=None):
+        """
+        Aplica el estado a las citas de la consulta. No hace commit.
+
+        Args:
+            query: Consulta de citas (ver CitaEstadoService.consulta)
+            estado: Nombre del estado destino (debe existir en el catálogo)
+            ids: Ids pedidos explícitamente, para informar los no encontrados
+
+        Returns:
+            Lista de {"id", "resultado", "estado_anterior"} en orden de id.
+        """
+        estado_nuevo_id = Catalogo.id_de("estados", estado)
+        if estado_nuevo_id is None:
+            raise ValueError(f"Estado '{estado}' no válido")
+
+        # Bloqueo en orden de id para no cruzarse con otros cambios de las mismas citas
+        citas = query.order_by(Cita.id).with_for_update(of=Cita).all()
+        resultados = {}
+        candidatas = []
+        for cita in citas:
+            anterior = Catalogo.por_id("estados", cita.estado_id)
+            nombre_anterior = anterior["nombre"] if anterior else "pendiente"
+            resultados[cita.id] = {"id": cita.id, "resultado": SIN_CAMBIO, "estado_anterior": nombre_anterior}
+            if cita.estado_id != estado_nuevo_id:
+                candidatas.append((cita, nombre_anterior))
+
+        for cita_id in ids or []:
+            resultados.setdefault(cita_id, {"id": cita_id, "resultado": NO_ENCONTRADA, "estado_anterior": None})
+
+        # Ocupación de los horarios antes de modificar las citas
+        rechazados = HorarioOcupacion.registrar_transiciones([
+            (cita.horario_id, anterior, estado) for cita, anterior in candidatas if cita.horario_id
+        ])
+        aplicables = []
+        for cita, anterior in candidatas:
+            if cita.horario_id in rechazados:
+                resultados[cita.id]["resultado"] = SIN_CUPO
+            else:
+                aplicables.append((cita, anterior))
+
+        if aplicables:
+            CitaDiaria.registrar_cambios([
+                (CitaDiaria.aporte(cita, anterior), CitaDiaria.aporte(cita, estado)) for cita, anterior in aplicables
+            ])
+            db.session.execute(
+                db.update(Cita).where(Cita.id.in_([cita.id for cita, _ in aplicables]))
+                .values(estado_id=estado_nuevo_id)
+                .execution_options(synchronize_session=False)
+            )
+            HistorialEstadoCita.registrar_cambios(
+                [(cita.id, cita.estado_id, estado_nuevo_id) for cita, _ in aplicables],
+                usuario_id=usuario_id, comentario=comentario, ip_address=ip_address
+            )
+            for cita, _ in aplicables:
+                resultados[cita.id]["resultado"] = ACTUALIZADA
+
+            CitaEstadoService._emitir_eventos(aplicables, estado)
+
+        return [resultados[cita_id] for cita_id in sorted(resultados)]
+
+    @staticmethod
+    def _emitir_eventos(aplicables, estado):
+        """Un evento por fecha y área, y los cupos de los horarios que cambiaron."""
+        grupos = {}
+        for cita, _ in aplicables:
+            clave = (str(cita.fecha) if cita.fecha else None, cita.area_id)
+            grupos[clave] = grupos.get(clave, 0) + 1
+        for (fecha, area_id), cantidad in grupos.items():
+            Eventos.emitir("citas.estado", fecha=fecha, area_id=area_id, estado=estado, cantidad=cantidad)
+
+        # Solo cancelar o reactivar cambia los cupos disponibles
+        horarios = {
+            cita.horario_id: cita.horario for cita, anterior in aplicables
+            if cita.horario_id and (anterior == "cancelada") != (estado == "cancelada")
+        }
+        if horarios:
+            ocupados = dict(db.session.execute(
+                db.select(HorarioOcupacion.horario_id, HorarioOcupacion.activos)
+                .where(HorarioOcupacion.horario_id.in_(horarios))
+            ).all())
+            for horario_id, horario in horarios.items():
+                Eventos.cupos(horario, ocupados.get(horario_id, 0))
@@ -0,0 +1,179 @@
+"""
+Serialización de citas para listados y detalle.
+
+Cita.to_dict() recorre relaciones (estado, área, doctor → persona, horario,
+acompañante, paciente → persona). Si las citas se cargan sin estrategia de
+carga, cada fila dispara varias consultas perezosas (problema N+1).
+
+Este servicio centraliza:
+- Las opciones de carga (joinedload) que traen esas relaciones en la
+  misma consulta de la página.
+- Las formas JSON que usan los distintos endpoints, para que todos
+  devuelvan exactamente la misma estructura.
+"""
+
+from sqlalchemy.orm import joinedload
+
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+from models.paciente_model import Paciente
+from models.usuario_model import Usuario
+
+
+class CitaSerializer:
+    """Carga y serialización de citas sin consultas perezosas por fila."""
+
+    @staticmethod
+    def opciones_carga(incluir_medico_horario=False):
+        """
+        Opciones de carga para consultas de citas.
+
+        Args:
+            incluir_medico_horario: También cargar horario → médico → persona
+                                    (usado en impresión de citas confirmadas)
+        """
+        opciones = [
+            joinedload(Cita.estado_rel),
+            joinedload(Cita.area_rel),
+            joinedload(Cita.doctor).joinedload(Usuario.persona),
+            joinedload(Cita.acompanante),
+            joinedload(Cita.paciente).joinedload(Paciente.persona),
+        ]
+        if incluir_medico_horario:
+            opciones.append(
+                joinedload(Cita.horario).joinedload(HorarioMedico.medico).joinedload(Usuario.persona)
+            )
+        else:
+            opciones.append(joinedload(Cita.horario))
+        return opciones
+
+    @staticmethod
+    def cargar(query, incluir_medico_horario=False):
+        """Aplica las opciones de carga a una query de Cita."""
+        return query.options(*CitaSerializer.opciones_carga(incluir_medico_horario))
+
+    @staticmethod
+    def obtener(cita_id):
+        """Obtiene una cita por ID con todas sus relaciones cargadas."""
+        return CitaSerializer.cargar(Cita.query).filter(Cita.id == cita_id).first()
+
+    # ==================== FORMAS JSON ====================
+
+    @staticmethod
+    def _horario_basico(horario):
+        return {
+            "id": horario.id,
+            "turno": horario.turno,
+            "turno_nombre": horario.turno_nombre,
+            "hora_inicio": str(horario.hora_inicio),
+            "hora_fin": str(horario.hora_fin)
+        }
+
+    @staticmethod
+    def para_listado(cita):
+        """Forma usada por GET /api/citas."""
+        cita_dict = cita.to_dict()
+
+        # Incluir datos del paciente
+        if cita.paciente:
+            cita_dict['paciente'] = {
+                "id": cita.paciente.id,
+                "nombres": cita.paciente.nombres,
+                "apellido_paterno": cita.paciente.apellido_paterno,
+                "apellido_materno": cita.paciente.apellido_materno,
+                "dni": cita.paciente.dni,
+                "telefono": cita.paciente.telefono,
+                "email": cita.paciente.email
+            }
+
+        # Incluir información del horario si existe
+        if cita.horario:
+            cita_dict['horario'] = CitaSerializer._horario_basico(cita.horario)
+
+        return cita_dict
+
+    @staticmethod
+    def para_detalle(cita):
+        """Forma usada por GET /api/citas/<id>."""
+        cita_dict = cita.to_dict()
+
+        # Incluir datos completos del paciente
+        if cita.paciente:
+            cita_dict['paciente'] = {
+                "id": cita.paciente.id,
+                "nombres": cita.paciente.nombres,
+                "apellido_paterno": cita.paciente.apellido_paterno,
+                "apellido_materno": cita.paciente.apellido_materno,
+                "dni": cita.paciente.dni,
+                "telefono": cita.paciente.telefono,
+                "email": cita.paciente.email,
+                "fecha_nacimiento": str(cita.paciente.fecha_nacimiento) if cita.paciente.fecha_nacimiento else None,
+                "sexo": cita.paciente.sexo,
+                "direccion": cita.paciente.direccion,
+                "seguro": cita.paciente.seguro
+            }
+
+        # Incluir información del horario si existe
+        if cita.horario:
+            horario_dict = CitaSerializer._horario_basico(cita.horario)
+            horario_dict["cupos"] = cita.horario.cupos
+            cita_dict['horario'] = horario_dict
+
+        return cita_dict
+
+    @staticmethod
+    def para_historial_paciente(cita):
+        """Forma usada por GET /api/pacientes/<id>/historial."""
+        cita_dict = cita.to_dict()
+
+        # Agregar información del horario si existe
+        if cita.horario:
+            cita_dict["horario"] = CitaSerializer._horario_basico(cita.horario)
+
+        return cita_dict
+
+    @staticmethod
+    def para_impresion(cita, numero):
+        """Forma usada por GET /api/citas/confirmadas (numeración por orden de registro)."""
+        return {
+            'numero': numero,  # Numeración automática por orden de registro
+            'id': cita.id,
+            'paciente': {
+                'id': cita.paciente.id,
+                'nombres': cita.paciente.nombres,
+                'apellido_paterno': cita.paciente.apellido_paterno,
+                'apellido_materno': cita.paciente.apellido_materno,
+                'dni': cita.paciente.dni,
+                'telefono': cita.paciente.telefono
+            } if cita.paciente else None,
+            'horario': {
+                'id': cita.horario.id,
+                'hora_inicio': str(cita.horario.hora_inicio),
+                'hora_fin': str(cita.horario.hora_fin),
+                'turno': cita.horario.turno,
+                'turno_nombre': cita.horario.turno_nombre
+            } if cita.horario else None,
+            'medico': {
+                'id': cita.horario.medico.id,
+                'nombre': cita.horario.medico.nombres_completos
+            } if cita.horario and cita.horario.medico else None,
+            'fecha_registro': cita.fecha_registro.isoformat() if cita.fecha_registro else None
+        }
+
+    @staticmethod
+    def para_proximas(cita):
+        """Forma usada por GET /api/dashboard/upcoming-appointments."""
+        # Formatear la hora/turno.
+        hora = "Por definir"
+        if cita.horario:
+            hora = f"{cita.horario.hora_inicio.strftime('%I:%M %p')}" if hasattr(cita.horario, 'hora_inicio') and cita.horario.hora_inicio else "Turno " + str(cita.horario.turno)
+
+        return {
+            "id": cita.id,
+            "fecha": str(cita.fecha),
+            "hora": hora,
+            "paciente": f"{cita.paciente.nombres} {cita.paciente.apellido_paterno} {cita.paciente.apellido_materno}" if cita.paciente else "Desconocido",
+            "doctor": f"{cita.doctor.nombres_completos}" if cita.doctor else "Sin asignar",
+            "especialidad": cita.area_rel.nombre if cita.area_rel else "General",
+            "estado": cita.estado_rel.nombre.capitalize() if cita.estado_rel else "Pendiente"
+        }
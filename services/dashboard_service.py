@@ -0,0 +1,151 @@
+"""
+Datos del dashboard: estadísticas, citas por especialidad y próximas citas.
+
+El resumen (GET /api/dashboard/summary) se arma con dos consultas
+agregadas y la de próximas citas, y se guarda en una caché corta
+(DASHBOARD_CACHE_TTL) para que muchos dashboards abiertos refrescando no
+repitan las mismas consultas:
+- estadísticas y citas por especialidad son iguales para todos: clave (fecha,)
+- próximas citas dependen del rol (y del médico en el rol 2):
+  clave (fecha, rol_id, user_id)
+
+Invalidación: CitaDiaria marca la sesión al registrar cambios de citas o
+cupos; al hacer commit de esa sesión se vacía la caché de este worker. En
+los demás workers los datos quedan desactualizados como máximo el TTL.
+"""
+
+from datetime import date
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from config import Config
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.paciente_model import Paciente
+from models.usuario_model import Usuario
+from services.catalogo_service import Catalogo
+from services.cita_serializer import CitaSerializer
+from utils.cache import TTLCache
+
+# rol_id: 2 = profesional
+ROL_MEDICO = 2
+ROL_ASISTENTE = 3
+
+
+class DashboardService:
+    """Consultas del dashboard y su caché."""
+
+    _cache = TTLCache(maxsize=512, ttl=Config.DASHBOARD_CACHE_TTL, nombre="dashboard")
+
+    @staticmethod
+    def estadisticas(fecha=None):
+        """
+        Contadores generales y citas del día por área en dos consultas.
+
+        Returns:
+            (stats, por_especialidad) con la forma de /stats y
+            /appointments-by-specialty.
+        """
+        fecha = fecha or date.today()
+
+        total_pacientes, medicos_activos, pendientes_total = db.session.query(
+            db.select(func.count(Paciente.id)).scalar_subquery(),
+            db.select(func.count(Usuario.id)).where(Usuario.rol_id == ROL_MEDICO, Usuario.activo == True).scalar_subquery(),
+            db.select(func.coalesce(func.sum(CitaDiaria.pendientes), 0)).scalar_subquery(),
+        ).one()
+
+        # Citas del día por área (tabla de hechos diaria); nombres desde el catálogo
+        filas = db.session.query(
+            CitaDiaria.area_id, func.sum(CitaDiaria.total), func.sum(CitaDiaria.pendientes)
+        ).filter(CitaDiaria.fecha == fecha).group_by(CitaDiaria.area_id).all()
+
+        citas_hoy = sum(total for _, total, _ in filas)
+        pendientes_hoy = sum(pendientes for _, _, pendientes in filas)
+
+        por_area = {}
+        for area_id, total, _ in filas:
+            area = Catalogo.por_id("areas", area_id)
+            if area and total > 0:
+                por_area[area["nombre"]] = por_area.get(area["nombre"], 0) + total
+
+        total_listado = sum(por_area.values())
+        por_especialidad = [
+            {
+                "nombre": nombre,
+                "cantidad": cantidad,
+                "porcentaje": round(cantidad / total_listado * 100, 1) if total_listado > 0 else 0
+            }
+            for nombre, cantidad in por_area.items()
+        ]
+
+        stats = {
+            "totalPacientes": total_pacientes,
+            "citasHoy": citas_hoy,
+            "citasPendientesHoy": pendientes_hoy,
+            "medicosActivos": medicos_activos,
+            "citasPendientesTotal": pendientes_total
+        }
+        return stats, por_especialidad
+
+    @staticmethod
+    def proximas(user_rol_id=None, user_id=None, fecha=None):
+        """Próximas 10 citas desde hoy, filtradas según el rol."""
+        fecha = fecha or date.today()
+
+        # Con relaciones precargadas
+        query = CitaSerializer.cargar(Cita.query).filter(Cita.fecha >= fecha)
+
+        # Lógica de filtrado por rol (estado_id resuelto desde el catálogo en memoria)
+        # 2 = Profesional: debe de verse solo las citas confirmadas para el
+        if user_rol_id == ROL_MEDICO:
+            query = query.filter(Cita.doctor_id == user_id, Cita.estado_id.in_(Catalogo.ids_de("estados", ["confirmada"])))
+        # 3 = Tecnico/Asistente: debe de verse las citas pendientes por confirmar (todas)
+        elif user_rol_id == ROL_ASISTENTE:
+            query = query.filter(Cita.estado_id.in_(Catalogo.ids_de("estados", ["pendiente"])))
+
+        citas = query.order_by(Cita.fecha.asc()).limit(10).all()
+        return [CitaSerializer.para_proximas(cita) for cita in citas]
+
+    @staticmethod
+    def resumen(user_rol_id=None, user_id=None):
+        """Todos los widgets del dashboard, servidos desde la caché si están vigentes."""
+        hoy = date.today()
+
+        clave_general = (hoy,)
+        general = DashboardService._cache.get(clave_general)
+        if general is None:
+            general = DashboardService.estadisticas(hoy)
+            DashboardService._cache.set(clave_general, general)
+
+        # Solo el médico ve citas propias; los demás roles comparten la lista
+        clave_proximas = (hoy, user_rol_id, user_id if user_rol_id == ROL_MEDICO else None)
+        proximas = DashboardService._cache.get(clave_proximas)
+        if proximas is None:
+            proximas = DashboardService.proximas(user_rol_id, user_id, hoy)
+            DashboardService._cache.set(clave_proximas, proximas)
+
+        stats, por_especialidad = general
+        return {
+            "stats": stats,
+            "upcomingAppointments": proximas,
+            "appointmentsBySpecialty": por_especialidad
+        }
+
+    @staticmethod
+    def invalidar():
+        DashboardService._cache.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session):
+    if session.info.pop(CitaDiaria.MARCA_SESION, False):
+        DashboardService.invalidar()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_marca(session, transaction):
+    # Rollback o cierre sin commit (after_commit ya se ejecutó si hubo commit)
+    if transaction.parent is None:
+        session.info.pop(CitaDiaria.MARCA_SESION, None)
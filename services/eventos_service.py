@@ -0,0 +1,266 @@
+"""
+Eventos en vivo de citas y horarios para GET /api/events (Server-Sent Events).
+
+Los controladores registran eventos compactos con Eventos.cita(),
+Eventos.cupos() y Eventos.horarios() durante la transacción; solo se
+publican si la transacción hace commit.
+
+Brokers (EVENTOS_BROKER = 'auto' | 'local' | 'postgres'):
+- local: reparte los eventos entre las conexiones SSE del mismo proceso.
+  Con varios workers de gunicorn cada uno solo ve sus propios eventos.
+- postgres: publica con pg_notify() dentro de la transacción (PostgreSQL lo
+  entrega al hacer commit) y un hilo por worker escucha con LISTEN en una
+  conexión propia, fuera del pool, y reparte los eventos localmente. Todos
+  los workers reciben los mismos eventos. LISTEN requiere una conexión
+  directa (ver EVENTOS_LISTEN_URI).
+'auto' usa postgres si la base de datos es PostgreSQL.
+
+Los clientes deben recargar sus datos al recibir 'conectado' o
+'sincronizar' (reconexión del broker o eventos perdidos): los eventos no
+se guardan.
+"""
+
+import json
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from config import Config
+from extensions.database import db
+
+CANAL = "citas_eventos"
+
+# Clave en session.info con los eventos aún no confirmados
+_PENDIENTES = "eventos_pendientes"
+
+
+class Suscripcion:
+    """Cola de eventos de una conexión SSE."""
+
+    def __init__(self, filtro=None, maxsize=None):
+        self.cola = queue.Queue(maxsize=maxsize or Config.EVENTOS_COLA)
+        self.filtro = filtro
+        # Cliente demasiado lento: se cierra su conexión para que se reconecte y recargue
+        self.desbordada = False
+
+    def entregar(self, evento):
+        if self.filtro and not self.filtro(evento):
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except queue.Full:
+            self.desbordada = True
+
+
+class BrokerLocal:
+    """Reparte los eventos entre las suscripciones de este proceso."""
+
+    transaccional = False
+
+    def __init__(self):
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+
+    def suscribir(self, filtro=None):
+        suscripcion = Suscripcion(filtro)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def conexiones(self):
+        with self._lock:
+            return len(self._suscripciones)
+
+    def publicar(self, session, eventos):
+        """Antes del commit (brokers transaccionales)."""
+
+    def confirmar(self, eventos):
+        """Después del commit."""
+        self.distribuir(eventos)
+
+    def distribuir(self, eventos):
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            for evento in eventos:
+                suscripcion.entregar(evento)
+
+
+class BrokerPostgres(BrokerLocal):
+    """NOTIFY en la transacción y LISTEN en un hilo por worker."""
+
+    transaccional = True
+    ESPERA_RECONEXION = 2
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self._hilo = None
+
+    def publicar(self, session, eventos):
+        for evento in eventos:
+            session.execute(db.select(func.pg_notify(CANAL, json.dumps(evento, default=str))))
+
+    def confirmar(self, eventos):
+        # PostgreSQL los entrega al hilo LISTEN de cada worker, incluido este
+        pass
+
+    def suscribir(self, filtro=None):
+        self._iniciar()
+        return super().suscribir(filtro)
+
+    def _iniciar(self):
+        # Se inicia en el worker (después del fork) con la primera suscripción
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._escuchar, name="eventos-listen", daemon=True)
+                self._hilo.start()
+
+    def _conectar(self):
+        """
+        Conexión DBAPI propia: LISTEN la ocupa de forma permanente. Un pooler
+        en modo transacción (p.ej. Supabase, puerto 6543) no admite LISTEN:
+        EVENTOS_LISTEN_URI permite usar la conexión directa.
+        """
+        url = make_url(Config.EVENTOS_LISTEN_URI) if Config.EVENTOS_LISTEN_URI else self.engine.url
+        cargs, cparams = self.engine.dialect.create_connect_args(url)
+        conexion = self.engine.dialect.connect(*cargs, **cparams)
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL}")
+        return conexion
+
+    def _escuchar(self):
+        reconexion = False
+        while True:
+            conexion = None
+            try:
+                conexion = self._conectar()
+                if reconexion:
+                    # Pudieron perderse eventos mientras no había conexión
+                    self.distribuir([{"tipo": "sincronizar"}])
+
+                while True:
+                    if select.select([conexion], [], [], Config.EVENTOS_KEEPALIVE) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    eventos = []
+                    while conexion.notifies:
+                        aviso = conexion.notifies.pop(0)
+                        eventos.append(json.loads(aviso.payload))
+                    if eventos:
+                        self.distribuir(eventos)
+            except Exception as e:
+                print(f"Error en LISTEN de eventos: {e}")
+            finally:
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+            reconexion = True
+            time.sleep(self.ESPERA_RECONEXION)
+
+
+class Eventos:
+    """Registro y publicación de eventos."""
+
+    _brokers = {}  # url del engine -> broker
+    _lock = threading.Lock()
+
+    @staticmethod
+    def broker(engine=None):
+        engine = engine or db.engine
+        url = str(engine.url)
+        with Eventos._lock:
+            broker = Eventos._brokers.get(url)
+            if broker is None:
+                tipo = Config.EVENTOS_BROKER
+                if tipo == "auto":
+                    tipo = "postgres" if engine.dialect.name == "postgresql" else "local"
+                broker = BrokerPostgres(engine) if tipo == "postgres" else BrokerLocal()
+                Eventos._brokers[url] = broker
+        return broker
+
+    @staticmethod
+    def emitir(tipo, **datos):
+        """Registra un evento en la transacción actual (se publica tras el commit)."""
+        db.session.info.setdefault(_PENDIENTES, []).append({"tipo": tipo, **datos})
+
+    @staticmethod
+    def cita(tipo, cita, estado=None, **extra):
+        """
+        Evento de una cita ('cita.creada', 'cita.estado', 'cita.actualizada',
+        'cita.eliminada'). estado: nombre del estado nuevo si acaba de cambiar.
+        """
+        Eventos.emitir(
+            tipo,
+            id=cita.id,
+            fecha=str(cita.fecha) if cita.fecha else None,
+            horario_id=cita.horario_id,
+            area_id=cita.area_id,
+            doctor_id=cita.doctor_id,
+            estado=estado or cita.estado_nombre,
+            **extra
+        )
+
+    @staticmethod
+    def cupos(horario, ocupados=None):
+        """Evento 'horario.cupos' con los cupos disponibles del horario."""
+        from models.horario_ocupacion_model import HorarioOcupacion
+
+        if ocupados is None:
+            ocupados = HorarioOcupacion.ocupados(horario.id)
+        Eventos.emitir(
+            "horario.cupos",
+            horario_id=horario.id,
+            fecha=str(horario.fecha),
+            area_id=horario.area_id,
+            medico_id=horario.medico_id,
+            turno=horario.turno,
+            cupos=horario.cupos,
+            cupos_disponibles=max(horario.cupos - ocupados, 0)
+        )
+
+    @staticmethod
+    def horarios(medico_id, desde, hasta, area_id=None):
+        """Evento 'horarios.actualizados' para cambios masivos: el cliente recarga el rango."""
+        Eventos.emitir(
+            "horarios.actualizados",
+            medico_id=medico_id,
+            area_id=area_id,
+            desde=str(desde),
+            hasta=str(hasta)
+        )
+
+
+@event.listens_for(Session, "before_commit")
+def _publicar_en_transaccion(session):
+    eventos = session.info.get(_PENDIENTES)
+    if eventos:
+        broker = Eventos.broker(session.get_bind())
+        if broker.transaccional:
+            broker.publicar(session, eventos)
+
+
+@event.listens_for(Session, "after_commit")
+def _confirmar(session):
+    eventos = session.info.pop(_PENDIENTES, None)
+    if eventos:
+        Eventos.broker(session.get_bind()).confirmar(eventos)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar(session, transaction):
+    # Rollback o cierre sin commit
+    if transaction.parent is None:
+        session.info.pop(_PENDIENTES, None)
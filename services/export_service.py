@@ -0,0 +1,92 @@
+"""
+Exportación de filas a CSV o XLSX en streaming.
+
+Las funciones reciben un iterable de filas (tuplas) y devuelven generadores
+de bytes para usar con flask.Response, de modo que nunca se mantiene el
+resultado completo en memoria.
+
+Los textos que empiezan con '=', '+', '-' o '@' (p. ej. síntomas escritos
+por el usuario) se escapan con un apóstrofo para que Excel o LibreOffice
+no los evalúen como fórmulas.
+"""
+
+import csv
+import io
+import os
+import tempfile
+
+from openpyxl import Workbook
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+FILAS_POR_BLOQUE = 500
+TAMANO_BLOQUE = 64 * 1024
+
+# Prefijos con los que una hoja de cálculo interpreta el texto como fórmula
+PREFIJOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _celda(valor):
+    """Texto que no se evalúa como fórmula al abrir el archivo."""
+    if isinstance(valor, str) and valor.startswith(PREFIJOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+class ExportService:
+    """Generadores de archivos CSV/XLSX."""
+
+    @staticmethod
+    def generar_csv(encabezados, filas):
+        """
+        Genera el CSV por bloques. El primer bloque (BOM + encabezados) se
+        envía antes de leer la primera fila, para que Excel reconozca UTF-8.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        buffer.write('\ufeff')
+        writer.writerow(encabezados)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+        for i, fila in enumerate(filas, start=1):
+            writer.writerow([_celda(valor) for valor in fila])
+            if i % FILAS_POR_BLOQUE == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def generar_xlsx(encabezados, filas, titulo='Datos'):
+        """
+        Genera el XLSX con openpyxl en modo write-only: las filas se escriben
+        a disco a medida que llegan (memoria constante). El formato zip
+        necesita el libro completo, así que el archivo se envía por bloques
+        una vez cerrado y luego se elimina.
+        """
+        workbook = Workbook(write_only=True)
+        hoja = workbook.create_sheet(title=titulo)
+        hoja.append(encabezados)
+        for fila in filas:
+            hoja.append([_celda(valor) for valor in fila])
+
+        descriptor, ruta = tempfile.mkstemp(suffix='.xlsx')
+        os.close(descriptor)
+        try:
+            workbook.save(ruta)
+            with open(ruta, 'rb') as archivo:
+                while True:
+                    bloque = archivo.read(TAMANO_BLOQUE)
+                    if not bloque:
+                        break
+                    yield bloque
+        finally:
+            os.remove(ruta)
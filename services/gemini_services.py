@@ -1,6 +1,7 @@
 import requests
 import json
 from config import Config
+from utils.instrumentacion import medir_externo
 
 GEMINI_API_KEY = Config.GEMINI_API_KEY
 
@@ -52,8 +53,12 @@ class GeminiService:
         }
 
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            
+            with medir_externo("gemini"):
+                response = requests.post(
+                    url, headers=headers, json=payload,
+                    timeout=(Config.GEMINI_TIMEOUT_CONEXION, Config.GEMINI_TIMEOUT_LECTURA)
+                )
+
             if response.status_code == 429:
                 return {"error": "El servicio de IA está saturado momentáneamente. Por favor intente en un minuto.", "status": 429}
             
@@ -71,6 +76,8 @@ class GeminiService:
             else:
                 return {"error": "No se pudo obtener una respuesta válida de Gemini"}
                 
+        except requests.Timeout:
+            return {"error": "El servicio de IA no respondió a tiempo.", "status": 504}
         except json.JSONDecodeError:
             return {"error": "Error al procesar la respuesta de la IA (no es un JSON válido)"}
         except Exception as e:
@@ -0,0 +1,177 @@
+"""
+Generación masiva de horarios (varios médicos y meses) con UPSERT.
+
+En lugar de cargar los horarios como objetos ORM y modificarlos uno a uno:
+- una consulta lee los horarios existentes del rango con su ocupación
+  (para el resumen de cambios y para no bajar cupos por debajo de las
+  citas activas)
+- un INSERT ... ON CONFLICT (medico_id, fecha, turno) DO UPDATE (executemany)
+  escribe altas y cambios; el WHERE del DO UPDATE omite las filas sin
+  cambios y vuelve a comprobar la ocupación
+- la tabla de hechos diaria se recalcula una sola vez para todos los médicos
+
+Usado por POST /api/horarios/bulk y POST /api/horarios/mensual.
+"""
+
+from calendar import monthrange
+from datetime import date
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+from services.eventos_service import Eventos
+
+# Claves de 'turnos' en el payload
+TURNOS = {"manana": "M", "tarde": "T"}
+
+
+class HorarioMasivoService:
+    """Expansión de la plantilla de horarios y escritura por lotes."""
+
+    @staticmethod
+    def fechas_mes(mes, dias_semana=None, excluir=()):
+        """Fechas de un mes 'YYYY-MM' (filtradas por día de la semana). ValueError si el mes es inválido."""
+        year, month = map(int, mes.split("-"))
+        _, dias_en_mes = monthrange(year, month)
+        fechas = [date(year, month, dia) for dia in range(1, dias_en_mes + 1)]
+        return [
+            f for f in fechas
+            if (dias_semana is None or f.weekday() in dias_semana) and f not in excluir
+        ]
+
+    @staticmethod
+    def filas(medico_id, area_id, fechas, turnos):
+        """
+        Filas de horarios_medicos para un médico.
+
+        Args:
+            turnos: {"manana": {"activo": bool, "cupos": int}, "tarde": {...}}
+        """
+        activos = [
+            (codigo, turnos[clave].get("cupos", 7))
+            for clave, codigo in TURNOS.items() if turnos.get(clave, {}).get("activo")
+        ]
+        return [
+            {"medico_id": medico_id, "area_id": area_id, "fecha": fecha,
+             "dia_semana": fecha.weekday(), "turno": codigo, "cupos": cupos}
+            for fecha in fechas for codigo, cupos in activos
+        ]
+
+    @staticmethod
+    def aplicar(filas):
+        """
+        Crea o actualiza los horarios. No hace commit.
+
+        Los horarios existentes cuyos nuevos cupos quedarían por debajo de sus
+        citas activas no se modifican y se informan como conflictos.
+
+        Returns:
+            {"creados", "actualizados", "sin_cambio", "conflictos": [...]}
+        """
+        # Una fila por clave (la última gana) y en orden de clave para bloquear siempre igual
+        por_clave = {(f["medico_id"], f["fecha"], f["turno"]): f for f in filas}
+        filas = [por_clave[clave] for clave in sorted(por_clave)]
+        resumen = {"creados": 0, "actualizados": 0, "sin_cambio": 0, "conflictos": []}
+        if not filas:
+            return resumen
+
+        medico_ids = sorted({f["medico_id"] for f in filas})
+        desde = min(f["fecha"] for f in filas)
+        hasta = max(f["fecha"] for f in filas)
+
+        existentes = {
+            (row.medico_id, row.fecha, row.turno): row
+            for row in db.session.execute(
+                db.select(
+                    HorarioMedico.id, HorarioMedico.medico_id, HorarioMedico.fecha, HorarioMedico.turno,
+                    HorarioMedico.area_id, HorarioMedico.cupos,
+                    db.func.coalesce(HorarioOcupacion.activos, 0).label("ocupados")
+                )
+                .outerjoin(HorarioOcupacion, HorarioOcupacion.horario_id == HorarioMedico.id)
+                .where(
+                    HorarioMedico.medico_id.in_(medico_ids),
+                    HorarioMedico.fecha >= desde,
+                    HorarioMedico.fecha <= hasta
+                )
+            )
+        }
+
+        escribir = []
+        for fila in filas:
+            actual = existentes.get((fila["medico_id"], fila["fecha"], fila["turno"]))
+            if actual is None:
+                resumen["creados"] += 1
+            elif actual.area_id == fila["area_id"] and actual.cupos == fila["cupos"]:
+                resumen["sin_cambio"] += 1
+                continue
+            elif fila["cupos"] < actual.ocupados:
+                resumen["conflictos"].append({
+                    "horario_id": actual.id,
+                    "medico_id": actual.medico_id,
+                    "fecha": str(actual.fecha),
+                    "turno": actual.turno,
+                    "cupos": fila["cupos"],
+                    "ocupados": actual.ocupados
+                })
+                continue
+            else:
+                resumen["actualizados"] += 1
+            escribir.append(fila)
+
+        if escribir:
+            HorarioMasivoService._upsert(escribir, existentes)
+            CitaDiaria.recalcular_cupos(medico_ids, desde, hasta)
+            rangos = {}
+            for f in escribir:
+                d, h, areas = rangos.get(f["medico_id"], (f["fecha"], f["fecha"], set()))
+                areas.add(f["area_id"])
+                rangos[f["medico_id"]] = (min(d, f["fecha"]), max(h, f["fecha"]), areas)
+            for medico_id, (d, h, areas) in rangos.items():
+                Eventos.horarios(medico_id, d, h, areas.pop() if len(areas) == 1 else None)
+        return resumen
+
+    @staticmethod
+    def _upsert(filas, existentes):
+        """
+        executemany de un INSERT ... ON CONFLICT DO UPDATE: se compila una vez
+        (psycopg2 agrupa las filas en INSERT ... VALUES de hasta 1000).
+        """
+        tabla = HorarioMedico.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(tabla)
+            excluido = stmt.excluded
+            ocupados = db.select(HorarioOcupacion.activos).where(
+                HorarioOcupacion.horario_id == tabla.c.id
+            ).scalar_subquery()
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["medico_id", "fecha", "turno"],
+                set_={"area_id": excluido.area_id, "cupos": excluido.cupos},
+                where=db.and_(
+                    db.or_(tabla.c.area_id != excluido.area_id, tabla.c.cupos != excluido.cupos),
+                    excluido.cupos >= db.func.coalesce(ocupados, 0)
+                )
+            )
+            db.session.execute(stmt, filas)
+            return
+
+        # Otros motores: altas y cambios según la lectura previa
+        nuevas = [f for f in filas if (f["medico_id"], f["fecha"], f["turno"]) not in existentes]
+        cambios = [
+            {"b_id": existentes[(f["medico_id"], f["fecha"], f["turno"])].id,
+             "b_area_id": f["area_id"], "b_cupos": f["cupos"]}
+            for f in filas if (f["medico_id"], f["fecha"], f["turno"]) in existentes
+        ]
+        if nuevas:
+            db.session.execute(db.insert(tabla), nuevas)
+        if cambios:
+            db.session.execute(
+                db.update(tabla)
+                .where(tabla.c.id == db.bindparam("b_id"))
+                .values(area_id=db.bindparam("b_area_id"), cupos=db.bindparam("b_cupos")),
+                cambios
+            )
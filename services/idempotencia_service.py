@@ -0,0 +1,100 @@
+"""
+Claves de idempotencia (cabecera Idempotency-Key) para POST sin autenticación.
+
+El Wi-Fi de las salas corta conexiones y el frontend reintenta: sin clave,
+cada reintento de POST /api/citas crea otra cita y consume otro cupo. Con
+clave:
+- la primera solicitud reserva la clave (INSERT confirmado antes de ejecutar)
+- los reintentos con el mismo cuerpo reciben la respuesta guardada
+- un reintento que llega mientras la primera sigue en proceso espera hasta
+  IDEMPOTENCIA_ESPERA segundos su respuesta (luego 409 con Retry-After)
+- la misma clave con otro cuerpo es un error del cliente (422)
+- respuestas 5xx y excepciones liberan la clave para poder reintentar
+
+Las claves vencen a las IDEMPOTENCIA_TTL_HORAS; se purgan con
+`python migrate_idempotencia.py --purgar`.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from extensions.database import db
+from models.idempotencia_model import ClaveIdempotencia
+
+# Una clave en proceso más antigua que esto quedó huérfana (worker reiniciado)
+_ABANDONADA = timedelta(minutes=5)
+
+
+class IdempotenciaService:
+    """Reserva, respuesta guardada y purga de claves."""
+
+    @staticmethod
+    def reservar(clave, alcance, hash_solicitud):
+        """
+        Intenta reservar la clave.
+
+        Returns:
+            None si la solicitud debe ejecutarse, o la fila existente
+            (en proceso o con respuesta guardada).
+        """
+        for _ in range(3):
+            ahora = datetime.utcnow()
+            try:
+                db.session.execute(db.insert(ClaveIdempotencia).values(
+                    clave=clave,
+                    alcance=alcance,
+                    hash_solicitud=hash_solicitud,
+                    creado_en=ahora,
+                    expira_en=ahora + timedelta(hours=current_app.config["IDEMPOTENCIA_TTL_HORAS"])
+                ))
+                db.session.commit()
+                return None
+            except IntegrityError:
+                db.session.rollback()
+
+            existente = db.session.get(ClaveIdempotencia, (clave, alcance), populate_existing=True)
+            if existente is None:
+                continue  # Liberada o purgada entre medio
+            if existente.vigente and not (existente.en_proceso and existente.creado_en < ahora - _ABANDONADA):
+                return existente
+
+            # Vencida o huérfana: se borra (si nadie la cambió) y se vuelve a intentar
+            db.session.execute(
+                db.delete(ClaveIdempotencia).where(
+                    ClaveIdempotencia.clave == clave,
+                    ClaveIdempotencia.alcance == alcance,
+                    ClaveIdempotencia.creado_en == existente.creado_en
+                )
+            )
+            db.session.commit()
+        raise RuntimeError(f"No se pudo reservar la clave de idempotencia '{clave}'")
+
+    @staticmethod
+    def guardar(clave, alcance, status_code, respuesta):
+        db.session.execute(
+            db.update(ClaveIdempotencia)
+            .where(ClaveIdempotencia.clave == clave, ClaveIdempotencia.alcance == alcance)
+            .values(status_code=status_code, respuesta=respuesta)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def liberar(clave, alcance):
+        db.session.rollback()
+        db.session.execute(
+            db.delete(ClaveIdempotencia)
+            .where(ClaveIdempotencia.clave == clave, ClaveIdempotencia.alcance == alcance)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def purgar_expirados():
+        """Elimina las claves vencidas. Retorna cuántas se borraron."""
+        result = db.session.execute(
+            db.delete(ClaveIdempotencia).where(ClaveIdempotencia.expira_en < datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount
+
@@ -0,0 +1,108 @@
+"""
+Cálculo de indicadores de gestión de citas (utilización, inasistencia, lead time).
+
+Los indicadores se leen de la tabla de hechos 'citas_diarias' (una fila por
+fecha, área, médico y turno), que ya tiene los conteos por estado, los
+cupos y la suma de días de anticipación. Un rango de 12 meses agrega unos
+cientos de filas en lugar de recorrer todas las citas. Los endpoints de
+indicadores solo eligen cómo agrupar.
+"""
+
+from sqlalchemy import func
+
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+
+
+def porcentaje(parte, total):
+    """(parte / total) × 100 redondeado a 2 decimales; 0 si no hay total."""
+    return round((parte / total * 100), 2) if total and total > 0 else 0
+
+
+def promedio(valor):
+    return round(float(valor), 2) if valor else 0
+
+
+def _suma(expresion):
+    return func.coalesce(func.sum(expresion), 0)
+
+
+def _division(numerador, denominador):
+    return func.sum(numerador) * 1.0 / func.nullif(func.sum(denominador), 0)
+
+
+class IndicadoresService:
+    """Consultas agregadas para los indicadores de la tesis."""
+
+    @staticmethod
+    def columnas():
+        """Agregados sobre citas_diarias con las métricas de los indicadores."""
+        f = CitaDiaria
+        return [
+            _suma(f.total).label('total_citas'),
+            _suma(f.total - f.canceladas).label('citas_no_canceladas'),
+            _suma(f.no_asistio).label('no_shows'),
+            _suma(f.atendidas).label('atendidas'),
+            _suma(f.canceladas).label('canceladas'),
+            _suma(f.confirmadas + f.atendidas + f.no_asistio).label('confirmadas_total'),
+            _suma(f.cupos).label('cupos_totales'),
+            _division(
+                f.lead_time_dias + f.lead_time_dias_canceladas,
+                f.lead_time_citas + f.lead_time_citas_canceladas
+            ).label('lead_time_promedio'),
+            _division(f.lead_time_dias, f.lead_time_citas).label('lead_time_no_canceladas'),
+        ]
+
+    @staticmethod
+    def consulta(fecha_inicio, fecha_fin, area_id=None, grupo=()):
+        """
+        Query con los agregados del rango de fechas.
+
+        Args:
+            grupo: Expresiones por las que agrupar (se anteponen a las columnas).
+                   Vacío = una sola fila con el total del período. Al agrupar
+                   solo se devuelven los grupos que tienen citas.
+        """
+        query = db.session.query(*grupo, *IndicadoresService.columnas()).select_from(CitaDiaria).filter(
+            CitaDiaria.fecha >= fecha_inicio,
+            CitaDiaria.fecha <= fecha_fin
+        )
+        if area_id:
+            query = query.filter(CitaDiaria.area_id == area_id)
+        if grupo:
+            query = query.group_by(*grupo).having(func.sum(CitaDiaria.total) > 0)
+        return query
+
+    @staticmethod
+    def periodo(agrupacion):
+        """
+        Inicio del período de CitaDiaria.fecha para agrupar: el día, el lunes
+        de la semana ('semana') o el primer día del mes (cualquier otro
+        valor). PostgreSQL usa date_trunc; SQLite, sus funciones de fecha.
+        """
+        fecha = CitaDiaria.fecha
+        if agrupacion == 'dia':
+            return fecha
+        if db.engine.dialect.name == "sqlite":
+            if agrupacion == 'semana':
+                # El domingo de la semana (o el mismo día) menos 6 días = lunes
+                return func.date(fecha, 'weekday 0', '-6 days')
+            return func.strftime('%Y-%m-01', fecha)
+        return func.date_trunc('week' if agrupacion == 'semana' else 'month', fecha)
+
+    @staticmethod
+    def resumen(fila):
+        """Indicadores derivados de una fila de consulta()."""
+        cupos = fila.cupos_totales or 0
+        return {
+            'utilizacion_capacidad': porcentaje(fila.citas_no_canceladas, cupos),
+            'tasa_inasistencia': porcentaje(fila.no_shows, cupos),
+            'lead_time': promedio(fila.lead_time_promedio),
+            'detalles': {
+                'total_citas': fila.total_citas,
+                'citas_no_canceladas': fila.citas_no_canceladas,
+                'no_shows': fila.no_shows,
+                'atendidas': fila.atendidas,
+                'cupos_totales': cupos
+            }
+        }
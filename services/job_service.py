@@ -0,0 +1,362 @@
+"""
+Trabajos en segundo plano: PDFs, reportes y exportaciones (POST /api/jobs).
+
+Los PDF y exportaciones grandes corren dentro del hilo de la solicitud con
+el timeout de 120 s de gunicorn y ocupan uno de los 8 hilos por worker.
+Como trabajo:
+- POST /api/jobs guarda una fila 'pendiente' en la tabla jobs y responde 202
+- un worker la toma con un UPDATE condicional (estado e intentos sin
+  cambios), así dos workers nunca ejecutan el mismo intento
+- la tarea ejecuta el mismo controlador que el endpoint síncrono, con los
+  parámetros guardados y el usuario que la encoló, y el archivo queda en
+  la fila hasta JOBS_RESULTADO_HORAS (GET /api/jobs/<id>/descarga)
+- errores 5xx y excepciones se reintentan hasta JOBS_MAX_INTENTOS con
+  espera exponencial; los 4xx (parámetros inválidos) fallan sin reintento
+- la reserva del intento (JOBS_TIMEOUT segundos) se renueva mientras la
+  tarea corre, así una tarea larga no se vuelve a ejecutar en paralelo; si
+  el proceso muere deja de renovarse y el trabajo se retoma al vencer
+
+Los ejecuta `python procesar_jobs.py` (hilos y/o procesos). Solo si
+JOBS_HILOS_WEB > 0 (por defecto 0) también hilos propios de cada worker de
+gunicorn que arrancan con el primer uso de /api/jobs.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import current_app, make_response, request
+from sqlalchemy import and_, or_
+from werkzeug.http import parse_options_header
+
+from controllers.cita_controller import CitaController
+from controllers.reporte_controller import ReporteController
+from extensions.database import db
+from models.job_model import Job, PENDIENTE, EN_PROCESO, COMPLETADO, FALLIDO
+from models.usuario_model import Usuario
+from utils import metricas
+
+# tipo -> (controlador que genera el archivo, parámetros requeridos)
+TAREAS = {
+    "citas_confirmadas_pdf": (CitaController.generar_pdf_citas_confirmadas, ("fecha", "area_id")),
+    "reporte_pdf": (ReporteController.exportar_pdf, ()),
+    "citas_export": (CitaController.exportar, ()),
+}
+
+# Candidatos que se intentan tomar por consulta (varios workers compiten por los primeros)
+_CANDIDATOS = 10
+# Cada cuánto trabajar() purga los trabajos vencidos
+_PURGA_SEGUNDOS = 3600
+# Renovaciones de la reserva por cada JOBS_TIMEOUT (cada 200 s con 600 s)
+_RENOVACIONES_POR_RESERVA = 3
+
+
+class ErrorTarea(Exception):
+    """La tarea respondió con un error; los 4xx no se reintentan."""
+
+    def __init__(self, mensaje, reintentar):
+        super().__init__(mensaje)
+        self.reintentar = reintentar
+
+
+class JobService:
+    """Cola de trabajos en la base de datos y sus ejecutores."""
+
+    _hilos_web = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def encolar(tipo, parametros=None, usuario_id=None):
+        """
+        Crea un trabajo pendiente.
+
+        Raises:
+            ValueError: tipo desconocido o parámetros inválidos
+        """
+        if tipo not in TAREAS:
+            raise ValueError(f"Tipo de trabajo no válido. Use: {', '.join(TAREAS)}")
+        parametros = parametros or {}
+        if not isinstance(parametros, dict) or not all(
+            isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in parametros.values()
+        ):
+            raise ValueError("'parametros' debe ser un objeto con valores de texto o números")
+        faltantes = [p for p in TAREAS[tipo][1] if parametros.get(p) in (None, "")]
+        if faltantes:
+            raise ValueError(f"Faltan parámetros: {', '.join(faltantes)}")
+
+        ahora = datetime.utcnow()
+        job = Job(
+            id=str(uuid.uuid4()),
+            tipo=tipo,
+            parametros={k: str(v) for k, v in parametros.items()},
+            estado=PENDIENTE,
+            usuario_id=usuario_id,
+            max_intentos=current_app.config["JOBS_MAX_INTENTOS"],
+            creado_en=ahora,
+            disponible_en=ahora
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def reclamar():
+        """
+        Toma el próximo trabajo disponible (pendiente o con la reserva
+        vencida) y lo marca 'en_proceso'. Retorna el Job o None.
+        """
+        ahora = datetime.utcnow()
+        candidatos = db.session.execute(
+            db.select(Job.id, Job.estado, Job.intentos, Job.max_intentos)
+            .where(or_(
+                and_(Job.estado == PENDIENTE, Job.disponible_en <= ahora),
+                and_(Job.estado == EN_PROCESO, Job.bloqueado_hasta < ahora)
+            ))
+            .order_by(Job.disponible_en)
+            .limit(_CANDIDATOS)
+        ).all()
+
+        for job_id, estado, intentos, max_intentos in candidatos:
+            sin_cambios = (Job.id == job_id, Job.estado == estado, Job.intentos == intentos)
+            if estado == EN_PROCESO and intentos >= max_intentos:
+                # Abandonado en su último intento: no se vuelve a ejecutar
+                db.session.execute(
+                    db.update(Job).where(*sin_cambios).values(
+                        estado=FALLIDO,
+                        error="El proceso que ejecutaba el trabajo se detuvo",
+                        terminado_en=ahora,
+                        expira_en=ahora + timedelta(hours=current_app.config["JOBS_RESULTADO_HORAS"])
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                continue
+
+            tomado = db.session.execute(
+                db.update(Job).where(*sin_cambios).values(
+                    estado=EN_PROCESO,
+                    intentos=intentos + 1,
+                    iniciado_en=ahora,
+                    bloqueado_hasta=ahora + timedelta(seconds=current_app.config["JOBS_TIMEOUT"])
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if tomado:
+                return db.session.get(Job, job_id, populate_existing=True)
+        return None
+
+    @staticmethod
+    def ejecutar_tarea(app, tipo, parametros, usuario_id=None):
+        """
+        Ejecuta el controlador de la tarea como si fuera la solicitud GET
+        original del usuario.
+
+        Returns:
+            (contenido en bytes, nombre del archivo, mimetype)
+        Raises:
+            ErrorTarea: el controlador respondió con un código >= 400
+        """
+        funcion = TAREAS[tipo][0]
+        with app.test_request_context("/", query_string=parametros):
+            usuario = db.session.get(Usuario, usuario_id) if usuario_id else None
+            request.user = usuario.to_dict() if usuario else None
+
+            respuesta = make_response(funcion())
+            if respuesta.status_code >= 400:
+                cuerpo = respuesta.get_json(silent=True) or {}
+                raise ErrorTarea(
+                    cuerpo.get("error") or f"HTTP {respuesta.status_code}",
+                    reintentar=respuesta.status_code >= 500
+                )
+            # send_file responde en modo passthrough; las exportaciones, con un generador
+            respuesta.direct_passthrough = False
+            contenido = respuesta.get_data()
+            respuesta.close()
+
+        nombre = parse_options_header(respuesta.headers.get("Content-Disposition", ""))[1].get("filename")
+        return contenido, nombre or f"{tipo}", respuesta.mimetype
+
+    @staticmethod
+    def procesar_uno(app):
+        """Toma y ejecuta un trabajo. Retorna False si no había ninguno disponible."""
+        with app.app_context():
+            job = JobService.reclamar()
+            if job is None:
+                return False
+            job_id, tipo, parametros, usuario_id, intentos = (
+                job.id, job.tipo, job.parametros, job.usuario_id, job.intentos
+            )
+
+        inicio = time.perf_counter()
+        try:
+            with JobService._renovando_reserva(app, job_id, intentos):
+                contenido, nombre, mimetype = JobService.ejecutar_tarea(app, tipo, parametros, usuario_id)
+        except Exception as e:
+            with app.app_context():
+                resultado = JobService._registrar_error(job_id, intentos, e)
+        else:
+            with app.app_context():
+                resultado = JobService._completar(job_id, intentos, contenido, nombre, mimetype)
+        metricas.TRABAJOS.labels(tipo, resultado).inc()
+        metricas.TRABAJO_DURACION.labels(tipo).observe(time.perf_counter() - inicio)
+        return True
+
+    @staticmethod
+    @contextmanager
+    def _renovando_reserva(app, job_id, intentos):
+        """Renueva bloqueado_hasta en otro hilo mientras dura el bloque."""
+        terminado = threading.Event()
+        hilo = threading.Thread(
+            target=JobService._renovar_reserva, args=(app, job_id, intentos, terminado),
+            name=f"jobs-reserva-{job_id[:8]}", daemon=True
+        )
+        hilo.start()
+        try:
+            yield
+        finally:
+            terminado.set()
+            hilo.join()
+
+    @staticmethod
+    def _renovar_reserva(app, job_id, intentos, terminado):
+        """
+        Extiende la reserva cada JOBS_TIMEOUT / _RENOVACIONES_POR_RESERVA
+        segundos. Termina con la tarea o si el intento ya no es nuestro.
+        """
+        timeout = app.config["JOBS_TIMEOUT"]
+        while not terminado.wait(timeout / _RENOVACIONES_POR_RESERVA):
+            try:
+                with app.app_context():
+                    renovada = JobService._actualizar_intento(
+                        job_id, intentos, bloqueado_hasta=datetime.utcnow() + timedelta(seconds=timeout)
+                    )
+            except Exception as e:
+                # Se reintenta en la próxima vuelta, antes de que venza la reserva
+                print(f"Error al renovar la reserva del trabajo {job_id}: {e}")
+                continue
+            if not renovada:
+                return
+
+    @staticmethod
+    def _actualizar_intento(job_id, intentos, **valores):
+        """UPDATE solo si el intento sigue siendo nuestro (no se retomó por reserva vencida)."""
+        actualizado = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.estado == EN_PROCESO, Job.intentos == intentos)
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return actualizado
+
+    @staticmethod
+    def _completar(job_id, intentos, contenido, nombre, mimetype):
+        ahora = datetime.utcnow()
+        JobService._actualizar_intento(
+            job_id, intentos,
+            estado=COMPLETADO,
+            resultado=contenido,
+            archivo_nombre=nombre,
+            mimetype=mimetype,
+            tamano=len(contenido),
+            error=None,
+            terminado_en=ahora,
+            bloqueado_hasta=None,
+            expira_en=ahora + timedelta(hours=current_app.config["JOBS_RESULTADO_HORAS"])
+        )
+        return COMPLETADO
+
+    @staticmethod
+    def _registrar_error(job_id, intentos, error):
+        ahora = datetime.utcnow()
+        max_intentos = db.session.scalar(db.select(Job.max_intentos).where(Job.id == job_id))
+        reintentar = getattr(error, "reintentar", True) and intentos < (max_intentos or 0)
+        mensaje = str(error) or error.__class__.__name__
+        if not isinstance(error, ErrorTarea):
+            print(f"Error en el trabajo {job_id} (intento {intentos}): {error!r}")
+
+        if reintentar:
+            espera = current_app.config["JOBS_REINTENTO_SEGUNDOS"] * 2 ** (intentos - 1)
+            JobService._actualizar_intento(
+                job_id, intentos,
+                estado=PENDIENTE, error=mensaje, bloqueado_hasta=None,
+                disponible_en=ahora + timedelta(seconds=espera)
+            )
+            return "reintento"
+
+        JobService._actualizar_intento(
+            job_id, intentos,
+            estado=FALLIDO, error=mensaje, bloqueado_hasta=None, terminado_en=ahora,
+            expira_en=ahora + timedelta(hours=current_app.config["JOBS_RESULTADO_HORAS"])
+        )
+        return FALLIDO
+
+    @staticmethod
+    def purgar_expirados():
+        """Borra los trabajos terminados (y sus archivos) ya vencidos. Retorna cuántos."""
+        eliminados = db.session.execute(
+            db.delete(Job).where(Job.expira_en < datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        return eliminados
+
+    @staticmethod
+    def _bucle(app, detener, una_vez=False):
+        intervalo = app.config["JOBS_INTERVALO"]
+        while not detener.is_set():
+            try:
+                procesado = JobService.procesar_uno(app)
+            except Exception as e:
+                # p.ej. la base no responde: se reintenta en el próximo ciclo
+                print(f"Error al tomar trabajos: {e}")
+                procesado = False
+            if not procesado:
+                if una_vez:
+                    return
+                detener.wait(intervalo)
+
+    @staticmethod
+    def trabajar(app, hilos=1, detener=None, una_vez=False):
+        """
+        Procesa trabajos con un pool de `hilos` hasta que se active
+        `detener` (el trabajo en curso termina) o, con una_vez, hasta que
+        la cola quede vacía. Purga los vencidos cada hora.
+        """
+        detener = detener or threading.Event()
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="jobs") as pool:
+            futuros = [pool.submit(JobService._bucle, app, detener, una_vez) for _ in range(hilos)]
+            while not all(f.done() for f in futuros):
+                with app.app_context():
+                    try:
+                        eliminados = JobService.purgar_expirados()
+                        if eliminados:
+                            print(f"Trabajos vencidos purgados: {eliminados}")
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"Error al purgar trabajos: {e}")
+                for _ in range(_PURGA_SEGUNDOS):
+                    if detener.wait(1) or all(f.done() for f in futuros):
+                        break
+
+    @staticmethod
+    def asegurar_hilos(app):
+        """
+        Arranca JOBS_HILOS_WEB hilos de trabajo en este proceso (una vez por
+        worker de gunicorn). Son daemon: al reiniciar el worker, el trabajo
+        en curso se retoma cuando vence su reserva.
+        """
+        cantidad = app.config["JOBS_HILOS_WEB"]
+        if cantidad <= 0:
+            return
+        with JobService._lock:
+            vivos = [h for h in JobService._hilos_web if h.is_alive()]
+            for i in range(len(vivos), cantidad):
+                hilo = threading.Thread(
+                    target=JobService._bucle, args=(app, threading.Event()),
+                    name=f"jobs-web-{i}", daemon=True
+                )
+                hilo.start()
+                vivos.append(hilo)
+            JobService._hilos_web = vivos
@@ -0,0 +1,223 @@
+"""
+Recomendación de área médica a partir de los síntomas.
+
+Orden de consulta:
+1. Caché en memoria por síntomas normalizados (en orden y con las
+   negaciones) + versión del catálogo de áreas
+2. Gemini (GeminiService), con timeout
+3. Clasificador local TF-IDF entrenado con las citas históricas
+   (Cita.sintomas -> Cita.area_id), si Gemini falla, no responde a tiempo
+   o está saturado (429)
+"""
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from config import Config
+from extensions.database import db
+from models.cita_model import Cita
+from services.gemini_services import GeminiService
+from utils.cache import TTLCache
+from utils.texto import normalizar
+
+MAX_CITAS_ENTRENAMIENTO = 5000
+
+STOPWORDS = {
+    "a", "al", "algo", "ante", "con", "de", "del", "desde", "el", "ella", "ellos", "en", "es", "esta",
+    "este", "hace", "hay", "la", "las", "le", "les", "lo", "los", "me", "mi", "mis", "muy", "no", "o",
+    "para", "pero", "por", "que", "se", "sin", "su", "sus", "tiene", "un", "una", "uno", "y", "ya",
+    "paciente", "presenta", "refiere", "dia", "dias", "semana", "semanas", "mes", "meses",
+}
+
+# Se conservan en la clave de caché: "dolor sin fiebre" no es "dolor con fiebre"
+NEGACIONES = {"no", "sin", "ni", "nunca", "jamas", "tampoco", "nada", "ningun", "ninguno", "ninguna", "niega"}
+
+SUFIJOS = sorted([
+    "aciones", "amiento", "imiento", "ciones", "mente", "acion", "ancia", "encia", "ables", "ibles",
+    "able", "ible", "osos", "osas", "ados", "idos", "ando", "iendo", "oso", "osa", "ado", "ido",
+    "es", "as", "os", "ar", "er", "ir", "a", "o", "e", "s",
+], key=len, reverse=True)
+
+# Raíces que suben el nivel de urgencia de una recomendación local
+RAICES_URGENTES = {"sangr", "hemorrag", "convulsion", "desmay", "inconscient", "asfixi", "infart", "fractur"}
+
+
+def _raiz(palabra):
+    """Stemming ligero para español: quita el sufijo más largo si deja 3+ letras."""
+    for sufijo in SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 3:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+
+def tokenizar(texto):
+    """Minúsculas, sin tildes, sin stopwords y con raíces."""
+    return [_raiz(p) for p in re.findall(r"[a-z]+", normalizar(texto)) if p not in STOPWORDS and len(p) > 2]
+
+
+def version_catalogo(areas):
+    """Huella del catálogo de áreas activas; cambia si se edita cualquier área."""
+    contenido = "|".join(
+        f"{a['id']}:{a['nombre']}:{a.get('descripcion') or ''}" for a in sorted(areas, key=lambda a: a['id'])
+    )
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()[:12]
+
+
+def clave_sintomas(sintomas, version):
+    """
+    Clave de caché: la misma secuencia de raíces con el mismo catálogo
+    comparte respuesta. A diferencia de tokenizar(), mantiene el orden y las
+    negaciones, que cambian el área y el nivel de urgencia ("no sangra").
+    """
+    palabras = re.findall(r"[a-z]+", normalizar(sintomas))
+    normalizado = " ".join(
+        p if p in NEGACIONES else _raiz(p)
+        for p in palabras if p in NEGACIONES or (p not in STOPWORDS and len(p) > 2)
+    )
+    return hashlib.sha1(f"{version}|{normalizado}".encode("utf-8")).hexdigest()
+
+
+class ClasificadorSintomas:
+    """
+    Clasificador TF-IDF por centroides: cada área es el promedio normalizado
+    de los vectores de sus citas (más su nombre y descripción, para áreas sin
+    historial) y se elige la de mayor similitud coseno con los síntomas.
+    """
+
+    def __init__(self):
+        self.idf = {}
+        self.centroides = {}
+
+    def _vector(self, tokens):
+        conteo = Counter(t for t in tokens if t in self.idf)
+        vector = {t: (1 + math.log(n)) * self.idf[t] for t, n in conteo.items()}
+        norma = math.sqrt(sum(v * v for v in vector.values()))
+        return {t: v / norma for t, v in vector.items()} if norma else {}
+
+    def entrenar(self, documentos, areas=()):
+        """
+        Args:
+            documentos: iterable de (sintomas, area_id)
+            areas: dicts de áreas (id, nombre, descripcion) candidatas; si se
+                indican, las citas de otras áreas se ignoran
+        """
+        ids_validos = {a['id'] for a in areas}
+        muestras = [
+            (tokenizar(texto), area_id) for texto, area_id in documentos
+            if area_id is not None and (not ids_validos or area_id in ids_validos)
+        ]
+        muestras += [(tokenizar(f"{a['nombre']} {a.get('descripcion') or ''}"), a['id']) for a in areas]
+        muestras = [(tokens, area_id) for tokens, area_id in muestras if tokens]
+
+        frecuencia = Counter(t for tokens, _ in muestras for t in set(tokens))
+        total = len(muestras)
+        self.idf = {t: math.log((total + 1) / (df + 1)) + 1 for t, df in frecuencia.items()}
+
+        sumas = defaultdict(lambda: defaultdict(float))
+        for tokens, area_id in muestras:
+            for t, v in self._vector(tokens).items():
+                sumas[area_id][t] += v
+
+        self.centroides = {}
+        for area_id, suma in sumas.items():
+            norma = math.sqrt(sum(v * v for v in suma.values()))
+            self.centroides[area_id] = {t: v / norma for t, v in suma.items()}
+        return self
+
+    def predecir(self, sintomas, k=3):
+        """Lista de (area_id, puntaje) ordenada de mayor a menor; vacía si no hay coincidencias."""
+        vector = self._vector(tokenizar(sintomas))
+        puntajes = []
+        for area_id, centroide in self.centroides.items():
+            puntaje = sum(v * centroide.get(t, 0.0) for t, v in vector.items())
+            if puntaje > 0:
+                puntajes.append((area_id, puntaje))
+        puntajes.sort(key=lambda p: (-p[1], p[0]))
+        return puntajes[:k]
+
+
+class RecomendacionService:
+    """Recomendación de área con caché y respaldo local."""
+
+    _cache = TTLCache(maxsize=4096, ttl=Config.RECOMENDACION_CACHE_TTL, nombre="recomendacion")
+    _modelo = None  # (version_catalogo, entrenado_en, ClasificadorSintomas)
+    _lock_modelo = threading.Lock()
+
+    @staticmethod
+    def documentos_historicos(limite=MAX_CITAS_ENTRENAMIENTO):
+        """(sintomas, area_id) de las citas más recientes con área asignada."""
+        return db.session.query(Cita.sintomas, Cita.area_id).filter(
+            Cita.area_id.isnot(None)
+        ).order_by(Cita.id.desc()).limit(limite).all()
+
+    @staticmethod
+    def clasificador(areas, version):
+        """Clasificador entrenado para el catálogo actual (se reentrena al cambiar o vencer)."""
+        modelo = RecomendacionService._modelo
+        if modelo and modelo[0] == version and time.time() - modelo[1] < Config.RECOMENDACION_MODELO_TTL:
+            return modelo[2]
+
+        with RecomendacionService._lock_modelo:
+            modelo = RecomendacionService._modelo
+            if modelo and modelo[0] == version and time.time() - modelo[1] < Config.RECOMENDACION_MODELO_TTL:
+                return modelo[2]
+            clasificador = ClasificadorSintomas().entrenar(RecomendacionService.documentos_historicos(), areas)
+            RecomendacionService._modelo = (version, time.time(), clasificador)
+            return clasificador
+
+    @staticmethod
+    def recomendar_local(sintomas, areas, version):
+        """Recomendación del clasificador local, o None si no hay coincidencias."""
+        prediccion = RecomendacionService.clasificador(areas, version).predecir(sintomas, k=1)
+        if not prediccion:
+            return None
+
+        area_id, puntaje = prediccion[0]
+        area = next(a for a in areas if a['id'] == area_id)
+        urgente = any(t.startswith(tuple(RAICES_URGENTES)) for t in tokenizar(sintomas))
+        return {
+            "area_id": area_id,
+            "nombre_area": area['nombre'],
+            "razon": "Sugerencia automática según citas anteriores con síntomas similares "
+                     "(el asistente de IA no está disponible en este momento).",
+            "nivel_urgencia": "alta" if urgente else "media",
+            "confianza": round(puntaje, 3)
+        }
+
+    @staticmethod
+    def recomendar(sintomas, areas):
+        """
+        Recomienda un área para los síntomas entre las áreas activas dadas.
+
+        Returns:
+            dict con area_id, nombre_area, razon, nivel_urgencia y origen
+            ('cache', 'ia' o 'local'); o el dict de error de Gemini si no hay
+            respaldo local posible.
+        """
+        version = version_catalogo(areas)
+        clave = clave_sintomas(sintomas, version)
+
+        en_cache = RecomendacionService._cache.get(clave)
+        if en_cache is not None:
+            return {**en_cache, "origen": "cache"}
+
+        recomendacion = GeminiService.recommend_area(sintomas, areas)
+        ids_validos = {a['id'] for a in areas}
+        if isinstance(recomendacion, dict) and "error" not in recomendacion \
+                and recomendacion.get("area_id") in ids_validos:
+            RecomendacionService._cache.set(clave, recomendacion)
+            return {**recomendacion, "origen": "ia"}
+
+        local = RecomendacionService.recomendar_local(sintomas, areas, version)
+        if local is None:
+            if isinstance(recomendacion, dict) and "error" in recomendacion:
+                return recomendacion
+            return {"error": "No se pudo obtener una recomendación para los síntomas indicados"}
+
+        # TTL corto: cuando Gemini vuelva, la siguiente consulta usará la IA
+        RecomendacionService._cache.set(clave, local, ttl=Config.RECOMENDACION_LOCAL_TTL)
+        return {**local, "origen": "local"}
@@ -0,0 +1,156 @@
+"""
+Estadísticas del módulo de reportes (JSON y PDF).
+
+Los contadores (por estado, por mes y por especialidad) se agrupan en SQL
+sobre la tabla de hechos 'citas_diarias' y el detalle se obtiene con una
+proyección ORDER BY fecha DESC LIMIT 50, de modo que la memoria usada no
+crece con el rango de fechas.
+"""
+
+from sqlalchemy import func, extract
+
+from extensions.database import db
+from models.area_model import Area
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.estado_cita_model import EstadoCita
+from models.paciente_model import Paciente
+from models.persona_model import Persona
+
+MESES = {
+    1: 'Ene', 2: 'Feb', 3: 'Mar', 4: 'Abr', 5: 'May', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dic'
+}
+
+COLORES_ESTADO = {
+    'atendida': '#10b981',
+    'cancelada': '#ef4444',
+    'no_asistio': '#f59e0b',
+    'pendiente': '#6366f1',
+    'confirmada': '#3b82f6',
+    'referido': '#8b5cf6'
+}
+
+LIMITE_DETALLE = 50
+
+
+class ReporteService:
+    """Construcción de las estadísticas de reportes."""
+
+    @staticmethod
+    def _filtrar(query, fecha_inicio, fecha_fin, area_id):
+        query = query.filter(CitaDiaria.fecha >= fecha_inicio, CitaDiaria.fecha <= fecha_fin)
+        if area_id:
+            query = query.filter(CitaDiaria.area_id == area_id)
+        return query
+
+    @staticmethod
+    def conteos_por_estado(fecha_inicio, fecha_fin, area_id=None):
+        """Retorna (total_citas, {estado: cantidad})."""
+        columnas = [func.coalesce(func.sum(CitaDiaria.total), 0)] + [
+            func.coalesce(func.sum(getattr(CitaDiaria, columna)), 0)
+            for columna in CitaDiaria.COLUMNAS_ESTADO.values()
+        ]
+        fila = ReporteService._filtrar(
+            db.session.query(*columnas), fecha_inicio, fecha_fin, area_id
+        ).one()
+
+        return fila[0], dict(zip(CitaDiaria.COLUMNAS_ESTADO.keys(), fila[1:]))
+
+    @staticmethod
+    def atendidas_por_mes(fecha_inicio, fecha_fin, area_id=None):
+        mes = extract('month', CitaDiaria.fecha)
+        filas = ReporteService._filtrar(
+            db.session.query(mes.label('mes'), func.sum(CitaDiaria.atendidas).label('cantidad')),
+            fecha_inicio, fecha_fin, area_id
+        ).group_by(mes).having(func.sum(CitaDiaria.atendidas) > 0).order_by(mes).all()
+
+        return [{"nombre": MESES[int(f.mes)], "cantidad": f.cantidad} for f in filas]
+
+    @staticmethod
+    def por_especialidad(fecha_inicio, fecha_fin, area_id, total_citas):
+        nombre = func.coalesce(Area.nombre, 'General')
+        cantidad = func.sum(CitaDiaria.total)
+        filas = ReporteService._filtrar(
+            db.session.query(nombre.label('nombre'), cantidad.label('cantidad')).select_from(CitaDiaria)
+            .outerjoin(Area, Area.id == CitaDiaria.area_id),
+            fecha_inicio, fecha_fin, area_id
+        ).group_by(nombre).having(cantidad > 0).order_by(cantidad.desc(), nombre).all()
+
+        return [{
+            "nombre": f.nombre,
+            "cantidad": f.cantidad,
+            "porcentaje": round((f.cantidad / total_citas) * 100, 1) if total_citas > 0 else 0
+        } for f in filas]
+
+    @staticmethod
+    def detalle(fecha_inicio, fecha_fin, area_id=None, limite=LIMITE_DETALLE):
+        """Últimas citas del rango (solo las columnas de la tabla del reporte)."""
+        query = db.session.query(
+            Cita.id, Cita.fecha, Persona.nombres, Persona.apellido_paterno,
+            Area.nombre.label('area_nombre'), EstadoCita.nombre.label('estado_nombre')
+        ).select_from(Cita).outerjoin(
+            Paciente, Paciente.id == Cita.paciente_id
+        ).outerjoin(
+            Persona, Persona.id == Paciente.persona_id
+        ).outerjoin(
+            Area, Area.id == Cita.area_id
+        ).outerjoin(
+            EstadoCita, EstadoCita.id == Cita.estado_id
+        ).filter(
+            Cita.fecha >= fecha_inicio,
+            Cita.fecha <= fecha_fin
+        )
+        if area_id:
+            query = query.filter(Cita.area_id == area_id)
+
+        filas = query.order_by(Cita.fecha.desc(), Cita.id.desc()).limit(limite).all()
+
+        return [{
+            "id": f.id,
+            "fecha": str(f.fecha),
+            "paciente": f"{f.nombres} {f.apellido_paterno}" if f.nombres else "Desconocido",
+            "especialidad": f.area_nombre or "General",
+            "estado": f.estado_nombre or "pendiente"
+        } for f in filas]
+
+    @staticmethod
+    def construir_estadisticas(fecha_inicio, fecha_fin, area_id=None):
+        """
+        Estadísticas completas del período, compartidas por el JSON y el PDF.
+
+        Returns:
+            dict con stats, citasAtendidasPorMes, estadoCitas,
+            citasPorEspecialidad y citasDetalle.
+        """
+        total_citas, estado_counts = ReporteService.conteos_por_estado(fecha_inicio, fecha_fin, area_id)
+
+        atendidas = estado_counts.get('atendida', 0)
+        cancelaciones = estado_counts.get('cancelada', 0)
+
+        # Tasa de asistencia: atendidas / citas programadas válidas (total - canceladas)
+        tasa_asistencia = 0
+        citas_validas = total_citas - cancelaciones
+        if citas_validas > 0:
+            tasa_asistencia = round((atendidas / citas_validas) * 100, 1)
+
+        estado_citas = [
+            {
+                "label": estado.capitalize(),
+                "value": cantidad,
+                "color": COLORES_ESTADO.get(estado, '#9ca3af')
+            }
+            for estado, cantidad in estado_counts.items() if cantidad > 0
+        ]
+
+        return {
+            "stats": {
+                "totalCitas": total_citas,
+                "tasaAsistencia": tasa_asistencia,
+                "cancelaciones": cancelaciones
+            },
+            "citasAtendidasPorMes": ReporteService.atendidas_por_mes(fecha_inicio, fecha_fin, area_id),
+            "estadoCitas": estado_citas,
+            "citasPorEspecialidad": ReporteService.por_especialidad(fecha_inicio, fecha_fin, area_id, total_citas),
+            "citasDetalle": ReporteService.detalle(fecha_inicio, fecha_fin, area_id)
+        }
@@ -0,0 +1,140 @@
+"""
+Datos base compartidos por los tests (tests/verify_*.py): estados de cita,
+roles, áreas, médicos, un administrador opcional y pacientes. Cada test
+agrega encima solo sus propias filas (horarios, citas, ...).
+
+    Estados     -> ESTADOS, en ese orden
+    Roles       -> 1 administrador, 2 profesional, 3 asistente
+    Áreas       -> AREAS[:n] (o los nombres indicados)
+    Admin       -> DNI 10000000 ("Admin Prueba .")
+    Médicos     -> DNI 40000000 + i ("Medico <i> .")
+    Pacientes   -> DNI 50000000 + i ("Paciente <i> .")
+
+Con login=True los usuarios tienen la contraseña PASSWORD (si no, un hash
+ficticio: no pueden iniciar sesión).
+
+ContadorConsultas registra las sentencias SQL que un bloque envía a la base.
+
+Uso:
+    from datos import reiniciar_bd, sembrar_base
+
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=2, pacientes=3)
+        ...                        # base.estados["pendiente"], base.medicos[0].id
+        db.session.commit()
+
+    with ContadorConsultas(db.engine) as contador:
+        ...
+    contador.total                 # contador.sentencias: [(sql, parámetros)]
+"""
+
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from extensions.database import db
+from models.area_model import Area
+from models.estado_cita_model import EstadoCita
+from models.paciente_model import Paciente
+from models.persona_model import Persona
+from models.rol_model import Rol
+from models.usuario_model import Usuario
+
+ESTADOS = ["pendiente", "confirmada", "atendida", "cancelada", "no_asistio", "referido"]
+AREAS = ["Medicina General", "Pediatría"]
+PASSWORD = "clave123"
+DNI_ADMIN = "10000000"
+
+
+def dni_medico(i=0):
+    return str(40000000 + i)
+
+
+def dni_paciente(i=0):
+    return str(50000000 + i)
+
+
+def reiniciar_bd():
+    """Tablas vacías (requiere app_context)."""
+    db.drop_all()
+    db.create_all()
+
+
+def sembrar_base(areas=1, medicos=1, pacientes=1, admin=False, login=False):
+    """
+    Inserta los datos base en la sesión y hace flush (los ids quedan
+    disponibles); el commit lo hace el test.
+
+    Args:
+        areas: Cantidad de áreas de AREAS (o lista de nombres)
+        medicos: Cantidad de usuarios con rol profesional
+        pacientes: Cantidad de pacientes
+        admin: Crear también un usuario administrador
+        login: Usuarios con contraseña PASSWORD
+
+    Returns:
+        SimpleNamespace con estados (dict por nombre), areas, admin (o None),
+        medicos y pacientes (listas de modelos)
+    """
+    password = generate_password_hash(PASSWORD) if login else "x"
+    nombres_area = AREAS[:areas] if isinstance(areas, int) else list(areas)
+
+    estados = {nombre: EstadoCita(nombre=nombre) for nombre in ESTADOS}
+    roles = [Rol(id=1, nombre="administrador"), Rol(id=2, nombre="profesional"), Rol(id=3, nombre="asistente")]
+    lista_areas = [Area(nombre=nombre) for nombre in nombres_area]
+    persona_admin = Persona(dni=DNI_ADMIN, nombres="Admin", apellido_paterno="Prueba", apellido_materno=".")
+    personas_medico = [
+        Persona(dni=dni_medico(i), nombres="Medico", apellido_paterno=str(i), apellido_materno=".")
+        for i in range(medicos)
+    ]
+    personas_paciente = [
+        Persona(dni=dni_paciente(i), nombres="Paciente", apellido_paterno=str(i), apellido_materno=".")
+        for i in range(pacientes)
+    ]
+    db.session.add_all([*estados.values(), *roles, *lista_areas, *personas_medico, *personas_paciente])
+    if admin:
+        db.session.add(persona_admin)
+    db.session.flush()
+
+    usuario_admin = Usuario(persona_id=persona_admin.id, password=password, rol_id=1) if admin else None
+    lista_medicos = [Usuario(persona_id=p.id, password=password, rol_id=2) for p in personas_medico]
+    lista_pacientes = [Paciente(persona_id=p.id, estado_civil="S") for p in personas_paciente]
+    db.session.add_all([*lista_medicos, *lista_pacientes])
+    if usuario_admin:
+        db.session.add(usuario_admin)
+    db.session.flush()
+
+    return SimpleNamespace(estados=estados, areas=lista_areas, admin=usuario_admin,
+                           medicos=lista_medicos, pacientes=lista_pacientes)
+
+
+def cliente(app, dni):
+    """Cliente de pruebas con sesión iniciada (usuarios sembrados con login=True)."""
+    client = app.test_client()
+    res = client.post("/api/auth/login", json={"dni": dni, "password": PASSWORD})
+    assert res.status_code == 200, res.get_json()
+    return client
+
+
+class ContadorConsultas:
+    """Sentencias ejecutadas en el engine mientras dura el bloque 'with'."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sentencias = []
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+    def _registrar(self, conn, cursor, sentencia, parametros, context, executemany):
+        self.sentencias.append((sentencia, parametros))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._registrar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._registrar)
@@ -0,0 +1,92 @@
+"""
+Servidor local que imita POST https://apiperu.dev/api/dni para pruebas.
+
+    DNI en PERSONAS  -> 200 {"success": true, "data": {...}}
+    DNI_LENTO        -> tarda más que el timeout de lectura
+    DNI_ERROR        -> 503
+    cualquier otro   -> 200 {"success": false, "message": ...}
+
+Uso:
+    servidor = StubApiPeru()
+    servidor.iniciar()          # servidor.url -> http://127.0.0.1:<puerto>/api/dni
+    ...
+    servidor.detener()
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PERSONAS = {
+    "12345678": {"numero": "12345678", "nombres": "JUAN CARLOS", "apellido_paterno": "PEREZ", "apellido_materno": "QUISPE"},
+    "87654321": {"numero": "87654321", "nombres": "MARIA", "apellido_paterno": "LOPEZ", "apellido_materno": "HUAMAN"},
+}
+DNI_LENTO = "55555555"
+DNI_ERROR = "99999999"
+DEMORA_LENTO = 2
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        longitud = int(self.headers.get("Content-Length", 0))
+        dni = json.loads(self.rfile.read(longitud) or b"{}").get("dni")
+        self.server.consultas.append(dni)
+
+        if dni == DNI_LENTO:
+            time.sleep(DEMORA_LENTO)
+        if dni == DNI_ERROR:
+            self._responder(503, {"success": False, "message": "Servicio no disponible"})
+        elif dni in PERSONAS:
+            self._responder(200, {"success": True, "data": PERSONAS[dni]})
+        else:
+            self._responder(200, {"success": False, "message": "No se encontraron registros"})
+
+    def _responder(self, status, cuerpo):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente cortó por timeout
+
+    def log_message(self, *args):
+        pass
+
+
+class StubApiPeru:
+    def __init__(self, puerto=0):
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", puerto), _Handler)
+        self.servidor.daemon_threads = True
+        self.servidor.consultas = []
+        self._hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.servidor.server_address[1]}/api/dni"
+
+    @property
+    def consultas(self):
+        """DNI recibidos, en orden."""
+        return self.servidor.consultas
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+if __name__ == "__main__":
+    stub = StubApiPeru(puerto=8099).iniciar()
+    print(f"Stub de apiperu.dev escuchando en {stub.url} (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.detener()
@@ -0,0 +1,135 @@
+"""
+Verifica la caché de usuarios autenticados (extensions/jwt_manager.py).
+
+Comprueba que:
+- con la caché caliente, una petición autenticada no ejecuta ninguna
+  consulta SQL para resolver al usuario
+- tras editar al usuario por PUT /api/auth/users/<id> (nombre, rol, activo)
+  la siguiente petición con su token ve los datos nuevos, no los cacheados
+- tras eliminarlo por DELETE /api/auth/users/<id> su token deja de ser
+  aceptado (401)
+- si otro worker modifica al usuario e incrementa la versión 'usuarios' en
+  catalogo_version, este worker deja de usar su copia en cuanto relee las
+  versiones (CATALOGO_VERIFICAR_SEGUNDOS)
+
+Uso:
+    python tests/verify_auth_cache.py
+    python -m pytest -q tests/verify_auth_cache.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'auth_cache.db')}"
+
+from sqlalchemy import text
+
+from factory import create_app
+from extensions.database import db
+from extensions.jwt_manager import usuarios_cache
+from services.catalogo_service import Catalogo
+
+from datos import DNI_ADMIN, ContadorConsultas, cliente, dni_medico, reiniciar_bd, sembrar_base
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(medicos=2, pacientes=0, admin=True, login=True)
+        db.session.commit()
+        return [u.id for u in (base.admin, *base.medicos)]
+
+
+def perfil(app, client):
+    with app.app_context():
+        engine = db.engine
+    with ContadorConsultas(engine) as contador:
+        res = client.get("/api/auth/perfil")
+    return res, contador.sentencias
+
+
+def test_consultas_en_caliente():
+    app = create_app('testing')
+    admin_id, _, _ = preparar_datos(app)
+    usuarios_cache.clear()
+    admin = cliente(app, DNI_ADMIN)
+
+    res, frias = perfil(app, admin)
+    assert res.status_code == 200 and res.get_json()["user"]["id"] == admin_id
+    assert frias, "la primera petición debe cargar al usuario desde la BD"
+
+    for _ in range(2):
+        res, calientes = perfil(app, admin)
+        assert res.status_code == 200 and res.get_json()["user"]["id"] == admin_id
+        assert calientes == [], calientes
+    print(f"✓ Caché fría: {len(frias)} consulta(s); dos peticiones con la caché caliente: 0 consultas")
+
+
+def test_invalidacion():
+    app = create_app('testing')
+    _, medico_id, suplente_id = preparar_datos(app)
+    usuarios_cache.clear()
+    admin = cliente(app, DNI_ADMIN)
+    medico = cliente(app, dni_medico(0))
+    suplente = cliente(app, dni_medico(1))
+
+    # Calentar la caché de los dos usuarios que se van a modificar
+    assert medico.get("/api/auth/admin-only").status_code == 403
+    assert perfil(app, medico)[0].get_json()["user"]["activo"] is True
+    assert perfil(app, suplente)[0].status_code == 200
+
+    res = admin.put(f"/api/auth/users/{medico_id}",
+                    json={"nombres": "Medica", "role": "admin", "activo": False})
+    assert res.status_code == 200, res.get_json()
+
+    usuario = perfil(app, medico)[0].get_json()["user"]
+    assert usuario["activo"] is False and usuario["rol_id"] == 1, usuario
+    assert usuario["persona"]["nombres"] == "Medica", usuario["persona"]
+    assert medico.get("/api/auth/admin-only").status_code == 200
+    print("✓ Usuario editado (nombre, rol, activo): la siguiente petición ve los datos nuevos")
+
+    assert admin.delete(f"/api/auth/users/{suplente_id}").status_code == 200
+    res = suplente.get("/api/auth/perfil")
+    assert res.status_code == 401, res.get_json()
+    print("✓ Usuario eliminado: su token deja de ser aceptado (401)")
+
+
+def test_invalidacion_otro_worker():
+    app = create_app('testing')
+    _, medico_id, _ = preparar_datos(app)
+    usuarios_cache.clear()
+    medico = cliente(app, dni_medico(0))
+    assert perfil(app, medico)[0].get_json()["user"]["persona"]["nombres"] == "Medico"
+
+    # Otro worker edita al usuario: cambia la BD y la versión, no esta caché
+    with app.app_context():
+        db.session.execute(text(
+            "UPDATE personas SET nombres = 'Medica' WHERE id = "
+            "(SELECT persona_id FROM usuarios WHERE id = :id)"), {"id": medico_id})
+        actualizadas = db.session.execute(text(
+            "UPDATE catalogo_version SET version = version + 1 WHERE nombre = 'usuarios'")).rowcount
+        if not actualizadas:
+            db.session.execute(text("INSERT INTO catalogo_version (nombre, version) VALUES ('usuarios', 1)"))
+        db.session.commit()
+
+    res, sentencias = perfil(app, medico)
+    assert res.get_json()["user"]["persona"]["nombres"] == "Medico" and sentencias == []
+
+    # Equivale a que pasen CATALOGO_VERIFICAR_SEGUNDOS desde la última lectura
+    Catalogo._verificado.clear()
+    usuario = perfil(app, medico)[0].get_json()["user"]
+    assert usuario["persona"]["nombres"] == "Medica", usuario["persona"]
+    print("✓ Cambio hecho por otro worker: visible al releer la versión 'usuarios'")
+
+
+if __name__ == "__main__":
+    test_consultas_en_caliente()
+    test_invalidacion()
+    test_invalidacion_otro_worker()
+    print("\nOK: caché de usuarios autenticados verificada")
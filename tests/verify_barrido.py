@@ -0,0 +1,145 @@
+"""
+Verifica el barrido de citas vencidas (services/barrido_citas_service.py).
+
+Comprueba que:
+- confirmadas de días pasados pasan a 'no_asistio' y pendientes vencidas
+  a 'cancelada'; las de hoy y las atendidas no se tocan
+- los días de gracia de pendientes se respetan
+- se trabaja por lotes (un commit por lote) y max_lotes corta la ejecución
+- se registra historial sin usuario (se muestra como "Sistema")
+- ocupación de horarios y tabla de hechos quedan al día
+
+Uso:
+    python tests/verify_barrido.py
+    python -m pytest -q tests/verify_barrido.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'barrido.db')}"
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from factory import create_app
+from extensions.database import db
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.historial_estado_cita_model import HistorialEstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+from services.barrido_citas_service import BarridoCitasService, COMENTARIO
+
+from datos import reiniciar_bd, sembrar_base
+
+HOY = date.today()
+# Citas por (días desde hoy, estado)
+CITAS = {
+    (-3, "confirmada"): 4, (-3, "pendiente"): 3, (-3, "atendida"): 2,
+    (-1, "confirmada"): 3, (-1, "pendiente"): 2,
+    (0, "confirmada"): 2, (0, "pendiente"): 2,
+}
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base()
+        estados, area, medico, paciente = base.estados, base.areas[0], base.medicos[0], base.pacientes[0]
+
+        horarios = {}
+        for dias in {d for d, _ in CITAS}:
+            fecha = HOY + timedelta(days=dias)
+            horarios[dias] = HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=fecha,
+                                           dia_semana=fecha.weekday(), turno="M", cupos=20)
+            db.session.add(horarios[dias])
+        db.session.flush()
+
+        for (dias, estado), cantidad in CITAS.items():
+            h = horarios[dias]
+            db.session.execute(db.insert(Cita), [
+                {"paciente_id": paciente.id, "horario_id": h.id, "doctor_id": medico.id, "area_id": area.id,
+                 "fecha": h.fecha, "sintomas": "Control", "estado_id": estados[estado].id}
+                for _ in range(cantidad)
+            ])
+        HorarioOcupacion.reconstruir()
+        CitaDiaria.reconstruir()
+        db.session.commit()
+
+
+def por_estado(app):
+    """{(días desde hoy, estado): cantidad}"""
+    conteo = {}
+    with app.app_context():
+        for cita in Cita.query.all():
+            clave = ((cita.fecha - HOY).days, cita.estado_nombre)
+            conteo[clave] = conteo.get(clave, 0) + 1
+    return conteo
+
+
+def comprobar_agregados(app, paso):
+    with app.app_context():
+        assert not HorarioOcupacion.verificar(), f"{paso}: ocupación"
+        assert not CitaDiaria.verificar(), f"{paso}: citas_diarias"
+
+
+def test_barrido():
+    app = create_app('testing')
+    preparar_datos(app)
+
+    with app.app_context():
+        assert BarridoCitasService.contar(dias_pendiente=2) == {"confirmada->no_asistio": 7, "pendiente->cancelada": 3}
+    print("✓ Simulación cuenta las citas afectadas")
+
+    # Pendientes con 2 días de gracia: solo las de hace 3 días
+    commits = []
+
+    def contar_commit(session):
+        commits.append(session)
+
+    with app.app_context():
+        event.listen(Session, "after_commit", contar_commit)
+        try:
+            resumen = BarridoCitasService.ejecutar(dias_pendiente=2, lote=3, pausa=0, max_lotes=2)
+            assert resumen == {"confirmada->no_asistio": 6}, resumen
+            resumen = BarridoCitasService.ejecutar(dias_pendiente=2, lote=3, pausa=0)
+        finally:
+            event.remove(Session, "after_commit", contar_commit)
+    assert resumen == {"confirmada->no_asistio": 1, "pendiente->cancelada": 3}, resumen
+    # 2 lotes + 1 de confirmadas + 1 de pendientes (lote lleno: una consulta más, vacía)
+    assert len(commits) == 5, len(commits)
+    comprobar_agregados(app, "barrido con gracia")
+    print("✓ Por lotes (max_lotes y un commit por lote), con días de gracia")
+
+    with app.app_context():
+        resumen = BarridoCitasService.ejecutar(dias_pendiente=0, lote=3, pausa=0)
+    assert resumen == {"confirmada->no_asistio": 0, "pendiente->cancelada": 2}, resumen
+    estados = por_estado(app)
+    assert estados == {
+        (-3, "no_asistio"): 4, (-3, "cancelada"): 3, (-3, "atendida"): 2,
+        (-1, "no_asistio"): 3, (-1, "cancelada"): 2,
+        (0, "confirmada"): 2, (0, "pendiente"): 2,
+    }, estados
+    comprobar_agregados(app, "barrido completo")
+    print("✓ Vencidas cerradas; citas de hoy y atendidas intactas")
+
+    with app.app_context():
+        historial = HistorialEstadoCita.query.all()
+        assert len(historial) == 7 + 5, len(historial)
+        assert all(h.usuario_id is None and h.comentario == COMENTARIO for h in historial)
+        assert historial[0].to_dict()["usuario_nombre"] == "Sistema"
+        assert BarridoCitasService.ejecutar(pausa=0) == {"confirmada->no_asistio": 0, "pendiente->cancelada": 0}
+    print("✓ Historial registrado por 'Sistema'; una segunda ejecución no cambia nada")
+
+
+if __name__ == "__main__":
+    test_barrido()
+    print("OK: barrido de citas vencidas verificado")
@@ -0,0 +1,145 @@
+"""
+Verifica la búsqueda de pacientes (GET /api/pacientes?search=).
+
+Sobre miles de pacientes sembrados comprueba que:
+- los resultados coinciden con un filtro hecho en Python (todas las
+  palabras, sin distinguir mayúsculas ni tildes; prefijo para DNI numérico)
+- el DNI exacto aparece primero y la respuesta mantiene su formato
+- la consulta no recorre completa la tabla 'personas' (EXPLAIN)
+- editar una persona actualiza el texto de búsqueda
+
+Uso:
+    python tests/verify_busqueda.py
+    python -m pytest -q tests/verify_busqueda.py
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'busqueda.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.paciente_controller import PacienteController
+from models.paciente_model import Paciente
+from models.persona_model import Persona
+from services.busqueda_service import BusquedaPersonas
+from utils.texto import normalizar
+
+from datos import ContadorConsultas
+
+NOMBRES = ["José", "María", "Ángel", "Lucía", "Juan", "Rosa", "Iñigo", "Andrés", "Ana", "Luis"]
+APELLIDOS = ["Pérez", "Quispe", "Huamán", "Núñez", "García", "Mamani", "López", "Ramírez", "Flores", "Chávez"]
+PACIENTES = 3000
+
+
+def sembrar(app, semilla=5):
+    rnd = random.Random(semilla)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        BusquedaPersonas.instalar()
+
+        for i in range(PACIENTES):
+            persona = Persona(
+                dni=f"{rnd.randint(10000000, 99999999)}" if i else "45120000",
+                nombres=rnd.choice(NOMBRES), apellido_paterno=rnd.choice(APELLIDOS),
+                apellido_materno=rnd.choice(APELLIDOS)
+            )
+            if Persona.query.filter_by(dni=persona.dni).first():
+                continue
+            db.session.add(persona)
+            db.session.flush()
+            db.session.add(Paciente(persona_id=persona.id, estado_civil="S"))
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+
+
+def esperados(app, termino):
+    """DNIs que deberían coincidir, calculados en Python."""
+    termino = normalizar(termino)
+    with app.app_context():
+        personas = db.session.query(Persona.dni, Persona.nombres, Persona.apellido_paterno, Persona.apellido_materno)\
+            .join(Paciente, Paciente.persona_id == Persona.id).all()
+    if termino.isdigit():
+        return {p.dni for p in personas if p.dni.startswith(termino)}
+    return {
+        p.dni for p in personas
+        if all(palabra in normalizar(" ".join(p)) for palabra in termino.split())
+    }
+
+
+def buscar(app, termino, per_page=100):
+    """Primera página con 'data' de todas las páginas, y las sentencias ejecutadas."""
+    resultado, pagina = None, 1
+    with app.app_context():
+        with ContadorConsultas(db.engine) as contador:
+            while True:
+                with app.test_request_context("/", query_string={"search": termino, "page": pagina,
+                                                                 "per_page": per_page}):
+                    respuesta, status = PacienteController.listar()
+                assert status == 200, respuesta.get_json()
+                datos = respuesta.get_json()
+                if resultado is None:
+                    resultado = datos
+                else:
+                    resultado["data"] += datos["data"]
+                if pagina >= datos["pages"]:
+                    break
+                pagina += 1
+    return resultado, contador.sentencias
+
+
+def recorridos_completos(app, sentencias):
+    """Pasos del plan que recorren completa la tabla 'personas' (solo SQLite)."""
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            return []
+        conexion = db.session.connection()
+        pasos = []
+        for sentencia, parametros in sentencias:
+            for fila in conexion.exec_driver_sql("EXPLAIN QUERY PLAN " + sentencia, parametros):
+                if re.match(r"SCAN personas( |$)", fila[-1]):
+                    pasos.append(fila[-1])
+        return pasos
+
+
+def test_busqueda_pacientes():
+    app = create_app('testing')
+    sembrar(app)
+
+    for termino in ["4512", "45120000", "jose", "PEREZ quispe", "nunez huaman", "ANGEL", "ñu", "an flo", "xyz"]:
+        datos, sentencias = buscar(app, termino)
+        encontrados = {p["dni"] for p in datos["data"]}
+        assert encontrados == esperados(app, termino), f"'{termino}': {len(encontrados)} vs {len(esperados(app, termino))}"
+        assert datos["total"] == len(encontrados)
+        assert {"total", "pages", "current_page", "per_page", "data"} <= set(datos)
+        pasos = recorridos_completos(app, sentencias)
+        assert not pasos, f"'{termino}': {pasos}"
+        print(f"✓ '{termino}': {len(encontrados)} pacientes, sin recorrer 'personas'")
+
+    datos, _ = buscar(app, "45120000")
+    assert datos["data"][0]["dni"] == "45120000"
+    print("✓ DNI exacto primero")
+
+    with app.app_context():
+        persona = Persona.query.filter_by(dni="45120000").first()
+        persona.apellido_paterno = "Zúñiga"
+        db.session.commit()
+    datos, _ = buscar(app, "zuniga")
+    assert [p["dni"] for p in datos["data"]] == ["45120000"], datos["data"]
+    print("✓ Editar una persona actualiza la búsqueda")
+
+
+if __name__ == "__main__":
+    test_busqueda_pacientes()
+    print("OK: búsqueda de pacientes verificada")
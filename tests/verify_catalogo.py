@@ -0,0 +1,110 @@
+"""
+Verifica la caché de catálogos (services/catalogo_service.py).
+
+Comprueba que:
+- los catálogos se cargan una vez y luego se sirven sin consultar la BD
+- /api/catalogos/* envía ETag y Cache-Control y responde 304 si no cambió
+- editar un área invalida la copia local al instante
+- un cambio hecho por otro worker (versión incrementada en BD) se detecta
+  tras CATALOGO_VERIFICAR_SEGUNDOS
+- los filtros por estado de GET /api/citas usan estado_id del catálogo
+
+Uso:
+    python tests/verify_catalogo.py
+    python -m pytest -q tests/verify_catalogo.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["CATALOGO_VERIFICAR_SEGUNDOS"] = "1"
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'catalogo.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.area_controller import AreaController
+from controllers.cita_controller import CitaController
+from models.area_model import Area
+from models.catalogo_version_model import CatalogoVersion
+from models.cita_model import Cita
+from services.catalogo_service import Catalogo
+
+from datos import ContadorConsultas, reiniciar_bd, sembrar_base
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(medicos=0)
+        estados, area, paciente = base.estados, base.areas[0], base.pacientes[0]
+        estados["referido"].activo = False
+        for nombre in ["pendiente", "confirmada", "confirmada", "cancelada"]:
+            db.session.add(Cita(paciente_id=paciente.id, area_id=area.id, fecha=date.today(),
+                                sintomas="Control", estado_id=estados[nombre].id))
+        db.session.commit()
+        return area.id
+
+
+def contar_consultas(app, funcion):
+    with app.app_context():
+        with ContadorConsultas(db.engine) as contador:
+            funcion()
+    return contador.total
+
+
+def test_catalogo():
+    app = create_app('testing')
+    area_id = preparar_datos(app)
+    cliente = app.test_client()
+
+    contar_consultas(app, lambda: Catalogo.lista("estados"))
+    assert contar_consultas(app, lambda: [Catalogo.id_de("estados", "pendiente") for _ in range(100)]) == 0
+    print("✓ Catálogo servido desde memoria")
+
+    respuesta = cliente.get("/api/catalogos/estados-cita")
+    assert respuesta.status_code == 200 and len(respuesta.get_json()) == 5
+    etag = respuesta.headers["ETag"]
+    assert "max-age" in respuesta.headers["Cache-Control"]
+    respuesta = cliente.get("/api/catalogos/estados-cita", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 304 and not respuesta.data
+    print("✓ ETag y 304 en /api/catalogos")
+
+    etag_areas = cliente.get("/api/catalogos/areas").headers["ETag"]
+    with app.test_request_context("/", method="PUT"):
+        _, status = AreaController.update(area_id, {"nombre": "Medicina Interna"})
+        assert status == 200
+    respuesta = cliente.get("/api/catalogos/areas", headers={"If-None-Match": etag_areas})
+    assert respuesta.status_code == 200 and respuesta.get_json()[0]["nombre"] == "Medicina Interna"
+    print("✓ Editar un área invalida la caché local")
+
+    # Otro worker: cambia el área y sube la versión directamente en BD
+    with app.app_context():
+        db.session.execute(db.update(Area).where(Area.id == area_id).values(nombre="Cardiología"))
+        db.session.execute(db.update(CatalogoVersion).where(CatalogoVersion.nombre == "areas")
+                           .values(version=CatalogoVersion.version + 1))
+        db.session.commit()
+        assert Catalogo.por_id("areas", area_id)["nombre"] == "Medicina Interna"
+        time.sleep(1.1)
+        assert Catalogo.por_id("areas", area_id)["nombre"] == "Cardiología"
+    print("✓ Cambio de otro worker detectado por versión")
+
+    for estado, esperadas in [("confirmada", 2), ("cancelada", 1), ("referido", 0), ("inexistente", 0)]:
+        with app.test_request_context("/", query_string={"estado": estado, "per_page": 50}):
+            respuesta, status = CitaController.listar()
+        datos = respuesta.get_json()
+        assert status == 200 and datos["total"] == esperadas, (estado, datos["total"])
+        assert all(c["estado"] == estado for c in datos["data"])
+    print("✓ Filtro por estado_id en GET /api/citas")
+
+
+if __name__ == "__main__":
+    test_catalogo()
+    print("OK: caché de catálogos verificada")
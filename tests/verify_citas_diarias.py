@@ -0,0 +1,105 @@
+"""
+Verifica que la tabla de hechos 'citas_diarias' se mantiene al día.
+
+Recorre los flujos que la modifican (horarios mensuales, cambio de cupos y
+de área, registro, cambio de estado, reasignación y eliminación de citas)
+y después de cada paso compara la tabla con un recálculo completo desde
+citas y horarios.
+
+Uso:
+    python tests/verify_citas_diarias.py
+    python -m pytest -q tests/verify_citas_diarias.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'citas_diarias.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from controllers.horario_controller import HorarioController
+from models.cita_diaria_model import CitaDiaria
+from models.horario_medico_model import HorarioMedico
+
+from datos import reiniciar_bd, sembrar_base
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, pacientes=5)
+        db.session.commit()
+        return base.medicos[0].id, [a.id for a in base.areas], [p.id for p in base.pacientes]
+
+
+def llamar(app, funcion, json=None, url="/"):
+    with app.test_request_context(url, method="POST", json=json):
+        respuesta, status = funcion()
+        assert status in (200, 201), respuesta.get_json()
+        return respuesta.get_json()
+
+
+def comprobar(app, paso):
+    with app.app_context():
+        diferencias = CitaDiaria.verificar()
+    assert not diferencias, f"{paso}: {diferencias[:3]}"
+    print(f"✓ {paso}")
+
+
+def test_citas_diarias_incremental():
+    app = create_app('testing')
+    medico_id, (area_1, area_2), paciente_ids = preparar_datos(app)
+
+    fecha = date.today() + timedelta(days=1)
+    llamar(app, HorarioController.create_horarios_mensuales, {
+        "medico_id": medico_id, "area_id": area_1, "mes": fecha.strftime("%Y-%m"),
+        "dias_seleccionados": [str(fecha)],
+        "turnos": {"manana": {"activo": True, "cupos": 10}, "tarde": {"activo": True, "cupos": 4}}
+    })
+    comprobar(app, "horarios mensuales")
+
+    with app.app_context():
+        horario_m = HorarioMedico.query.filter_by(turno='M').first().id
+        horario_t = HorarioMedico.query.filter_by(turno='T').first().id
+
+    citas = []
+    for i, paciente_id in enumerate(paciente_ids):
+        datos = llamar(app, CitaController.crear, {
+            "paciente_id": paciente_id, "horario_id": horario_m if i % 2 == 0 else horario_t,
+            "fecha": str(fecha), "sintomas": "Control"
+        })
+        citas.append(datos["data"]["id"])
+    comprobar(app, "registro de citas")
+
+    for cita_id, estado in zip(citas, ["confirmada", "cancelada", "atendida", "no_asistio"]):
+        llamar(app, lambda: CitaController.actualizar(cita_id), {"estado": estado})
+    llamar(app, lambda: CitaController.actualizar(citas[1]), {"estado": "pendiente"})
+    comprobar(app, "cambios de estado")
+
+    llamar(app, lambda: CitaController.actualizar(citas[0]), {"area_id": area_2, "estado": "atendida"})
+    comprobar(app, "reasignación de área")
+
+    llamar(app, lambda: CitaController.eliminar(citas[4]))
+    comprobar(app, "eliminación de cita")
+
+    llamar(app, lambda: HorarioController.update_horario(horario_m), {"cupos": 12, "area_id": area_2})
+    comprobar(app, "cambio de cupos y área del horario")
+
+    with app.app_context():
+        cupos = db.session.query(db.func.sum(CitaDiaria.cupos)).scalar()
+        total = db.session.query(db.func.sum(CitaDiaria.total)).scalar()
+    assert cupos == 16 and total == 4, (cupos, total)
+
+
+if __name__ == "__main__":
+    test_citas_diarias_incremental()
+    print("OK: citas_diarias consistente")
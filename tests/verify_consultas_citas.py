@@ -0,0 +1,107 @@
+"""
+Verifica que los listados de citas no generen consultas N+1.
+
+Cuenta las sentencias SQL emitidas por cada endpoint y comprueba que el
+número es el mismo con 10 y con 100 citas por página.
+
+Uso:
+    python tests/verify_consultas_citas.py
+    python -m pytest -q tests/verify_consultas_citas.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'consultas.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from controllers.dashboard_controller import get_upcoming_appointments
+from controllers.paciente_controller import PacienteController
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+from models.persona_model import Persona
+
+from datos import ContadorConsultas, reiniciar_bd, sembrar_base
+
+TOTAL_CITAS = 150
+MAX_CONSULTAS = 4
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        # Cada paciente concentra dos citas para probar el historial
+        base = sembrar_base(medicos=3, pacientes=TOTAL_CITAS // 2)
+        estados, area = base.estados, base.areas[0]
+        for estado in estados.values():
+            estado.color = "blue"
+
+        fecha = date.today() + timedelta(days=1)
+        medicos = []
+        for medico in base.medicos:
+            horario = HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=fecha,
+                                    dia_semana=fecha.weekday(), turno='M', cupos=TOTAL_CITAS)
+            db.session.add(horario)
+            medicos.append((medico, horario))
+        db.session.flush()
+
+        for i in range(TOTAL_CITAS):
+            acompanante = Persona(dni=f"{60000000 + i}", nombres="Acomp", apellido_paterno=str(i), apellido_materno=".")
+            db.session.add(acompanante)
+            db.session.flush()
+            paciente = base.pacientes[i // 2]
+            medico, horario = medicos[i % len(medicos)]
+            db.session.add(Cita(
+                paciente_id=paciente.id, horario_id=horario.id, doctor_id=medico.id, area_id=area.id,
+                fecha=fecha, sintomas="Control", acompanante_persona_id=acompanante.id,
+                estado_id=estados["confirmada" if i % 3 else "pendiente"].id
+            ))
+
+        db.session.commit()
+        return str(fecha), area.id, base.pacientes[0].id
+
+
+def contar_consultas(app, url, funcion):
+    with app.test_request_context(url):
+        # Primera llamada sin contar: carga los catálogos en memoria
+        funcion()
+        db.session.remove()
+        with ContadorConsultas(db.engine) as contador:
+            respuesta = funcion()
+        status = respuesta[1] if isinstance(respuesta, tuple) else 200
+        assert status == 200, respuesta
+        return contador.total
+
+
+def test_consultas_acotadas_por_pagina():
+    app = create_app('testing')
+    fecha, area_id, paciente_id = preparar_datos(app)
+
+    casos = {
+        "listar": lambda n: (f"/?per_page={n}", CitaController.listar),
+        "listar_cursor": lambda n: (f"/?per_page={n}&cursor=", CitaController.listar),
+        "confirmadas": lambda n: (f"/?fecha={fecha}&area_id={area_id}", CitaController.obtener_citas_confirmadas_para_impresion),
+        "historial_paciente": lambda n: (f"/?per_page={n}", lambda: PacienteController.obtener_historial_citas(paciente_id)),
+        "proximas": lambda n: ("/", lambda: get_upcoming_appointments()),
+        "detalle": lambda n: ("/", lambda: CitaController.obtener(n)),
+    }
+
+    for nombre, caso in casos.items():
+        conteos = [contar_consultas(app, *caso(n)) for n in (10, 100)]
+        print(f"{nombre:20} consultas con 10 filas: {conteos[0]} | con 100 filas: {conteos[1]}")
+        assert conteos[0] == conteos[1], f"{nombre}: las consultas crecen con el tamaño de página"
+        assert conteos[1] <= MAX_CONSULTAS, f"{nombre}: demasiadas consultas ({conteos[1]})"
+
+
+if __name__ == "__main__":
+    test_consultas_acotadas_por_pagina()
+    print("OK: consultas acotadas")
@@ -0,0 +1,131 @@
+"""
+Verifica el resumen del dashboard (GET /api/dashboard/summary).
+
+Comprueba que:
+- el resumen coincide con /stats, /upcoming-appointments y
+  /appointments-by-specialty
+- se calcula con pocas consultas y la segunda llamada sale de la caché
+- los médicos no comparten sus próximas citas
+- registrar o cambiar el estado de una cita invalida la caché al hacer commit
+
+Uso:
+    python tests/verify_dashboard.py
+    python -m pytest -q tests/verify_dashboard.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'dashboard.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from controllers.dashboard_controller import (
+    get_appointments_by_specialty_today, get_dashboard_stats, get_dashboard_summary, get_upcoming_appointments
+)
+from controllers.horario_controller import HorarioController
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+from services.dashboard_service import DashboardService
+
+from datos import ContadorConsultas, reiniciar_bd, sembrar_base
+
+MAX_CONSULTAS = 4
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=2, pacientes=6)
+        db.session.commit()
+        return [m.id for m in base.medicos], [a.id for a in base.areas], [p.id for p in base.pacientes]
+
+
+def llamar(app, funcion, json=None):
+    with app.test_request_context("/", method="POST", json=json):
+        respuesta, status = funcion()
+        assert status in (200, 201), respuesta.get_json()
+        return respuesta.get_json()
+
+
+def resumen(app, rol_id=1, user_id=1):
+    """Resumen y número de consultas ejecutadas."""
+    with app.app_context():
+        with ContadorConsultas(db.engine) as contador:
+            datos = get_dashboard_summary(rol_id, user_id)
+    return datos, contador.total
+
+
+def test_resumen_dashboard():
+    app = create_app('testing')
+    medico_ids, area_ids, paciente_ids = preparar_datos(app)
+    DashboardService.invalidar()
+
+    hoy = date.today()
+    for medico_id, area_id in zip(medico_ids, area_ids):
+        llamar(app, HorarioController.create_horarios_mensuales, {
+            "medico_id": medico_id, "area_id": area_id, "mes": hoy.strftime("%Y-%m"),
+            "dias_seleccionados": [str(hoy)], "turnos": {"manana": {"activo": True, "cupos": 10}}
+        })
+    with app.app_context():
+        horarios = [HorarioMedico.query.filter_by(medico_id=m).first().id for m in medico_ids]
+
+    citas = []
+    for i, paciente_id in enumerate(paciente_ids):
+        datos = llamar(app, CitaController.crear, {
+            "paciente_id": paciente_id, "horario_id": horarios[i % 2], "fecha": str(hoy), "sintomas": "Control"
+        })
+        citas.append(datos["data"]["id"])
+    for cita_id in citas[:3]:
+        llamar(app, lambda: CitaController.actualizar(cita_id), {"estado": "confirmada"})
+
+    datos, consultas = resumen(app)
+    with app.app_context():
+        assert datos["stats"] == get_dashboard_stats(), datos["stats"]
+        assert datos["appointmentsBySpecialty"] == get_appointments_by_specialty_today()
+        assert datos["upcomingAppointments"] == get_upcoming_appointments(1, 1)
+    assert datos["stats"]["citasHoy"] == 6 and datos["stats"]["citasPendientesHoy"] == 3, datos["stats"]
+    assert consultas <= MAX_CONSULTAS, consultas
+    print(f"✓ Resumen igual a los endpoints individuales ({consultas} consultas)")
+
+    _, consultas = resumen(app)
+    assert consultas == 0, consultas
+    print("✓ Segunda llamada servida desde la caché")
+
+    propias = {}
+    for medico_id in medico_ids:
+        datos, _ = resumen(app, rol_id=2, user_id=medico_id)
+        propias[medico_id] = {c["id"] for c in datos["upcomingAppointments"]}
+    assert propias[medico_ids[0]] and not propias[medico_ids[0]] & propias[medico_ids[1]], propias
+    print("✓ Cada médico ve solo sus citas confirmadas")
+
+    llamar(app, lambda: CitaController.actualizar(citas[3]), {"estado": "confirmada"})
+    datos, consultas = resumen(app)
+    assert consultas > 0 and datos["stats"]["citasPendientesHoy"] == 2, datos["stats"]
+    datos, _ = resumen(app, rol_id=2, user_id=medico_ids[1])
+    assert citas[3] in {c["id"] for c in datos["upcomingAppointments"]}
+    print("✓ Cambiar el estado de una cita invalida la caché")
+
+    resumen(app)
+    with app.app_context():
+        # Cambio registrado en la tabla de hechos pero revertido
+        cita = db.session.get(Cita, citas[4])
+        CitaDiaria.registrar_cambio(CitaDiaria.aporte(cita), None)
+        db.session.rollback()
+    _, consultas = resumen(app)
+    assert consultas == 0, consultas
+    print("✓ Cambios revertidos no invalidan la caché")
+
+
+if __name__ == "__main__":
+    test_resumen_dashboard()
+    print("OK: resumen del dashboard verificado")
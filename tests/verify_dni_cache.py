@@ -0,0 +1,116 @@
+"""
+Verifica la caché de consultas de DNI (DniService) contra un servidor local
+que imita apiperu.dev (tests/stub_api_peru.py).
+
+Comprueba que:
+- la segunda consulta de un DNI no llega a la API (memoria)
+- tras vaciar la memoria se responde desde la tabla 'dni_cache'
+- un DNI no encontrado se guarda como caché negativa
+- los timeouts y los 5xx no se guardan
+- una entrada vencida vuelve a consultarse
+- guardar en caché no confirma ni descarta el trabajo pendiente en la
+  sesión de quien llama
+
+Uso:
+    python tests/verify_dni_cache.py
+    python -m pytest -q tests/verify_dni_cache.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_api_peru import StubApiPeru, DNI_LENTO, DNI_ERROR
+
+# La URL y los timeouts se leen al importar config: definirlos antes
+_stub = StubApiPeru()
+os.environ["API_PERU_DEV_URL"] = _stub.url
+os.environ["DNI_API_TIMEOUT_LECTURA"] = "0.5"
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'dni_cache.db')}"
+
+from factory import create_app
+from extensions.database import db
+from models.dni_cache_model import DniCache
+from models.persona_model import Persona
+from services.api_dni_services import DniService
+
+
+def test_dni_cache():
+    app = create_app('testing')
+    _stub.iniciar()
+    try:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            DniService._memoria.clear()
+
+            primera = DniService.buscar("12345678")
+            assert primera["success"] and primera["origen"] == "api", primera
+            assert primera["data"]["nombres"] == "JUAN CARLOS"
+
+            segunda = DniService.buscar("12345678")
+            assert segunda["origen"] == "cache" and segunda["data"] == primera["data"]
+            assert _stub.consultas.count("12345678") == 1
+            print("✓ Segunda consulta servida desde memoria")
+
+            DniService._memoria.clear()
+            tercera = DniService.buscar("12345678")
+            assert tercera["success"] and tercera["origen"] == "cache"
+            assert _stub.consultas.count("12345678") == 1
+            print("✓ Tras vaciar la memoria se usa la tabla dni_cache")
+
+            for _ in range(3):
+                no_encontrado = DniService.buscar("11111111")
+                assert not no_encontrado["success"]
+            assert _stub.consultas.count("11111111") == 1
+            registro = db.session.get(DniCache, "11111111")
+            assert registro and not registro.encontrado
+            assert registro.expira_en < datetime.utcnow() + timedelta(days=2)
+            print("✓ DNI no encontrado guardado como caché negativa")
+
+            for dni in (DNI_LENTO, DNI_ERROR):
+                for _ in range(2):
+                    resultado = DniService.buscar(dni)
+                    assert not resultado.get("success") and resultado.get("transitorio"), resultado
+                assert _stub.consultas.count(dni) == 2, _stub.consultas
+                assert db.session.get(DniCache, dni) is None
+            print("✓ Timeouts y errores 5xx no se guardan")
+
+            registro = db.session.get(DniCache, "12345678")
+            registro.expira_en = datetime.utcnow() - timedelta(minutes=1)
+            db.session.commit()
+            DniService._memoria.clear()
+            renovado = DniService.buscar("12345678")
+            assert renovado["origen"] == "api" and _stub.consultas.count("12345678") == 2
+            assert db.session.get(DniCache, "12345678", populate_existing=True).vigente
+            print("✓ Entrada vencida vuelve a consultarse")
+
+            registro = db.session.get(DniCache, "11111111")
+            registro.expira_en = datetime.utcnow() - timedelta(minutes=1)
+            db.session.commit()
+            assert DniService.purgar_expirados() == 1
+            print("✓ Purga de entradas vencidas")
+
+            # Trabajo pendiente de quien llama: la caché no lo confirma
+            pendiente = Persona(dni="70000000", nombres="Pendiente", apellido_paterno=".", apellido_materno=".")
+            db.session.add(pendiente)
+            DniService._memoria.clear()
+            nuevo = DniService.buscar("22222222")
+            assert nuevo["origen"] == "api" and pendiente in db.session.new
+            db.session.rollback()
+            assert Persona.query.filter_by(dni="70000000").first() is None
+            assert db.session.get(DniCache, "22222222") is not None
+            print("✓ Guardar en caché no confirma la transacción de quien llama")
+    finally:
+        _stub.detener()
+
+
+if __name__ == "__main__":
+    test_dni_cache()
+    print("OK: caché de DNI verificada")
@@ -0,0 +1,157 @@
+"""
+Verifica el cambio de estado masivo (POST /api/citas/estado/bulk).
+
+Sobre 5,000 citas de un día comprueba que:
+- confirmar miles de citas ejecuta un número fijo de sentencias (el mismo
+  que con 50 citas)
+- se registra una fila de historial por cita cambiada
+- ocupación de horarios y tabla de hechos diaria quedan igual que un
+  recálculo completo
+- por ids informa citas sin cambio y no encontradas
+- reactivar canceladas respeta los cupos del horario
+
+Uso:
+    python tests/verify_estado_masivo.py
+    python -m pytest -q tests/verify_estado_masivo.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'estado_masivo.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.estado_cita_model import EstadoCita
+from models.historial_estado_cita_model import HistorialEstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+
+from datos import ContadorConsultas, reiniciar_bd, sembrar_base
+
+CITAS = 5000
+MAX_SENTENCIAS = 10
+
+
+def preparar_datos(app, fecha):
+    """Dos áreas (un médico cada una) con un horario por turno y CITAS citas pendientes repartidas."""
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=2)
+        estados, areas, paciente = base.estados, base.areas, base.pacientes[0]
+
+        horarios = []
+        for area, medico in zip(areas, base.medicos):
+            for turno in "MT":
+                horario = HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=fecha,
+                                        dia_semana=fecha.weekday(), turno=turno, cupos=CITAS)
+                db.session.add(horario)
+                horarios.append(horario)
+        db.session.flush()
+
+        db.session.execute(db.insert(Cita), [
+            {"paciente_id": paciente.id, "horario_id": h.id, "doctor_id": h.medico_id, "area_id": h.area_id,
+             "fecha": fecha, "sintomas": "Control", "estado_id": estados["pendiente"].id}
+            for i in range(CITAS) for h in [horarios[i % len(horarios)]]
+        ])
+        HorarioOcupacion.reconstruir()
+        CitaDiaria.reconstruir()
+        db.session.commit()
+        return [a.id for a in areas], [h.id for h in horarios]
+
+
+def cambiar(app, payload):
+    """Respuesta y número de sentencias SQL ejecutadas."""
+    with app.test_request_context("/", method="POST", json=payload):
+        db.session.remove()
+        with ContadorConsultas(db.engine) as contador:
+            respuesta, status = CitaController.cambiar_estado_masivo()
+    return respuesta.get_json(), status, [sentencia for sentencia, _ in contador.sentencias]
+
+
+def comprobar_agregados(app, paso):
+    with app.app_context():
+        assert not HorarioOcupacion.verificar(), f"{paso}: ocupación"
+        assert not CitaDiaria.verificar(), f"{paso}: citas_diarias"
+
+
+def test_estado_masivo():
+    app = create_app('testing')
+    fecha = date.today() + timedelta(days=1)
+    (area_1, area_2), horarios = preparar_datos(app, fecha)
+
+    # Mismas sentencias con 50 citas que con las 4,950 restantes (catálogos ya cargados)
+    with app.app_context():
+        ids = [c.id for c in Cita.query.order_by(Cita.id)]
+    cambiar(app, {"estado": "pendiente", "ids": []})
+    datos, status, pocas = cambiar(app, {"estado": "confirmada", "ids": ids[:50]})
+    assert status == 200 and datos["resumen"] == {"actualizada": 50}, datos.get("resumen", datos)
+    datos, status, sentencias = cambiar(app, {"estado": "confirmada", "ids": ids[50:]})
+    assert status == 200, datos
+    assert datos["resumen"] == {"actualizada": CITAS - 50}, datos["resumen"]
+    print(f"Sentencias con 50 citas: {len(pocas)} | con {CITAS - 50}: {len(sentencias)}")
+    assert len(sentencias) == len(pocas) <= MAX_SENTENCIAS, [s[:60] for s in sentencias]
+    print(f"✓ {CITAS - 50} citas confirmadas con {len(sentencias)} sentencias")
+
+    with app.app_context():
+        confirmada_id = EstadoCita.query.filter_by(nombre="confirmada").first().id
+        assert Cita.query.filter(Cita.estado_id != confirmada_id).count() == 0
+        assert HistorialEstadoCita.query.filter_by(estado_nuevo_id=confirmada_id).count() == CITAS
+    comprobar_agregados(app, "confirmación")
+    print("✓ Historial, ocupación y tabla de hechos al día")
+
+    datos, status, _ = cambiar(app, {
+        "estado": "no_asistio", "filtro": {"fecha": str(fecha), "area_id": area_2, "turno": "T", "estado": ["confirmada"]}
+    })
+    assert status == 200 and datos["resumen"] == {"actualizada": CITAS // 4}, datos["resumen"]
+    comprobar_agregados(app, "inasistencias")
+    print("✓ Filtro por área, turno y estado actual")
+
+    with app.app_context():
+        ids = [c.id for c in Cita.query.filter_by(horario_id=horarios[0]).order_by(Cita.id).limit(3)]
+    datos, status, _ = cambiar(app, {"estado": "confirmada", "ids": ids + [999999]})
+    assert [r["resultado"] for r in datos["resultados"]] == ["sin_cambio"] * 3 + ["no_encontrada"], datos
+    print("✓ Resultado por id (sin cambio, no encontrada)")
+
+    # Cancelar 10 citas, reducir los cupos y reactivarlas: no caben
+    with app.app_context():
+        ids = [c.id for c in Cita.query.filter_by(horario_id=horarios[0]).order_by(Cita.id).limit(10)]
+    cambiar(app, {"estado": "cancelada", "ids": ids})
+    with app.app_context():
+        horario = db.session.get(HorarioMedico, horarios[0])
+        horario.cupos = HorarioOcupacion.ocupados(horario.id) + 5
+        CitaDiaria.recalcular_cupos(horario.medico_id, fecha, fecha)
+        db.session.commit()
+    datos, status, _ = cambiar(app, {"estado": "pendiente", "ids": ids})
+    assert datos["resumen"] == {"sin_cupo": 10}, datos["resumen"]
+    comprobar_agregados(app, "reactivación sin cupo")
+    with app.app_context():
+        horario = db.session.get(HorarioMedico, horarios[0])
+        horario.cupos += 5
+        CitaDiaria.recalcular_cupos(horario.medico_id, fecha, fecha)
+        db.session.commit()
+    datos, status, _ = cambiar(app, {"estado": "pendiente", "ids": ids})
+    assert datos["resumen"] == {"actualizada": 10}, datos["resumen"]
+    comprobar_agregados(app, "reactivación")
+    print("✓ Reactivar canceladas respeta los cupos")
+
+    _, status, _ = cambiar(app, {"estado": "inexistente", "ids": [1]})
+    assert status == 400
+    _, status, _ = cambiar(app, {"estado": "confirmada", "filtro": {"area_id": area_1}})
+    assert status == 400
+    print("✓ Validaciones (estado y filtro sin fecha)")
+
+
+if __name__ == "__main__":
+    test_estado_masivo()
+    print("OK: cambio de estado masivo verificado")
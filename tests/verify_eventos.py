@@ -0,0 +1,173 @@
+"""
+Verifica el stream de eventos en vivo (GET /api/events) con el broker local.
+
+Abre conexiones SSE en hilos y comprueba que:
+- registrar, cambiar de estado y eliminar citas publica los eventos de la
+  cita y los cupos disponibles del horario
+- una transacción revertida (registro sin cupo) no publica nada
+- los filtros por área y tipo se respetan
+- los cambios de horarios publican sus eventos
+- se rechazan conexiones por encima de EVENTOS_MAX_CONEXIONES
+
+Uso:
+    python tests/verify_eventos.py
+    python -m pytest -q tests/verify_eventos.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'eventos.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from controllers.evento_controller import EventoController
+from controllers.horario_controller import HorarioController
+from models.horario_medico_model import HorarioMedico
+from services.eventos_service import Eventos
+
+from datos import reiniciar_bd, sembrar_base
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, pacientes=3)
+        db.session.commit()
+        return base.medicos[0].id, [a.id for a in base.areas], [p.id for p in base.pacientes]
+
+
+def llamar(app, funcion, json=None, esperado=(200, 201)):
+    with app.test_request_context("/", method="POST", json=json):
+        respuesta, status = funcion()
+        assert status in esperado, respuesta.get_json()
+        return respuesta.get_json()
+
+
+class Oyente:
+    """Conexión SSE leída en un hilo."""
+
+    def __init__(self, app, query_string=None):
+        with app.test_request_context("/api/events", query_string=query_string or {}):
+            self.respuesta = EventoController.stream()
+        self.eventos = []
+        self.cerrada = False
+        self.hilo = threading.Thread(target=self._leer, daemon=True)
+        self.hilo.start()
+        self.esperar(lambda: any(e["tipo"] == "conectado" for e in self.eventos))
+
+    def _leer(self):
+        generador = self.respuesta.response
+        for fragmento in generador:
+            if self.cerrada:
+                # Como el servidor al fallar la escritura: cerrar desde el mismo hilo
+                generador.close()
+                return
+            for bloque in fragmento.strip().split("\n\n"):
+                datos = [linea[6:] for linea in bloque.split("\n") if linea.startswith("data: ")]
+                if datos:
+                    self.eventos.append(json.loads(datos[0]))
+
+    def esperar(self, condicion, timeout=5):
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if condicion():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def tipos(self):
+        return [e["tipo"] for e in self.eventos if e["tipo"] != "conectado"]
+
+    def cerrar(self):
+        # El hilo lo detecta con el siguiente ': ping' (EVENTOS_KEEPALIVE)
+        self.cerrada = True
+        self.hilo.join(timeout=5)
+
+
+def test_eventos_en_vivo():
+    app = create_app('testing')
+    app.config.update(EVENTOS_KEEPALIVE=1, EVENTOS_DURACION_MAX=30, EVENTOS_MAX_CONEXIONES=3)
+    medico_id, (area_1, area_2), paciente_ids = preparar_datos(app)
+
+    fecha = date.today() + timedelta(days=1)
+    llamar(app, HorarioController.create_horarios_mensuales, {
+        "medico_id": medico_id, "area_id": area_1, "mes": fecha.strftime("%Y-%m"),
+        "dias_seleccionados": [str(fecha)], "turnos": {"manana": {"activo": True, "cupos": 2}}
+    })
+    with app.app_context():
+        horario_id = HorarioMedico.query.filter_by(turno='M').first().id
+
+    todos = Oyente(app)
+    otra_area = Oyente(app, {"area_id": area_2})
+    solo_cupos = Oyente(app, {"tipos": "horario.cupos", "area_id": area_1})
+
+    citas = []
+    for paciente_id in paciente_ids[:2]:
+        datos = llamar(app, CitaController.crear, {
+            "paciente_id": paciente_id, "horario_id": horario_id, "fecha": str(fecha), "sintomas": "Control"
+        })
+        citas.append(datos["data"]["id"])
+    assert todos.esperar(lambda: len(todos.tipos()) == 4), todos.eventos
+    assert todos.tipos() == ["cita.creada", "horario.cupos"] * 2, todos.tipos()
+    creada, cupos = todos.eventos[1], todos.eventos[-1]
+    assert creada["id"] == citas[0] and creada["estado"] == "pendiente" and creada["area_id"] == area_1, creada
+    assert cupos["horario_id"] == horario_id and cupos["cupos_disponibles"] == 0, cupos
+    print("✓ Registro de citas publica la cita y los cupos disponibles")
+
+    llamar(app, CitaController.crear, {
+        "paciente_id": paciente_ids[2], "horario_id": horario_id, "fecha": str(fecha), "sintomas": "Control"
+    }, esperado=(400,))
+    llamar(app, lambda: CitaController.actualizar(citas[0]), {"estado": "cancelada"})
+    assert todos.esperar(lambda: len(todos.tipos()) == 6)
+    estado, cupos = todos.eventos[-2:]
+    assert estado["tipo"] == "cita.estado" and estado["estado"] == "cancelada" and estado["estado_anterior"] == "pendiente", estado
+    assert cupos["cupos_disponibles"] == 1, cupos
+    print("✓ Registro rechazado no publica eventos; el cambio de estado sí")
+
+    llamar(app, lambda: CitaController.eliminar(citas[1]))
+    assert todos.esperar(lambda: len(todos.tipos()) == 8)
+    assert todos.tipos()[-2:] == ["cita.eliminada", "horario.cupos"] and todos.eventos[-1]["cupos_disponibles"] == 2
+    print("✓ Eliminar una cita publica el cupo liberado")
+
+    with app.test_request_context("/", method="PUT", json={"cupos": 5}):
+        _, status = HorarioController.update_horario(horario_id)
+        assert status == 200
+    llamar(app, HorarioController.create_horarios_mensuales, {
+        "medico_id": medico_id, "area_id": area_1, "mes": fecha.strftime("%Y-%m"),
+        "dias_seleccionados": [str(fecha)], "turnos": {"tarde": {"activo": True, "cupos": 3}}
+    })
+    assert todos.esperar(lambda: len(todos.tipos()) == 10)
+    assert todos.tipos()[-2:] == ["horario.cupos", "horarios.actualizados"], todos.tipos()
+    assert todos.eventos[-2]["cupos_disponibles"] == 5
+    print("✓ Cambios de horarios publican eventos")
+
+    time.sleep(0.2)
+    assert otra_area.tipos() == [], otra_area.tipos()
+    assert set(solo_cupos.tipos()) == {"horario.cupos"} and len(solo_cupos.tipos()) == 5, solo_cupos.tipos()
+    print("✓ Filtros por área y tipo")
+
+    with app.test_request_context("/api/events"):
+        respuesta = EventoController.stream()
+    assert isinstance(respuesta, tuple) and respuesta[1] == 503, respuesta
+    for oyente in (todos, otra_area, solo_cupos):
+        oyente.cerrar()
+    with app.app_context():
+        assert Eventos.broker().conexiones() == 0
+    print("✓ Límite de conexiones por worker y liberación al cerrar")
+
+
+if __name__ == "__main__":
+    test_eventos_en_vivo()
+    print("OK: eventos en vivo verificados")
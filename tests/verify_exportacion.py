@@ -0,0 +1,146 @@
+"""
+Verifica la exportación de citas (GET /api/citas/export, services/export_service.py).
+
+Comprueba que:
+- el CSV y el XLSX tienen tantas filas como el total del listado
+  (GET /api/citas) con los mismos filtros
+- un profesional solo exporta sus citas en los estados que puede ver
+  (un administrador, todas, también al filtrar por nombre de área)
+- un formato no soportado responde 400
+- los síntomas que empiezan con '=', '+', '-' o '@' se exportan como texto
+  (con apóstrofo), no como fórmula
+
+Uso:
+    python tests/verify_exportacion.py
+    python -m pytest -q tests/verify_exportacion.py
+"""
+
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'exportacion.db')}"
+
+from openpyxl import load_workbook
+
+from factory import create_app
+from extensions.database import db
+from models.cita_model import Cita
+from models.estado_cita_model import EstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.persona_model import Persona
+from models.usuario_model import Usuario
+
+from datos import DNI_ADMIN, ESTADOS, cliente, dni_medico, reiniciar_bd, sembrar_base
+
+FECHAS = [date.today() + timedelta(days=d) for d in (-1, 0, 1)]
+FORMULAS = ['=HYPERLINK("http://ejemplo.com","clic")', "@SUM(1,2)", "+51 999", "-2+3"]
+
+
+def preparar_datos(app):
+    rnd = random.Random(5)
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=2, admin=True, login=True)
+        estados, areas, paciente = base.estados, base.areas, base.pacientes[0]
+        medico, otro = base.medicos
+
+        horarios = []
+        for fecha in FECHAS:
+            for doctor, area in [(medico, areas[0]), (otro, areas[1])]:
+                for turno in ("M", "T"):
+                    horarios.append(HorarioMedico(medico_id=doctor.id, area_id=area.id, fecha=fecha,
+                                                  dia_semana=fecha.weekday(), turno=turno, cupos=20))
+        db.session.add_all(horarios)
+        db.session.flush()
+
+        for i in range(90):
+            horario = rnd.choice(horarios)
+            db.session.add(Cita(
+                paciente_id=paciente.id, horario_id=horario.id, doctor_id=horario.medico_id,
+                area_id=horario.area_id, fecha=horario.fecha,
+                sintomas=FORMULAS[i] if i < len(FORMULAS) else "Control",
+                estado_id=estados[rnd.choice(ESTADOS)].id
+            ))
+        db.session.commit()
+        return [a.id for a in areas]
+
+
+def filas_csv(res):
+    assert res.status_code == 200, res.status_code
+    texto = res.get_data(as_text=True)
+    assert texto.startswith("﻿")
+    return list(csv.reader(io.StringIO(texto[1:])))[1:]
+
+
+def filas_xlsx(res):
+    assert res.status_code == 200, res.status_code
+    hoja = load_workbook(io.BytesIO(res.data), read_only=True).active
+    return [list(fila) for fila in hoja.iter_rows(min_row=2, values_only=True)]
+
+
+def test_exportacion():
+    app = create_app('testing')
+    area_ids = preparar_datos(app)
+    filtros = [
+        {}, {"fecha": str(FECHAS[1])}, {"area_id": area_ids[0]}, {"estado": "atendida"},
+        {"turno": "T"}, {"area_id": area_ids[1], "estado": "confirmada"}, {"fecha": str(FECHAS[0]), "turno": "M"},
+        {"area": "Pediatr"},
+    ]
+
+    for nombre, client in [("admin", cliente(app, DNI_ADMIN)), ("profesional", cliente(app, dni_medico()))]:
+        for filtro in filtros:
+            total = client.get("/api/citas/", query_string={**filtro, "per_page": 1}).get_json()["total"]
+            # Cada respuesta en streaming se lee antes de pedir la siguiente
+            csv_filas = filas_csv(client.get("/api/citas/export", query_string={**filtro, "format": "csv"}))
+            xlsx_filas = filas_xlsx(client.get("/api/citas/export", query_string={**filtro, "format": "xlsx"}))
+            assert len(csv_filas) == len(xlsx_filas) == total, (nombre, filtro, total, len(csv_filas), len(xlsx_filas))
+
+            if nombre == "profesional":
+                # Columna 'Médico' y 'Estado': solo sus citas y los estados visibles
+                assert {f[7] for f in csv_filas} <= {"Medico 0 ."}, filtro
+                assert not {f[8] for f in csv_filas} & {"pendiente", "cancelada"}, filtro
+        print(f"✓ {nombre}: CSV y XLSX con las mismas filas que el listado en {len(filtros)} combinaciones de filtros")
+
+    with app.app_context():
+        visibles = Cita.query.filter(
+            Cita.doctor_id == Usuario.query.join(Persona).filter(Persona.dni == dni_medico()).one().id,
+            Cita.estado_id.in_(db.session.query(EstadoCita.id).filter(
+                EstadoCita.nombre.in_(["confirmada", "atendida", "no_asistio", "referido"])))
+        ).count()
+    profesional = cliente(app, dni_medico())
+    assert len(filas_csv(profesional.get("/api/citas/export?format=csv"))) == visibles
+    print(f"✓ El profesional exporta solo sus {visibles} citas visibles")
+
+    # El filtro por nombre de área no restringe los estados de un administrador
+    admin = cliente(app, DNI_ADMIN)
+    with app.app_context():
+        pediatria = Cita.query.filter_by(area_id=area_ids[1]).count()
+    assert len(filas_csv(admin.get("/api/citas/export?format=csv&area=Pediatr"))) == pediatria
+    print(f"✓ Administrador por nombre de área: las {pediatria} citas en todos los estados")
+
+    res = admin.get("/api/citas/export?format=pdf")
+    assert res.status_code == 400 and "Formato" in res.get_json()["error"]
+    assert app.test_client().get("/api/citas/export").status_code == 401
+    print("✓ Formato no soportado rechazado (400)")
+
+    sintomas_csv = {f[9] for f in filas_csv(admin.get("/api/citas/export?format=csv"))}
+    celdas = [c for fila in filas_xlsx(admin.get("/api/citas/export?format=xlsx")) for c in fila]
+    for formula in FORMULAS:
+        assert "'" + formula in sintomas_csv and formula not in sintomas_csv, formula
+        assert "'" + formula in celdas and formula not in celdas, formula
+    print("✓ Celdas que empiezan con =, +, - o @ exportadas como texto")
+
+
+if __name__ == "__main__":
+    test_exportacion()
+    print("\nOK: exportación de citas verificada")
@@ -0,0 +1,171 @@
+"""
+Verifica la generación masiva de horarios (POST /api/horarios/bulk).
+
+Comprueba que:
+- 50 médicos x 3 meses (lunes a viernes, dos turnos) se crean con a lo
+  sumo MAX_SENTENCIAS sentencias, sin importar la cantidad de horarios (el
+  tiempo solo se informa: depende de la máquina)
+- repetir la misma solicitud no escribe nada (todo 'sin_cambio')
+- no se bajan cupos por debajo de las citas activas (conflictos) y el
+  resto de cambios sí se aplica
+- turnos y días por médico, y la tabla de hechos queda al día
+- POST /api/horarios/mensual usa el mismo UPSERT
+
+Uso:
+    python tests/verify_horarios_masivos.py
+    python -m pytest -q tests/verify_horarios_masivos.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'horarios_masivos.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.horario_controller import HorarioController
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.estado_cita_model import EstadoCita
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+
+from datos import ContadorConsultas, reiniciar_bd, sembrar_base
+
+MEDICOS = 50
+MAX_SENTENCIAS = 10
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=MEDICOS)
+        db.session.commit()
+        return [m.id for m in base.medicos], [a.id for a in base.areas], base.pacientes[0].id
+
+
+def proximos_meses(n):
+    primero = date.today().replace(day=1)
+    meses = []
+    for _ in range(n):
+        primero = (primero + timedelta(days=32)).replace(day=1)
+        meses.append(primero.strftime("%Y-%m"))
+    return meses
+
+
+def llamar(app, funcion, payload):
+    """Respuesta, status, sentencias SQL y segundos."""
+    with app.test_request_context("/", method="POST", json=payload):
+        db.session.remove()
+        with ContadorConsultas(db.engine) as contador:
+            inicio = time.perf_counter()
+            respuesta, status = funcion()
+            segundos = time.perf_counter() - inicio
+    return respuesta.get_json(), status, contador.total, segundos
+
+
+def test_horarios_masivos():
+    app = create_app('testing')
+    medico_ids, (area_1, area_2), paciente_id = preparar_datos(app)
+    meses = proximos_meses(3)
+    turnos = {"manana": {"activo": True, "cupos": 10}, "tarde": {"activo": True, "cupos": 8}}
+    payload = {
+        "meses": meses,
+        "turnos": turnos,
+        "medicos": [{"medico_id": m, "area_id": area_1 if i % 2 else area_2} for i, m in enumerate(medico_ids)]
+    }
+    # Días hábiles de los tres meses
+    esperados = sum(
+        1 for mes in meses for d in range(1, 32)
+        for f in [_fecha(mes, d)] if f and f.weekday() < 5
+    ) * 2 * MEDICOS
+
+    datos, status, sentencias, segundos = llamar(app, HorarioController.create_horarios_masivos, payload)
+    assert status == 200, datos
+    assert datos["resumen"] == {"creados": esperados, "actualizados": 0, "sin_cambio": 0, "conflictos": 0}, datos["resumen"]
+    assert sentencias <= MAX_SENTENCIAS, sentencias
+    with app.app_context():
+        assert HorarioMedico.query.count() == esperados
+        assert not CitaDiaria.verificar()
+    print(f"✓ {MEDICOS} médicos x 3 meses: {esperados} horarios con {sentencias} sentencias ({segundos:.3f}s)")
+
+    datos, status, sentencias, _ = llamar(app, HorarioController.create_horarios_masivos, payload)
+    assert datos["resumen"] == {"creados": 0, "actualizados": 0, "sin_cambio": esperados, "conflictos": 0}, datos["resumen"]
+    assert sentencias <= 3, sentencias
+    print(f"✓ Solicitud repetida sin escrituras ({sentencias} sentencias)")
+
+    # 3 citas activas en un horario del primer médico; bajar sus cupos a 2 no se permite
+    with app.app_context():
+        horario = HorarioMedico.query.filter_by(medico_id=medico_ids[0], turno="M").order_by(HorarioMedico.fecha).first()
+        horario_id, fecha = horario.id, horario.fecha
+        estado_id = EstadoCita.query.filter_by(nombre="pendiente").first().id
+        db.session.execute(db.insert(Cita), [
+            {"paciente_id": paciente_id, "horario_id": horario.id, "doctor_id": horario.medico_id,
+             "area_id": horario.area_id, "fecha": horario.fecha, "sintomas": "Control", "estado_id": estado_id}
+            for _ in range(3)
+        ])
+        HorarioOcupacion.reconstruir()
+        CitaDiaria.reconstruir()
+        db.session.commit()
+
+    datos, status, _, _ = llamar(app, HorarioController.create_horarios_masivos, {
+        "meses": meses[:1],
+        "medicos": [{"medico_id": medico_ids[0], "area_id": area_2,
+                     "turnos": {"manana": {"activo": True, "cupos": 2}}, "dias_semana": [fecha.weekday()]}]
+    })
+    assert status == 200 and datos["resumen"]["conflictos"] == 1, datos
+    conflicto = datos["conflictos"][0]
+    assert conflicto["horario_id"] == horario_id and conflicto["ocupados"] == 3 and conflicto["cupos"] == 2, conflicto
+    mismo_dia = [f for d in range(1, 32) for f in [_fecha(meses[0], d)] if f and f.weekday() == fecha.weekday()]
+    assert datos["resumen"]["creados"] == 0 and datos["resumen"]["actualizados"] == len(mismo_dia) - 1, datos["resumen"]
+    with app.app_context():
+        assert db.session.get(HorarioMedico, horario_id).cupos == 10
+        otros = HorarioMedico.query.filter(
+            HorarioMedico.medico_id == medico_ids[0], HorarioMedico.turno == "M",
+            HorarioMedico.fecha.in_(mismo_dia), HorarioMedico.id != horario_id
+        ).all()
+        assert len(otros) == len(mismo_dia) - 1 and all(h.cupos == 2 and h.area_id == area_2 for h in otros)
+        assert not CitaDiaria.verificar()
+    print("✓ Cupos por debajo de las citas activas informados como conflicto; el resto aplicado")
+
+    with app.test_request_context("/", method="POST", json={
+        "medico_id": medico_ids[0], "area_id": area_2, "mes": meses[0],
+        "dias_seleccionados": [str(fecha)], "turnos": {"manana": {"activo": True, "cupos": 3}}
+    }):
+        respuesta, status = HorarioController.create_horarios_mensuales()
+    datos = respuesta.get_json()
+    assert status == 201 and datos["actualizados"] == 1 and "conflictos" not in datos, datos
+    with app.app_context():
+        horario = db.session.get(HorarioMedico, horario_id)
+        assert horario.cupos == 3 and horario.area_id == area_2
+        assert not CitaDiaria.verificar()
+    print("✓ /mensual usa el mismo UPSERT (cupos iguales a las citas activas permitidos)")
+
+    _, status, _, _ = llamar(app, HorarioController.create_horarios_masivos, dict(payload, meses=["2025-13"]))
+    assert status == 400
+    _, status, _, _ = llamar(app, HorarioController.create_horarios_masivos, dict(
+        payload, medicos=[{"medico_id": 99999, "area_id": area_1}]
+    ))
+    assert status == 400
+    print("✓ Validaciones (mes inválido, médico inexistente)")
+
+
+def _fecha(mes, dia):
+    year, month = map(int, mes.split("-"))
+    try:
+        return date(year, month, dia)
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    test_horarios_masivos()
+    print("OK: generación masiva de horarios verificada")
@@ -0,0 +1,153 @@
+"""
+Verifica la cabecera Idempotency-Key en POST /api/citas y POST /api/pacientes.
+
+Comprueba que:
+- varias solicitudes simultáneas con la misma clave crean una sola cita
+  (y consumen un solo cupo); todas reciben la misma respuesta
+- un reintento posterior devuelve la respuesta guardada sin ejecutar nada
+- la misma clave con otro cuerpo se rechaza (422)
+- las claves de citas y pacientes son independientes
+- una respuesta 5xx libera la clave para reintentar
+- las claves vencidas se purgan y pueden volver a usarse
+
+Uso:
+    python tests/verify_idempotencia.py
+    python -m pytest -q tests/verify_idempotencia.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'idempotencia.db')}"
+
+from flask import jsonify
+
+from factory import create_app
+from extensions.database import db
+from middleware.idempotencia_middleware import idempotente
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+from models.horario_ocupacion_model import HorarioOcupacion
+from models.idempotencia_model import ClaveIdempotencia
+from services.idempotencia_service import IdempotenciaService
+
+from datos import reiniciar_bd, sembrar_base
+
+SIMULTANEAS = 8
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base()
+        area, medico, paciente = base.areas[0], base.medicos[0], base.pacientes[0]
+
+        fecha = date.today() + timedelta(days=1)
+        horario = HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=fecha,
+                                dia_semana=fecha.weekday(), turno="M", cupos=5)
+        db.session.add(horario)
+        db.session.flush()
+        CitaDiaria.recalcular_cupos(medico.id, fecha, fecha)
+        db.session.commit()
+        return horario.id, str(fecha), paciente.id
+
+
+def test_idempotencia():
+    app = create_app('testing')
+    llamadas = []
+
+    @app.post("/prueba-idempotencia")
+    @idempotente("prueba")
+    def prueba():
+        # Falla la primera vez (5xx), luego responde
+        llamadas.append(1)
+        if len(llamadas) == 1:
+            return jsonify({"error": "Fallo temporal"}), 500
+        return jsonify({"llamada": len(llamadas)}), 201
+
+    horario_id, fecha, paciente_id = preparar_datos(app)
+    cita = {"paciente_id": paciente_id, "horario_id": horario_id, "fecha": fecha, "sintomas": "Tos"}
+
+    # Solicitudes simultáneas con la misma clave (reintentos del frontend)
+    barrera = threading.Barrier(SIMULTANEAS)
+    respuestas = []
+    lock = threading.Lock()
+
+    def enviar():
+        client = app.test_client()
+        barrera.wait()
+        res = client.post("/api/citas/", json=cita, headers={"Idempotency-Key": "cita-1"})
+        with lock:
+            respuestas.append(res)
+
+    hilos = [threading.Thread(target=enviar) for _ in range(SIMULTANEAS)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert {r.status_code for r in respuestas} == {201}, [(r.status_code, r.get_json()) for r in respuestas]
+    ids = {r.get_json()["data"]["id"] for r in respuestas}
+    repetidas = sum(1 for r in respuestas if r.headers.get("Idempotent-Replayed") == "true")
+    with app.app_context():
+        assert Cita.query.count() == 1 and HorarioOcupacion.ocupados(horario_id) == 1
+    assert len(ids) == 1 and repetidas == SIMULTANEAS - 1, (ids, repetidas)
+    print(f"✓ {SIMULTANEAS} solicitudes simultáneas con la misma clave: una cita, {repetidas} respuestas repetidas")
+
+    client = app.test_client()
+    res = client.post("/api/citas/", json=cita, headers={"Idempotency-Key": "cita-1"})
+    assert res.status_code == 201 and res.headers.get("Idempotent-Replayed") == "true"
+    assert res.get_json() == respuestas[0].get_json()
+    res = client.post("/api/citas/", json=dict(cita, sintomas="Fiebre"), headers={"Idempotency-Key": "cita-1"})
+    assert res.status_code == 422, res.get_json()
+    with app.app_context():
+        assert Cita.query.count() == 1
+    print("✓ Reintento posterior repetido; otro cuerpo con la misma clave rechazado")
+
+    paciente = {
+        "dni": "60000000", "nombres": "Ana", "apellido_paterno": "Ríos", "apellido_materno": "Paz",
+        "fecha_nacimiento": "1990-01-01", "sexo": "F", "estado_civil": "S", "direccion": "Jr. Lima 1"
+    }
+    primera = client.post("/api/pacientes/", json=paciente, headers={"Idempotency-Key": "cita-1"})
+    segunda = client.post("/api/pacientes/", json=paciente, headers={"Idempotency-Key": "cita-1"})
+    assert primera.status_code == 201 and primera.get_json()["is_new"], primera.get_json()
+    assert segunda.status_code == 201 and segunda.get_json() == primera.get_json()
+    assert "Idempotent-Replayed" not in primera.headers and segunda.headers["Idempotent-Replayed"] == "true"
+    sin_clave = client.post("/api/pacientes/", json=paciente)
+    assert sin_clave.status_code == 200 and not sin_clave.get_json()["is_new"]
+    print("✓ Claves independientes por endpoint; sin cabecera se procesa como siempre")
+
+    # Una respuesta 5xx libera la clave
+    assert client.post("/prueba-idempotencia", json={}, headers={"Idempotency-Key": "k"}).status_code == 500
+    res = client.post("/prueba-idempotencia", json={}, headers={"Idempotency-Key": "k"})
+    assert res.status_code == 201 and res.get_json() == {"llamada": 2}
+    assert client.post("/prueba-idempotencia", json={}, headers={"Idempotency-Key": "k"}).get_json() == {"llamada": 2}
+    print("✓ Respuesta 5xx libera la clave")
+
+    with app.app_context():
+        db.session.execute(
+            db.update(ClaveIdempotencia).where(ClaveIdempotencia.alcance == "citas.crear")
+            .values(expira_en=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.session.commit()
+        assert IdempotenciaService.purgar_expirados() == 1
+        assert ClaveIdempotencia.query.count() == 2
+    res = client.post("/api/citas/", json=cita, headers={"Idempotency-Key": "cita-1"})
+    assert res.status_code == 201 and "Idempotent-Replayed" not in res.headers
+    with app.app_context():
+        assert Cita.query.count() == 2
+    print("✓ Claves vencidas purgadas y reutilizables")
+
+
+if __name__ == "__main__":
+    test_idempotencia()
+    print("OK: claves de idempotencia verificadas")
@@ -0,0 +1,110 @@
+"""
+Verifica los indicadores por período (GET /api/indicadores/por-periodo,
+IndicadoresService.periodo) contra un reconteo en Python.
+
+Comprueba que, con agrupación por día, semana (lunes) y mes:
+- responde 200 en SQLite (date_trunc solo existe en PostgreSQL)
+- cada período empieza en el día, el lunes o el primer día del mes y sus
+  totales de citas y cupos coinciden con el reconteo
+- los períodos salen en orden y solo los que tienen citas
+
+Uso:
+    python tests/verify_indicadores.py
+    python -m pytest -q tests/verify_indicadores.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'indicadores.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.indicador_controller import IndicadorController
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+
+from datos import ESTADOS, reiniciar_bd, sembrar_base
+
+INICIO = date(2025, 1, 27)  # lunes; el rango cruza fin de mes y de semana
+FIN = date(2025, 3, 9)      # domingo
+CUPOS = 6
+
+
+def preparar_datos(app):
+    """Horarios en días al azar del rango (y fuera de él) con citas en estados al azar."""
+    rnd = random.Random(7)
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=2, pacientes=3)
+
+        horarios = []
+        for dias in rnd.sample(range(-10, (FIN - INICIO).days + 10), 30):
+            fecha = INICIO + timedelta(days=dias)
+            medico, area = rnd.choice(list(zip(base.medicos, base.areas)))
+            horarios.append(HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=fecha,
+                                          dia_semana=fecha.weekday(), turno="M", cupos=CUPOS))
+        db.session.add_all(horarios)
+        db.session.flush()
+
+        for h in horarios:
+            for _ in range(rnd.randint(1, CUPOS)):
+                db.session.add(Cita(
+                    paciente_id=rnd.choice(base.pacientes).id, horario_id=h.id, doctor_id=h.medico_id,
+                    area_id=h.area_id, fecha=h.fecha, sintomas="Control",
+                    estado_id=base.estados[rnd.choice(ESTADOS)].id
+                ))
+        db.session.flush()
+        CitaDiaria.reconstruir()
+        db.session.commit()
+
+
+def inicio_periodo(fecha, agrupacion):
+    if agrupacion == "dia":
+        return fecha
+    if agrupacion == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    return fecha.replace(day=1)
+
+
+def test_por_periodo():
+    app = create_app('testing')
+    preparar_datos(app)
+
+    with app.app_context():
+        citas = [c.fecha for c in Cita.query.all() if INICIO <= c.fecha <= FIN]
+        cupos = [(h.fecha, h.cupos) for h in HorarioMedico.query.all() if INICIO <= h.fecha <= FIN]
+
+    for agrupacion in ["dia", "semana", "mes"]:
+        url = f"/?fecha_inicio={INICIO}&fecha_fin={FIN}&agrupacion={agrupacion}"
+        with app.test_request_context(url):
+            respuesta, status = IndicadorController.obtener_indicadores_por_periodo()
+        datos = respuesta.get_json()
+        assert status == 200, datos
+
+        totales = Counter(inicio_periodo(f, agrupacion) for f in citas)
+        cupos_periodo = Counter()
+        for fecha, n in cupos:
+            cupos_periodo[inicio_periodo(fecha, agrupacion)] += n
+
+        obtenido = [
+            (d["periodo"], d["detalles"]["total_citas"], d["detalles"]["cupos_totales"]) for d in datos["datos"]
+        ]
+        esperado = [(str(p), totales[p], cupos_periodo[p]) for p in sorted(totales)]
+        assert obtenido == esperado, (agrupacion, obtenido, esperado)
+        print(f"✓ Por {agrupacion}: {len(obtenido)} períodos, {sum(totales.values())} citas = reconteo")
+
+
+if __name__ == "__main__":
+    test_por_periodo()
+    print("\nOK: indicadores por período verificados")
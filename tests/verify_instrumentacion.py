@@ -0,0 +1,164 @@
+"""
+Verifica la instrumentación por solicitud (utils/instrumentacion.py).
+
+Comprueba que:
+- cada respuesta lleva Server-Timing con el número de consultas y el
+  tiempo en BD, y el conteo coincide con un listener independiente
+- se escribe una línea JSON por solicitud con las sentencias más lentas
+- las sentencias sobre SQL_LENTA_MS se registran con su SQL sin parámetros
+  y el endpoint, también fuera de una solicitud
+- el tiempo de la API de DNI aparece como métrica 'dni'
+- una sentencia que falla no deja rastro en la conexión (conn.info)
+
+Uso:
+    python tests/verify_instrumentacion.py
+    python -m pytest -q tests/verify_instrumentacion.py
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_api_peru import StubApiPeru
+
+# La URL de la API de DNI se lee al importar config: definirla antes
+_stub = StubApiPeru()
+os.environ["API_PERU_DEV_URL"] = _stub.url
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'instrumentacion.db')}"
+
+from flask import jsonify
+from sqlalchemy.exc import OperationalError
+
+from factory import create_app
+from extensions.database import db
+from models.area_model import Area
+from services.api_dni_services import DniService
+
+from datos import ContadorConsultas
+
+CONSULTAS = 5
+
+
+class _Captura(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append((record.name, record.levelno, json.loads(record.getMessage())))
+
+
+def _metricas(cabecera):
+    """{'db': (dur, desc), ...} a partir de Server-Timing."""
+    metricas = {}
+    for parte in cabecera.split(", "):
+        nombre, *atributos = parte.split(";")
+        valores = dict(a.split("=", 1) for a in atributos)
+        metricas[nombre] = (float(valores["dur"]), valores.get("desc", "").strip('"'))
+    return metricas
+
+
+def test_instrumentacion():
+    app = create_app('testing')
+
+    @app.get("/prueba-consultas")
+    def prueba():
+        for _ in range(CONSULTAS):
+            Area.query.count()
+        return jsonify({"ok": True}), 200
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        DniService._memoria.clear()
+
+    captura = _Captura()
+    logger = logging.getLogger("citas")
+    # Se reemplaza la salida a stdout por la captura (y se baja el nivel a INFO)
+    manejadores, nivel = logger.handlers[:], logger.level
+    logger.handlers = [captura]
+    logger.setLevel(logging.INFO)
+    client = app.test_client()
+
+    res = client.get("/api/health")
+    metricas = _metricas(res.headers["Server-Timing"])
+    assert metricas["db"] == (0.0, "0 consultas") and "total" in metricas, metricas
+    print("✓ Server-Timing sin consultas en /api/health")
+
+    with app.app_context():
+        engine = db.engine
+    with ContadorConsultas(engine) as contador:
+        res = client.get("/prueba-consultas")
+        creada = client.post("/api/areas/", json={"nombre": "Cardiología"})
+    contadas = contador.sentencias
+    assert creada.status_code == 201, creada.get_json()
+    consultas_prueba = int(_metricas(res.headers["Server-Timing"])["db"][1].split()[0])
+    consultas_area = int(_metricas(creada.headers["Server-Timing"])["db"][1].split()[0])
+    assert consultas_prueba == CONSULTAS, res.headers["Server-Timing"]
+    assert consultas_prueba + consultas_area == len(contadas), (consultas_prueba, consultas_area, len(contadas))
+    print(f"✓ Conteo de consultas igual al de un listener independiente ({len(contadas)})")
+
+    solicitud = [r for n, _, r in captura.registros if n == "citas.solicitudes" and r["ruta"] == "/prueba-consultas"][0]
+    assert solicitud["consultas"] == CONSULTAS and solicitud["status"] == 200
+    assert solicitud["endpoint"] == "prueba" and len(solicitud["lentas"]) == app.config["INSTRUMENTACION_TOP"]
+    assert all("SELECT count(*)" in lenta["sql"] for lenta in solicitud["lentas"]), solicitud["lentas"]
+    print("✓ Línea JSON por solicitud con las sentencias más lentas")
+
+    # Umbral 0: todas las sentencias son 'lentas'
+    app.config["SQL_LENTA_MS"] = 0
+    captura.registros.clear()
+    client.post("/api/areas/", json={"nombre": "Dermatología"})
+    lentas = [r for n, nivel, r in captura.registros if n == "citas.sql" and nivel == logging.WARNING]
+    assert lentas and all(r["endpoint"] == "area_bp.create_area" for r in lentas), lentas
+    assert not any("Dermatología" in r["sql"] for r in lentas), "El log de SQL lenta no debe incluir parámetros"
+    insert = [r for r in lentas if r["sql"].startswith("INSERT INTO areas")]
+    assert insert and "?" in insert[0]["sql"], lentas
+    captura.registros.clear()
+    with app.app_context():
+        Area.query.count()
+    assert [r["endpoint"] for n, _, r in captura.registros if n == "citas.sql"] == [None]
+    app.config["SQL_LENTA_MS"] = 200
+    print("✓ SQL lenta registrada sin parámetros, con endpoint (o sin él fuera de una solicitud)")
+
+    _stub.iniciar()
+    try:
+        res = client.post("/api/dni/", json={"dni": "12345678"})
+    finally:
+        _stub.detener()
+    assert res.status_code == 200, res.get_json()
+    metricas = _metricas(res.headers["Server-Timing"])
+    assert "dni" in metricas and metricas["dni"][0] > 0 and metricas["total"][0] >= metricas["dni"][0], metricas
+    print(f"✓ Tiempo de la API de DNI en Server-Timing ({metricas['dni'][0]} ms)")
+
+    logger.handlers = manejadores
+    logger.setLevel(nivel)
+
+
+def test_sentencias_fallidas():
+    app = create_app('testing')
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+            antes = repr(conn.info)
+            for _ in range(20):
+                try:
+                    conn.exec_driver_sql("SELECT * FROM tabla_inexistente")
+                    raise AssertionError("la sentencia debía fallar")
+                except OperationalError:
+                    conn.rollback()
+            assert repr(conn.info) == antes, conn.info
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+    print("✓ 20 sentencias fallidas no dejan inicios acumulados en la conexión")
+
+
+if __name__ == "__main__":
+    test_instrumentacion()
+    test_sentencias_fallidas()
+    print("OK: instrumentación por solicitud verificada")
@@ -0,0 +1,255 @@
+"""
+Verifica los trabajos en segundo plano (POST /api/jobs, services/job_service.py).
+
+Comprueba que:
+- POST /api/jobs encola (202 + Location) y valida tipo y parámetros (400)
+- el worker genera el mismo archivo que el endpoint síncrono y se descarga
+  con GET /api/jobs/<id>/descarga (409 mientras no está completado)
+- la tarea corre con el usuario que la encoló (un profesional solo exporta
+  sus citas) y solo ese usuario o un administrador ve el trabajo
+- un 4xx del controlador falla sin reintentar; una excepción se reintenta
+  hasta max_intentos
+- varios hilos compitiendo por la cola ejecutan cada trabajo una sola vez
+- un trabajo que dura más que JOBS_TIMEOUT renueva su reserva: ningún otro
+  worker lo retoma y se ejecuta una sola vez
+- un trabajo abandonado (reserva vencida) se retoma o, en su último
+  intento, se marca fallido
+- los trabajos vencidos se purgan con su archivo
+
+Uso:
+    python tests/verify_jobs.py
+    python -m pytest -q tests/verify_jobs.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'jobs.db')}"
+
+from flask import Response
+
+from factory import create_app
+from extensions.database import db
+from models.cita_model import Cita
+from models.horario_medico_model import HorarioMedico
+from models.job_model import Job, PENDIENTE, EN_PROCESO, COMPLETADO, FALLIDO
+from services import job_service
+from services.job_service import JobService
+
+from datos import DNI_ADMIN, cliente, dni_medico, reiniciar_bd, sembrar_base
+
+FECHA = date.today() + timedelta(days=1)
+
+
+def preparar_datos(app):
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(medicos=2, admin=True, login=True)
+        estados, area, medico, paciente = base.estados, base.areas[0], base.medicos[0], base.pacientes[0]
+
+        horario = HorarioMedico(medico_id=medico.id, area_id=area.id, fecha=FECHA,
+                                dia_semana=FECHA.weekday(), turno="M", cupos=5)
+        db.session.add(horario)
+        db.session.flush()
+        db.session.add(Cita(paciente_id=paciente.id, horario_id=horario.id, doctor_id=medico.id,
+                            area_id=area.id, fecha=FECHA, sintomas="Tos",
+                            estado_id=estados["confirmada"].id))
+        db.session.commit()
+        return area.id
+
+
+def estado(app, job_id):
+    with app.app_context():
+        return db.session.get(Job, job_id)
+
+
+def test_jobs_api():
+    app = create_app('testing')
+    area_id = preparar_datos(app)
+    medico, otro, admin = cliente(app, dni_medico(0)), cliente(app, dni_medico(1)), cliente(app, DNI_ADMIN)
+    parametros = {"fecha": str(FECHA), "area_id": area_id}
+
+    res = medico.post("/api/jobs", json={"tipo": "citas_confirmadas_pdf", "parametros": parametros})
+    assert res.status_code == 202, res.get_json()
+    job = res.get_json()
+    assert job["estado"] == PENDIENTE and res.headers["Location"] == f"/api/jobs/{job['id']}"
+    res = medico.get(f"/api/jobs/{job['id']}/descarga")
+    assert res.status_code == 409 and "Retry-After" in res.headers, res.get_json()
+
+    for cuerpo in [{"tipo": "otro"}, {"tipo": "citas_confirmadas_pdf", "parametros": {"fecha": str(FECHA)}},
+                   {"tipo": "reporte_pdf", "parametros": ["x"]}]:
+        res = medico.post("/api/jobs", json=cuerpo)
+        assert res.status_code == 400, (cuerpo, res.get_json())
+    assert app.test_client().post("/api/jobs", json={"tipo": "reporte_pdf"}).status_code == 401
+    print("✓ Encolado con 202 y Location; tipo y parámetros inválidos rechazados (400)")
+
+    JobService.trabajar(app, hilos=1, una_vez=True)
+
+    res = medico.get(f"/api/jobs/{job['id']}")
+    assert res.status_code == 200 and res.get_json()["estado"] == COMPLETADO, res.get_json()
+    archivo = res.get_json()["archivo"]
+    descarga = medico.get(archivo["descarga"])
+    sincrono = medico.get(f"/api/citas/confirmadas/pdf?fecha={FECHA}&area_id={area_id}")
+    assert descarga.status_code == 200 and descarga.mimetype == "application/pdf"
+    assert descarga.data.startswith(b"%PDF") and len(descarga.data) == archivo["tamano"]
+    assert descarga.headers["Content-Disposition"] == sincrono.headers["Content-Disposition"]
+    print(f"✓ PDF generado por el worker ({archivo['tamano']} bytes, {archivo['nombre']}) y descargado")
+
+    assert otro.get(f"/api/jobs/{job['id']}").status_code == 404
+    assert otro.get(archivo["descarga"]).status_code == 404
+    assert admin.get(f"/api/jobs/{job['id']}").status_code == 200
+    print("✓ Solo el usuario que lo encoló o un administrador ven el trabajo")
+
+    # La exportación respeta el rol: el otro profesional no tiene citas
+    ids = {}
+    for nombre, client in [("otro", otro), ("admin", admin)]:
+        res = client.post("/api/jobs", json={"tipo": "citas_export", "parametros": {"format": "csv"}})
+        ids[nombre] = res.get_json()["id"]
+    JobService.trabajar(app, hilos=1, una_vez=True)
+    lineas = {
+        nombre: client.get(f"/api/jobs/{ids[nombre]}/descarga").get_data(as_text=True).strip().splitlines()
+        for nombre, client in [("otro", otro), ("admin", admin)]
+    }
+    assert len(lineas["otro"]) == 1 and len(lineas["admin"]) == 2, lineas
+    print("✓ La exportación corre con el usuario que la encoló (profesional: solo sus citas)")
+
+    res = medico.post("/api/jobs", json={"tipo": "citas_confirmadas_pdf",
+                                         "parametros": {"fecha": str(FECHA), "area_id": 999}})
+    JobService.trabajar(app, hilos=1, una_vez=True)
+    fallido = medico.get(f"/api/jobs/{res.get_json()['id']}").get_json()
+    assert fallido["estado"] == FALLIDO and fallido["intentos"] == 1, fallido
+    assert fallido["error"] == "Área no encontrada" and fallido["archivo"] is None
+    res = medico.get(f"/api/jobs/{fallido['id']}/descarga")
+    assert res.status_code == 409 and "Retry-After" not in res.headers
+    print("✓ Un 4xx del controlador falla sin reintentar (error visible en el estado)")
+
+
+def test_reintentos_y_concurrencia():
+    app = create_app('testing')
+    app.config["JOBS_REINTENTO_SEGUNDOS"] = 0
+    preparar_datos(app)
+    original = dict(job_service.TAREAS)
+    llamadas = []
+    lock = threading.Lock()
+
+    def archivo():
+        return Response(b"ok", mimetype="text/plain", headers={"Content-Disposition": "attachment; filename=ok.txt"})
+
+    def falla_una_vez():
+        with lock:
+            llamadas.append(1)
+            if len(llamadas) == 1:
+                raise RuntimeError("Conexión perdida")
+        return archivo()
+
+    def siempre_falla():
+        raise RuntimeError("Error permanente")
+
+    def contada():
+        with lock:
+            llamadas.append(1)
+        return archivo()
+
+    try:
+        job_service.TAREAS.update({
+            "falla_una_vez": (falla_una_vez, ()), "siempre_falla": (siempre_falla, ()), "contada": (contada, ())
+        })
+        with app.app_context():
+            reintento = JobService.encolar("falla_una_vez").id
+            permanente = JobService.encolar("siempre_falla").id
+
+        assert JobService.procesar_uno(app) and JobService.procesar_uno(app)
+        job = estado(app, reintento)
+        assert job.estado == PENDIENTE and job.intentos == 1 and job.error == "Conexión perdida", job.to_dict()
+        JobService.trabajar(app, hilos=1, una_vez=True)
+        job, fallido = estado(app, reintento), estado(app, permanente)
+        assert job.estado == COMPLETADO and job.intentos == 2 and job.error is None, job.to_dict()
+        assert fallido.estado == FALLIDO and fallido.intentos == 3 and fallido.expira_en, fallido.to_dict()
+        print("✓ Excepciones reintentadas: éxito en el 2.º intento; fallido tras 3 intentos")
+
+        llamadas.clear()
+        with app.app_context():
+            ids = [JobService.encolar("contada").id for _ in range(12)]
+        JobService.trabajar(app, hilos=4, una_vez=True)
+        with app.app_context():
+            estados = {j.estado for j in Job.query.filter(Job.id.in_(ids))}
+            intentos = {j.intentos for j in Job.query.filter(Job.id.in_(ids))}
+        assert len(llamadas) == 12 and estados == {COMPLETADO} and intentos == {1}, (len(llamadas), estados)
+        print("✓ 4 hilos compitiendo: 12 trabajos ejecutados una vez cada uno")
+
+        with app.app_context():
+            vencida = datetime.utcnow() - timedelta(minutes=1)
+            retomar, agotado = JobService.encolar("contada").id, JobService.encolar("contada").id
+            db.session.execute(db.update(Job).where(Job.id == retomar).values(
+                estado=EN_PROCESO, intentos=1, bloqueado_hasta=vencida))
+            db.session.execute(db.update(Job).where(Job.id == agotado).values(
+                estado=EN_PROCESO, intentos=3, bloqueado_hasta=vencida))
+            db.session.commit()
+        JobService.trabajar(app, hilos=1, una_vez=True)
+        job, fallido = estado(app, retomar), estado(app, agotado)
+        assert job.estado == COMPLETADO and job.intentos == 2, job.to_dict()
+        assert fallido.estado == FALLIDO and "se detuvo" in fallido.error, fallido.to_dict()
+        print("✓ Reserva vencida: el trabajo se retoma; en su último intento queda fallido")
+
+        with app.app_context():
+            total = Job.query.count()
+            db.session.execute(db.update(Job).where(Job.id.in_(ids[:5])).values(
+                expira_en=datetime.utcnow() - timedelta(seconds=1)))
+            db.session.commit()
+            assert JobService.purgar_expirados() == 5 and Job.query.count() == total - 5
+        print("✓ Trabajos vencidos purgados")
+    finally:
+        job_service.TAREAS.clear()
+        job_service.TAREAS.update(original)
+
+
+
+def test_reserva_renovada():
+    app = create_app('testing')
+    app.config["JOBS_TIMEOUT"] = 1
+    preparar_datos(app)
+    original = dict(job_service.TAREAS)
+    llamadas = []
+
+    def lenta():
+        llamadas.append(1)
+        time.sleep(2.5)
+        return Response(b"ok", mimetype="text/plain", headers={"Content-Disposition": "attachment; filename=ok.txt"})
+
+    try:
+        job_service.TAREAS["lenta"] = (lenta, ())
+        with app.app_context():
+            job_id = JobService.encolar("lenta").id
+        primero = threading.Thread(target=JobService.procesar_uno, args=(app,))
+        primero.start()
+        time.sleep(0.2)
+        # Otro worker consulta la cola mientras la tarea supera JOBS_TIMEOUT
+        retomados = 0
+        while primero.is_alive():
+            retomados += JobService.procesar_uno(app)
+            time.sleep(0.2)
+        primero.join()
+
+        job = estado(app, job_id)
+        assert retomados == 0 and len(llamadas) == 1, (retomados, len(llamadas))
+        assert job.estado == COMPLETADO and job.intentos == 1, job.to_dict()
+        print("✓ Tarea de 2,5 s con JOBS_TIMEOUT=1: la reserva se renueva y se ejecuta una sola vez")
+    finally:
+        job_service.TAREAS.clear()
+        job_service.TAREAS.update(original)
+
+
+if __name__ == "__main__":
+    test_jobs_api()
+    test_reintentos_y_concurrencia()
+    test_reserva_renovada()
+    print("\nOK: trabajos en segundo plano verificados")
@@ -0,0 +1,148 @@
+"""
+Verifica GET /api/metrics (formato Prometheus).
+
+Comprueba que:
+- se cuentan solicitudes y latencias por endpoint de Flask y código
+  (las rutas inexistentes se agrupan en 'sin_ruta')
+- los gauges del pool reflejan las conexiones prestadas y se mide la espera
+- se exportan aciertos/fallos de las cachés y la latencia de la API de DNI
+- con METRICAS_TOKEN se exige el token Bearer; sin él, fuera de DEBUG o
+  TESTING las métricas no se sirven (403)
+- en modo multiproceso (gunicorn) se suman los valores de varios procesos
+
+Uso:
+    python tests/verify_metricas.py
+    python -m pytest -q tests/verify_metricas.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_api_peru import StubApiPeru
+
+# La URL de la API de DNI se lee al importar config: definirla antes
+_stub = StubApiPeru()
+os.environ["API_PERU_DEV_URL"] = _stub.url
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'metricas.db')}"
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from factory import create_app
+from extensions.database import db
+from services.api_dni_services import DniService
+
+SOLICITUDES_POR_PROCESO = 3
+PROCESOS = 2
+
+
+def muestras(texto):
+    """{(nombre_muestra, (('etiqueta', 'valor'), ...)): valor}"""
+    return {
+        (m.name, tuple(sorted(m.labels.items()))): m.value
+        for familia in text_string_to_metric_families(texto)
+        for m in familia.samples
+    }
+
+
+def valor(datos, nombre, **etiquetas):
+    return datos.get((nombre, tuple(sorted(etiquetas.items()))), 0)
+
+
+def leer(client, **kwargs):
+    res = client.get("/api/metrics", **kwargs)
+    assert res.status_code == 200, res.status_code
+    assert res.content_type.startswith("text/plain"), res.content_type
+    return muestras(res.get_data(as_text=True))
+
+
+def test_metricas():
+    app = create_app('testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        DniService._memoria.clear()
+    client = app.test_client()
+
+    for _ in range(3):
+        assert client.get("/api/areas/").status_code == 200
+    assert client.get("/api/no-existe").status_code == 404
+    datos = leer(client)
+    assert valor(datos, "citas_http_solicitudes_total",
+                 endpoint="area_bp.get_areas", metodo="GET", status="200") == 3
+    assert valor(datos, "citas_http_duracion_segundos_count", endpoint="area_bp.get_areas", metodo="GET") == 3
+    assert valor(datos, "citas_http_solicitudes_total", endpoint="sin_ruta", metodo="GET", status="404") == 1
+    print("✓ Solicitudes y latencia por endpoint; rutas inexistentes agrupadas")
+
+    assert valor(datos, "citas_db_pool_en_uso") == 0
+    assert valor(datos, "citas_db_pool_espera_segundos_count") > 0
+    with app.app_context():
+        conexion = db.engine.connect()
+        try:
+            assert valor(leer(client), "citas_db_pool_en_uso") == 1
+        finally:
+            conexion.close()
+    assert valor(leer(client), "citas_db_pool_en_uso") == 0
+    print("✓ Conexiones prestadas del pool y tiempo de espera")
+
+    _stub.iniciar()
+    try:
+        for _ in range(2):
+            assert client.post("/api/dni/", json={"dni": "12345678"}).status_code == 200
+    finally:
+        _stub.detener()
+    datos = leer(client)
+    assert valor(datos, "citas_cache_consultas_total", cache="dni", resultado="fallo") >= 1
+    assert valor(datos, "citas_cache_consultas_total", cache="dni", resultado="acierto") >= 1
+    assert valor(datos, "citas_externo_duracion_segundos_count", servicio="dni") == 1
+    print("✓ Aciertos/fallos de caché y latencia de la API de DNI")
+
+    app.config["METRICAS_TOKEN"] = "secreto"
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+    leer(client, headers={"Authorization": "Bearer secreto"})
+    app.config["METRICAS_TOKEN"] = ""
+    app.testing = False
+    assert client.get("/api/metrics").status_code == 403
+    app.testing = True
+    print("✓ Token Bearer exigido con METRICAS_TOKEN; sin token, 403 fuera de DEBUG/TESTING")
+
+    # Varios procesos escriben en el mismo directorio; un tercero lee la suma
+    entorno = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp())
+    for _ in range(PROCESOS):
+        subprocess.run([sys.executable, __file__, "--worker"], env=entorno, check=True)
+    salida = subprocess.run([sys.executable, __file__, "--leer"], env=entorno, check=True,
+                            capture_output=True, text=True).stdout
+    datos = muestras(salida)
+    total = SOLICITUDES_POR_PROCESO * PROCESOS
+    assert valor(datos, "citas_http_solicitudes_total",
+                 endpoint="area_bp.get_areas", metodo="GET", status="200") == total, salida
+    assert valor(datos, "citas_http_duracion_segundos_count", endpoint="area_bp.get_areas", metodo="GET") == total
+    print(f"✓ Modo multiproceso: {PROCESOS} procesos sumados ({total} solicitudes)")
+
+
+def _worker():
+    client = create_app('testing').test_client()
+    for _ in range(SOLICITUDES_POR_PROCESO):
+        assert client.get("/api/areas/").status_code == 200
+
+
+def _leer():
+    client = create_app('testing').test_client()
+    sys.stdout.write(client.get("/api/metrics").get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        _worker()
+    elif "--leer" in sys.argv:
+        _leer()
+    else:
+        test_metricas()
+        print("OK: métricas Prometheus verificadas")
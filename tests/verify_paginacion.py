@@ -0,0 +1,118 @@
+"""
+Verifica la paginación por cursor de GET /api/citas (utils/paginacion.py).
+
+Comprueba que:
+- recorrer más de 150 citas página a página con el cursor (con fechas NULL
+  y muchas fecha_registro iguales) entrega exactamente los mismos ids, en
+  el mismo orden, que el listado paginado por offset: sin huecos ni repetidos
+- la última página no trae next_cursor
+- un cursor mal formado responde 400
+- per_page fuera de 1..100 (p. ej. -5 o 1000) se ajusta a ese rango en
+  los dos modos
+
+Uso:
+    python tests/verify_paginacion.py
+    python -m pytest -q tests/verify_paginacion.py
+"""
+
+import base64
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'paginacion.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.cita_controller import CitaController
+from models.cita_model import Cita
+
+from datos import reiniciar_bd, sembrar_base
+
+TOTAL_CITAS = 163
+POR_PAGINA = 7
+
+
+def preparar_datos(app):
+    """Citas con fecha NULL (~1/4) y fecha_registro repetida en grupos grandes."""
+    rnd = random.Random(3)
+    with app.app_context():
+        reiniciar_bd()
+        paciente = sembrar_base(medicos=0).pacientes[0]
+
+        fechas = [None, date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)]
+        registros = [datetime(2025, 5, 20, 8, 0), datetime(2025, 5, 20, 8, 0) + timedelta(microseconds=1),
+                     datetime(2025, 5, 21, 9, 30)]
+        db.session.add_all([
+            Cita(paciente_id=paciente.id, fecha=rnd.choice(fechas), fecha_registro=rnd.choice(registros),
+                 sintomas="Control")
+            for _ in range(TOTAL_CITAS)
+        ])
+        db.session.commit()
+        assert Cita.query.filter(Cita.fecha.is_(None)).count() > 0
+
+
+def listar(app, url):
+    with app.test_request_context(url):
+        respuesta, status = CitaController.listar()
+        return respuesta.get_json(), status
+
+
+def test_paginacion_cursor():
+    app = create_app('testing')
+    preparar_datos(app)
+
+    por_offset = []
+    pagina = 1
+    while True:
+        datos, status = listar(app, f"/?page={pagina}&per_page={POR_PAGINA}")
+        assert status == 200, datos
+        por_offset += [c["id"] for c in datos["data"]]
+        if pagina >= datos["pages"]:
+            break
+        pagina += 1
+    grandes = [c["id"] for pagina in (1, 2) for c in listar(app, f"/?page={pagina}&per_page=100")[0]["data"]]
+    assert por_offset == grandes
+
+    por_cursor, paginas, cursor = [], 0, ""
+    while cursor is not None:
+        datos, status = listar(app, f"/?cursor={cursor}&per_page={POR_PAGINA}")
+        assert status == 200, datos
+        assert len(datos["data"]) <= POR_PAGINA and datos["has_more"] == (datos["next_cursor"] is not None)
+        por_cursor += [c["id"] for c in datos["data"]]
+        cursor = datos["next_cursor"]
+        paginas += 1
+
+    assert len(por_offset) == len(set(por_offset)) == TOTAL_CITAS
+    assert por_cursor == por_offset, [(i, a, b) for i, (a, b) in enumerate(zip(por_cursor, por_offset)) if a != b][:5]
+    print(f"✓ {TOTAL_CITAS} citas en {paginas} páginas por cursor: mismos ids y orden que por offset, "
+          "sin huecos ni repetidos")
+
+    def b64(valor):
+        return base64.urlsafe_b64encode(json.dumps(valor).encode()).decode().rstrip("=")
+
+    malformados = ["no-es-base64!", b64({"fecha": 1}), b64(["2025-06-01", "ayer", 1]), b64(["2025-06-01"])]
+    for cursor in malformados:
+        datos, status = listar(app, f"/?cursor={cursor}&per_page={POR_PAGINA}")
+        assert status == 400 and datos["error"] == "Cursor inválido", (cursor, status, datos)
+    print(f"✓ {len(malformados)} cursores mal formados rechazados (400)")
+
+    for per_page, esperado in [(-5, 1), (0, 1), (1000, 100)]:
+        for modo in (f"page=1&per_page={per_page}", f"cursor=&per_page={per_page}"):
+            datos, status = listar(app, f"/?{modo}")
+            assert status == 200 and datos["per_page"] == esperado, (modo, status, datos.get("per_page"))
+            assert len(datos["data"]) == esperado, (modo, len(datos["data"]))
+    print("✓ per_page -5, 0 y 1000 ajustados a 1..100 en offset y en cursor")
+
+
+if __name__ == "__main__":
+    test_paginacion_cursor()
+    print("\nOK: paginación por cursor verificada")
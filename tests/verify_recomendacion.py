@@ -0,0 +1,157 @@
+"""
+Verifica la recomendación de área por síntomas (POST /api/areas/recomendar).
+
+Reemplaza GeminiService.recommend_area por una respuesta controlada y
+comprueba que:
+- la segunda consulta con los mismos síntomas (mayúsculas, tildes,
+  puntuación) sale de la caché
+- las negaciones y el orden forman parte de la clave ("dolor sin fiebre"
+  no comparte respuesta con "dolor con fiebre")
+- si Gemini responde 429 o no responde, el clasificador local recomienda
+  el área de las citas anteriores con síntomas similares
+- un área inexistente devuelta por la IA se descarta
+- editar un área invalida la caché
+
+Uso:
+    python tests/verify_recomendacion.py
+    python -m pytest -q tests/verify_recomendacion.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'recomendacion.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.area_controller import AreaController
+from models.area_model import Area
+from models.cita_model import Cita
+from models.paciente_model import Paciente
+from models.persona_model import Persona
+from services.gemini_services import GeminiService
+from services.recomendacion_service import RecomendacionService, clave_sintomas
+
+HISTORIAL = {
+    "Medicina General": ["dolor de cabeza y malestar general", "gripe con dolor de cuerpo", "chequeo general"],
+    "Pediatría": ["niño con fiebre alta y tos", "bebé con diarrea", "control de niño sano", "niña con fiebre"],
+    "Odontología": ["dolor de muela", "caries y sangrado de encías", "limpieza dental", "muela rota"],
+}
+
+
+class GeminiFalso:
+    """Respuesta controlada de la IA que cuenta las llamadas."""
+
+    def __init__(self):
+        self.respuesta = None
+        self.llamadas = 0
+
+    def __call__(self, sintomas, areas):
+        self.llamadas += 1
+        return self.respuesta(areas) if callable(self.respuesta) else self.respuesta
+
+
+def preparar_datos(app):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        persona = Persona(dni="50000000", nombres="Paciente", apellido_paterno="Prueba", apellido_materno=".")
+        db.session.add(persona)
+        db.session.flush()
+        paciente = Paciente(persona_id=persona.id, estado_civil="S")
+        db.session.add(paciente)
+
+        areas = {}
+        for nombre, sintomas in HISTORIAL.items():
+            area = Area(nombre=nombre, descripcion=f"Atención de {nombre.lower()}")
+            db.session.add(area)
+            db.session.flush()
+            areas[nombre] = area.id
+            for texto in sintomas:
+                db.session.add(Cita(paciente_id=paciente.id, area_id=area.id, sintomas=texto))
+        db.session.commit()
+        return areas
+
+
+def recomendar(app, sintomas):
+    with app.test_request_context("/", method="POST"):
+        respuesta, status = AreaController.recommend({"sintomas": sintomas})
+        return respuesta.get_json(), status
+
+
+def test_clave_con_negaciones():
+    distintas = [
+        ("dolor sin fiebre", "dolor con fiebre"),
+        ("no sangra", "sangra"),
+        ("paciente niega dolor de pecho", "paciente con dolor de pecho"),
+        ("fiebre sin tos", "tos sin fiebre"),
+    ]
+    for a, b in distintas:
+        assert clave_sintomas(a, "v1") != clave_sintomas(b, "v1"), (a, b)
+    assert clave_sintomas("Dolor SIN fiebre.", "v1") == clave_sintomas("dolor sin fiebre", "v1")
+    assert clave_sintomas("dolor sin fiebre", "v1") != clave_sintomas("dolor sin fiebre", "v2")
+    print("✓ Negaciones y orden distinguen la clave de caché")
+
+
+def test_recomendacion():
+    app = create_app('testing')
+    areas = preparar_datos(app)
+    gemini = GeminiFalso()
+    original = GeminiService.recommend_area
+    GeminiService.recommend_area = staticmethod(gemini)
+    RecomendacionService._cache.clear()
+    RecomendacionService._modelo = None
+    try:
+        gemini.respuesta = {"area_id": areas["Pediatría"], "nombre_area": "Pediatría",
+                            "razon": "Paciente pediátrico", "nivel_urgencia": "media"}
+        datos, status = recomendar(app, "Niño con fiebre y tos")
+        assert status == 200 and datos["origen"] == "ia", datos
+        datos, status = recomendar(app, "niño, con FIEBRE y tos.")
+        assert status == 200 and datos["origen"] == "cache" and gemini.llamadas == 1, datos
+        print("✓ Síntomas equivalentes servidos desde la caché")
+
+        gemini.respuesta = {"error": "El servicio de IA está saturado momentáneamente.", "status": 429}
+        datos, status = recomendar(app, "me duele una muela")
+        assert status == 200 and datos["origen"] == "local", datos
+        assert datos["area_id"] == areas["Odontología"], datos
+        datos, status = recomendar(app, "Me duele UNA muela!")
+        assert datos["origen"] == "cache" and gemini.llamadas == 2, datos
+        print("✓ Con Gemini saturado responde el clasificador local")
+
+        gemini.respuesta = {"error": "El servicio de IA no respondió a tiempo.", "status": 504}
+        datos, status = recomendar(app, "dolor de cabeza fuerte")
+        assert status == 200 and datos["area_id"] == areas["Medicina General"], datos
+        print("✓ Con Gemini sin responder responde el clasificador local")
+
+        gemini.respuesta = {"area_id": 999, "nombre_area": "Inexistente", "razon": "", "nivel_urgencia": "baja"}
+        datos, status = recomendar(app, "bebé con diarrea")
+        assert datos["origen"] == "local" and datos["area_id"] == areas["Pediatría"], datos
+        print("✓ Área inexistente devuelta por la IA descartada")
+
+        gemini.respuesta = {"error": "El servicio de IA está saturado momentáneamente.", "status": 429}
+        datos, status = recomendar(app, "xyz")
+        assert status == 429, datos
+        print("✓ Sin coincidencias locales se devuelve el error de la IA")
+
+        with app.test_request_context("/", method="PUT"):
+            _, status = AreaController.update(areas["Pediatría"], {"descripcion": "Niños y adolescentes"})
+            assert status == 200
+        gemini.respuesta = {"area_id": areas["Pediatría"], "nombre_area": "Pediatría",
+                            "razon": "Paciente pediátrico", "nivel_urgencia": "media"}
+        llamadas = gemini.llamadas
+        datos, status = recomendar(app, "Niño con fiebre y tos")
+        assert datos["origen"] == "ia" and gemini.llamadas == llamadas + 1, datos
+        print("✓ Editar un área invalida la caché")
+    finally:
+        GeminiService.recommend_area = original
+
+
+if __name__ == "__main__":
+    test_clave_con_negaciones()
+    test_recomendacion()
+    print("OK: recomendación de área verificada")
@@ -0,0 +1,156 @@
+"""
+Verifica las estadísticas de reportes (services/reporte_service.py) contra
+un reconteo en Python sobre las citas.
+
+Comprueba que, para todo el rango y filtrado por área:
+- total, canceladas, tasa de asistencia y conteos por estado (en el orden
+  fijo de CitaDiaria.COLUMNAS_ESTADO) coinciden con el reconteo; las citas
+  sin estado cuentan como pendientes
+- atendidas por mes y citas por especialidad ('General' sin área) coinciden
+- el detalle son las 50 últimas citas (fecha e id descendentes)
+- el PDF (GET /api/reportes/exportar-pdf) recibe los mismos números que el JSON
+
+Uso:
+    python tests/verify_reportes.py
+    python -m pytest -q tests/verify_reportes.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if not os.getenv("TEST_DATABASE_URI"):
+    _tmp_dir = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'reportes.db')}"
+
+from factory import create_app
+from extensions.database import db
+from controllers.reporte_controller import ReporteController
+from models.area_model import Area
+from models.cita_diaria_model import CitaDiaria
+from models.cita_model import Cita
+from models.estado_cita_model import EstadoCita
+from services.pdf_service import PDFService
+from services.reporte_service import MESES
+
+from datos import ESTADOS, reiniciar_bd, sembrar_base
+
+INICIO = date(2025, 3, 1)
+FIN = date(2025, 5, 31)
+
+
+def preparar_datos(app):
+    """Citas en tres meses (y fuera del rango) con estados al azar, algunas sin estado o sin área."""
+    rnd = random.Random(11)
+    with app.app_context():
+        reiniciar_bd()
+        base = sembrar_base(areas=2, medicos=0, pacientes=4)
+        estados, areas, pacientes = base.estados, base.areas, base.pacientes
+
+        for _ in range(240):
+            fecha = INICIO + timedelta(days=rnd.randint(-20, (FIN - INICIO).days + 20))
+            estado = rnd.choice(ESTADOS + [None, None])
+            area = rnd.choice(areas + [None])
+            db.session.add(Cita(
+                paciente_id=rnd.choice(pacientes).id, area_id=area.id if area else None, fecha=fecha,
+                sintomas="Control", estado_id=estados[estado].id if estado else None
+            ))
+        db.session.flush()
+        assert Cita.query.filter(Cita.estado_id.is_(None)).count() > 0
+        CitaDiaria.reconstruir()
+        db.session.commit()
+        return [a.id for a in areas]
+
+
+def reconteo(area_id=None):
+    """Las mismas estadísticas calculadas fila por fila desde 'citas'."""
+    nombres_estado = {e.id: e.nombre for e in EstadoCita.query.all()}
+    nombres_area = {a.id: a.nombre for a in Area.query.all()}
+
+    def estado(c):
+        return nombres_estado.get(c.estado_id, "pendiente")
+
+    def area(c):
+        return nombres_area.get(c.area_id, "General")
+
+    citas = [
+        c for c in Cita.query.all()
+        if INICIO <= c.fecha <= FIN and (area_id is None or c.area_id == area_id)
+    ]
+    estados = Counter(estado(c) for c in citas)
+    total = len(citas)
+    validas = total - estados["cancelada"]
+    atendidas_mes = Counter(c.fecha.month for c in citas if estado(c) == "atendida")
+    especialidades = Counter(area(c) for c in citas)
+    detalle = sorted(citas, key=lambda c: (c.fecha, c.id), reverse=True)[:50]
+
+    return {
+        "stats": {
+            "totalCitas": total,
+            "tasaAsistencia": round(estados["atendida"] / validas * 100, 1) if validas else 0,
+            "cancelaciones": estados["cancelada"],
+        },
+        "estados": [(e, estados[e]) for e in CitaDiaria.COLUMNAS_ESTADO if estados[e]],
+        "citasAtendidasPorMes": [
+            {"nombre": MESES[mes], "cantidad": atendidas_mes[mes]} for mes in sorted(atendidas_mes)
+        ],
+        "citasPorEspecialidad": sorted([
+            {"nombre": nombre, "cantidad": n, "porcentaje": round(n / total * 100, 1)}
+            for nombre, n in especialidades.items()
+        ], key=lambda e: (-e["cantidad"], e["nombre"])),
+        "detalle": [
+            (c.id, str(c.fecha), estado(c), area(c))
+            for c in detalle
+        ],
+    }
+
+
+def comparar(datos, esperado, pdf_args):
+    assert datos["stats"] == esperado["stats"], (datos["stats"], esperado["stats"])
+    assert [(e["label"].lower(), e["value"]) for e in datos["estadoCitas"]] == esperado["estados"], datos["estadoCitas"]
+    assert datos["citasAtendidasPorMes"] == esperado["citasAtendidasPorMes"]
+    assert datos["citasPorEspecialidad"] == esperado["citasPorEspecialidad"], datos["citasPorEspecialidad"]
+    assert [(d["id"], d["fecha"], d["estado"], d["especialidad"]) for d in datos["citasDetalle"]] == esperado["detalle"]
+
+    assert pdf_args["stats"] == esperado["stats"]
+    assert pdf_args["citas_por_especialidad"] == esperado["citasPorEspecialidad"]
+    assert [d["id"] for d in pdf_args["citas_detalle"]] == [d[0] for d in esperado["detalle"]]
+
+
+def test_reportes():
+    app = create_app('testing')
+    area_ids = preparar_datos(app)
+    original = PDFService.generar_pdf_reporte_estadisticas
+    recibidos = {}
+
+    def capturar(**kwargs):
+        recibidos.update(kwargs)
+        return original(**kwargs)
+
+    PDFService.generar_pdf_reporte_estadisticas = staticmethod(capturar)
+    try:
+        for area_id in [None, *area_ids]:
+            url = f"/?fecha_inicio={INICIO}&fecha_fin={FIN}" + (f"&area_id={area_id}" if area_id else "")
+            with app.test_request_context(url):
+                datos = ReporteController.obtener_estadisticas().get_json()
+                pdf = ReporteController.exportar_pdf()
+                assert pdf.status_code == 200 and pdf.mimetype == "application/pdf"
+                pdf.close()
+                esperado = reconteo(int(area_id) if area_id else None)
+            comparar(datos, esperado, recibidos)
+            print(f"✓ Área {area_id or 'todas'}: {datos['stats']['totalCitas']} citas, "
+                  f"{datos['stats']['cancelaciones']} canceladas, {len(esperado['estados'])} estados; "
+                  "JSON y PDF = reconteo")
+    finally:
+        PDFService.generar_pdf_reporte_estadisticas = original
+
+
+if __name__ == "__main__":
+    test_reportes()
+    print("\nOK: estadísticas de reportes verificadas")
@@ -0,0 +1,81 @@
+"""
+Caché en memoria con expiración (TTL) y tamaño acotado.
+
+Cada worker de gunicorn tiene su propia instancia; los datos cacheados aquí
+deben tolerar quedar desactualizados como máximo 'ttl' segundos en los
+demás workers, o invalidarse por otro medio.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metricas import CACHE
+
+_SIN_VALOR = object()
+
+
+class TTLCache:
+    """
+    Diccionario LRU con expiración por entrada, seguro entre hilos.
+
+    Args:
+        maxsize: Número máximo de entradas (se descarta la menos usada)
+        ttl: Segundos de vida por defecto de cada entrada
+        nombre: Etiqueta 'cache' de citas_cache_consultas_total (sin nombre no se exporta)
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, nombre=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.nombre = nombre
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave, default=None):
+        with self._lock:
+            entrada = self._datos.get(clave, _SIN_VALOR)
+            if entrada is _SIN_VALOR:
+                return self._fallo(default)
+
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return self._fallo(default)
+
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            if self.nombre:
+                CACHE.labels(self.nombre, "acierto").inc()
+            return valor
+
+    def _fallo(self, default):
+        self.misses += 1
+        if self.nombre:
+            CACHE.labels(self.nombre, "fallo").inc()
+        return default
+
+    def set(self, clave, valor, ttl=None):
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (expira, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __contains__(self, clave):
+        return self.get(clave, _SIN_VALOR) is not _SIN_VALOR
+
+    def __len__(self):
+        with self._lock:
+            return len(self._datos)
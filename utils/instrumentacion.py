@@ -0,0 +1,160 @@
+"""
+Instrumentación por solicitud: consultas SQL, tiempo en BD y llamadas externas.
+
+Para saber por qué una página es lenta en producción (muchas consultas por
+carga diferida, una consulta mala o la API de DNI) cada solicitud registra:
+- número de consultas y tiempo total en la base de datos
+- las INSTRUMENTACION_TOP sentencias más lentas
+- tiempo en servicios externos (medir_externo: 'dni', 'gemini')
+
+y los devuelve en la cabecera Server-Timing (visible en las DevTools del
+navegador) y en una línea JSON del logger 'citas.solicitudes'. Toda
+sentencia que supere SQL_LENTA_MS se registra en 'citas.sql' (WARNING) con
+su SQL sin parámetros y el endpoint que la originó, también fuera de una
+solicitud (scripts, hilos).
+"""
+
+import json
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metricas import EXTERNO
+
+log_solicitudes = logging.getLogger("citas.solicitudes")
+log_sql = logging.getLogger("citas.sql")
+
+_ESPACIOS = re.compile(r"\s+")
+_LARGO_SQL = 300
+
+_listeners_instalados = False
+
+
+def _registro():
+    """Métricas de la solicitud actual (None fuera de una solicitud)."""
+    if not has_request_context():
+        return None
+    return g.get("_instrumentacion")
+
+
+def _sql_compacto(statement):
+    sql = _ESPACIOS.sub(" ", statement).strip()
+    return sql if len(sql) <= _LARGO_SQL else sql[:_LARGO_SQL] + "..."
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    # El inicio vive en el contexto de ejecución de la sentencia: si falla,
+    # se descarta con él (nada queda acumulado en la conexión del pool)
+    if context is not None:
+        context._instr_inicio = time.perf_counter()
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_instr_inicio", None)
+    if inicio is None:
+        return
+    ms = (time.perf_counter() - inicio) * 1000
+
+    registro = _registro()
+    if registro is not None:
+        registro["consultas"] += 1
+        registro["db_ms"] += ms
+        lentas = registro["lentas"]
+        if len(lentas) < registro["top"] or ms > lentas[-1][0]:
+            lentas.append((ms, statement))
+            lentas.sort(key=lambda x: -x[0])
+            del lentas[registro["top"]:]
+
+    umbral = current_app.config["SQL_LENTA_MS"] if has_app_context() else None
+    if umbral is not None and ms >= umbral:
+        log_sql.warning(json.dumps({
+            "evento": "sql_lenta",
+            "ms": round(ms, 1),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "ruta": request.path if has_request_context() else None,
+            "sql": _sql_compacto(statement)
+        }, ensure_ascii=False))
+
+
+@contextmanager
+def medir_externo(nombre):
+    """
+    Tiempo de una llamada externa (p.ej. 'dni'): se suma al registro de la
+    solicitud y al histograma citas_externo_duracion_segundos.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        EXTERNO.labels(nombre).observe(time.perf_counter() - inicio)
+        registro = _registro()
+        if registro is not None:
+            externos = registro["externos"]
+            externos[nombre] = externos.get(nombre, 0) + (time.perf_counter() - inicio) * 1000
+
+
+def _iniciar():
+    g._instrumentacion = {
+        "inicio": time.perf_counter(),
+        "consultas": 0,
+        "db_ms": 0.0,
+        "lentas": [],
+        "externos": {},
+        "top": current_app.config["INSTRUMENTACION_TOP"],
+    }
+
+
+def _finalizar(respuesta):
+    registro = _registro()
+    if registro is None:
+        return respuesta
+    total_ms = (time.perf_counter() - registro["inicio"]) * 1000
+
+    metricas = [f'db;dur={registro["db_ms"]:.1f};desc="{registro["consultas"]} consultas"']
+    metricas += [f"{nombre};dur={ms:.1f}" for nombre, ms in registro["externos"].items()]
+    metricas.append(f"total;dur={total_ms:.1f}")
+    respuesta.headers["Server-Timing"] = ", ".join(metricas)
+
+    log_solicitudes.info(json.dumps({
+        "evento": "solicitud",
+        "metodo": request.method,
+        "ruta": request.path,
+        "endpoint": request.endpoint,
+        "status": respuesta.status_code,
+        "ms": round(total_ms, 1),
+        "consultas": registro["consultas"],
+        "db_ms": round(registro["db_ms"], 1),
+        "externos": {nombre: round(ms, 1) for nombre, ms in registro["externos"].items()},
+        "lentas": [{"ms": round(ms, 1), "sql": _sql_compacto(sql)} for ms, sql in registro["lentas"]],
+    }, ensure_ascii=False))
+    return respuesta
+
+
+def instalar(app):
+    """Listeners de SQLAlchemy (una vez por proceso) y hooks de Flask de la app."""
+    global _listeners_instalados
+    if not app.config["INSTRUMENTACION"]:
+        return
+
+    if not _listeners_instalados:
+        event.listen(Engine, "before_cursor_execute", _antes)
+        event.listen(Engine, "after_cursor_execute", _despues)
+        _listeners_instalados = True
+
+    logger = logging.getLogger("citas")
+    if not logger.handlers:
+        # Una línea por registro en stdout (gunicorn la envía a los logs de Railway)
+        manejador = logging.StreamHandler(sys.stdout)
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(manejador)
+        logger.propagate = False
+    logger.setLevel(app.config["LOG_NIVEL"])
+
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
@@ -0,0 +1,146 @@
+"""
+Métricas Prometheus de la API (GET /api/metrics).
+
+- citas_http_solicitudes_total / citas_http_duracion_segundos: por endpoint
+  de Flask ('cita_bp.get_citas', 'horario_bp....'), método y código
+- citas_db_pool_en_uso / citas_db_pool_desborde: conexiones prestadas y
+  por encima de pool_size; citas_db_pool_espera_segundos: tiempo para
+  obtener una conexión del pool (incluye abrir una nueva)
+- citas_cache_consultas_total: aciertos y fallos de cada TTLCache con nombre
+- citas_externo_duracion_segundos: API de DNI y Gemini (medir_externo)
+- citas_jobs_total / citas_jobs_duracion_segundos: trabajos en segundo
+  plano por tipo y resultado (completado, reintento, fallido). Los del
+  servicio worker los expone procesar_jobs.py --puerto-metricas
+
+Con gunicorn (varios workers) cada proceso escribe sus valores en
+PROMETHEUS_MULTIPROC_DIR (lo define gunicorn.conf.py) y /api/metrics
+suma los de todos los workers vivos. Sin esa variable se usa el registro
+del proceso.
+"""
+
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+SOLICITUDES = Counter(
+    "citas_http_solicitudes_total", "Solicitudes HTTP atendidas",
+    ["endpoint", "metodo", "status"]
+)
+DURACION = Histogram(
+    "citas_http_duracion_segundos", "Duración de las solicitudes HTTP",
+    ["endpoint", "metodo"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_EN_USO = Gauge(
+    "citas_db_pool_en_uso", "Conexiones de BD prestadas", multiprocess_mode="livesum"
+)
+POOL_DESBORDE = Gauge(
+    "citas_db_pool_desborde", "Conexiones de BD por encima de pool_size", multiprocess_mode="livesum"
+)
+POOL_ESPERA = Histogram(
+    "citas_db_pool_espera_segundos", "Tiempo para obtener una conexión del pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+CACHE = Counter(
+    "citas_cache_consultas_total", "Consultas a las cachés en memoria",
+    ["cache", "resultado"]
+)
+EXTERNO = Histogram(
+    "citas_externo_duracion_segundos", "Duración de las llamadas a servicios externos",
+    ["servicio"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+TRABAJOS = Counter(
+    "citas_jobs_total", "Intentos de trabajos en segundo plano",
+    ["tipo", "resultado"]
+)
+TRABAJO_DURACION = Histogram(
+    "citas_jobs_duracion_segundos", "Duración de los intentos de trabajos en segundo plano",
+    ["tipo"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+
+# Solicitudes sin ruta (404) se agrupan para no crear una serie por URL
+_SIN_RUTA = "sin_ruta"
+
+_engines_instrumentados = set()
+
+
+def multiproceso():
+    return bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def registro():
+    """Registro a exportar: la suma de PROMETHEUS_MULTIPROC_DIR o el del proceso."""
+    if multiproceso():
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return registro
+    return REGISTRY
+
+
+def exportar():
+    """(cuerpo, content-type) en formato de texto de Prometheus."""
+    return generate_latest(registro()), CONTENT_TYPE_LATEST
+
+
+def _iniciar():
+    g._metricas_inicio = time.perf_counter()
+
+
+def _finalizar(respuesta):
+    inicio = g.pop("_metricas_inicio", None)
+    if inicio is None:
+        return respuesta
+    endpoint = request.endpoint or _SIN_RUTA
+    DURACION.labels(endpoint, request.method).observe(time.perf_counter() - inicio)
+    SOLICITUDES.labels(endpoint, request.method, str(respuesta.status_code)).inc()
+    return respuesta
+
+
+def _instrumentar_pool(engine):
+    """Préstamos/devoluciones del pool y tiempo de espera de raw_connection()."""
+    if engine in _engines_instrumentados:
+        return
+    _engines_instrumentados.add(engine)
+
+    def desborde():
+        overflow = getattr(engine.pool, "overflow", None)
+        POOL_DESBORDE.set(max(overflow(), 0) if overflow else 0)
+
+    @event.listens_for(engine, "checkout")
+    def prestada(dbapi_connection, connection_record, connection_proxy):
+        POOL_EN_USO.inc()
+        desborde()
+
+    @event.listens_for(engine, "checkin")
+    def devuelta(dbapi_connection, connection_record):
+        POOL_EN_USO.dec()
+        desborde()
+
+    # Connection() obtiene la conexión con engine.raw_connection(): se mide ahí
+    raw_connection = engine.raw_connection
+
+    def raw_connection_medida(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            POOL_ESPERA.observe(time.perf_counter() - inicio)
+
+    engine.raw_connection = raw_connection_medida
+
+
+def instalar(app, db):
+    """Hooks de Flask de la app e instrumentación de los engines de db."""
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
+    with app.app_context():
+        for engine in db.engines.values():
+            _instrumentar_pool(engine)
@@ -0,0 +1,104 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+A diferencia de query.paginate(), no ejecuta COUNT(*) ni OFFSET: cada página
+continúa desde los valores de orden de la última fila entregada, por lo que
+las páginas profundas cuestan lo mismo que la primera.
+
+El cursor es opaco para el frontend (JSON en base64 url-safe).
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from extensions.database import db
+
+# Tope de filas por página en los listados (per_page fuera de rango se ajusta)
+MAX_POR_PAGINA = 100
+
+
+def limitar_per_page(per_page):
+    """Ajusta per_page al rango 1..MAX_POR_PAGINA (tanto en offset como en cursor)."""
+    return max(1, min(per_page, MAX_POR_PAGINA))
+
+
+def codificar_cursor(valores):
+    """Convierte la lista de valores de orden en un cursor opaco."""
+    serializables = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    raw = json.dumps(serializables, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor, tipos):
+    """
+    Reconstruye los valores de orden desde el cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        tipos: Lista de funciones de conversión (una por columna), p.ej. date.fromisoformat
+
+    Raises:
+        ValueError: si el cursor no es válido
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(valores, list) or len(valores) != len(tipos):
+        raise ValueError("Cursor inválido")
+
+    try:
+        return [None if v is None else tipo(v) for v, tipo in zip(valores, tipos)]
+    except (TypeError, ValueError):
+        raise ValueError("Cursor inválido")
+
+
+def _despues_de(columna, valor):
+    """Filas que van estrictamente después de 'valor' en orden DESC NULLS LAST."""
+    if valor is None:
+        return db.false()
+    return db.or_(columna < valor, columna.is_(None))
+
+
+def _igual_a(columna, valor):
+    return columna.is_(None) if valor is None else columna == valor
+
+
+def paginar_keyset(query, orden, cursor=None, per_page=10):
+    """
+    Pagina una consulta por cursor.
+
+    Args:
+        query: Query de SQLAlchemy con los filtros ya aplicados (sin order_by)
+        orden: Lista de (columna, tipo) en orden de prioridad. Todas se ordenan
+               DESC NULLS LAST; la última debe ser única (normalmente el id).
+        cursor: Cursor de la página anterior (None o "" para la primera página)
+        per_page: Cantidad de filas por página (se ajusta con limitar_per_page)
+
+    Returns:
+        (items, next_cursor) donde next_cursor es None si no hay más páginas.
+    """
+    per_page = limitar_per_page(per_page)
+    columnas = [col for col, _ in orden]
+
+    if cursor:
+        valores = decodificar_cursor(cursor, [tipo for _, tipo in orden])
+        condiciones = []
+        for k, (columna, valor) in enumerate(zip(columnas, valores)):
+            prefijo = [_igual_a(columnas[j], valores[j]) for j in range(k)]
+            condiciones.append(db.and_(*prefijo, _despues_de(columna, valor)))
+        query = query.filter(db.or_(*condiciones))
+
+    query = query.order_by(*[col.desc().nullslast() for col in columnas])
+    filas = query.limit(per_page + 1).all()
+
+    items = filas[:per_page]
+    next_cursor = None
+    if len(filas) > per_page and items:
+        ultimo = items[-1]
+        next_cursor = codificar_cursor([getattr(ultimo, col.key) for col in columnas])
+
+    return items, next_cursor
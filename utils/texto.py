@@ -0,0 +1,17 @@
+"""
+Normalización de texto para búsquedas y comparaciones.
+"""
+
+import re
+import unicodedata
+
+
+def sin_tildes(texto):
+    """Quita tildes y diéresis (la ñ queda como n)."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con espacios simples: 'José  PÉREZ' -> 'jose perez'."""
+    return re.sub(r"\s+", " ", sin_tildes(texto).lower()).strip()